@@ -16,6 +16,7 @@ from .models import (
     AuctionWatchlist,
     AuctionResult
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class BidInline(admin.TabularInline):
@@ -62,7 +63,7 @@ class AuctionResultInline(admin.StackedInline):
 
 
 @admin.register(Auction)
-class AuctionAdmin(admin.ModelAdmin):
+class AuctionAdmin(PerformanceModelAdmin):
     list_display = [
         'auction_number',
         'title',
@@ -238,7 +239,7 @@ class AuctionAdmin(admin.ModelAdmin):
     
     def current_bid_display(self, obj):
         if obj.current_bid > 0:
-            return format_html('${:,.2f}', obj.current_bid)
+            return format_html('${}', f'{obj.current_bid:,.2f}')
         return format_html('<span style="color: gray;">No bids</span>')
     current_bid_display.short_description = 'Current Bid'
     current_bid_display.admin_order_field = 'current_bid'
@@ -310,7 +311,7 @@ class AuctionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Bid)
-class BidAdmin(admin.ModelAdmin):
+class BidAdmin(PerformanceModelAdmin):
     list_display = [
         'id',
         'auction_link',
@@ -321,6 +322,7 @@ class BidAdmin(admin.ModelAdmin):
         'is_outbid',
         'created_at'
     ]
+    list_select_related = ['auction', 'bidder']
     list_filter = [
         'bid_type',
         'is_winning_bid',
@@ -364,19 +366,19 @@ class BidAdmin(admin.ModelAdmin):
     auction_link.short_description = 'Auction'
     
     def bidder_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.bidder.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.bidder.get_full_name() or obj.bidder.username)
+        url = reverse('admin:authentication_user_change', args=[obj.bidder.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.bidder.get_full_name() or obj.bidder.email)
     bidder_link.short_description = 'Bidder'
     
     def bid_amount_display(self, obj):
         color = 'green' if obj.is_winning_bid else 'black'
-        return format_html('<span style="color: {}; font-weight: bold;">${:,.2f}</span>', color, obj.bid_amount)
+        return format_html('<span style="color: {}; font-weight: bold;">${}</span>', color, f'{obj.bid_amount:,.2f}')
     bid_amount_display.short_description = 'Bid Amount'
     bid_amount_display.admin_order_field = 'bid_amount'
 
 
 @admin.register(AuctionParticipant)
-class AuctionParticipantAdmin(admin.ModelAdmin):
+class AuctionParticipantAdmin(PerformanceModelAdmin):
     list_display = [
         'user_link',
         'auction_link',
@@ -388,6 +390,7 @@ class AuctionParticipantAdmin(admin.ModelAdmin):
         'highest_bid_display',
         'proxy_bid_enabled'
     ]
+    list_select_related = ['auction', 'user']
     list_filter = [
         'is_approved',
         'registration_fee_paid',
@@ -444,8 +447,8 @@ class AuctionParticipantAdmin(admin.ModelAdmin):
     actions = ['approve_participants', 'mark_fees_paid', 'mark_deposit_paid']
     
     def user_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.user.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+        url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
     user_link.short_description = 'User'
     
     def auction_link(self, obj):
@@ -455,7 +458,7 @@ class AuctionParticipantAdmin(admin.ModelAdmin):
     
     def highest_bid_display(self, obj):
         if obj.highest_bid:
-            return format_html('${:,.2f}', obj.highest_bid)
+            return format_html('${}', f'{obj.highest_bid:,.2f}')
         return '-'
     highest_bid_display.short_description = 'Highest Bid'
     highest_bid_display.admin_order_field = 'highest_bid'
@@ -478,7 +481,7 @@ class AuctionParticipantAdmin(admin.ModelAdmin):
 
 
 @admin.register(AuctionWatchlist)
-class AuctionWatchlistAdmin(admin.ModelAdmin):
+class AuctionWatchlistAdmin(PerformanceModelAdmin):
     list_display = [
         'user_link',
         'auction_link',
@@ -486,6 +489,7 @@ class AuctionWatchlistAdmin(admin.ModelAdmin):
         'notify_before_end',
         'notify_on_outbid'
     ]
+    list_select_related = ['auction', 'user']
     list_filter = [
         'notify_before_end',
         'notify_on_outbid',
@@ -501,8 +505,8 @@ class AuctionWatchlistAdmin(admin.ModelAdmin):
     date_hierarchy = 'added_at'
     
     def user_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.user.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+        url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
     user_link.short_description = 'User'
     
     def auction_link(self, obj):
@@ -512,7 +516,7 @@ class AuctionWatchlistAdmin(admin.ModelAdmin):
 
 
 @admin.register(AuctionResult)
-class AuctionResultAdmin(admin.ModelAdmin):
+class AuctionResultAdmin(PerformanceModelAdmin):
     list_display = [
         'auction_link',
         'winner_link',
@@ -523,6 +527,7 @@ class AuctionResultAdmin(admin.ModelAdmin):
         'payment_progress_bar',
         'created_at'
     ]
+    list_select_related = ['auction', 'winner']
     list_filter = [
         'payment_status',
         'delivery_status',
@@ -593,18 +598,18 @@ class AuctionResultAdmin(admin.ModelAdmin):
     
     def winner_link(self, obj):
         if obj.winner:
-            url = reverse('admin:auth_user_change', args=[obj.winner.pk])
-            return format_html('<a href="{}">{}</a>', url, obj.winner.get_full_name() or obj.winner.username)
+            url = reverse('admin:authentication_user_change', args=[obj.winner.pk])
+            return format_html('<a href="{}">{}</a>', url, obj.winner.get_full_name() or obj.winner.email)
         return '-'
     winner_link.short_description = 'Winner'
     
     def final_price_display(self, obj):
-        return format_html('${:,.2f}', obj.final_price)
+        return format_html('${}', f'{obj.final_price:,.2f}')
     final_price_display.short_description = 'Final Price'
     final_price_display.admin_order_field = 'final_price'
     
     def total_amount_display(self, obj):
-        return format_html('<strong>${:,.2f}</strong>', obj.total_amount)
+        return format_html('<strong>${}</strong>', f'{obj.total_amount:,.2f}')
     total_amount_display.short_description = 'Total Amount'
     total_amount_display.admin_order_field = 'total_amount'
     
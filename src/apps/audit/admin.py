@@ -7,10 +7,11 @@ from django.utils.safestring import mark_safe
 from django.db.models import Count
 from .models import AuditLog, LoginHistory
 import json
+from utils.admin import PerformanceModelAdmin
 
 
 @admin.register(AuditLog)
-class AuditLogAdmin(admin.ModelAdmin):
+class AuditLogAdmin(PerformanceModelAdmin):
     """Admin interface for Audit Logs"""
     
     list_display = [
@@ -56,6 +57,7 @@ class AuditLogAdmin(admin.ModelAdmin):
     date_hierarchy = 'timestamp'
     ordering = ['-timestamp']
     list_per_page = 50
+    list_select_related = ['user']
     
     def user_display_name(self, obj):
         """Display user with email"""
@@ -167,7 +169,7 @@ class AuditLogAdmin(admin.ModelAdmin):
 
 
 @admin.register(LoginHistory)
-class LoginHistoryAdmin(admin.ModelAdmin):
+class LoginHistoryAdmin(PerformanceModelAdmin):
     """Admin interface for Login History"""
     
     list_display = [
@@ -207,6 +209,7 @@ class LoginHistoryAdmin(admin.ModelAdmin):
     date_hierarchy = 'timestamp'
     ordering = ['-timestamp']
     list_per_page = 50
+    list_select_related = ['user']
     
     def user_link(self, obj):
         """Display user with link"""
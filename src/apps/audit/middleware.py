@@ -1,11 +1,18 @@
 """
 Audit Middleware
-Automatically logs all requests and user actions
+Automatically logs all requests and user actions, and profiles request
+performance (see performance.py)
 """
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.dispatch import receiver
 from .models import AuditLog, LoginHistory
+from . import performance
 from utils.constants import AuditAction
 import json
 import logging
@@ -235,6 +242,46 @@ class AuditLogMiddleware(MiddlewareMixin):
             return data
 
 
+class PerformanceMiddleware:
+    """
+    Profiles a sample of requests (wall time, queries, repeated queries,
+    cache and template time) into the in-memory metrics buffer.
+    Place it first so the time spent in other middleware is included.
+    """
+
+    EXCLUDED_PATHS = [
+        '/static/',
+        '/media/',
+        '/favicon.ico',
+        '/health/',
+    ]
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        performance.install_hooks()
+
+    def __call__(self, request):
+        if request.path.startswith(tuple(self.EXCLUDED_PATHS)) or not performance.should_sample():
+            return self.get_response(request)
+
+        profile, token = performance.start_profile()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            performance.end_profile(token)
+
+        try:
+            performance.record(request, response, profile)
+        except Exception as e:
+            logger.error(f"Error recording request performance: {str(e)}")
+        return response
+
+
 # Signal receivers for login/logout tracking
 
 @receiver(user_logged_in)
@@ -0,0 +1,61 @@
+# Generated by Django 5.1 on 2026-10-18 21:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateQueryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(max_length=200, verbose_name='View')),
+                ('method', models.CharField(max_length=10, verbose_name='Method')),
+                ('period_start', models.DateTimeField(db_index=True, verbose_name='Period Start')),
+                ('fingerprint', models.CharField(max_length=32, verbose_name='Fingerprint')),
+                ('sql', models.TextField(verbose_name='Normalised SQL')),
+                ('requests', models.PositiveIntegerField(default=0, help_text='Requests in which the fingerprint repeated', verbose_name='Requests')),
+                ('executions', models.PositiveIntegerField(default=0, verbose_name='Executions')),
+                ('max_per_request', models.PositiveIntegerField(default=0, verbose_name='Most In One Request')),
+            ],
+            options={
+                'verbose_name': 'Duplicate Query',
+                'verbose_name_plural': 'Duplicate Queries',
+                'db_table': 'view_duplicate_queries',
+                'ordering': ['-period_start'],
+                'indexes': [models.Index(fields=['period_start', 'view_name'], name='view_duplic_period__6975c5_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ViewPerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('view_name', models.CharField(db_index=True, max_length=200, verbose_name='View')),
+                ('method', models.CharField(max_length=10, verbose_name='Method')),
+                ('period_start', models.DateTimeField(db_index=True, verbose_name='Period Start')),
+                ('period_end', models.DateTimeField(verbose_name='Period End')),
+                ('requests', models.PositiveIntegerField(default=0, verbose_name='Requests')),
+                ('errors', models.PositiveIntegerField(default=0, verbose_name='Server Errors')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Total Time (ms)')),
+                ('max_ms', models.FloatField(default=0, verbose_name='Slowest Request (ms)')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='Queries')),
+                ('query_ms', models.FloatField(default=0, verbose_name='Query Time (ms)')),
+                ('duplicate_queries', models.PositiveIntegerField(default=0, help_text='Executions beyond the first of repeated query fingerprints', verbose_name='Duplicate Queries')),
+                ('cache_hits', models.PositiveIntegerField(default=0, verbose_name='Cache Hits')),
+                ('cache_misses', models.PositiveIntegerField(default=0, verbose_name='Cache Misses')),
+                ('template_ms', models.FloatField(default=0, verbose_name='Template Time (ms)')),
+            ],
+            options={
+                'verbose_name': 'View Performance',
+                'verbose_name_plural': 'View Performance',
+                'db_table': 'view_performance',
+                'ordering': ['-period_start'],
+                'indexes': [models.Index(fields=['period_start', 'view_name'], name='view_perfor_period__29595e_idx')],
+            },
+        ),
+    ]
@@ -3,6 +3,8 @@ Audit Models
 Track all user actions and system changes
 """
 from django.db import models
+from django.db.models import F, FloatField, Max, Sum
+from django.db.models.functions import Cast
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from utils.constants import AuditAction
@@ -423,4 +425,128 @@ class LoginHistory(models.Model):
                 timestamp__gte=self.timestamp
             ).count()
             return recent_failures >= 3
-        return False
\ No newline at end of file
+        return False
+
+
+class ViewPerformanceManager(models.Manager):
+    """Report queries over the flushed request metrics"""
+
+    def by_view(self, since):
+        """Per-view totals and averages since a datetime"""
+        return (
+            self.filter(period_start__gte=since)
+            .values('view_name', 'method')
+            .annotate(
+                request_total=Sum('requests'),
+                error_total=Sum('errors'),
+                time_total=Sum('total_ms'),
+                slowest_ms=Max('max_ms'),
+                queries=Sum('query_count'),
+                query_time=Sum('query_ms'),
+                duplicates=Sum('duplicate_queries'),
+                hits=Sum('cache_hits'),
+                misses=Sum('cache_misses'),
+                template_time=Sum('template_ms'),
+            )
+            .annotate(
+                avg_ms=F('time_total') / F('request_total'),
+                avg_queries=Cast('queries', FloatField()) / F('request_total'),
+                avg_query_ms=F('query_time') / F('request_total'),
+                avg_template_ms=F('template_time') / F('request_total'),
+            )
+        )
+
+    def slowest(self, since, limit=20):
+        return self.by_view(since).order_by('-avg_ms')[:limit]
+
+
+class ViewPerformance(models.Model):
+    """
+    Request metrics of one view, aggregated in memory by
+    PerformanceMiddleware and flushed once per window per process
+    """
+
+    view_name = models.CharField('View', max_length=200, db_index=True)
+    method = models.CharField('Method', max_length=10)
+    period_start = models.DateTimeField('Period Start', db_index=True)
+    period_end = models.DateTimeField('Period End')
+
+    requests = models.PositiveIntegerField('Requests', default=0)
+    errors = models.PositiveIntegerField('Server Errors', default=0)
+    total_ms = models.FloatField('Total Time (ms)', default=0)
+    max_ms = models.FloatField('Slowest Request (ms)', default=0)
+    query_count = models.PositiveIntegerField('Queries', default=0)
+    query_ms = models.FloatField('Query Time (ms)', default=0)
+    duplicate_queries = models.PositiveIntegerField(
+        'Duplicate Queries',
+        default=0,
+        help_text='Executions beyond the first of repeated query fingerprints'
+    )
+    cache_hits = models.PositiveIntegerField('Cache Hits', default=0)
+    cache_misses = models.PositiveIntegerField('Cache Misses', default=0)
+    template_ms = models.FloatField('Template Time (ms)', default=0)
+
+    objects = ViewPerformanceManager()
+
+    class Meta:
+        db_table = 'view_performance'
+        verbose_name = 'View Performance'
+        verbose_name_plural = 'View Performance'
+        ordering = ['-period_start']
+        indexes = [
+            models.Index(fields=['period_start', 'view_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.view_name} - {self.requests} requests"
+
+
+class DuplicateQueryStatManager(models.Manager):
+
+    def worst(self, since, limit=20):
+        """Fingerprints repeated most often within single requests since a datetime"""
+        return (
+            self.filter(period_start__gte=since)
+            .values('view_name', 'method', 'fingerprint')
+            .annotate(
+                affected_requests=Sum('requests'),
+                total_executions=Sum('executions'),
+                worst_request=Max('max_per_request'),
+                statement=Max('sql'),
+            )
+            .order_by('-total_executions')[:limit]
+        )
+
+
+class DuplicateQueryStat(models.Model):
+    """
+    A query fingerprint repeated within requests to a view (an N+1
+    candidate), aggregated over one flush window
+    """
+
+    view_name = models.CharField('View', max_length=200)
+    method = models.CharField('Method', max_length=10)
+    period_start = models.DateTimeField('Period Start', db_index=True)
+    fingerprint = models.CharField('Fingerprint', max_length=32)
+    sql = models.TextField('Normalised SQL')
+    requests = models.PositiveIntegerField(
+        'Requests',
+        default=0,
+        help_text='Requests in which the fingerprint repeated'
+    )
+    executions = models.PositiveIntegerField('Executions', default=0)
+    max_per_request = models.PositiveIntegerField('Most In One Request', default=0)
+
+    objects = DuplicateQueryStatManager()
+
+    class Meta:
+        db_table = 'view_duplicate_queries'
+        verbose_name = 'Duplicate Query'
+        verbose_name_plural = 'Duplicate Queries'
+        ordering = ['-period_start']
+        indexes = [
+            models.Index(fields=['period_start', 'view_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.view_name} - {self.fingerprint} x{self.executions}"
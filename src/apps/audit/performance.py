@@ -0,0 +1,356 @@
+"""
+Request performance instrumentation.
+
+PerformanceMiddleware profiles a sample (PERF_SAMPLE_RATE) of requests:
+wall time, DB query count and time (through connection.execute_wrapper),
+repeated query fingerprints (N+1 candidates), cache hits and misses and
+template render time. Profiles are aggregated in memory per view and
+written to ViewPerformance and DuplicateQueryStat rows every
+PERF_FLUSH_INTERVAL seconds, by whichever request crosses the interval.
+Rows past PERF_METRICS_RETENTION_DAYS are purged by a daily task
+(tasks.purge_performance_metrics_task), never in a request.
+
+Per query the cost is two perf_counter() calls and a Counter increment
+on the parametrised SQL; fingerprints are computed once per distinct
+statement when the request ends.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.backends.django import Template as DjangoTemplate
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Profile of the request being handled in this thread/task (None if unsampled)
+_current = ContextVar('request_profile', default=None)
+
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+
+def sample_rate():
+    return getattr(settings, 'PERF_SAMPLE_RATE', 1.0)
+
+
+def flush_interval():
+    """Seconds between writes of the in-memory aggregates"""
+    return getattr(settings, 'PERF_FLUSH_INTERVAL', 60)
+
+
+def duplicate_threshold():
+    """Executions of one fingerprint in a request that count as an N+1"""
+    return getattr(settings, 'PERF_DUPLICATE_THRESHOLD', 3)
+
+
+def retention_days():
+    return getattr(settings, 'PERF_METRICS_RETENTION_DAYS', 14)
+
+
+# ============================================================================
+# Query fingerprints
+# ============================================================================
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """
+    Reduce a statement to its shape: literals become %s and IN lists of any
+    length become (%s...), so `WHERE id = 1` and `WHERE id = 2` match.
+    """
+    sql = _STRING_LITERAL.sub('%s', sql)
+    sql = _NUMBER_LITERAL.sub('%s', sql)
+    sql = _PLACEHOLDER_LIST.sub('(%s...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    """(hash, normalised sql) of a statement"""
+    normalized = normalize_sql(sql)
+    return hashlib.md5(normalized.encode()).hexdigest(), normalized
+
+
+# ============================================================================
+# Per-request profile
+# ============================================================================
+
+class RequestProfile:
+    """Counters for one request; also the execute_wrapper for its queries"""
+
+    __slots__ = (
+        'started', 'query_count', 'query_ms', 'statements',
+        'cache_hits', 'cache_misses', 'template_ms', 'template_depth',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.statements = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_ms = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_ms += (time.perf_counter() - started) * 1000
+            self.query_count += 1
+            self.statements[sql] += 1
+
+    def repeated_queries(self):
+        """
+        Fingerprints executed at least duplicate_threshold() times.
+
+        Returns:
+            dict: hash -> (executions, normalised sql)
+        """
+        grouped = {}
+        for sql, count in self.statements.items():
+            key, normalized = fingerprint(sql)
+            executions, _ = grouped.get(key, (0, normalized))
+            grouped[key] = (executions + count, normalized)
+        threshold = duplicate_threshold()
+        return {key: value for key, value in grouped.items() if value[0] >= threshold}
+
+
+def start_profile():
+    """Begin profiling the current request; returns (profile, reset token)"""
+    profile = RequestProfile()
+    return profile, _current.set(profile)
+
+
+def end_profile(token):
+    _current.reset(token)
+
+
+def should_sample():
+    rate = sample_rate()
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+# ============================================================================
+# Cache and template hooks
+# ============================================================================
+
+def _wrap_cache_get(get):
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, default=default, version=version)
+        profile = _current.get()
+        if profile is not None:
+            if value is default:
+                profile.cache_misses += 1
+            else:
+                profile.cache_hits += 1
+        return value
+    wrapper.perf_wrapped = True
+    return wrapper
+
+
+def _wrap_cache_get_many(get_many):
+    def wrapper(self, keys, version=None):
+        keys = list(keys)
+        values = get_many(self, keys, version=version)
+        profile = _current.get()
+        if profile is not None:
+            profile.cache_hits += len(values)
+            profile.cache_misses += len(keys) - len(values)
+        return values
+    wrapper.perf_wrapped = True
+    return wrapper
+
+
+def _wrap_template_render(render):
+    def wrapper(self, context=None, request=None):
+        profile = _current.get()
+        # Only the outermost render is timed; nested renders (form widgets,
+        # render_to_string in tags) are already inside it
+        if profile is None or profile.template_depth:
+            return render(self, context, request)
+        profile.template_depth = 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            profile.template_depth = 0
+            profile.template_ms += (time.perf_counter() - started) * 1000
+    wrapper.perf_wrapped = True
+    return wrapper
+
+
+def install_hooks():
+    """Wrap the configured cache backends and Django template rendering (once)"""
+    global _hooks_installed
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        for alias in settings.CACHES:
+            backend = type(caches[alias])
+            if not getattr(backend.get, 'perf_wrapped', False):
+                backend.get = _wrap_cache_get(backend.get)
+            if not getattr(backend.get_many, 'perf_wrapped', False):
+                backend.get_many = _wrap_cache_get_many(backend.get_many)
+        if not getattr(DjangoTemplate.render, 'perf_wrapped', False):
+            DjangoTemplate.render = _wrap_template_render(DjangoTemplate.render)
+        _hooks_installed = True
+
+
+# ============================================================================
+# In-memory aggregation
+# ============================================================================
+
+VIEW_TOTALS = (
+    'requests', 'errors', 'total_ms', 'max_ms', 'query_count', 'query_ms',
+    'duplicate_queries', 'cache_hits', 'cache_misses', 'template_ms',
+)
+
+
+class MetricsBuffer:
+    """Process-wide per-view totals since the last flush"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.period_start = timezone.now()
+        self.views = {}
+        self.duplicates = {}
+        self._flush_at = time.monotonic() + flush_interval()
+
+    def add(self, view_name, method, status_code, profile):
+        elapsed_ms = (time.perf_counter() - profile.started) * 1000
+        repeated = profile.repeated_queries() if profile.statements else {}
+
+        with self._lock:
+            totals = self.views.get((view_name, method))
+            if totals is None:
+                totals = self.views[(view_name, method)] = dict.fromkeys(VIEW_TOTALS, 0)
+            totals['requests'] += 1
+            totals['errors'] += status_code >= 500
+            totals['total_ms'] += elapsed_ms
+            totals['max_ms'] = max(totals['max_ms'], elapsed_ms)
+            totals['query_count'] += profile.query_count
+            totals['query_ms'] += profile.query_ms
+            totals['cache_hits'] += profile.cache_hits
+            totals['cache_misses'] += profile.cache_misses
+            totals['template_ms'] += profile.template_ms
+
+            for key, (executions, sql) in repeated.items():
+                totals['duplicate_queries'] += executions - 1
+                stat = self.duplicates.get((view_name, method, key))
+                if stat is None:
+                    stat = self.duplicates[(view_name, method, key)] = {
+                        'sql': sql, 'requests': 0, 'executions': 0, 'max_per_request': 0,
+                    }
+                stat['requests'] += 1
+                stat['executions'] += executions
+                stat['max_per_request'] = max(stat['max_per_request'], executions)
+
+    def flush_due(self):
+        return time.monotonic() >= self._flush_at
+
+    def drain(self):
+        """Return (period_start, views, duplicates) and start a new window"""
+        with self._lock:
+            drained = (self.period_start, self.views, self.duplicates)
+            self._reset()
+        return drained
+
+
+buffer = MetricsBuffer()
+
+
+def record(request, response, profile):
+    """Add a finished request's profile to the buffer, flushing if due"""
+    match = getattr(request, 'resolver_match', None)
+    view_name = match.view_name if match else 'unresolved'
+    buffer.add(view_name, request.method, response.status_code, profile)
+    if buffer.flush_due():
+        flush()
+
+
+def flush():
+    """
+    Write the buffered aggregates as one row per view (and per repeated
+    fingerprint) for the window. Runs in the request that crossed the
+    flush interval, so it only inserts.
+
+    Returns:
+        int: number of ViewPerformance rows written
+    """
+    from .models import DuplicateQueryStat, ViewPerformance
+
+    period_start, views, duplicates = buffer.drain()
+    if not views:
+        return 0
+    period_end = timezone.now()
+
+    try:
+        ViewPerformance.objects.bulk_create([
+            ViewPerformance(
+                view_name=view_name[:200],
+                method=method,
+                period_start=period_start,
+                period_end=period_end,
+                **totals,
+            )
+            for (view_name, method), totals in views.items()
+        ])
+        DuplicateQueryStat.objects.bulk_create([
+            DuplicateQueryStat(
+                view_name=view_name[:200],
+                method=method,
+                period_start=period_start,
+                fingerprint=key,
+                **stat,
+            )
+            for (view_name, method, key), stat in duplicates.items()
+        ])
+    except Exception as e:
+        # Metrics must never break a request
+        logger.error(f"Error flushing performance metrics: {e}")
+        return 0
+    return len(views)
+
+
+def purge_expired_metrics(now=None, batch_size=5000):
+    """
+    Delete ViewPerformance and DuplicateQueryStat rows older than the
+    retention period, batch_size rows per DELETE so no statement holds
+    locks on a large range.
+
+    Returns:
+        dict: rows deleted per model
+    """
+    from .models import DuplicateQueryStat, ViewPerformance
+
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days())
+    deleted = {}
+    for model in (ViewPerformance, DuplicateQueryStat):
+        expired = model.objects.filter(period_start__lt=cutoff)
+        total = 0
+        while True:
+            pks = list(expired.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            total += model.objects.filter(pk__in=pks).delete()[0]
+        deleted[model.__name__] = total
+    return deleted
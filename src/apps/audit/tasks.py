@@ -0,0 +1,28 @@
+"""
+Audit App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .performance import purge_expired_metrics
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# PERFORMANCE METRICS TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def purge_performance_metrics_task():
+    """
+    Delete performance metrics older than PERF_METRICS_RETENTION_DAYS
+    Scheduled to run daily
+    """
+    deleted = purge_expired_metrics()
+    logger.info(
+        f"Purged performance metrics: {deleted['ViewPerformance']} view rows, "
+        f"{deleted['DuplicateQueryStat']} duplicate query rows"
+    )
+    return {'status': 'completed', **deleted}
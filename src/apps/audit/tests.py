@@ -1,3 +1,133 @@
-from django.test import TestCase
+from datetime import timedelta
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import performance
+from .middleware import PerformanceMiddleware
+from .models import DuplicateQueryStat, ViewPerformance
+from .tasks import purge_performance_metrics_task
+
+User = get_user_model()
+
+
+class NormalizeSqlTests(TestCase):
+
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            performance.normalize_sql("SELECT * FROM t WHERE id = 12 AND name = 'x''y'"),
+            performance.normalize_sql("SELECT * FROM t WHERE id = 7 AND name = 'z'"),
+        )
+        self.assertEqual(
+            performance.normalize_sql('SELECT * FROM t WHERE id IN (%s, %s)'),
+            performance.normalize_sql('SELECT * FROM t WHERE id IN (%s, %s, %s, %s)'),
+        )
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0, PERF_DUPLICATE_THRESHOLD=3)
+class PerformanceMiddlewareTests(TestCase):
+    """Profiles are aggregated per view and flushed to the metrics tables"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(email=f'perf{index}@example.com', password='password')
+            for index in range(4)
+        ]
+
+    def setUp(self):
+        performance.buffer.drain()
+
+    def request(self, view):
+        request = RequestFactory().get('/perf/')
+        request.resolver_match = SimpleNamespace(view_name='perf:test')
+        return PerformanceMiddleware(view)(request)
+
+    def test_repeated_queries_are_reported(self):
+        def view(request):
+            for user in self.users:
+                User.objects.get(pk=user.pk)
+            cache.set('perf-key', 1)
+            cache.get('perf-key')
+            cache.get('perf-missing')
+            return HttpResponse('ok')
+
+        self.request(view)
+        self.assertEqual(performance.flush(), 1)
+
+        row = ViewPerformance.objects.get(view_name='perf:test')
+        self.assertEqual(row.requests, 1)
+        self.assertEqual(row.query_count, 4)
+        self.assertEqual(row.duplicate_queries, 3)
+        self.assertEqual((row.cache_hits, row.cache_misses), (1, 1))
+
+        duplicate = DuplicateQueryStat.objects.get(view_name='perf:test')
+        self.assertEqual(duplicate.executions, 4)
+        self.assertIn(User._meta.db_table, duplicate.sql)
+
+    def test_distinct_queries_are_not_duplicates(self):
+        def view(request):
+            User.objects.count()
+            User.objects.filter(is_staff=True).exists()
+            return HttpResponse('ok')
+
+        self.request(view)
+        self.request(view)
+        performance.flush()
+
+        row = ViewPerformance.objects.get(view_name='perf:test')
+        self.assertEqual((row.requests, row.query_count, row.duplicate_queries), (2, 4, 0))
+        self.assertFalse(DuplicateQueryStat.objects.exists())
+
+    def old_rows(self, days):
+        period_start = timezone.now() - timedelta(days=days)
+        ViewPerformance.objects.create(
+            view_name='perf:old', method='GET', period_start=period_start, period_end=period_start,
+        )
+        DuplicateQueryStat.objects.create(
+            view_name='perf:old', method='GET', period_start=period_start, fingerprint='f', sql='SELECT 1',
+        )
+
+    @override_settings(PERF_METRICS_RETENTION_DAYS=14)
+    def test_flush_only_inserts(self):
+        self.old_rows(days=30)
+        self.request(lambda request: HttpResponse('ok'))
+        performance.flush()
+        self.assertEqual(ViewPerformance.objects.count(), 2)
+        self.assertTrue(DuplicateQueryStat.objects.exists())
+
+    @override_settings(PERF_METRICS_RETENTION_DAYS=14)
+    def test_purge_task_drops_expired_rows_in_batches(self):
+        for _ in range(3):
+            self.old_rows(days=30)
+        self.old_rows(days=1)
+
+        self.assertEqual(
+            performance.purge_expired_metrics(batch_size=2),
+            {'ViewPerformance': 3, 'DuplicateQueryStat': 3},
+        )
+        self.assertEqual(ViewPerformance.objects.count(), 1)
+        self.assertEqual(DuplicateQueryStat.objects.count(), 1)
+        self.assertEqual(purge_performance_metrics_task.apply().get()['ViewPerformance'], 0)
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class PerformanceReportTests(TestCase):
+
+    def test_report_is_staff_only(self):
+        url = reverse('audit:performance_report')
+        user = User.objects.create_user(email='user@example.com', password='password')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 302)
+
+        staff = User.objects.create_user(email='staff@example.com', password='password', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 200)
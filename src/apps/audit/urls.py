@@ -27,6 +27,9 @@ urlpatterns = [
     # Dashboard Stats (AJAX)
     path('api/stats/', views.dashboard_stats_view, name='dashboard_stats'),
     
+    # Request Performance (staff only)
+    path('performance/', views.performance_report_view, name='performance_report'),
+    
     # Cleanup (Admin only)
     path('cleanup/', views.audit_cleanup_view, name='cleanup'),
 ]
\ No newline at end of file
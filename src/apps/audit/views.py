@@ -3,6 +3,7 @@ Audit Views
 Display and manage audit logs
 """
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
@@ -11,7 +12,7 @@ from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 from datetime import timedelta
 import csv
-from .models import AuditLog, LoginHistory
+from .models import AuditLog, DuplicateQueryStat, LoginHistory, ViewPerformance
 from apps.authentication.models import User
 from utils.decorators import role_required, superuser_required
 from utils.constants import UserRole, AuditAction
@@ -352,4 +353,22 @@ def audit_cleanup_view(request):
             timestamp__lt=timezone.now() - timedelta(days=180)
         ).count(),
     }
-    return render(request, 'audit/cleanup_confirm.html', context)
\ No newline at end of file
+    return render(request, 'audit/cleanup_confirm.html', context)
+
+
+@staff_member_required
+def performance_report_view(request):
+    """Slowest views and worst repeated queries from PerformanceMiddleware metrics"""
+    try:
+        hours = max(1, min(int(request.GET.get('hours', 24)), 24 * 14))
+    except ValueError:
+        hours = 24
+    since = timezone.now() - timedelta(hours=hours)
+
+    context = {
+        'hours': hours,
+        'hour_choices': [1, 6, 24, 72, 168],
+        'slowest_views': ViewPerformance.objects.slowest(since),
+        'duplicate_queries': DuplicateQueryStat.objects.worst(since),
+    }
+    return render(request, 'audit/performance_report.html', context)
@@ -2,9 +2,9 @@
 Authentication Admin Configuration
 """
 from django.contrib import admin
-from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.html import format_html
 from .models import User, UserProfile
+from utils.admin import PerformanceModelAdmin, PerformanceUserAdmin
 
 
 class UserProfileInline(admin.StackedInline):
@@ -21,7 +21,7 @@ class UserProfileInline(admin.StackedInline):
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(PerformanceUserAdmin):
     """Custom User Admin"""
     inlines = [UserProfileInline]
     
@@ -101,7 +101,7 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(PerformanceModelAdmin):
     """User Profile Admin"""
     list_display = ['user', 'date_of_birth', 'national_id', 'email_notifications', 'sms_notifications']
     search_fields = ['user__email', 'user__first_name', 'user__last_name', 'national_id']
@@ -0,0 +1,97 @@
+"""
+Session engine: cache-first sessions with write coalescing.
+
+Set SESSION_ENGINE = 'apps.authentication.sessions'. Reads are served from
+the SESSION_CACHE_ALIAS cache and fall back to django_session on a miss;
+writes go to both, as with Django's cached_db engine. The cache must be
+shared by every process (Redis): settings only select this engine when
+SESSION_REDIS_URL is set.
+
+On top of cached_db:
+
+- A session whose data is the same as when it was loaded is not saved again.
+  Any assignment marks a session modified, even of a value it already holds
+  (e.g. a resubmitted portal payment stored under the same key), and
+  cached_db turns each of those into an UPDATE of django_session.
+- clear_expired() (used by `clearsessions` and purge_expired_sessions_task)
+  deletes expired rows in batches of SESSION_PURGE_BATCH_SIZE instead of one
+  DELETE over the whole table.
+"""
+
+import copy
+import logging
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def purge_batch_size():
+    """Rows deleted per statement when purging expired sessions"""
+    return getattr(settings, 'SESSION_PURGE_BATCH_SIZE', 5000)
+
+
+class SessionStore(CachedDBStore):
+    """cached_db SessionStore that skips saves of unchanged session data"""
+
+    _loaded_data = None
+
+    def load(self):
+        data = super().load()
+        self._loaded_data = copy.deepcopy(data)
+        return data
+
+    def is_unchanged(self):
+        """True if the session data still matches what was loaded"""
+        if self._loaded_data is None or self.session_key is None:
+            return False
+        return getattr(self, '_session_cache', None) == self._loaded_data
+
+    def save(self, must_create=False):
+        if not must_create and self.is_unchanged():
+            return
+        super().save(must_create)
+        self._loaded_data = copy.deepcopy(self._session)
+
+    def cycle_key(self):
+        # The data moves to a new key, which must be written even if unchanged
+        self._loaded_data = None
+        super().cycle_key()
+
+    @classmethod
+    def clear_expired(cls):
+        purge_expired_sessions()
+
+
+def purge_expired_sessions(batch_size=None):
+    """
+    Delete expired django_session rows in batches, each a short DELETE on
+    the expire_date index so logins are not blocked behind one long purge.
+    Cached copies expire on their own (their timeout is the session's age).
+
+    Returns:
+        int: number of sessions deleted
+    """
+    model = SessionStore.get_model_class()
+    batch_size = batch_size or purge_batch_size()
+    now = timezone.now()
+
+    deleted = 0
+    while True:
+        keys = list(
+            model.objects.filter(expire_date__lt=now)
+            .order_by()
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            break
+        count, _ = model.objects.filter(session_key__in=keys).delete()
+        deleted += count
+        if len(keys) < batch_size:
+            break
+
+    if deleted:
+        logger.info(f"Purged {deleted} expired sessions")
+    return deleted
@@ -0,0 +1,24 @@
+"""
+Authentication App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .sessions import purge_expired_sessions
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# SESSION TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def purge_expired_sessions_task(batch_size=None):
+    """
+    Delete expired sessions in batches (runs hourly via beat; replaces
+    a cron'd `clearsessions`)
+    """
+    deleted = purge_expired_sessions(batch_size=batch_size)
+    return {'deleted': deleted}
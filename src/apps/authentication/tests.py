@@ -1,3 +1,108 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .sessions import SessionStore, purge_expired_sessions
+
+DB_ENGINE = 'django.contrib.sessions.backends.db'
+CACHED_ENGINE = 'apps.authentication.sessions'
+
+
+def session_queries(context):
+    return [q['sql'] for q in context.captured_queries if 'django_session' in q['sql']]
+
+
+class SessionStoreTests(TestCase):
+    """Write coalescing and batched purge"""
+
+    def setUp(self):
+        caches['sessions'].clear()
+        self.store = SessionStore()
+        self.store['cart'] = 1
+        self.store.save(must_create=True)
+
+    def test_unchanged_session_is_not_saved(self):
+        store = SessionStore(self.store.session_key)
+        store['cart'] = 1
+        with CaptureQueriesContext(connection) as context:
+            store.save()
+        self.assertEqual(context.captured_queries, [])
+
+    def test_changed_session_is_saved(self):
+        store = SessionStore(self.store.session_key)
+        store['cart'] = 2
+        store.save()
+        caches['sessions'].clear()
+        self.assertEqual(SessionStore(self.store.session_key)['cart'], 2)
+
+    def test_cycle_key_writes_new_key(self):
+        store = SessionStore(self.store.session_key)
+        store['cart']
+        store.cycle_key()
+        self.assertTrue(Session.objects.filter(session_key=store.session_key).exists())
+
+    def test_purge_deletes_expired_in_batches(self):
+        expired = timezone.now() - timedelta(days=1)
+        for index in range(5):
+            Session.objects.create(
+                session_key=f'expired{index:025d}', session_data='', expire_date=expired
+            )
+        self.assertEqual(purge_expired_sessions(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)),
+                         [self.store.session_key])
+
+
+@override_settings(
+    CSRF_USE_SESSIONS=True,
+    STORAGES={
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class SessionLoadTests(TestCase):
+    """
+    Replays authenticated page loads (each rendering a CSRF token stored in
+    the session) against the db engine and the cached engine, and compares
+    the django_session queries they cost.
+    """
+    requests = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='load@example.com', password='password'
+        )
+
+    def replay(self, engine):
+        caches['sessions'].clear()
+        with self.settings(SESSION_ENGINE=engine):
+            # A new client builds its middleware (and SessionStore) for this engine
+            client = self.client_class()
+            client.force_login(self.user)
+            url = reverse('authentication:profile')
+            client.get(url, secure=True)
+
+            with CaptureQueriesContext(connection) as context:
+                for _ in range(self.requests):
+                    response = client.get(url, secure=True)
+                    self.assertEqual(response.status_code, 200)
+        return len(session_queries(context)) / self.requests
+
+    def test_cached_engine_saves_session_queries(self):
+        db_per_request = self.replay(DB_ENGINE)
+        cached_per_request = self.replay(CACHED_ENGINE)
+
+        # db engine: a SELECT per request to load the session (and CSRF secret)
+        self.assertGreaterEqual(db_per_request, 1)
+        self.assertEqual(
+            cached_per_request, 0,
+            f'{db_per_request:.1f} session queries per request with the db engine, '
+            f'{cached_per_request:.1f} with the cached engine'
+        )
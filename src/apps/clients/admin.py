@@ -8,10 +8,11 @@ from django.urls import reverse
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from django import forms
-from .models import Client, ClientVehicle, ClientDocument
+from .models import Client, ClientVehicle, ClientDocument, ClientFinancialSummary
 from apps.payments.models import Payment
 from apps.authentication.models import User
 from utils.constants import UserRole
+from utils.admin import PerformanceModelAdmin
 
 
 # ==================== CUSTOM FORMS ====================
@@ -86,7 +87,7 @@ class PaymentInline(admin.TabularInline):
 # ==================== CLIENT ADMIN ====================
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(PerformanceModelAdmin):
     """
     Admin interface for Client model
     """
@@ -285,27 +286,34 @@ class ClientAdmin(admin.ModelAdmin):
         )
     credit_utilization_display.short_description = 'Credit Utilization'
     
+    def get_queryset(self, request):
+        """Join the user and precomputed totals used by the list columns"""
+        return super().get_queryset(request).select_related('user', 'financial_summary')
+    
     def total_purchases_display(self, obj):
         """Display total number of purchases"""
-        count = obj.vehicles.count()
+        count = obj.get_financial_summary().vehicle_count
         return format_html('<strong>{}</strong>', count)
     total_purchases_display.short_description = 'Total Purchases'
+    total_purchases_display.admin_order_field = 'financial_summary__vehicle_count'
     
     def total_spent_display(self, obj):
         """Display total amount spent"""
-        total = obj.vehicles.aggregate(Sum('purchase_price'))['purchase_price__sum'] or 0
+        total = obj.get_financial_summary().total_spent
         return format_html('KES {}', f'{total:,.2f}')
     total_spent_display.short_description = 'Total Spent'
+    total_spent_display.admin_order_field = 'financial_summary__total_spent'
     
     def total_paid_display(self, obj):
         """Display total amount paid"""
-        total = obj.vehicles.aggregate(Sum('total_paid'))['total_paid__sum'] or 0
+        total = obj.get_financial_summary().total_paid
         return format_html('KES {}', f'{total:,.2f}')
     total_paid_display.short_description = 'Total Paid'
+    total_paid_display.admin_order_field = 'financial_summary__total_paid'
     
     def total_balance_display(self, obj):
         """Display total balance"""
-        total = obj.vehicles.aggregate(Sum('balance'))['balance__sum'] or 0
+        total = obj.get_financial_summary().total_balance
         color = '#dc3545' if total > 0 else '#28a745'
         return format_html(
             '<span style="color: {}; font-weight: bold;">KES {}</span>',
@@ -313,6 +321,7 @@ class ClientAdmin(admin.ModelAdmin):
             f'{total:,.2f}'
         )
     total_balance_display.short_description = 'Total Balance'
+    total_balance_display.admin_order_field = 'financial_summary__total_balance'
     
     def activate_clients(self, request, queryset):
         """Bulk action to activate clients"""
@@ -339,10 +348,39 @@ class ClientAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(ClientFinancialSummary)
+class ClientFinancialSummaryAdmin(PerformanceModelAdmin):
+    """
+    Read-only view of the denormalized client totals.
+    Rows are refreshed after the transaction writing a payment or vehicle
+    purchase commits, not inside it, so they can briefly lag the source
+    records; reconcile_client_summaries_task repairs any drift hourly
+    (or run `manage.py reconcile_client_summaries`).
+    """
+    list_display = [
+        'client', 'vehicle_count', 'total_spent', 'total_paid',
+        'total_balance', 'payments_received', 'last_payment_date', 'updated_at'
+    ]
+    list_select_related = ['client']
+    search_fields = ['client__first_name', 'client__last_name', 'client__id_number']
+    readonly_fields = ['client'] + ClientFinancialSummary.TOTAL_FIELDS + ['updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {
+            'subtitle': 'Refreshed after each payment or purchase commits and reconciled hourly; '
+                        'totals can briefly lag the source records.',
+            **(extra_context or {}),
+        }
+        return super().changelist_view(request, extra_context)
+
+
 # ==================== CLIENT VEHICLE ADMIN ====================
 
 @admin.register(ClientVehicle)
-class ClientVehicleAdmin(admin.ModelAdmin):
+class ClientVehicleAdmin(PerformanceModelAdmin):
     """
     Admin interface for ClientVehicle model
     """
@@ -403,6 +441,7 @@ class ClientVehicleAdmin(admin.ModelAdmin):
     inlines = [PaymentInline]
     
     list_per_page = 25
+    list_select_related = ['client', 'vehicle']
     date_hierarchy = 'purchase_date'
     
     def client_link(self, obj):
@@ -479,7 +518,7 @@ class ClientVehicleAdmin(admin.ModelAdmin):
 # ==================== CLIENT DOCUMENT ADMIN ====================
 
 @admin.register(ClientDocument)
-class ClientDocumentAdmin(admin.ModelAdmin):
+class ClientDocumentAdmin(PerformanceModelAdmin):
     """
     Admin interface for ClientDocument model
     """
@@ -488,6 +527,7 @@ class ClientDocumentAdmin(admin.ModelAdmin):
         'file_size_display', 'file_extension_display',
         'uploaded_by', 'uploaded_at'
     ]
+    list_select_related = ['client', 'uploaded_by']
     
     list_filter = [
         'document_type', 'uploaded_at'
@@ -0,0 +1,32 @@
+"""
+Management command to check every ClientFinancialSummary against the
+ClientVehicle and Payment tables and repair rows that have drifted
+(e.g. after bulk_create, queryset.update() or raw SQL writes). The same
+check runs hourly as reconcile_client_summaries_task.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.clients.models import ClientFinancialSummary
+
+
+class Command(BaseCommand):
+    help = 'Reconcile denormalized client financial summaries with payments and vehicle purchases'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+        parser.add_argument('--batch-size', type=int, default=500, help='Clients checked per query')
+
+    def handle(self, *args, **options):
+        result = ClientFinancialSummary.objects.reconcile(
+            batch_size=options['batch_size'], dry_run=options['dry_run'],
+        )
+        for client_id, changes in result['drifted']:
+            self.stdout.write(f'Client #{client_id}: ' + ', '.join(
+                f'{field} {stored} -> {live}' for field, (stored, live) in changes.items()
+            ))
+
+        action = 'found' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result['checked']} client(s): {result['missing']} missing and "
+            f"{len(result['drifted'])} drifted summaries {action}."
+        ))
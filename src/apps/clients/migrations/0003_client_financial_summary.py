@@ -0,0 +1,76 @@
+# Generated by Django 5.1 on 2026-10-18 21:39
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    """Compute the summary of every existing client with two grouped queries."""
+    Client = apps.get_model('clients', 'Client')
+    ClientVehicle = apps.get_model('clients', 'ClientVehicle')
+    ClientFinancialSummary = apps.get_model('clients', 'ClientFinancialSummary')
+    Payment = apps.get_model('payments', 'Payment')
+
+    vehicle_totals = {
+        row.pop('client'): row
+        for row in ClientVehicle.objects.order_by().values('client').annotate(
+            vehicle_count=Count('id'),
+            active_vehicle_count=Count('id', filter=Q(is_active=True)),
+            total_spent=Sum('purchase_price'),
+            total_paid=Sum('total_paid'),
+            total_balance=Sum('balance'),
+            outstanding_balance=Sum('balance', filter=Q(is_paid_off=False)),
+        )
+    }
+    payment_totals = {
+        row.pop('client_vehicle__client'): row
+        for row in Payment.objects.order_by().values('client_vehicle__client').annotate(
+            payments_received=Sum('amount'),
+            payment_count=Count('id'),
+            last_payment_date=Max('payment_date'),
+        )
+    }
+
+    summaries = []
+    for client_id in Client.objects.values_list('pk', flat=True).iterator():
+        totals = {**vehicle_totals.get(client_id, {}), **payment_totals.get(client_id, {})}
+        summaries.append(ClientFinancialSummary(
+            client_id=client_id,
+            **{field: value for field, value in totals.items() if value is not None},
+        ))
+    ClientFinancialSummary.objects.bulk_create(summaries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_user'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientFinancialSummary',
+            fields=[
+                ('client', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='financial_summary', serialize=False, to='clients.client')),
+                ('vehicle_count', models.PositiveIntegerField(default=0, verbose_name='Vehicles Purchased')),
+                ('active_vehicle_count', models.PositiveIntegerField(default=0, verbose_name='Active Vehicles')),
+                ('total_spent', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of purchase prices', max_digits=14, verbose_name='Total Spent')),
+                ('total_paid', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of amounts paid across vehicles', max_digits=14, verbose_name='Total Paid')),
+                ('total_balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of remaining balances', max_digits=14, verbose_name='Total Balance')),
+                ('outstanding_balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Remaining balance on vehicles not yet paid off', max_digits=14, verbose_name='Outstanding Balance')),
+                ('payments_received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of recorded payments', max_digits=14, verbose_name='Payments Received')),
+                ('payment_count', models.PositiveIntegerField(default=0, verbose_name='Payments')),
+                ('last_payment_date', models.DateField(blank=True, null=True, verbose_name='Last Payment')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Client Financial Summary',
+                'verbose_name_plural': 'Client Financial Summaries',
+                'db_table': 'client_financial_summaries',
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -2,10 +2,15 @@
 Clients Models
 Manage customer/client information and vehicle purchases
 """
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, DecimalField, IntegerField, Max, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 from utils.constants import ClientStatus, DocumentType
+from utils.signals import batch_receiver
 from utils.validators import (
     validate_phone_number, 
     validate_passport_number
@@ -31,6 +36,47 @@ class ClientManager(models.Manager):
     def completed(self):
         """Get clients who completed payments"""
         return self.filter(status=ClientStatus.COMPLETED)
+    
+    def with_financial_summary(self):
+        """Clients with their precomputed ClientFinancialSummary joined in"""
+        return self.select_related('financial_summary')
+    
+    def with_live_financials(self):
+        """
+        Clients annotated with live_* financial totals computed from the
+        source tables, for reconciling ClientFinancialSummary.
+        """
+        from apps.payments.models import Payment
+        
+        money = DecimalField(max_digits=14, decimal_places=2)
+        
+        def per_client(queryset, group_by, aggregate, output_field, default=0):
+            subquery = Subquery(
+                queryset.order_by().values(group_by).annotate(value=aggregate).values('value'),
+                output_field=output_field,
+            )
+            if default is None:
+                return subquery
+            return Coalesce(subquery, Value(default), output_field=output_field)
+        
+        vehicles = ClientVehicle.objects.filter(client=OuterRef('pk'))
+        active_vehicles = vehicles.filter(is_active=True)
+        unpaid_vehicles = vehicles.filter(is_paid_off=False)
+        payments = Payment.objects.filter(client_vehicle__client=OuterRef('pk'))
+        
+        return self.annotate(
+            live_vehicle_count=per_client(vehicles, 'client', Count('id'), IntegerField()),
+            live_active_vehicle_count=per_client(active_vehicles, 'client', Count('id'), IntegerField()),
+            live_total_spent=per_client(vehicles, 'client', Sum('purchase_price'), money),
+            live_total_paid=per_client(vehicles, 'client', Sum('total_paid'), money),
+            live_total_balance=per_client(vehicles, 'client', Sum('balance'), money),
+            live_outstanding_balance=per_client(unpaid_vehicles, 'client', Sum('balance'), money),
+            live_payments_received=per_client(payments, 'client_vehicle__client', Sum('amount'), money),
+            live_payment_count=per_client(payments, 'client_vehicle__client', Count('id'), IntegerField()),
+            live_last_payment_date=per_client(
+                payments, 'client_vehicle__client', Max('payment_date'), models.DateField(), default=None
+            ),
+        )
 
 
 class Client(models.Model):
@@ -336,16 +382,24 @@ class Client(models.Model):
             vehicle__status='sold'
         ).exists()
     
+    def get_financial_summary(self):
+        """
+        Get the client's precomputed financial totals, building the row
+        if it is missing (e.g. data loaded with bulk_create)
+        """
+        try:
+            return self.financial_summary
+        except ClientFinancialSummary.DoesNotExist:
+            self.financial_summary = ClientFinancialSummary.objects.refresh(self.pk)
+            return self.financial_summary
+    
     def total_purchases(self):
         """Get total number of vehicle purchases"""
-        return self.vehicles.count()
+        return self.get_financial_summary().vehicle_count
     
     def total_amount_paid(self):
-        """Calculate total amount paid by client"""
-        from apps.payments.models import Payment
-        return Payment.objects.filter(
-            client=self
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0.00')
+        """Get total amount paid by client"""
+        return self.get_financial_summary().payments_received
 
 
 class ClientVehicle(models.Model):
@@ -587,4 +641,236 @@ class ClientDocument(models.Model):
         """Get file extension"""
         if self.file:
             return os.path.splitext(self.file.name)[1].lower()
-        return ""
\ No newline at end of file
+        return ""
+
+
+class ClientFinancialSummaryManager(models.Manager):
+    """Custom manager for ClientFinancialSummary model"""
+    
+    def compute(self, client_id):
+        """Compute a client's totals from ClientVehicle and Payment rows"""
+        from apps.payments.models import Payment
+        
+        totals = ClientVehicle.objects.filter(client_id=client_id).aggregate(
+            vehicle_count=Count('id'),
+            active_vehicle_count=Count('id', filter=Q(is_active=True)),
+            total_spent=Sum('purchase_price'),
+            total_paid=Sum('total_paid'),
+            total_balance=Sum('balance'),
+            outstanding_balance=Sum('balance', filter=Q(is_paid_off=False)),
+        )
+        totals.update(Payment.objects.filter(client_vehicle__client_id=client_id).aggregate(
+            payments_received=Sum('amount'),
+            payment_count=Count('id'),
+            last_payment_date=Max('payment_date'),
+        ))
+        return {
+            field: Decimal('0.00') if value is None and field != 'last_payment_date' else value
+            for field, value in totals.items()
+        }
+    
+    def refresh(self, client_id):
+        """Recompute and store one client's summary"""
+        summary, created = self.update_or_create(
+            client_id=client_id, defaults=self.compute(client_id)
+        )
+        return summary
+    
+    def refresh_existing(self, client_id):
+        """
+        Recompute a client's summary if it has one.
+        Used by the write-path signals: a plain UPDATE that silently
+        matches nothing while the client itself is being deleted.
+        """
+        return self.filter(client_id=client_id).update(**self.compute(client_id))
+    
+    def refresh_existing_many(self, client_ids):
+        """
+        Recompute the summaries of several clients that have one, with a
+        single grouped read and one bulk update (for batched receivers).
+        """
+        client_ids = set(client_ids) - {None}
+        if len(client_ids) <= 1:
+            return sum(self.refresh_existing(client_id) for client_id in client_ids)
+        
+        summaries = {summary.client_id: summary for summary in self.filter(client_id__in=client_ids)}
+        if not summaries:
+            return 0
+        fields = ClientFinancialSummary.TOTAL_FIELDS
+        live_rows = Client.objects.filter(pk__in=summaries).with_live_financials().values(
+            'pk', *(f'live_{field}' for field in fields)
+        )
+        for row in live_rows:
+            summary = summaries[row['pk']]
+            for field in fields:
+                setattr(summary, field, row[f'live_{field}'])
+        return self.bulk_update(summaries.values(), fields)
+    
+    def reconcile(self, batch_size=500, dry_run=False):
+        """
+        Check every client's summary against the source tables, creating
+        missing summaries and repairing drifted ones unless dry_run.
+        
+        Returns:
+            dict with checked and missing counts and drifted, a list of
+            (client_id, {field: (stored, live)})
+        """
+        fields = ClientFinancialSummary.TOTAL_FIELDS
+        checked = missing = 0
+        drifted = []
+        last_pk = 0
+        
+        while True:
+            clients = list(
+                Client.objects.with_live_financials()
+                .select_related('financial_summary')
+                .filter(pk__gt=last_pk)
+                .order_by('pk')[:batch_size]
+            )
+            if not clients:
+                break
+            last_pk = clients[-1].pk
+            checked += len(clients)
+            
+            to_create, to_update = [], []
+            for client in clients:
+                live = {field: getattr(client, f'live_{field}') for field in fields}
+                try:
+                    summary = client.financial_summary
+                except ClientFinancialSummary.DoesNotExist:
+                    missing += 1
+                    to_create.append(ClientFinancialSummary(client=client, **live))
+                    continue
+                
+                changes = {
+                    field: (getattr(summary, field), live[field])
+                    for field in fields if getattr(summary, field) != live[field]
+                }
+                if changes:
+                    drifted.append((client.pk, changes))
+                    for field in changes:
+                        setattr(summary, field, live[field])
+                    to_update.append(summary)
+            
+            if not dry_run:
+                with transaction.atomic():
+                    self.bulk_create(to_create)
+                    self.bulk_update(to_update, fields)
+        
+        return {'checked': checked, 'missing': missing, 'drifted': drifted}
+
+
+class ClientFinancialSummary(models.Model):
+    """
+    Denormalized per-client financial totals
+    Refreshed once per transaction, after it commits, for the clients whose
+    ClientVehicle and Payment rows it wrote, so list pages read totals
+    instead of aggregating per row.
+    The refresh is not part of the writer's transaction: a process that dies
+    between the commit and the refresh leaves a summary behind, which the
+    hourly reconcile_client_summaries_task repairs (also available as
+    `manage.py reconcile_client_summaries`).
+    """
+    
+    client = models.OneToOneField(
+        Client,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='financial_summary'
+    )
+    
+    vehicle_count = models.PositiveIntegerField('Vehicles Purchased', default=0)
+    active_vehicle_count = models.PositiveIntegerField('Active Vehicles', default=0)
+    
+    total_spent = models.DecimalField(
+        'Total Spent',
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Sum of purchase prices'
+    )
+    
+    total_paid = models.DecimalField(
+        'Total Paid',
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Sum of amounts paid across vehicles'
+    )
+    
+    total_balance = models.DecimalField(
+        'Total Balance',
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Sum of remaining balances'
+    )
+    
+    outstanding_balance = models.DecimalField(
+        'Outstanding Balance',
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Remaining balance on vehicles not yet paid off'
+    )
+    
+    payments_received = models.DecimalField(
+        'Payments Received',
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text='Sum of recorded payments'
+    )
+    
+    payment_count = models.PositiveIntegerField('Payments', default=0)
+    
+    last_payment_date = models.DateField('Last Payment', blank=True, null=True)
+    
+    updated_at = models.DateTimeField('Updated At', auto_now=True)
+    
+    objects = ClientFinancialSummaryManager()
+    
+    # Fields maintained from the source tables (see ClientManager.with_live_financials)
+    TOTAL_FIELDS = [
+        'vehicle_count', 'active_vehicle_count', 'total_spent', 'total_paid',
+        'total_balance', 'outstanding_balance', 'payments_received',
+        'payment_count', 'last_payment_date',
+    ]
+    
+    class Meta:
+        db_table = 'client_financial_summaries'
+        verbose_name = 'Client Financial Summary'
+        verbose_name_plural = 'Client Financial Summaries'
+    
+    def __str__(self):
+        return f"Financial summary for client #{self.client_id}"
+
+
+# ==================== SIGNAL HANDLERS ====================
+
+@receiver(post_save, sender=Client)
+def create_client_financial_summary(sender, instance, created, raw=False, **kwargs):
+    """Start every new client with an (empty) financial summary"""
+    if created and not raw:
+        ClientFinancialSummary.objects.get_or_create(client=instance)
+
+
+@batch_receiver(
+    [post_save, post_delete], sender=ClientVehicle,
+    snapshot=lambda purchase: purchase.client_id,
+)
+def refresh_summaries_for_client_vehicles(sender, events):
+    """Keep clients' totals in step with purchases and balances"""
+    ClientFinancialSummary.objects.refresh_existing_many({event.data for event in events})
+
+
+@batch_receiver(
+    [post_save, post_delete], sender='payments.Payment',
+    snapshot=lambda payment: payment.client_vehicle_id,
+)
+def refresh_summaries_for_payments(sender, events):
+    """Keep clients' payment totals in step with recorded payments"""
+    client_ids = ClientVehicle.objects.filter(
+        pk__in={event.data for event in events}
+    ).values_list('client_id', flat=True)
+    ClientFinancialSummary.objects.refresh_existing_many(client_ids)
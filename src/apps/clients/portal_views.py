@@ -42,7 +42,7 @@ def client_required(view_func):
 def get_client_from_user(user):
     """Get client object from user, or None if not found"""
     try:
-        return Client.objects.get(user=user)
+        return Client.objects.with_financial_summary().get(user=user)
     except Client.DoesNotExist:
         return None
 
@@ -103,7 +103,7 @@ def portal_dashboard(request):
     ).count()
     
     # Calculate statistics
-    total_vehicles = vehicles.count()
+    total_vehicles = client.get_financial_summary().active_vehicle_count
     total_debt = sum(plan.remaining_balance or 0 for plan in active_plans)
     overdue_payments = PaymentSchedule.objects.filter(
         installment_plan__client_vehicle__client=client,
@@ -223,8 +223,8 @@ def portal_payments(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Calculate totals
-    total_paid = payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+    # Totals (precomputed)
+    total_paid = client.get_financial_summary().payments_received
     
     context = {
         'client': client,
@@ -0,0 +1,33 @@
+"""
+Clients App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .models import ClientFinancialSummary
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# FINANCIAL SUMMARY TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def reconcile_client_summaries_task(batch_size=500):
+    """
+    Repair client financial summaries that missed their after-commit
+    refresh (runs hourly via beat)
+    """
+    result = ClientFinancialSummary.objects.reconcile(batch_size=batch_size)
+    if result['missing'] or result['drifted']:
+        logger.warning(
+            f"Repaired {result['missing']} missing and {len(result['drifted'])} drifted "
+            f"client financial summaries"
+        )
+    return {
+        'checked': result['checked'],
+        'missing': result['missing'],
+        'drifted': len(result['drifted']),
+    }
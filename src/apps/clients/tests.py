@@ -1,3 +1,187 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.payments.models import Payment
+from apps.vehicles.models import Vehicle
+from utils.signals import suppress_receivers
+
+from .models import Client, ClientFinancialSummary, ClientVehicle
+from .tasks import reconcile_client_summaries_task
+
+
+def make_client(index):
+    return Client.objects.create(
+        first_name=f'Client{index}',
+        last_name='Test',
+        phone_primary=f'+2547{index:08d}',
+        id_number=f'{10000000 + index}',
+        date_of_birth=date(1990, 1, 1),
+        physical_address='1 Test Road',
+        city='Nairobi',
+        county='Nairobi',
+    )
+
+
+def make_vehicle(index):
+    return Vehicle.objects.create(
+        make='Toyota',
+        model='Axio',
+        year=2018,
+        vin=f'VIN2018{index:07d}',
+        registration_number=f'KAA{index:03d}A',
+        color='White',
+        mileage=50000,
+        fuel_type='petrol',
+        transmission='automatic',
+        body_type='sedan',
+        engine_size='1.5L',
+        purchase_price=Decimal('800000'),
+        selling_price=Decimal('1000000'),
+        condition='good',
+        status='sold',
+        location='Main Yard',
+        purchase_date=date(2024, 1, 1),
+    )
+
+
+def make_purchase(client, vehicle, price=Decimal('1000000'), paid=Decimal('200000')):
+    return ClientVehicle.objects.create(
+        client=client,
+        vehicle=vehicle,
+        purchase_date=date(2024, 2, 1),
+        purchase_price=price,
+        deposit_paid=paid,
+        total_paid=paid,
+        balance=price - paid,
+    )
+
+
+class ClientFinancialSummaryTests(TestCase):
+    """The summary follows ClientVehicle and Payment writes once they commit."""
+
+    def setUp(self):
+        self.client_record = make_client(1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.purchase = make_purchase(self.client_record, make_vehicle(1))
+
+    def summary(self):
+        return ClientFinancialSummary.objects.get(client=self.client_record)
+
+    def test_purchase_updates_summary(self):
+        summary = self.summary()
+        self.assertEqual(summary.vehicle_count, 1)
+        self.assertEqual(summary.total_spent, Decimal('1000000'))
+        self.assertEqual(summary.total_balance, Decimal('800000'))
+        self.assertEqual(summary.outstanding_balance, Decimal('800000'))
+
+    def make_payment(self, amount=Decimal('50000'), payment_date=date(2024, 3, 1)):
+        return Payment.objects.create(
+            client_vehicle=self.purchase,
+            amount=amount,
+            payment_date=payment_date,
+            payment_method='cash',
+        )
+
+    def test_payment_updates_and_reverts_summary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            payment = self.make_payment()
+        self.assertEqual(self.summary().payments_received, Decimal('50000'))
+        self.assertEqual(self.summary().last_payment_date, date(2024, 3, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            payment.delete()
+        self.assertEqual(self.summary().payments_received, Decimal('0'))
+        self.assertEqual(self.summary().payment_count, 0)
+
+    def test_payments_in_one_transaction_refresh_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for month in range(3, 6):
+                self.make_payment(payment_date=date(2024, month, 1))
+        self.assertEqual(self.summary().payment_count, 0)
+        self.assertEqual(len(callbacks), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            callbacks[0]()
+        self.assertLessEqual(len(queries), 4)
+        summary = self.summary()
+        self.assertEqual(summary.payment_count, 3)
+        self.assertEqual(summary.last_payment_date, date(2024, 5, 1))
+
+    def test_rolled_back_savepoint_does_not_swallow_later_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                self.make_payment()
+                raise ValueError
+            self.make_payment(amount=Decimal('20000'))
+        summary = self.summary()
+        self.assertEqual(summary.payment_count, 1)
+        self.assertEqual(summary.payments_received, Decimal('20000'))
+
+    def test_suppressed_writes_leave_summary_for_reconcile(self):
+        with self.captureOnCommitCallbacks(execute=True), suppress_receivers():
+            self.make_payment()
+        self.assertEqual(self.summary().payment_count, 0)
+
+    def test_client_delete_cascades(self):
+        self.client_record.delete()
+        self.assertFalse(ClientFinancialSummary.objects.exists())
+
+    def test_reconcile_repairs_drift(self):
+        ClientFinancialSummary.objects.filter(client=self.client_record).update(
+            vehicle_count=7, total_spent=Decimal('1')
+        )
+        call_command('reconcile_client_summaries', stdout=StringIO())
+        summary = self.summary()
+        self.assertEqual(summary.vehicle_count, 1)
+        self.assertEqual(summary.total_spent, Decimal('1000000'))
+
+    def test_scheduled_reconcile_repairs_missed_refresh(self):
+        # A refresh lost between commit and delivery (e.g. the process died)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.make_payment()
+        self.assertEqual(self.summary().payment_count, 0)
+
+        result = reconcile_client_summaries_task()
+        self.assertEqual(result['drifted'], 1)
+        self.assertEqual(self.summary().payment_count, 1)
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class ClientAdminQueryCountTests(TestCase):
+    """The client changelist must not aggregate per row."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='password'
+        )
+        self.client.force_login(user)
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('admin:clients_client_changelist'), secure=True)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelist_query_count_is_constant(self):
+        for index in range(3):
+            make_purchase(make_client(index), make_vehicle(index))
+        baseline = self.changelist_queries()
+
+        for index in range(3, 20):
+            make_purchase(make_client(index), make_vehicle(index))
+        self.assertEqual(self.changelist_queries(), baseline)
+
+    def test_summary_changelist_explains_refresh(self):
+        response = self.client.get(reverse('admin:clients_clientfinancialsummary_changelist'), secure=True)
+        self.assertContains(response, 'reconciled hourly')
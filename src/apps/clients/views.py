@@ -95,7 +95,7 @@ def client_detail(request, pk):
     """
     Display detailed information about a specific client
     """
-    client = get_object_or_404(Client, pk=pk)
+    client = get_object_or_404(Client.objects.with_financial_summary(), pk=pk)
     
     # Get client's vehicles
     client_vehicles = ClientVehicle.objects.filter(client=client).select_related('vehicle')
@@ -108,11 +108,8 @@ def client_detail(request, pk):
     # Get client's documents
     documents = ClientDocument.objects.filter(client=client).order_by('-uploaded_at')
     
-    # Calculate statistics
-    total_purchases = client_vehicles.count()
-    total_spent = client_vehicles.aggregate(Sum('purchase_price'))['purchase_price__sum'] or 0
-    total_paid = client_vehicles.aggregate(Sum('total_paid'))['total_paid__sum'] or 0
-    total_balance = client_vehicles.aggregate(Sum('balance'))['balance__sum'] or 0
+    # Statistics (precomputed)
+    summary = client.get_financial_summary()
     
     # Recent activity
     recent_payments = payments[:5]
@@ -122,10 +119,10 @@ def client_detail(request, pk):
         'client_vehicles': client_vehicles,
         'payments': payments,
         'documents': documents,
-        'total_purchases': total_purchases,
-        'total_spent': total_spent,
-        'total_paid': total_paid,
-        'total_balance': total_balance,
+        'total_purchases': summary.vehicle_count,
+        'total_spent': summary.total_spent,
+        'total_paid': summary.total_paid,
+        'total_balance': summary.total_balance,
         'recent_payments': recent_payments,
     }
     
@@ -607,7 +604,7 @@ def client_statement(request, client_pk):
     """
     Generate client statement showing all transactions
     """
-    client = get_object_or_404(Client, pk=client_pk)
+    client = get_object_or_404(Client.objects.with_financial_summary(), pk=client_pk)
     
     # Get all client vehicles and payments
     client_vehicles = ClientVehicle.objects.filter(client=client).select_related('vehicle')
@@ -615,18 +612,16 @@ def client_statement(request, client_pk):
         client_vehicle__client=client
     ).order_by('payment_date')
     
-    # Calculate totals
-    total_purchases = client_vehicles.aggregate(Sum('purchase_price'))['purchase_price__sum'] or 0
-    total_paid = payments.aggregate(Sum('amount'))['amount__sum'] or 0
-    total_balance = client_vehicles.aggregate(Sum('balance'))['balance__sum'] or 0
+    # Totals (precomputed)
+    summary = client.get_financial_summary()
     
     context = {
         'client': client,
         'client_vehicles': client_vehicles,
         'payments': payments,
-        'total_purchases': total_purchases,
-        'total_paid': total_paid,
-        'total_balance': total_balance,
+        'total_purchases': summary.total_spent,
+        'total_paid': summary.payments_received,
+        'total_balance': summary.total_balance,
     }
     
     log_audit(request.user, 'view', 'Client', f'Generated statement for {client.get_full_name()}')
@@ -727,18 +722,23 @@ def client_search_api(request):
 def client_stats_api(request, pk):
     """
     AJAX endpoint for client statistics
-    """
-    client = get_object_or_404(Client, pk=pk)
     
-    client_vehicles = ClientVehicle.objects.filter(client=client)
+    Totals come from ClientFinancialSummary, which is refreshed after the
+    writing transaction commits and reconciled hourly, so they may briefly
+    lag a just-recorded payment; totals_updated_at is when they were last
+    refreshed.
+    """
+    client = get_object_or_404(Client.objects.with_financial_summary(), pk=pk)
+    summary = client.get_financial_summary()
     
     data = {
-        'total_purchases': client_vehicles.count(),
-        'total_spent': float(client_vehicles.aggregate(Sum('purchase_price'))['purchase_price__sum'] or 0),
-        'total_paid': float(client_vehicles.aggregate(Sum('total_paid'))['total_paid__sum'] or 0),
-        'total_balance': float(client_vehicles.aggregate(Sum('balance'))['balance__sum'] or 0),
+        'total_purchases': summary.vehicle_count,
+        'total_spent': float(summary.total_spent),
+        'total_paid': float(summary.total_paid),
+        'total_balance': float(summary.total_balance),
         'available_credit': float(client.available_credit),
         'credit_utilization': float(client.credit_utilization),
+        'totals_updated_at': summary.updated_at.isoformat() if summary.updated_at else None,
     }
     
     return JsonResponse(data)
\ No newline at end of file
@@ -6,7 +6,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.contrib import messages
 
 from .models import (
@@ -16,8 +16,10 @@ from .models import (
     DashboardActivity,
     QuickAction,
     DashboardSnapshot,
-    MetricCache
+    MetricCache,
+    KPISnapshot
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class WidgetInline(admin.TabularInline):
@@ -28,7 +30,7 @@ class WidgetInline(admin.TabularInline):
 
 
 @admin.register(Dashboard)
-class DashboardAdmin(admin.ModelAdmin):
+class DashboardAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'created_by_link',
@@ -39,6 +41,10 @@ class DashboardAdmin(admin.ModelAdmin):
         'is_active',
         'created_at',
     ]
+    list_select_related = ['created_by']
+    list_annotations = {
+        'active_widget_count': Count('widgets', filter=Q(widgets__is_active=True)),
+    }
     list_filter = [
         'layout',
         'is_public',
@@ -81,21 +87,15 @@ class DashboardAdmin(admin.ModelAdmin):
         'deactivate_dashboards',
     ]
     
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        queryset = queryset.select_related('created_by')
-        queryset = queryset.annotate(widgets_count=Count('widgets'))
-        return queryset
-    
     def created_by_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.created_by.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.created_by.get_full_name() or obj.created_by.username)
+        url = reverse('admin:authentication_user_change', args=[obj.created_by.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.created_by.get_full_name() or obj.created_by.email)
     created_by_link.short_description = 'Created By'
     
     def widget_count(self, obj):
-        return obj.widgets.filter(is_active=True).count()
+        return obj.active_widget_count
     widget_count.short_description = 'Widgets'
-    widget_count.admin_order_field = 'widgets_count'
+    widget_count.admin_order_field = 'active_widget_count'
     
     def make_public(self, request, queryset):
         updated = queryset.update(is_public=True)
@@ -154,7 +154,7 @@ class DashboardAdmin(admin.ModelAdmin):
 
 
 @admin.register(Widget)
-class WidgetAdmin(admin.ModelAdmin):
+class WidgetAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'dashboard_link',
@@ -165,6 +165,7 @@ class WidgetAdmin(admin.ModelAdmin):
         'auto_refresh',
         'updated_at',
     ]
+    list_select_related = ['dashboard']
     list_filter = [
         'widget_type',
         'chart_type',
@@ -255,7 +256,7 @@ class WidgetAdmin(admin.ModelAdmin):
 
 
 @admin.register(UserDashboardPreference)
-class UserDashboardPreferenceAdmin(admin.ModelAdmin):
+class UserDashboardPreferenceAdmin(PerformanceModelAdmin):
     list_display = [
         'user_link',
         'default_dashboard_link',
@@ -264,6 +265,7 @@ class UserDashboardPreferenceAdmin(admin.ModelAdmin):
         'show_notifications',
         'updated_at',
     ]
+    list_select_related = ['user', 'default_dashboard']
     list_filter = [
         'theme',
         'compact_mode',
@@ -297,8 +299,8 @@ class UserDashboardPreferenceAdmin(admin.ModelAdmin):
     )
     
     def user_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.user.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+        url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
     user_link.short_description = 'User'
     
     def default_dashboard_link(self, obj):
@@ -310,7 +312,7 @@ class UserDashboardPreferenceAdmin(admin.ModelAdmin):
 
 
 @admin.register(DashboardActivity)
-class DashboardActivityAdmin(admin.ModelAdmin):
+class DashboardActivityAdmin(PerformanceModelAdmin):
     list_display = [
         'dashboard_link',
         'user_link',
@@ -318,6 +320,7 @@ class DashboardActivityAdmin(admin.ModelAdmin):
         'description_short',
         'created_at',
     ]
+    list_select_related = ['dashboard', 'user']
     list_filter = [
         'activity_type',
         'created_at',
@@ -344,8 +347,8 @@ class DashboardActivityAdmin(admin.ModelAdmin):
     
     def user_link(self, obj):
         if obj.user:
-            url = reverse('admin:auth_user_change', args=[obj.user.pk])
-            return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+            url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+            return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
         return 'System'
     user_link.short_description = 'User'
     
@@ -373,7 +376,7 @@ class DashboardActivityAdmin(admin.ModelAdmin):
 
 
 @admin.register(QuickAction)
-class QuickActionAdmin(admin.ModelAdmin):
+class QuickActionAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'action_type',
@@ -442,13 +445,14 @@ class QuickActionAdmin(admin.ModelAdmin):
 
 
 @admin.register(DashboardSnapshot)
-class DashboardSnapshotAdmin(admin.ModelAdmin):
+class DashboardSnapshotAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'dashboard_link',
         'created_by_link',
         'created_at',
     ]
+    list_select_related = ['dashboard', 'created_by']
     list_filter = ['created_at']
     search_fields = ['name', 'description', 'dashboard__name']
     readonly_fields = ['created_at', 'snapshot_data']
@@ -473,14 +477,14 @@ class DashboardSnapshotAdmin(admin.ModelAdmin):
     
     def created_by_link(self, obj):
         if obj.created_by:
-            url = reverse('admin:auth_user_change', args=[obj.created_by.pk])
-            return format_html('<a href="{}">{}</a>', url, obj.created_by.get_full_name() or obj.created_by.username)
+            url = reverse('admin:authentication_user_change', args=[obj.created_by.pk])
+            return format_html('<a href="{}">{}</a>', url, obj.created_by.get_full_name() or obj.created_by.email)
         return '-'
     created_by_link.short_description = 'Created By'
 
 
 @admin.register(MetricCache)
-class MetricCacheAdmin(admin.ModelAdmin):
+class MetricCacheAdmin(PerformanceModelAdmin):
     list_display = [
         'metric_name',
         'metric_key',
@@ -518,4 +522,29 @@ class MetricCacheAdmin(admin.ModelAdmin):
     def clear_all_cache(self, request, queryset):
         count = queryset.delete()[0]
         self.message_user(request, f'{count} cache(s) cleared.', messages.SUCCESS)
-    clear_all_cache.short_description = 'Clear all selected caches'
\ No newline at end of file
+    clear_all_cache.short_description = 'Clear all selected caches'
+
+
+@admin.register(KPISnapshot)
+class KPISnapshotAdmin(PerformanceModelAdmin):
+    list_display = [
+        'module',
+        'computed_at',
+        'compute_ms',
+        'dirty',
+        'dirtied_at',
+    ]
+    list_filter = ['dirty']
+    readonly_fields = ['module', 'values', 'timings', 'compute_ms', 'computed_at', 'dirty', 'dirtied_at']
+    actions = ['refresh_snapshots']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def refresh_snapshots(self, request, queryset):
+        from .kpis import refresh_snapshot
+        
+        for snapshot in queryset:
+            refresh_snapshot(snapshot.module)
+        self.message_user(request, f'{queryset.count()} snapshot(s) refreshed.', messages.SUCCESS)
+    refresh_snapshots.short_description = 'Refresh selected snapshots now'
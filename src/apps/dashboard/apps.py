@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dashboard'
+
+    def ready(self):
+        # Register each app's dashboard KPIs (<app>/kpis.py)
+        from . import kpis
+        kpis.autodiscover()
@@ -0,0 +1,290 @@
+"""
+Benchmark harness for the hot views and tasks.
+
+    python manage.py run_benchmarks --scales 1000 10000 100000 --repeat 5
+
+For each scale (a number of synthetic clients) the harness grows the
+database with synthetic.py, runs every registered benchmark once to warm
+up and then `repeat` times, and records the median, min and max wall time
+and the median run's query count. All generated rows, and everything the
+benchmarks write, are rolled back at the end, so it can run against a
+development database. The on_commit callbacks a run registers (batched
+signal receivers, KPI dirty flags, queued tasks) would never fire in that
+transaction, so they are run at the end of each run, inside its timing. Results are stored as BenchmarkResult rows tagged
+with the git commit; `--compare <commit>` diffs against an earlier run.
+
+A benchmark is a setup function registered with @benchmark. It takes the
+BenchmarkContext and returns the callable to time:
+
+    @benchmark('overdue_report')
+    def overdue_report(context):
+        url = reverse('payments:overdue_payments')
+        return lambda: context.get(url)
+"""
+
+import statistics
+import subprocess
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client as TestClient, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import kpis
+from .models import BenchmarkResult
+from .synthetic import SyntheticDataGenerator
+
+User = get_user_model()
+
+# name -> setup function
+_registry = {}
+
+
+def benchmark(name):
+    """Register a benchmark setup function under `name`"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def registered_benchmarks():
+    return list(_registry)
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+
+class BenchmarkContext:
+    """What benchmarks share: a logged-in test client and the generator's date"""
+
+    def __init__(self, user, today):
+        self.user = user
+        self.today = today
+        self.client = TestClient()
+        self.client.force_login(user)
+
+    def get(self, url, **params):
+        response = self.client.get(url, params, secure=True)
+        if response.status_code != 200:
+            raise AssertionError(f'GET {url} returned {response.status_code}')
+        return response
+
+    def post(self, url, data):
+        # Successful form posts redirect; a 200 means the form was rejected
+        response = self.client.post(url, data, secure=True)
+        if response.status_code != 302:
+            raise AssertionError(f'POST {url} returned {response.status_code}')
+        return response
+
+
+# ============================================================================
+# Benchmarks
+# ============================================================================
+
+@benchmark('dashboard')
+def dashboard(context):
+    url = reverse('dashboard:home')
+    return lambda: context.get(url)
+
+
+@benchmark('kpi_refresh')
+def kpi_refresh(context):
+    def run():
+        for module in kpis.registered_modules():
+            kpis.refresh_snapshot(module)
+    return run
+
+
+@benchmark('overdue_report')
+def overdue_report(context):
+    url = reverse('payments:overdue_payments')
+    return lambda: context.get(url)
+
+
+@benchmark('payment_recording')
+def payment_recording(context):
+    from apps.clients.models import ClientVehicle
+
+    # A different open purchase for every run
+    purchases = iter(
+        ClientVehicle.objects.filter(is_paid_off=False, balance__gt=0)
+        .order_by('?').values_list('pk', 'monthly_installment')[:100]
+    )
+
+    def run():
+        pk, installment = next(purchases)
+        context.post(reverse('payments:record_payment', args=[pk]), {
+            'amount': installment,
+            'payment_date': context.today.isoformat(),
+            'payment_method': 'mpesa',
+            'transaction_reference': f'BENCH{pk}',
+        })
+    return run
+
+
+@benchmark('report_execution')
+def report_execution(context):
+    import os
+    from apps.reports.models import Report, ReportExecution
+    from apps.reports.tasks import execute_report_task
+
+    report = Report.objects.create(
+        name=f'Benchmark payments {timezone.now():%Y%m%d%H%M%S%f}',
+        report_type='payment',
+        output_format='csv',
+        send_email=False,
+        created_by=context.user,
+    )
+    date_from = date(context.today.year - 1, context.today.month, 1)
+
+    def run():
+        execution = ReportExecution.objects.create(
+            report=report,
+            triggered_by=context.user,
+            output_format='csv',
+            date_from=date_from,
+            date_to=context.today,
+        )
+        execute_report_task.apply(args=[str(execution.id)])
+        execution.refresh_from_db()
+        if execution.status != 'completed':
+            raise AssertionError(f'Report execution {execution.status}: {execution.error_message}')
+        if execution.file_path and os.path.isfile(execution.file_path):
+            os.remove(execution.file_path)
+    return run
+
+
+@benchmark('payroll_run')
+def payroll_run(context):
+    from apps.payroll.engine import process_payroll_run
+    from apps.payroll.models import PayrollRun
+
+    # Reprocessing a run replaces its payslips, so one run serves every iteration
+    payroll, _ = PayrollRun.objects.get_or_create(payroll_month=context.today.replace(day=1))
+    return lambda: process_payroll_run(payroll, user=context.user)
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+def run_committed(run):
+    """
+    Call `run`, then the on_commit callbacks it registered (and those they
+    register), as a commit would
+    """
+    with TestCase.captureOnCommitCallbacks(using=connection.alias, execute=True):
+        run()
+
+
+def time_benchmark(run, repeat):
+    """Warm up once, then time `repeat` runs; returns result field values"""
+    run_committed(run)
+    samples = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            run_committed(run)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        samples.append((elapsed_ms, len(queries.captured_queries)))
+
+    samples.sort()
+    median_ms, queries = samples[len(samples) // 2]
+    return {
+        'repeat': repeat,
+        'median_ms': round(statistics.median(ms for ms, _ in samples), 2),
+        'min_ms': round(samples[0][0], 2),
+        'max_ms': round(samples[-1][0], 2),
+        'queries': queries,
+    }
+
+
+def run_benchmarks(scales, repeat=5, names=None, seed=42, label='', batch_size=1000, stdout=None):
+    """
+    Grow synthetic data through each scale and time the benchmarks at each.
+
+    Returns:
+        list of saved BenchmarkResult rows
+    """
+    names = names or registered_benchmarks()
+    unknown = set(names) - set(_registry)
+    if unknown:
+        raise KeyError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    def log(message):
+        if stdout:
+            stdout.write(message)
+
+    commit = current_commit()
+    results = []
+    generator = SyntheticDataGenerator(seed=seed, batch_size=batch_size)
+    generated = 0
+
+    with override_settings(
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        STORAGES={**settings.STORAGES, 'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+        }},
+    ), transaction.atomic():
+        user = User.objects.create_superuser(
+            email=f'benchmark{seed}@example.com', password=None, first_name='Benchmark'
+        )
+        context = BenchmarkContext(user, generator.today)
+
+        for scale in sorted(scales):
+            started = time.perf_counter()
+            generator.generate(clients=scale - generated)
+            generated = scale
+            log(f'Scale {scale}: data ready in {time.perf_counter() - started:.1f}s')
+
+            for name in names:
+                timings = time_benchmark(_registry[name](context), repeat)
+                results.append(BenchmarkResult(
+                    commit=commit,
+                    label=label,
+                    name=name,
+                    scale=scale,
+                    database=connection.vendor,
+                    **timings,
+                ))
+                log(f"  {name:<20} {timings['median_ms']:>10.1f} ms  {timings['queries']:>5} queries")
+
+        transaction.set_rollback(True)
+
+    return BenchmarkResult.objects.bulk_create(results)
+
+
+def compare(commit, against):
+    """
+    Latest results of `commit` next to those of `against` for matching
+    (name, scale, database).
+
+    Returns:
+        list of (name, scale, baseline_ms, current_ms, change_percent)
+    """
+    def latest(sha):
+        rows = {}
+        for result in BenchmarkResult.objects.filter(commit=sha).order_by('created_at'):
+            rows[(result.name, result.scale, result.database)] = result
+        return rows
+
+    current, baseline = latest(commit), latest(against)
+    rows = []
+    for key in sorted(current.keys() & baseline.keys()):
+        before, after = baseline[key].median_ms, current[key].median_ms
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((key[0], key[1], before, after, round(change, 1)))
+    return rows
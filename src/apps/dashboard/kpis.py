@@ -0,0 +1,196 @@
+"""
+KPI snapshot service.
+
+Apps declare their dashboard metrics in a kpis.py module, found by
+autodiscover() when the dashboard app loads:
+
+    from apps.dashboard import kpis
+
+    @kpis.register('insurance', models=[InsurancePolicy])
+    def policy_kpis(today):
+        return InsurancePolicy.objects.all(), {
+            'active_policies': Count('id', filter=Q(status='active')),
+            'total_premium': Sum('premium_amount', filter=Q(status='active')),
+        }
+
+Each registered function is a metric group: a queryset plus conditional
+aggregates, evaluated with a single aggregate() query. refresh_snapshot()
+evaluates every group of a module, times each query and stores the values
+in the module's KPISnapshot row; dashboards read that one row through
+get_snapshot().
+
+refresh_kpi_snapshots_task (every minute via beat) recomputes snapshots
+older than KPI_SNAPSHOT_MAX_AGE and those flagged dirty by a save or
+delete on one of the registered models (flagged once per committed
+transaction), so edits show up within a minute.
+"""
+
+import logging
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Case, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from utils.signals import batch_receiver
+
+from .models import KPISnapshot
+
+logger = logging.getLogger(__name__)
+
+# module -> [(group name, function)]
+_registry = {}
+
+# model -> modules whose KPIs it feeds
+_model_modules = {}
+
+
+def max_age():
+    """Seconds a snapshot is served before the periodic refresh recomputes it"""
+    return getattr(settings, 'KPI_SNAPSHOT_MAX_AGE', 300)
+
+
+# ============================================================================
+# Registration
+# ============================================================================
+
+def register(module, models=(), name=None):
+    """
+    Decorator registering a metric group for a module's dashboard.
+
+    The function takes today's date and returns (queryset, {metric: aggregate}).
+    Saves and deletes on `models` mark the module's snapshot dirty.
+    """
+    def decorator(func):
+        _registry.setdefault(module, []).append((name or func.__name__, func))
+        for model in models:
+            _model_modules.setdefault(model, set()).add(module)
+            batch_receiver([post_save, post_delete], sender=model, dispatch_uid='kpi_dirty')(_mark_model_dirty)
+        return func
+    return decorator
+
+
+def registered_modules():
+    return sorted(_registry)
+
+
+def autodiscover():
+    autodiscover_modules('kpis')
+
+
+def _mark_model_dirty(sender, events):
+    mark_dirty(*_model_modules.get(sender, ()))
+
+
+def mark_dirty(*modules):
+    """
+    Flag snapshots for recomputation on the next refresh. dirtied_at moves
+    on every call, even on a dirty snapshot, so a write that lands while it
+    is being recomputed keeps it dirty (see refresh_snapshot).
+    """
+    if modules:
+        KPISnapshot.objects.filter(module__in=modules).update(dirty=True, dirtied_at=timezone.now())
+
+
+# ============================================================================
+# Computation
+# ============================================================================
+
+def _jsonable(value):
+    if value is None:
+        return 0
+    if isinstance(value, Decimal):
+        # Kept exact: stored as a string and read back as a Decimal by KPIValuesDecoder
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def compute_module(module, today=None):
+    """
+    Evaluate every metric group of a module.
+
+    Returns:
+        (values, timings, total_ms): metric -> value (None sums become 0,
+        Decimals stay Decimals), metric -> compute time in milliseconds (metrics
+        of one group share its query time) and the module's total time
+    """
+    if module not in _registry:
+        raise KeyError(f"No KPIs registered for '{module}'")
+
+    today = today or timezone.now().date()
+    values, timings, total_ms = {}, {}, 0.0
+    for name, func in _registry[module]:
+        started = time.perf_counter()
+        queryset, aggregates = func(today)
+        result = queryset.order_by().aggregate(**aggregates)
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        total_ms += elapsed_ms
+        for metric, value in result.items():
+            values[metric] = _jsonable(value)
+            timings[metric] = elapsed_ms
+    return values, timings, round(total_ms, 2)
+
+
+def refresh_snapshot(module):
+    """Recompute and store one module's snapshot."""
+    started = timezone.now()
+    values, timings, total_ms = compute_module(module)
+
+    KPISnapshot.objects.get_or_create(module=module)
+    # A save that lands while we compute keeps the snapshot dirty
+    KPISnapshot.objects.filter(module=module).update(
+        values=values,
+        timings=timings,
+        compute_ms=total_ms,
+        computed_at=timezone.now(),
+        dirty=Case(When(Q(dirtied_at__gte=started), then=Value(True)), default=Value(False)),
+    )
+    return KPISnapshot.objects.get(module=module)
+
+
+def refresh_due_snapshots(force=False):
+    """
+    Recompute snapshots that are missing, dirty or older than max_age().
+
+    Returns:
+        list of refreshed module names
+    """
+    cutoff = timezone.now() - timedelta(seconds=max_age())
+    current = {
+        snapshot.module: snapshot
+        for snapshot in KPISnapshot.objects.filter(module__in=registered_modules())
+    }
+
+    refreshed = []
+    for module in registered_modules():
+        snapshot = current.get(module)
+        due = (
+            force or snapshot is None or snapshot.dirty
+            or snapshot.computed_at is None or snapshot.computed_at < cutoff
+        )
+        if not due:
+            continue
+        try:
+            refresh_snapshot(module)
+        except Exception as e:
+            logger.error(f"KPI snapshot refresh failed for {module}: {e}")
+            continue
+        refreshed.append(module)
+    return refreshed
+
+
+def get_snapshot(module):
+    """
+    Return a module's KPISnapshot, computing it in this request only if it
+    has never been computed (e.g. before the first beat run).
+    """
+    snapshot = KPISnapshot.objects.filter(module=module).first()
+    if snapshot is None or snapshot.computed_at is None:
+        snapshot = refresh_snapshot(module)
+    return snapshot
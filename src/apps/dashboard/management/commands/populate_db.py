@@ -1,6 +1,10 @@
 """
 Django Management Command to Populate Database with Dummy Data
 Usage: python manage.py populate_db
+       python manage.py populate_db --bulk --clients 1000000 --seed 42
+
+--bulk hands off to apps.dashboard.synthetic: bulk_create in batches, no
+signals, derived balances computed in bulk. Use it for production-scale data.
 """
 
 import random
@@ -80,14 +84,12 @@ class Command(BaseCommand):
         parser.add_argument(
             '--users',
             type=int,
-            default=10,
-            help='Number of users to create (default: 10)',
+            help='Number of users to create (default: 10; scaled from --clients with --bulk)',
         )
         parser.add_argument(
             '--vehicles',
             type=int,
-            default=50,
-            help='Number of vehicles to create (default: 50)',
+            help='Number of vehicles to create (default: 50; unsold stock scaled from --clients with --bulk)',
         )
         parser.add_argument(
             '--clients',
@@ -95,6 +97,22 @@ class Command(BaseCommand):
             default=100,
             help='Number of clients to create (default: 100)',
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed, for reproducible data',
+        )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Generate with bulk inserts (apps.dashboard.synthetic) for large volumes',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert with --bulk (default: 1000)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('Starting database population...'))
@@ -102,6 +120,16 @@ class Command(BaseCommand):
         if options['clear']:
             self.clear_data()
 
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+
+        if options['bulk']:
+            self.populate_bulk(options)
+            return
+
+        options['users'] = 10 if options['users'] is None else options['users']
+        options['vehicles'] = 50 if options['vehicles'] is None else options['vehicles']
+
         try:
             with transaction.atomic():
                 # Create data in order of dependencies
@@ -160,6 +188,31 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
             raise
 
+    def populate_bulk(self, options):
+        """Production-scale data through the bulk synthetic generator"""
+        import time
+        from apps.dashboard.synthetic import SyntheticDataGenerator
+
+        generator = SyntheticDataGenerator(
+            seed=42 if options['seed'] is None else options['seed'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        started = time.perf_counter()
+        with transaction.atomic():
+            created = generator.generate(
+                clients=options['clients'],
+                users=options['users'],
+                stock_vehicles=options['vehicles'],
+            )
+        elapsed = time.perf_counter() - started
+
+        for label, count in created.items():
+            self.stdout.write(f'  {label}: {count:,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Generated {sum(created.values()):,} rows in {elapsed:.1f}s'
+        ))
+
     def clear_data(self):
         """Clear existing data from all tables"""
         self.stdout.write(self.style.WARNING('Clearing existing data...'))
@@ -193,10 +246,11 @@ class Command(BaseCommand):
             Payment.objects.all().delete()
         if InstallmentPlan:
             InstallmentPlan.objects.all().delete()
-        if Vehicle:
-            Vehicle.objects.all().delete()
+        # Clients first: their purchases PROTECT the vehicles
         if Client:
             Client.objects.all().delete()
+        if Vehicle:
+            Vehicle.objects.all().delete()
         User.objects.filter(is_superuser=False).delete()
         
         self.stdout.write(self.style.SUCCESS('Data cleared!'))
@@ -346,7 +400,7 @@ class Command(BaseCommand):
             return []
         
         plans = []
-        sold_vehicles = [v for v in vehicles if v.status == 'SOLD'][:len(clients)//2]
+        sold_vehicles = [v for v in vehicles if v.status == 'sold'][:len(clients)//2]
         
         for i, vehicle in enumerate(sold_vehicles):
             if i >= len(clients):
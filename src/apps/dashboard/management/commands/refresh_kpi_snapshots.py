@@ -0,0 +1,32 @@
+"""
+Management command to recompute dashboard KPI snapshots and report how
+long each metric group took
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.kpis import refresh_due_snapshots, refresh_snapshot, registered_modules
+
+
+class Command(BaseCommand):
+    help = 'Recompute dashboard KPI snapshots (all modules, or only those that are due with --due)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='*', help="Modules to refresh (default: all)")
+        parser.add_argument('--due', action='store_true', help='Only refresh dirty or expired snapshots')
+
+    def handle(self, *args, **options):
+        if options['due']:
+            refreshed = refresh_due_snapshots()
+            self.stdout.write(self.style.SUCCESS(f"Refreshed: {', '.join(refreshed) or 'nothing due'}"))
+            return
+
+        modules = options['modules'] or registered_modules()
+        unknown = set(modules) - set(registered_modules())
+        if unknown:
+            raise CommandError(f"Unknown module(s): {', '.join(sorted(unknown))}")
+
+        for module in modules:
+            snapshot = refresh_snapshot(module)
+            self.stdout.write(f'{module}: {len(snapshot.values)} metrics in {snapshot.compute_ms:.1f} ms')
+            for metric, ms in sorted(snapshot.timings.items(), key=lambda item: -item[1]):
+                self.stdout.write(f'  {metric:<32} {snapshot.values[metric]!s:>16} {ms:>8.2f} ms')
@@ -0,0 +1,64 @@
+"""
+Management command to time the hot views and tasks against synthetic data
+at increasing scales, and compare the results with an earlier commit
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dashboard.benchmarks import compare, registered_benchmarks, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark dashboard, reports, payments and payroll on synthetic data (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scales', type=int, nargs='+', default=[1000, 10000],
+            help='Numbers of synthetic clients to benchmark at (default: 1000 10000)'
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark (default: 5)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the synthetic data')
+        parser.add_argument(
+            '--only', nargs='+', choices=registered_benchmarks(),
+            help='Benchmarks to run (default: all)'
+        )
+        parser.add_argument('--label', default='', help='Free-text label stored with the results')
+        parser.add_argument('--compare', metavar='COMMIT', help='Show changes against the results of COMMIT')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        results = run_benchmarks(
+            scales=options['scales'],
+            repeat=options['repeat'],
+            names=options['only'],
+            seed=options['seed'],
+            label=options['label'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        if not results:
+            return
+        commit = results[0].commit
+
+        self.stdout.write('')
+        self.stdout.write(f"{'benchmark':<20} {'scale':>8} {'median ms':>10} {'min ms':>10} {'max ms':>10} {'queries':>8}")
+        for result in results:
+            self.stdout.write(
+                f'{result.name:<20} {result.scale:>8} {result.median_ms:>10.1f} '
+                f'{result.min_ms:>10.1f} {result.max_ms:>10.1f} {result.queries:>8}'
+            )
+
+        if options['compare']:
+            rows = compare(commit, options['compare'])
+            if not rows:
+                self.stdout.write(self.style.WARNING(f"No comparable results for {options['compare']}"))
+                return
+            self.stdout.write('')
+            self.stdout.write(f"{'benchmark':<20} {'scale':>8} {options['compare']:>10} {commit:>10} {'change':>8}")
+            for name, scale, before, after, change in rows:
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS if change < -10 else str
+                self.stdout.write(style(
+                    f'{name:<20} {scale:>8} {before:>10.1f} {after:>10.1f} {change:>+7.1f}%'
+                ))
@@ -0,0 +1,31 @@
+# Generated by Django 5.1 on 2026-10-18 21:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KPISnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module', models.CharField(max_length=50, unique=True)),
+                ('values', models.JSONField(default=dict, help_text='Metric name -> value')),
+                ('timings', models.JSONField(default=dict, help_text='Metric -> compute time in milliseconds (metrics from one query share its time)')),
+                ('compute_ms', models.FloatField(default=0)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('dirty', models.BooleanField(default=False)),
+                ('dirtied_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'KPI Snapshot',
+                'verbose_name_plural': 'KPI Snapshots',
+                'ordering': ['module'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-18 22:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0002_kpi_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BenchmarkResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('commit', models.CharField(db_index=True, max_length=40)),
+                ('label', models.CharField(blank=True, max_length=100)),
+                ('name', models.CharField(max_length=50)),
+                ('scale', models.PositiveIntegerField(help_text='Synthetic clients in the database')),
+                ('database', models.CharField(max_length=20)),
+                ('repeat', models.PositiveIntegerField(default=1)),
+                ('median_ms', models.FloatField()),
+                ('min_ms', models.FloatField()),
+                ('max_ms', models.FloatField()),
+                ('queries', models.PositiveIntegerField(default=0, help_text='Queries in the median run')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Benchmark Result',
+                'verbose_name_plural': 'Benchmark Results',
+                'ordering': ['-created_at', 'name', 'scale'],
+                'indexes': [models.Index(fields=['name', 'scale', '-created_at'], name='dashboard_b_name_17fe08_idx')],
+            },
+        ),
+    ]
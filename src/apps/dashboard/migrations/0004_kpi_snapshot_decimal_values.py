@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-18 23:27
+
+import apps.dashboard.models
+import django.core.serializers.json
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_snapshots_dirty(apps, schema_editor):
+    """Snapshots written before this hold money sums as floats; recompute them"""
+    KPISnapshot = apps.get_model('dashboard', 'KPISnapshot')
+    KPISnapshot.objects.update(dirty=True, dirtied_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_benchmark_result'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='kpisnapshot',
+            name='values',
+            field=models.JSONField(decoder=apps.dashboard.models.KPIValuesDecoder, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Metric name -> value (sums of money as exact decimal strings)'),
+        ),
+        migrations.RunPython(mark_snapshots_dirty, migrations.RunPython.noop),
+    ]
@@ -5,9 +5,13 @@ Handles dashboard configuration, widgets, and user preferences
 
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from decimal import Decimal
+import json
+import re
 import uuid
 
 User = get_user_model()
@@ -576,4 +580,111 @@ class MetricCache(models.Model):
                 'expires_at': expires_at,
             }
         )
-        return cache
\ No newline at end of file
+        return cache
+
+# ============================================================================
+# KPI SNAPSHOT MODEL
+# ============================================================================
+
+class KPIValuesDecoder(json.JSONDecoder):
+    """
+    Decode KPISnapshot.values, turning the decimal strings that money sums
+    are stored as (DjangoJSONEncoder writes Decimals as strings) back into
+    exact Decimals. Counts are stored as JSON integers and dates as ISO
+    strings, so neither matches.
+    """
+    
+    DECIMAL_STRING = re.compile(r'^-?\d+(\.\d+)?$')
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('object_hook', self.parse_decimals)
+        super().__init__(*args, **kwargs)
+    
+    @classmethod
+    def parse_decimals(cls, obj):
+        return {
+            key: Decimal(value) if isinstance(value, str) and cls.DECIMAL_STRING.match(value) else value
+            for key, value in obj.items()
+        }
+
+
+class KPISnapshot(models.Model):
+    """
+    Latest precomputed KPI values for one module's dashboard (see kpis.py)
+    """
+    
+    module = models.CharField(max_length=50, unique=True)
+    
+    # Snapshot Data
+    values = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        decoder=KPIValuesDecoder,
+        help_text="Metric name -> value (sums of money as exact decimal strings)"
+    )
+    timings = models.JSONField(
+        default=dict,
+        help_text="Metric -> compute time in milliseconds (metrics from one query share its time)"
+    )
+    compute_ms = models.FloatField(default=0)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    
+    # Set by saves/deletes on the module's models; cleared by the next refresh
+    dirty = models.BooleanField(default=False)
+    dirtied_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['module']
+        verbose_name = 'KPI Snapshot'
+        verbose_name_plural = 'KPI Snapshots'
+    
+    def __str__(self):
+        return f"{self.module} KPIs ({self.computed_at or 'never computed'})"
+    
+    @property
+    def age_seconds(self):
+        """Seconds since the snapshot was computed"""
+        if not self.computed_at:
+            return None
+        return (timezone.now() - self.computed_at).total_seconds()
+    
+    @property
+    def is_stale(self):
+        """Whether newer data is waiting for the next refresh"""
+        from django.conf import settings
+        
+        max_age = getattr(settings, 'KPI_SNAPSHOT_MAX_AGE', 300)
+        return self.dirty or self.age_seconds is None or self.age_seconds > max_age
+
+
+class BenchmarkResult(models.Model):
+    """
+    Timing of one benchmark at one data scale (see benchmarks.py),
+    tagged with the commit it ran on for comparison between commits
+    """
+    
+    commit = models.CharField(max_length=40, db_index=True)
+    label = models.CharField(max_length=100, blank=True)
+    name = models.CharField(max_length=50)
+    scale = models.PositiveIntegerField(help_text="Synthetic clients in the database")
+    database = models.CharField(max_length=20)
+    
+    # Timings over `repeat` runs (after one warm-up run)
+    repeat = models.PositiveIntegerField(default=1)
+    median_ms = models.FloatField()
+    min_ms = models.FloatField()
+    max_ms = models.FloatField()
+    queries = models.PositiveIntegerField(default=0, help_text="Queries in the median run")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at', 'name', 'scale']
+        verbose_name = 'Benchmark Result'
+        verbose_name_plural = 'Benchmark Results'
+        indexes = [
+            models.Index(fields=['name', 'scale', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} @ {self.scale} ({self.commit}): {self.median_ms:.1f} ms"
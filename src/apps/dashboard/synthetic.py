@@ -0,0 +1,435 @@
+"""
+Synthetic data generator for production-scale local databases.
+
+    generator = SyntheticDataGenerator(seed=42)
+    generator.generate(clients=100000)
+
+Rows are written with bulk_create, so model save() methods and signals do
+not run. Everything they would derive is computed here instead:
+ClientVehicle paid/balance totals, paid PaymentSchedule rows, auction bid
+counters and ClientFinancialSummary rows. KPI snapshots are flagged dirty
+at the end.
+
+Clients are generated in chunks of `batch_size` together with their
+vehicles, purchases, plans, schedules and payments, so memory stays flat
+at any scale. The same seed (and `today`) produces the same data; unique
+fields embed the seed, so re-running a seed against a database that
+already holds it fails on the first unique constraint.
+
+Used by `populate_db --bulk` and the benchmark harness (benchmarks.py).
+"""
+
+import random
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from apps.auctions.models import Auction, Bid
+from apps.clients.models import Client, ClientFinancialSummary, ClientVehicle
+from apps.payments.models import InstallmentPlan, Payment, PaymentSchedule
+from apps.payroll.models import Employee, SalaryStructure
+from apps.vehicles.models import Vehicle
+from utils.constants import UserRole
+
+from . import kpis
+
+User = get_user_model()
+
+CENTS = Decimal('0.01')
+
+FIRST_NAMES = ['John', 'Jane', 'Michael', 'Sarah', 'David', 'Emma', 'James', 'Olivia',
+               'William', 'Sophia', 'Robert', 'Isabella', 'Daniel', 'Mia', 'Joseph']
+LAST_NAMES = ['Kamau', 'Wanjiru', 'Ochieng', 'Akinyi', 'Mwangi', 'Njeri', 'Otieno',
+              'Wambui', 'Kiprop', 'Chebet', 'Mutua', 'Nduta', 'Karanja', 'Adhiambo']
+CITIES = ['Nairobi', 'Mombasa', 'Kisumu', 'Nakuru', 'Eldoret']
+MAKES_MODELS = {
+    'Toyota': ['Corolla', 'Camry', 'RAV4', 'Land Cruiser', 'Hilux', 'Prado', 'Vitz', 'Fielder'],
+    'Nissan': ['X-Trail', 'Patrol', 'Note', 'Juke', 'Qashqai', 'Navara'],
+    'Honda': ['Fit', 'Civic', 'CR-V', 'Accord', 'HR-V'],
+    'Mazda': ['Demio', 'CX-5', 'Axela', 'Atenza', 'CX-3'],
+    'Subaru': ['Impreza', 'Forester', 'Outback', 'Legacy', 'XV'],
+    'Mercedes-Benz': ['C-Class', 'E-Class', 'GLE', 'GLC', 'A-Class'],
+    'BMW': ['3 Series', '5 Series', 'X3', 'X5', 'X1'],
+}
+MAKES = list(MAKES_MODELS)
+
+
+def money(value):
+    return Decimal(value).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def scaled_counts(clients):
+    """Row counts of every generated table for a number of clients"""
+    return {
+        'clients': clients,
+        'stock_vehicles': max(10, clients // 5),
+        'users': max(5, clients // 500),
+        'employees': max(8, clients // 100),
+        'auctions': max(2, clients // 50),
+    }
+
+
+class SyntheticDataGenerator:
+    """
+    Seeded bulk generator. Counters persist across generate() calls, so a
+    benchmark can grow one database through several scales.
+    """
+
+    purchase_ratio = 0.6
+
+    def __init__(self, seed=42, batch_size=1000, today=None, stdout=None):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.today = today or timezone.now().date()
+        self.stdout = stdout
+        self.random = random.Random(seed)
+        self.counters = {}
+        self.created = {}
+        self.staff = []
+        self.available_vehicles = []
+        # make_password is deliberately slow; hash once for every user
+        self.password = make_password('password123')
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def log(self, message):
+        if self.stdout:
+            self.stdout.write(message)
+
+    def next_index(self, name, count=1):
+        """Reserve `count` sequence numbers for a kind of row"""
+        start = self.counters.get(name, 0)
+        self.counters[name] = start + count
+        return range(start, start + count)
+
+    def insert(self, model, objects):
+        objects = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        label = model._meta.verbose_name_plural
+        self.created[label] = self.created.get(label, 0) + len(objects)
+        return objects
+
+    def days_ago(self, low, high):
+        return self.today - timedelta(days=self.random.randint(low, high))
+
+    def phone(self):
+        return f'+2547{self.random.randint(10000000, 99999999)}'
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+
+    def generate(self, clients, users=None, stock_vehicles=None, employees=None, auctions=None):
+        """
+        Add `clients` clients (60% with a financed purchase) and the
+        surrounding staff, stock, auctions and employees.
+
+        Returns:
+            dict: verbose model name -> rows created by this generator so far
+        """
+        counts = scaled_counts(clients)
+        counts.update({
+            key: value for key, value in {
+                'users': users, 'stock_vehicles': stock_vehicles,
+                'employees': employees, 'auctions': auctions,
+            }.items() if value is not None
+        })
+
+        self.log(f"Generating {clients} clients (seed {self.seed})...")
+        self.create_users(counts['users'])
+        for offset in range(0, clients, self.batch_size):
+            self.create_client_batch(min(self.batch_size, clients - offset))
+        for offset in range(0, counts['stock_vehicles'], self.batch_size):
+            self.create_stock_vehicles(min(self.batch_size, counts['stock_vehicles'] - offset))
+        self.create_auctions(counts['auctions'])
+        self.create_employees(counts['employees'])
+
+        kpis.mark_dirty(*kpis.registered_modules())
+        return dict(self.created)
+
+    def create_users(self, count):
+        roles = [UserRole.MANAGER, UserRole.SALES, UserRole.ACCOUNTANT, UserRole.CLERK]
+        users = [
+            User(
+                email=f'synthetic{self.seed}.staff{index}@example.com',
+                password=self.password,
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                phone=self.phone(),
+                role=self.random.choice(roles),
+                is_active=True,
+            )
+            for index in self.next_index('user', count)
+        ]
+        self.staff.extend(self.insert(User, users))
+
+    def build_vehicle(self, status):
+        index = self.next_index('vehicle')[0]
+        make = self.random.choice(MAKES)
+        year = self.random.randint(2015, 2024)
+        price = self.random.randint(800, 5000) * 1000
+        if make in ('Mercedes-Benz', 'BMW'):
+            price = price * 3 // 2
+        return Vehicle(
+            make=make,
+            model=self.random.choice(MAKES_MODELS[make]),
+            year=year,
+            vin=f'SYN{self.seed % 1000:03d}{index:011d}',
+            registration_number=f'KSY{self.seed % 1000:03d}{index:09d}',
+            color=self.random.choice(['White', 'Black', 'Silver', 'Blue', 'Red', 'Gray']),
+            mileage=self.random.randint(10000, 150000),
+            fuel_type=self.random.choice(['petrol', 'diesel', 'hybrid']),
+            transmission=self.random.choice(['automatic', 'manual']),
+            body_type=self.random.choice(['sedan', 'suv', 'hatchback', 'pickup', 'wagon']),
+            engine_size=f'{self.random.choice([1.3, 1.5, 1.8, 2.0, 2.5, 3.0])}L',
+            purchase_price=money(price * Decimal('0.8')),
+            selling_price=money(price),
+            condition=self.random.choice(['excellent', 'good', 'fair']),
+            status=status,
+            location=self.random.choice(['Main Yard', 'Showroom', 'Warehouse']),
+            purchase_date=self.days_ago(30, 730),
+        )
+
+    def create_stock_vehicles(self, count):
+        statuses = ['available', 'available', 'available', 'reserved']
+        vehicles = self.insert(
+            Vehicle, [self.build_vehicle(self.random.choice(statuses)) for _ in range(count)]
+        )
+        self.available_vehicles.extend(v for v in vehicles if v.status == 'available')
+
+    def create_client_batch(self, count):
+        clients = []
+        for index in self.next_index('client', count):
+            first_name = self.random.choice(FIRST_NAMES)
+            last_name = self.random.choice(LAST_NAMES)
+            clients.append(Client(
+                first_name=first_name,
+                last_name=last_name,
+                email=f'{first_name.lower()}.{last_name.lower()}.{self.seed}.{index}@example.com',
+                phone_primary=self.phone(),
+                id_number=f'SYN{self.seed}-{index}',
+                date_of_birth=self.days_ago(7300, 18250),
+                physical_address=f'{self.random.randint(1, 999)} Ngong Road',
+                city=self.random.choice(CITIES),
+                county=self.random.choice(CITIES),
+                status='active',
+            ))
+        clients = self.insert(Client, clients)
+
+        buyers = [client for client in clients if self.random.random() < self.purchase_ratio]
+        vehicles = self.insert(Vehicle, [self.build_vehicle('sold') for _ in buyers])
+        self.create_purchases(clients, buyers, vehicles)
+
+    def create_purchases(self, clients, buyers, vehicles):
+        """
+        Purchases, plans, schedules and payments for one batch of buyers,
+        with every derived total computed from the generated payments.
+        """
+        purchases, plans, payment_rows = [], [], []
+        for client, vehicle in zip(buyers, vehicles):
+            months = self.random.choice([12, 24, 36, 48, 60])
+            price = vehicle.selling_price
+            deposit = money(price * Decimal('0.3'))
+            monthly = money((price - deposit) / months)
+            start_date = self.days_ago(30, 365)
+
+            # Deposit plus one payment per elapsed month; some clients fall behind
+            elapsed = min(months, (self.today - start_date).days // 30)
+            missed = self.random.choice([0, 0, 0, 1, 2, 3])
+            paid_months = max(0, elapsed - missed)
+            amounts = [deposit] + [monthly] * paid_months
+            if paid_months == months:
+                amounts[-1] = price - deposit - monthly * (months - 1)
+            total_paid = sum(amounts)
+            balance = price - total_paid
+
+            purchases.append(ClientVehicle(
+                client=client,
+                vehicle=vehicle,
+                purchase_date=start_date,
+                purchase_price=price,
+                deposit_paid=deposit,
+                total_paid=total_paid,
+                balance=balance,
+                monthly_installment=monthly,
+                installment_months=months,
+                interest_rate=Decimal('0'),
+                is_active=True,
+                is_paid_off=balance <= 0,
+            ))
+            plans.append(InstallmentPlan(
+                total_amount=price,
+                deposit=deposit,
+                monthly_installment=monthly,
+                number_of_installments=months,
+                start_date=start_date,
+                end_date=start_date + relativedelta(months=months),
+                is_active=balance > 0,
+                is_completed=balance <= 0,
+            ))
+            payment_rows.append((start_date, amounts))
+
+        purchases = self.insert(ClientVehicle, purchases)
+        for purchase, plan in zip(purchases, plans):
+            plan.client_vehicle = purchase
+        plans = self.insert(InstallmentPlan, plans)
+
+        payments = []
+        for purchase, (start_date, amounts) in zip(purchases, payment_rows):
+            for number, amount in enumerate(amounts):
+                index = self.next_index('payment')[0]
+                payments.append(Payment(
+                    client_vehicle=purchase,
+                    amount=amount,
+                    payment_date=start_date + relativedelta(months=number),
+                    payment_method=self.random.choice(['cash', 'bank_transfer', 'mpesa', 'mpesa']),
+                    transaction_reference=f'SYN{index:010d}',
+                    receipt_number=f'RCP-SYN{self.seed}-{index:010d}',
+                    notes='Deposit payment' if number == 0 else f'Installment {number}',
+                ))
+        payments = self.insert(Payment, payments)
+
+        # Installment n is settled by the (n)th payment after the deposit
+        payments_by_purchase = {}
+        for payment in payments:
+            payments_by_purchase.setdefault(payment.client_vehicle_id, []).append(payment)
+        schedules = []
+        for plan in plans:
+            installments = payments_by_purchase[plan.client_vehicle_id][1:]
+            for number in range(1, plan.number_of_installments + 1):
+                payment = installments[number - 1] if number <= len(installments) else None
+                schedules.append(PaymentSchedule(
+                    installment_plan=plan,
+                    installment_number=number,
+                    due_date=plan.start_date + relativedelta(months=number),
+                    amount_due=plan.monthly_installment,
+                    amount_paid=payment.amount if payment else Decimal('0'),
+                    is_paid=payment is not None,
+                    payment=payment,
+                    payment_date=payment.payment_date if payment else None,
+                ))
+        self.insert(PaymentSchedule, schedules)
+
+        self.create_summaries(clients, purchases, payments_by_purchase)
+
+    def create_summaries(self, clients, purchases, payments_by_purchase):
+        """ClientFinancialSummary rows for a batch, from the in-memory totals"""
+        by_client = {purchase.client_id: purchase for purchase in purchases}
+        summaries = []
+        for client in clients:
+            purchase = by_client.get(client.pk)
+            if purchase is None:
+                summaries.append(ClientFinancialSummary(client=client))
+                continue
+            payments = payments_by_purchase[purchase.pk]
+            summaries.append(ClientFinancialSummary(
+                client=client,
+                vehicle_count=1,
+                active_vehicle_count=1,
+                total_spent=purchase.purchase_price,
+                total_paid=purchase.total_paid,
+                total_balance=purchase.balance,
+                outstanding_balance=Decimal('0') if purchase.is_paid_off else purchase.balance,
+                payments_received=sum(payment.amount for payment in payments),
+                payment_count=len(payments),
+                last_payment_date=max(payment.payment_date for payment in payments),
+            ))
+        self.insert(ClientFinancialSummary, summaries)
+
+    def create_auctions(self, count):
+        if not self.staff or not self.available_vehicles:
+            return
+        vehicles = self.random.sample(self.available_vehicles, min(count, len(self.available_vehicles)))
+        auctioned = {vehicle.pk for vehicle in vehicles}
+        self.available_vehicles = [v for v in self.available_vehicles if v.pk not in auctioned]
+        now = timezone.now()
+
+        auctions, auction_bids = [], []
+        for vehicle in vehicles:
+            index = self.next_index('auction')[0]
+            start = now - timedelta(days=self.random.randint(1, 30))
+            starting_price = money(vehicle.selling_price * Decimal('0.8'))
+            bidders = self.random.sample(self.staff, min(self.random.randint(2, 8), len(self.staff)))
+            amounts = [money(starting_price * (1 + Decimal(step) / 50)) for step in range(len(bidders))]
+            auctions.append(Auction(
+                auction_number=f'AUC-SYN{self.seed}-{index:07d}',
+                title=f'{vehicle.year} {vehicle.make} {vehicle.model} Auction',
+                vehicle=vehicle,
+                starting_price=starting_price,
+                reserve_price=money(vehicle.selling_price * Decimal('0.9')),
+                current_bid=amounts[-1],
+                total_bids=len(amounts),
+                unique_bidders=len(bidders),
+                start_date=start,
+                end_date=start + timedelta(days=self.random.randint(7, 30)),
+                status='active',
+            ))
+            auction_bids.append(list(zip(bidders, amounts)))
+
+        auctions = self.insert(Auction, auctions)
+        bids = []
+        for auction, offers in zip(auctions, auction_bids):
+            for position, (bidder, amount) in enumerate(offers):
+                latest = position == len(offers) - 1
+                bids.append(Bid(
+                    auction=auction,
+                    bidder=bidder,
+                    bid_amount=amount,
+                    is_active=True,
+                    is_outbid=not latest,
+                ))
+        self.insert(Bid, bids)
+
+    def create_employees(self, count):
+        indexes = self.next_index('employee', count)
+        users = self.insert(User, [
+            User(
+                email=f'synthetic{self.seed}.employee{index}@example.com',
+                password=self.password,
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                role=UserRole.CLERK,
+                is_active=True,
+            )
+            for index in indexes
+        ])
+        employees = self.insert(Employee, [
+            Employee(
+                user=user,
+                employee_id=f'EMP-S{self.seed % 1000:03d}-{index:07d}',
+                first_name=user.first_name,
+                last_name=user.last_name,
+                email=user.email,
+                phone_number=self.phone(),
+                national_id=f'SYN{self.seed}-{index}',
+                job_title=self.random.choice(['Sales Executive', 'Accountant', 'Mechanic', 'Driver']),
+                department=self.random.choice(['SALES', 'FINANCE', 'OPERATIONS', 'ADMIN']),
+                employment_type=self.random.choice(['FULL_TIME', 'FULL_TIME', 'CONTRACT']),
+                date_of_birth=self.days_ago(7300, 18250),
+                hire_date=self.days_ago(90, 1095),
+                status='ACTIVE',
+                bank_name='KCB Bank',
+                bank_account_number=f'{self.random.randint(10 ** 9, 10 ** 10 - 1)}',
+                emergency_contact_name=f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}',
+                emergency_contact_phone=self.phone(),
+                emergency_contact_relationship='Spouse',
+                address_line1=f'{self.random.randint(1, 999)} Thika Road',
+                city=self.random.choice(CITIES),
+            )
+            for user, index in zip(users, indexes)
+        ])
+        self.insert(SalaryStructure, [
+            SalaryStructure(
+                employee=employee,
+                basic_salary=Decimal(self.random.randint(30, 200) * 1000),
+                housing_allowance=Decimal(self.random.randint(0, 20) * 1000),
+                transport_allowance=Decimal(self.random.randint(0, 10) * 1000),
+                effective_from=employee.hire_date,
+            )
+            for employee in employees
+        ])
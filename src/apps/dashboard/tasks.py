@@ -0,0 +1,26 @@
+"""
+Dashboard App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .kpis import refresh_due_snapshots
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# KPI SNAPSHOT TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def refresh_kpi_snapshots_task(force=False):
+    """
+    Recompute KPI snapshots that are dirty or older than KPI_SNAPSHOT_MAX_AGE
+    (runs every minute via beat)
+    """
+    refreshed = refresh_due_snapshots(force=force)
+    if refreshed:
+        logger.info(f"Refreshed KPI snapshots: {', '.join(refreshed)}")
+    return {'refreshed': refreshed}
@@ -1,3 +1,205 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.clients.models import Client, ClientFinancialSummary, ClientVehicle
+from apps.payments.models import InstallmentPlan, Payment, PaymentReminder
+from apps.vehicles.models import Vehicle
+
+from . import benchmarks, kpis
+from .benchmarks import run_benchmarks
+from .models import BenchmarkResult, KPISnapshot
+from .synthetic import SyntheticDataGenerator
+
+
+def create_payment_data():
+    """Installment plans with payments, schedules and reminders for a few clients."""
+    clients = list(Client.objects.all()[:4])
+    vehicles = list(Vehicle.objects.exclude(client_purchases__isnull=False)[:len(clients)])
+    for client, vehicle in zip(clients, vehicles):
+        client_vehicle = ClientVehicle.objects.create(
+            client=client,
+            vehicle=vehicle,
+            purchase_date=date(2024, 1, 1),
+            purchase_price=Decimal('1200000'),
+            deposit_paid=Decimal('300000'),
+            total_paid=Decimal('300000'),
+            balance=Decimal('900000'),
+        )
+        plan = InstallmentPlan.objects.create(
+            client_vehicle=client_vehicle,
+            total_amount=Decimal('1200000'),
+            deposit=Decimal('300000'),
+            monthly_installment=Decimal('75000'),
+            number_of_installments=12,
+            start_date=date(2024, 2, 1),
+        )
+        plan.generate_payment_schedule()
+        for month in range(1, 4):
+            Payment.objects.create(
+                client_vehicle=client_vehicle,
+                amount=Decimal('75000'),
+                payment_date=date(2024, month + 1, 1),
+                payment_method='mpesa',
+            )
+        for schedule in plan.payment_schedules.all()[:3]:
+            PaymentReminder.objects.create(
+                payment_schedule=schedule,
+                reminder_type='sms',
+                message='Payment due',
+                status='sent',
+            )
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class AdminChangelistSweepTests(TestCase):
+    """
+    Every registered changelist renders, and its query count does not grow
+    with the number of rows on the page.
+    """
+    small_page = 2
+    large_page = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('populate_db', users=3, vehicles=30, clients=15, stdout=StringIO())
+        create_payment_data()
+        cls.user = get_user_model().objects.create_superuser(
+            email='sweep@example.com', password='password'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def changelist_queries(self, model_admin, url, per_page):
+        original = model_admin.list_per_page
+        model_admin.list_per_page = per_page
+        try:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, secure=True)
+        finally:
+            model_admin.list_per_page = original
+        return response.status_code, len(context.captured_queries)
+
+    def test_changelist_queries_do_not_scale_with_page_size(self):
+        failures = []
+        for model, model_admin in admin.site._registry.items():
+            opts = model._meta
+            url = reverse(f'admin:{opts.app_label}_{opts.model_name}_changelist')
+
+            status, small = self.changelist_queries(model_admin, url, self.small_page)
+            if status != 200:
+                failures.append(f'{opts.label}: changelist returned {status}')
+                continue
+            if model._default_manager.count() <= self.small_page:
+                continue
+
+            status, large = self.changelist_queries(model_admin, url, self.large_page)
+            if large > small:
+                failures.append(
+                    f'{opts.label}: {small} queries for {self.small_page} rows, '
+                    f'{large} for {self.large_page}'
+                )
+
+        self.assertEqual(failures, [], '\n'.join(failures))
+
+
+class SyntheticDataGeneratorTests(TestCase):
+    """Bulk-created rows carry the same derived totals the signals would"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.counts = SyntheticDataGenerator(seed=7, batch_size=8).generate(clients=30)
+
+    def test_summaries_match_source_rows(self):
+        self.assertEqual(Client.objects.count(), 30)
+        self.assertEqual(ClientFinancialSummary.objects.count(), 30)
+
+        cent = Decimal('0.01')
+        for summary in ClientFinancialSummary.objects.all():
+            live = ClientFinancialSummary.objects.compute(summary.client_id)
+            for field in ClientFinancialSummary.TOTAL_FIELDS:
+                stored, expected = getattr(summary, field), live[field]
+                if isinstance(stored, Decimal):
+                    stored, expected = stored.quantize(cent), Decimal(expected).quantize(cent)
+                self.assertEqual(stored, expected, f'client {summary.client_id} {field}')
+
+    def test_purchase_totals_match_payments(self):
+        for purchase in ClientVehicle.objects.prefetch_related('payments'):
+            paid = sum((payment.amount for payment in purchase.payments.all()), Decimal('0'))
+            self.assertEqual(purchase.total_paid, paid)
+            self.assertEqual(purchase.balance, purchase.purchase_price - paid)
+
+
+class BenchmarkHarnessTests(TestCase):
+
+    def test_results_are_stored_and_data_rolled_back(self):
+        results = run_benchmarks(scales=[20], repeat=1, names=['dashboard', 'payment_recording'])
+
+        self.assertEqual(
+            sorted(BenchmarkResult.objects.values_list('name', 'scale')),
+            [('dashboard', 20), ('payment_recording', 20)],
+        )
+        self.assertTrue(all(result.queries > 0 for result in results))
+        self.assertFalse(Client.objects.exists())
+
+    def test_on_commit_callbacks_run_inside_each_run(self):
+        committed = []
+
+        def on_commit_benchmark(context):
+            def run():
+                transaction.on_commit(lambda: committed.append(Client.objects.count()))
+            return run
+
+        with mock.patch.dict(benchmarks._registry, {'on_commit': on_commit_benchmark}):
+            results = run_benchmarks(scales=[5], repeat=2, names=['on_commit'])
+
+        # Warm-up plus two timed runs, each seeing the uncommitted data
+        self.assertEqual(committed, [5, 5, 5])
+        self.assertGreater(results[0].queries, 0)
+
+
+class KPISnapshotTests(TestCase):
+
+    def test_write_during_refresh_of_dirty_snapshot_keeps_it_dirty(self):
+        kpis.refresh_snapshot('payroll')
+        kpis.mark_dirty('payroll')
+
+        real_compute = kpis.compute_module
+
+        def compute_with_concurrent_write(module, today=None):
+            result = real_compute(module, today)
+            kpis.mark_dirty('payroll')
+            return result
+
+        with mock.patch.object(kpis, 'compute_module', compute_with_concurrent_write):
+            snapshot = kpis.refresh_snapshot('payroll')
+        self.assertTrue(snapshot.dirty)
+
+        self.assertFalse(kpis.refresh_snapshot('payroll').dirty)
+
+    def test_money_sums_round_trip_as_exact_decimals(self):
+        total = Decimal('0.10') + Decimal('0.20') + Decimal('1234567.01')
+        KPISnapshot.objects.create(module='test', values={
+            'outstanding': kpis._jsonable(total),
+            'count': kpis._jsonable(3),
+            'as_of': kpis._jsonable(date(2024, 3, 1)),
+        })
+
+        values = KPISnapshot.objects.get(module='test').values
+        self.assertEqual(values['outstanding'], Decimal('1234567.31'))
+        self.assertIsInstance(values['outstanding'], Decimal)
+        self.assertEqual(values['count'], 3)
+        self.assertEqual(values['as_of'], '2024-03-01')
@@ -8,8 +8,10 @@ from django.utils.html import format_html
 from django.urls import reverse
 from .models import (
     Document, DocumentCategory, 
-    DocumentShare, DocumentAccess, DocumentPermission
+    DocumentShare, DocumentAccess, DocumentPermission,
+    DocumentBlob, DocumentStorageUsage
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class DocumentShareInline(admin.TabularInline):
@@ -21,13 +23,17 @@ class DocumentShareInline(admin.TabularInline):
 
 
 @admin.register(Document)
-class DocumentAdmin(admin.ModelAdmin):
+class DocumentAdmin(PerformanceModelAdmin):
     """Admin interface for documents."""
     
-    list_display = ('title', 'category', 'uploaded_by', 'uploaded_at')
-    list_filter = ('category', 'uploaded_at')
+    list_display = ('title', 'category', 'uploaded_by', 'uploaded_at', 'processing_status')
+    list_filter = ('category', 'uploaded_at', 'processing_status')
     search_fields = ('title', 'description')
-    readonly_fields = ('uploaded_by', 'uploaded_at', 'updated_at')
+    readonly_fields = (
+        'uploaded_by', 'uploaded_at', 'updated_at', 'processing_status', 'mime_type',
+        'page_count', 'previews', 'processing_error', 'processed_at'
+    )
+    exclude = ('extracted_text',)
     inlines = [DocumentShareInline]
     
     def save_model(self, request, obj, form, change):
@@ -38,7 +44,7 @@ class DocumentAdmin(admin.ModelAdmin):
 
 
 @admin.register(DocumentCategory)
-class DocumentCategoryAdmin(admin.ModelAdmin):
+class DocumentCategoryAdmin(PerformanceModelAdmin):
     """Admin interface for document categories."""
     
     list_display = ('name', 'description', 'created_at')
@@ -47,7 +53,7 @@ class DocumentCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(DocumentShare)
-class DocumentShareAdmin(admin.ModelAdmin):
+class DocumentShareAdmin(PerformanceModelAdmin):
     """Admin interface for document shares."""
     
     list_display = ('document', 'share_token', 'created_by', 'allow_download', 'is_active', 'created_at')
@@ -62,7 +68,7 @@ class DocumentShareAdmin(admin.ModelAdmin):
 
 
 @admin.register(DocumentAccess)
-class DocumentAccessAdmin(admin.ModelAdmin):
+class DocumentAccessAdmin(PerformanceModelAdmin):
     """Admin interface for document access."""
     
     list_display = ('document', 'user', 'access_type', 'accessed_at')
@@ -71,9 +77,27 @@ class DocumentAccessAdmin(admin.ModelAdmin):
 
 
 @admin.register(DocumentPermission)
-class DocumentPermissionAdmin(admin.ModelAdmin):
+class DocumentPermissionAdmin(PerformanceModelAdmin):
     """Admin interface for document permissions."""
     
     list_display = ('document', 'user', 'permission', 'granted_at')
     list_filter = ('permission', 'granted_at')
-    readonly_fields = ('granted_at',)
\ No newline at end of file
+    readonly_fields = ('granted_at',)
+
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(PerformanceModelAdmin):
+    """Admin interface for content-addressed document blobs."""
+    
+    list_display = ('digest', 'name', 'size', 'ref_count', 'created_at')
+    search_fields = ('digest', 'name')
+    readonly_fields = ('name', 'digest', 'size', 'ref_count', 'created_at')
+
+
+@admin.register(DocumentStorageUsage)
+class DocumentStorageUsageAdmin(PerformanceModelAdmin):
+    """Admin interface for document storage usage."""
+    
+    list_display = ('user', 'category', 'document_count', 'total_bytes', 'updated_at')
+    list_filter = ('category',)
+    list_select_related = ('user', 'category')
+    readonly_fields = ('user', 'category', 'document_count', 'total_bytes', 'updated_at')
@@ -5,11 +5,13 @@ Handles document upload, categorization, version control, and sharing.
 
 from django import forms
 from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from .models import (
     Document, DocumentCategory, DocumentShare
 )
+from .utils import check_storage_quota
 import os
 
 User = get_user_model()
@@ -121,6 +123,10 @@ class DocumentForm(forms.ModelForm):
                     f'File type {ext} is not allowed. '
                     f'Allowed types: {", ".join(allowed_extensions)}'
                 )
+            
+            # Check the uploader's storage quota for new uploads
+            if isinstance(file, UploadedFile) and not check_storage_quota(self.user, file.size):
+                raise ValidationError('This upload would exceed your document storage quota.')
         
         return file
     
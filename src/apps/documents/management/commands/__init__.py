@@ -0,0 +1 @@
+# Documents management commands
@@ -0,0 +1,70 @@
+"""
+Management command to report or delete document files that no Document
+references
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.documents.utils import ORPHAN_MIN_AGE, cleanup_orphaned_files, format_file_size
+
+
+class Command(BaseCommand):
+    help = 'Report orphaned document files (dry run by default) or delete them with throttling'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Delete orphaned files instead of only reporting them',
+        )
+        parser.add_argument(
+            '--max-deletes',
+            type=int,
+            help='Stop after deleting this many files',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='Maximum deletes per second',
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=int(ORPHAN_MIN_AGE.total_seconds() // 60),
+            help='Ignore files modified within this many minutes (uploads still committing)',
+        )
+        parser.add_argument(
+            '--list',
+            type=int,
+            default=20,
+            help='Number of orphaned paths to list in the report',
+        )
+
+    def handle(self, *args, **options):
+        delete = options['delete']
+
+        self.stdout.write(self.style.WARNING(
+            'Deleting orphaned files...' if delete else 'Scanning for orphaned files (dry run)...'
+        ))
+
+        report = cleanup_orphaned_files(
+            delete=delete,
+            max_deletes=options['max_deletes'],
+            deletes_per_second=options['rate'],
+            report_limit=options['list'],
+            min_age=timedelta(minutes=options['min_age']),
+        )
+
+        for path in report['files']:
+            self.stdout.write(f'  {path}')
+
+        self.stdout.write(
+            f"Orphaned files: {report['orphaned_count']} "
+            f"({format_file_size(report['orphaned_bytes'])})"
+        )
+        if delete:
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {report['deleted_count']} file(s), "
+                f"freed {format_file_size(report['deleted_bytes'])}"
+            ))
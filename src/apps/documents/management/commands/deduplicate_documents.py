@@ -0,0 +1,134 @@
+"""
+Management command to move existing document files into content-addressable
+storage, collapsing identical files into a single blob
+"""
+import os
+import shutil
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+
+from apps.documents.models import Document, DocumentBlob
+from apps.documents.utils import format_file_size
+from config.storage_backends import compute_content_digest
+
+
+class Command(BaseCommand):
+    help = 'Deduplicate existing document files in place and report the space reclaimed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be reclaimed without touching any files',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of document rows fetched per query',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+        storage = Document._meta.get_field('file').storage
+
+        moved = {}  # legacy name -> blob name
+        planned_blobs = set()  # blobs a dry run would have created
+        stats = {'scanned': 0, 'migrated': 0, 'duplicates': 0, 'missing': 0, 'reclaimed': 0}
+
+        self.stdout.write(self.style.WARNING(
+            'Scanning documents%s...' % (' (dry run)' if dry_run else '')
+        ))
+
+        rows = (
+            Document.objects.exclude(file='')
+            .order_by('pk')
+            .values_list('file', flat=True)
+            .iterator(chunk_size=batch_size)
+        )
+
+        for name in rows:
+            stats['scanned'] += 1
+
+            # Every row sharing a legacy file is repointed with its first row
+            if storage.is_blob_name(name) or name in moved:
+                continue
+
+            if not storage.exists(name):
+                stats['missing'] += 1
+                continue
+
+            with storage.open(name, 'rb') as fh:
+                digest, size = compute_content_digest(fh, storage.chunk_size)
+
+            blob_name = storage.blob_name(digest, os.path.splitext(name)[1])
+            is_duplicate = storage.exists(blob_name) or blob_name in planned_blobs
+            moved[name] = blob_name
+
+            if is_duplicate:
+                stats['duplicates'] += 1
+                stats['reclaimed'] += size
+
+            if dry_run:
+                planned_blobs.add(blob_name)
+                continue
+
+            if not is_duplicate:
+                self.copy_to_blob(storage, name, blob_name)
+
+            # The legacy file is only removed once the rows pointing at the
+            # blob have committed; a failed repoint leaves it in place
+            with transaction.atomic():
+                refs = Document.objects.filter(file=name).update(file=blob_name)
+                blob, created = DocumentBlob.objects.select_for_update().get_or_create(
+                    name=blob_name,
+                    defaults={'digest': digest, 'size': size, 'ref_count': refs},
+                )
+                if not created:
+                    DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + refs)
+                transaction.on_commit(lambda name=name: storage.delete(name))
+            stats['migrated'] += 1
+
+        if not dry_run:
+            self.rebuild_ref_counts()
+
+        self.stdout.write(f"Documents scanned:   {stats['scanned']}")
+        self.stdout.write(f"Files migrated:      {stats['migrated']}")
+        self.stdout.write(f"Duplicates found:    {stats['duplicates']}")
+        self.stdout.write(f"Missing files:       {stats['missing']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Space {'reclaimable' if dry_run else 'reclaimed'}: {format_file_size(stats['reclaimed'])}"
+        ))
+
+    def copy_to_blob(self, storage, name, blob_name):
+        """Hard-link (or copy) a legacy file to its blob path, keeping the original"""
+        source, target = storage.path(name), storage.path(blob_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+    def rebuild_ref_counts(self):
+        """Recompute every blob's reference count from the document table"""
+        counts = dict(
+            Document.objects.filter(file__startswith='cas/')
+            .values('file')
+            .annotate(refs=Count('id'))
+            .values_list('file', 'refs')
+        )
+
+        with transaction.atomic():
+            blobs = list(DocumentBlob.objects.select_for_update())
+            for blob in blobs:
+                blob.ref_count = counts.get(blob.name, 0)
+            DocumentBlob.objects.bulk_update(blobs, ['ref_count'], batch_size=1000)
+
+        unreferenced = sum(1 for blob in blobs if blob.ref_count == 0)
+        if unreferenced:
+            self.stdout.write(self.style.WARNING(
+                f'{unreferenced} blob(s) have no references and remain in storage'
+            ))
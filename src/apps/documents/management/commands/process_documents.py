@@ -0,0 +1,91 @@
+"""
+Management command to backfill previews and extracted text for existing
+documents using a local worker pool (or by queueing Celery tasks)
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.documents.models import Document
+from apps.documents.processing import (
+    DocumentProcessingError, enqueue_document_processing,
+    mark_processing_failed, process_document,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _process_one(document_id):
+    """Worker entry point; each thread uses and closes its own DB connection"""
+    try:
+        document = Document.objects.filter(pk=document_id).first()
+        if document is None:
+            return 'missing'
+        process_document(document)
+        return 'completed'
+    except Exception as e:
+        # One bad document must not abort the backfill
+        if not isinstance(e, (DocumentProcessingError, OSError)):
+            logger.exception(f"Unexpected error processing document {document_id}")
+        mark_processing_failed(document_id, e)
+        return 'failed'
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Generate previews and extract text for existing documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--status',
+            choices=['pending', 'failed', 'all'],
+            default='pending',
+            help='Which documents to process (default: pending)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of worker threads',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum number of documents to process',
+        )
+        parser.add_argument(
+            '--enqueue',
+            action='store_true',
+            help='Queue Celery tasks instead of processing locally',
+        )
+
+    def handle(self, *args, **options):
+        documents = Document.objects.exclude(file='').order_by('pk')
+        if options['status'] != 'all':
+            documents = documents.filter(processing_status=options['status'])
+
+        document_ids = list(documents.values_list('pk', flat=True)[:options['limit']])
+        total = len(document_ids)
+        self.stdout.write(self.style.WARNING(f'Processing {total} document(s)...'))
+
+        if options['enqueue']:
+            for document_id in document_ids:
+                enqueue_document_processing(document_id)
+            self.stdout.write(self.style.SUCCESS(f'Queued {total} document(s).'))
+            return
+
+        results = {'completed': 0, 'failed': 0, 'missing': 0}
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = [pool.submit(_process_one, document_id) for document_id in document_ids]
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[future.result()] += 1
+                if done % 100 == 0:
+                    self.stdout.write(f'  {done}/{total}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Completed: {results['completed']}, failed: {results['failed']}, "
+            f"missing: {results['missing']}"
+        ))
@@ -0,0 +1,23 @@
+"""
+Management command to (re)build the document full-text search index
+"""
+from django.core.management.base import BaseCommand
+
+from apps.documents.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of documents indexed per batch',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Rebuilding document search index...'))
+        total = rebuild_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} document(s).'))
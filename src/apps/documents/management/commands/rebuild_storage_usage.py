@@ -0,0 +1,15 @@
+"""
+Management command to recompute document storage usage from the document table
+"""
+from django.core.management.base import BaseCommand
+
+from apps.documents.models import DocumentStorageUsage
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user and per-category document storage usage counters'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.WARNING('Rebuilding storage usage...'))
+        buckets = DocumentStorageUsage.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {buckets} usage bucket(s).'))
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-18 20:47
+
+import apps.documents.models
+import config.storage_backends
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage path of the blob', max_length=255, unique=True)),
+                ('digest', models.CharField(db_index=True, help_text='BLAKE2b content digest', max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0, help_text='Blob size in bytes')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Number of documents referencing this blob')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Document Blob',
+                'verbose_name_plural': 'Document Blobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(help_text='Document file', max_length=255, storage=config.storage_backends.get_document_storage, upload_to=apps.documents.models.document_upload_path),
+        ),
+    ]
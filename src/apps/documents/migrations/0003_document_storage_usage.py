@@ -0,0 +1,54 @@
+# Generated by Django 5.1 on 2026-10-18 20:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_storage_usage(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    DocumentStorageUsage = apps.get_model('documents', 'DocumentStorageUsage')
+
+    rows = (
+        Document.objects.filter(uploaded_by__isnull=False)
+        .values('uploaded_by_id', 'category_id')
+        .annotate(document_count=models.Count('id'), total_bytes=models.Sum('file_size'))
+        .order_by()
+    )
+    DocumentStorageUsage.objects.bulk_create([
+        DocumentStorageUsage(
+            user_id=row['uploaded_by_id'],
+            category_id=row['category_id'],
+            document_count=row['document_count'],
+            total_bytes=row['total_bytes'] or 0,
+        )
+        for row in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_blob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentStorageUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_count', models.IntegerField(default=0, help_text='Number of documents')),
+                ('total_bytes', models.BigIntegerField(default=0, help_text='Total size of documents in bytes')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(help_text='Document category', on_delete=django.db.models.deletion.CASCADE, related_name='storage_usage', to='documents.documentcategory')),
+                ('user', models.ForeignKey(help_text='Uploader', on_delete=django.db.models.deletion.CASCADE, related_name='document_storage_usage', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Document Storage Usage',
+                'verbose_name_plural': 'Document Storage Usage',
+                'unique_together': {('user', 'category')},
+            },
+        ),
+        migrations.RunPython(build_storage_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.1 on 2026-10-18 20:51
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_search_structures(apps, schema_editor):
+    """GIN index on PostgreSQL, FTS5 table on SQLite"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX documents_search_vector_gin "
+            "ON documents_documentsearchindex USING gin (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS documents_search_fts "
+            "USING fts5(title, tags, description, content, tokenize='unicode61')"
+        )
+
+
+def build_search_index(apps, schema_editor):
+    """Index the documents that existed before the index table"""
+    Document = apps.get_model('documents', 'Document')
+    DocumentSearchIndex = apps.get_model('documents', 'DocumentSearchIndex')
+    vendor = schema_editor.connection.vendor
+
+    fields = ('pk', 'uploaded_by_id', 'category_id', 'is_private', 'is_active', 'title', 'tags', 'description')
+    rows = Document.objects.order_by('pk').values_list(*fields)
+    entries = [
+        DocumentSearchIndex(
+            document_id=pk,
+            owner_id=owner_id,
+            category_id=category_id,
+            is_private=is_private,
+            is_active=is_active,
+            title=title or '',
+            tags=(tags or '').replace(',', ' '),
+            description=description or '',
+        )
+        for pk, owner_id, category_id, is_private, is_active, title, tags, description in rows.iterator()
+    ]
+    DocumentSearchIndex.objects.bulk_create(entries, batch_size=1000)
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+
+        config = getattr(settings, 'DOCUMENT_SEARCH_CONFIG', 'simple')
+        vector = (
+            SearchVector('title', weight='A', config=config)
+            + SearchVector('tags', weight='B', config=config)
+            + SearchVector('description', weight='C', config=config)
+        )
+        DocumentSearchIndex.objects.update(search_vector=vector)
+    elif vendor == 'sqlite':
+        schema_editor.connection.cursor().executemany(
+            "INSERT INTO documents_search_fts (rowid, title, tags, description, content) VALUES (%s, %s, %s, %s, '')",
+            [(entry.document_id, entry.title, entry.tags, entry.description) for entry in entries]
+        )
+
+
+def drop_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS documents_search_vector_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS documents_search_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_document_storage_usage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSearchIndex',
+            fields=[
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_index', serialize=False, to='documents.document')),
+                ('is_private', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('title', models.CharField(max_length=255)),
+                ('tags', models.CharField(blank=True, default='', max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('content', models.TextField(blank=True, default='', help_text='Extracted document text')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='documents.documentcategory')),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Document Search Index',
+                'verbose_name_plural': 'Document Search Index',
+                'indexes': [models.Index(fields=['is_active', 'is_private'], name='documents_d_is_acti_b5845a_idx'), models.Index(fields=['owner', 'is_active'], name='documents_d_owner_i_18716f_idx')],
+            },
+        ),
+        migrations.RunPython(create_search_structures, drop_search_structures),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1 on 2026-10-18 20:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('documents', '0004_document_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='extracted_text',
+            field=models.TextField(blank=True, default='', help_text='Text extracted for search'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='mime_type',
+            field=models.CharField(blank=True, help_text='MIME type detected from file content', max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of pages (PDF only)', null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='previews',
+            field=models.JSONField(blank=True, default=dict, help_text='Preview image paths keyed by size'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, help_text='When processing last completed', null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_error',
+            field=models.TextField(blank=True, default='', help_text='Last processing error'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', help_text='Preview/text extraction status', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['processing_status'], name='documents_d_process_052924_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 20:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('documents', '0005_document_processing'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, help_text='When the document was archived', null=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='is_archived',
+            field=models.BooleanField(default=False, help_text='Whether this document was archived after expiring'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['is_archived', 'expiry_date'], name='documents_d_is_arch_6ba555_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentshare',
+            index=models.Index(fields=['expires_at'], name='documents_d_expires_4b27d0_idx'),
+        ),
+    ]
@@ -8,9 +8,14 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
-from django.db.models.signals import post_delete
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.signals import post_delete, pre_save, post_save
 from django.dispatch import receiver
 import os
+
+from config.storage_backends import get_document_storage
 from datetime import date
 
 User = get_user_model()
@@ -50,6 +55,82 @@ class DocumentManager(models.Manager):
         )
 
 
+class DocumentBlobManager(models.Manager):
+    """Reference counting for content-addressed document files"""
+    
+    def acquire(self, name, digest, size):
+        """Add a reference to a stored blob, creating its record if needed"""
+        with transaction.atomic():
+            blob, created = self.select_for_update().get_or_create(
+                name=name,
+                defaults={'digest': digest, 'size': size, 'ref_count': 1}
+            )
+            if not created:
+                self.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+        return blob
+    
+    def release(self, name):
+        """
+        Drop a reference to a stored blob.
+        
+        Returns:
+            None if the name is not tracked, True if this was the last
+            reference (the record is removed), False otherwise.
+        """
+        with transaction.atomic():
+            blob = self.select_for_update().filter(name=name).first()
+            if blob is None:
+                return None
+            if blob.ref_count <= 1:
+                blob.delete()
+                return True
+            self.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+        return False
+
+
+# ==================== DOCUMENT BLOB MODEL ====================
+
+class DocumentBlob(models.Model):
+    """
+    A physical file in content-addressable storage, shared by every
+    document (and document version) whose content hashes to it
+    """
+    
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        help_text="Storage path of the blob"
+    )
+    
+    digest = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text="BLAKE2b content digest"
+    )
+    
+    size = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Blob size in bytes"
+    )
+    
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of documents referencing this blob"
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = DocumentBlobManager()
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Document Blob'
+        verbose_name_plural = 'Document Blobs'
+    
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.ref_count} refs)"
+
+
 # ==================== DOCUMENT CATEGORY MODEL ====================
 
 class DocumentCategory(models.Model):
@@ -181,6 +262,8 @@ class Document(models.Model):
     # File Information
     file = models.FileField(
         upload_to=document_upload_path,
+        storage=get_document_storage,
+        max_length=255,
         help_text="Document file"
     )
     
@@ -279,6 +362,17 @@ class Document(models.Model):
         help_text="Whether this document is active"
     )
     
+    is_archived = models.BooleanField(
+        default=False,
+        help_text="Whether this document was archived after expiring"
+    )
+    
+    archived_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the document was archived"
+    )
+    
     # Tags for better search
     tags = models.CharField(
         max_length=255,
@@ -318,6 +412,58 @@ class Document(models.Model):
         help_text="Last download timestamp"
     )
     
+    # Background Processing
+    PROCESSING_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    processing_status = models.CharField(
+        max_length=20,
+        choices=PROCESSING_STATUS_CHOICES,
+        default='pending',
+        help_text="Preview/text extraction status"
+    )
+    
+    mime_type = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        help_text="MIME type detected from file content"
+    )
+    
+    page_count = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Number of pages (PDF only)"
+    )
+    
+    previews = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Preview image paths keyed by size"
+    )
+    
+    extracted_text = models.TextField(
+        blank=True,
+        default='',
+        help_text="Text extracted for search"
+    )
+    
+    processing_error = models.TextField(
+        blank=True,
+        default='',
+        help_text="Last processing error"
+    )
+    
+    processed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When processing last completed"
+    )
+    
     # Custom Manager
     objects = DocumentManager()
     
@@ -332,6 +478,8 @@ class Document(models.Model):
             models.Index(fields=['is_active', 'is_latest_version']),
             models.Index(fields=['content_type', 'object_id']),
             models.Index(fields=['expiry_date']),
+            models.Index(fields=['is_archived', 'expiry_date']),
+            models.Index(fields=['processing_status']),
         ]
     
     def __str__(self):
@@ -411,6 +559,12 @@ class Document(models.Model):
         doc_extensions = ['.doc', '.docx', '.txt', '.rtf', '.odt']
         return self.get_file_extension() in doc_extensions
     
+    def get_preview_url(self, size='medium'):
+        """Get URL of a generated preview image, if any"""
+        from django.core.files.storage import default_storage
+        path = (self.previews or {}).get(size)
+        return default_storage.url(path) if path else None
+    
     @property
     def is_spreadsheet(self):
         """Check if document is a spreadsheet"""
@@ -721,6 +875,7 @@ class DocumentShare(models.Model):
             models.Index(fields=['share_token']),
             models.Index(fields=['document']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['expires_at']),
         ]
     
     def __str__(self):
@@ -751,13 +906,291 @@ class DocumentShare(models.Model):
         self.save(update_fields=['download_count', 'last_accessed_at'])
 
 
+# ==================== STORAGE USAGE MODEL ====================
+
+class DocumentStorageUsageManager(models.Manager):
+    """Delta-maintained storage usage counters"""
+    
+    def apply_delta(self, user_id, category_id, count_delta, bytes_delta):
+        """
+        Add count/byte deltas to a (user, category) bucket, creating it on
+        first use. Documents without an uploader are not tracked.
+        """
+        if user_id is None or category_id is None:
+            return
+        if not count_delta and not bytes_delta:
+            return
+        
+        changes = {
+            'document_count': F('document_count') + count_delta,
+            'total_bytes': F('total_bytes') + bytes_delta,
+            'updated_at': timezone.now(),
+        }
+        if self.filter(user_id=user_id, category_id=category_id).update(**changes):
+            return
+        
+        try:
+            with transaction.atomic():
+                self.create(
+                    user_id=user_id,
+                    category_id=category_id,
+                    document_count=count_delta,
+                    total_bytes=bytes_delta,
+                )
+        except IntegrityError:
+            # Created concurrently; apply the delta to the winning row
+            self.filter(user_id=user_id, category_id=category_id).update(**changes)
+    
+    def for_user(self, user):
+        """Total usage for a user across all categories"""
+        totals = self.filter(user=user).aggregate(
+            total_bytes=Sum('total_bytes'),
+            document_count=Sum('document_count'),
+        )
+        return {
+            'total_bytes': totals['total_bytes'] or 0,
+            'document_count': totals['document_count'] or 0,
+        }
+    
+    def by_category(self):
+        """Usage per category across all users"""
+        return self.values('category', 'category__name').annotate(
+            total_bytes=Sum('total_bytes'),
+            document_count=Sum('document_count'),
+        ).order_by('-total_bytes')
+    
+    def rebuild(self):
+        """Recompute every bucket from the document table"""
+        rows = (
+            Document.objects.filter(uploaded_by__isnull=False)
+            .values('uploaded_by_id', 'category_id')
+            .annotate(document_count=Count('id'), total_bytes=Sum('file_size'))
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create([
+                self.model(
+                    user_id=row['uploaded_by_id'],
+                    category_id=row['category_id'],
+                    document_count=row['document_count'],
+                    total_bytes=row['total_bytes'] or 0,
+                )
+                for row in rows.iterator()
+            ], batch_size=1000)
+        return self.count()
+
+
+class DocumentStorageUsage(models.Model):
+    """
+    Storage used per (uploader, category), kept current by save/delete
+    deltas so quota checks and usage reports never re-sum documents
+    """
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='document_storage_usage',
+        help_text="Uploader"
+    )
+    
+    category = models.ForeignKey(
+        DocumentCategory,
+        on_delete=models.CASCADE,
+        related_name='storage_usage',
+        help_text="Document category"
+    )
+    
+    document_count = models.IntegerField(
+        default=0,
+        help_text="Number of documents"
+    )
+    
+    total_bytes = models.BigIntegerField(
+        default=0,
+        help_text="Total size of documents in bytes"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = DocumentStorageUsageManager()
+    
+    class Meta:
+        verbose_name = 'Document Storage Usage'
+        verbose_name_plural = 'Document Storage Usage'
+        unique_together = ['user', 'category']
+    
+    def __str__(self):
+        return f"{self.user} - {self.category}: {self.total_bytes} bytes"
+
+
+# ==================== SEARCH INDEX MODEL ====================
+
+class DocumentSearchIndex(models.Model):
+    """
+    Denormalized search row for a document.
+    
+    Carries the access-control columns so permission filtering runs on
+    this table's indexes before ranking. On PostgreSQL search_vector holds
+    the weighted tsvector (GIN indexed); on SQLite a parallel FTS5 table is
+    used instead. See apps.documents.search.
+    """
+    
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_index'
+    )
+    
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+'
+    )
+    
+    category = models.ForeignKey(
+        DocumentCategory,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    
+    is_private = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    
+    title = models.CharField(max_length=255)
+    tags = models.CharField(max_length=255, blank=True, default='')
+    description = models.TextField(blank=True, default='')
+    content = models.TextField(
+        blank=True,
+        default='',
+        help_text="Extracted document text"
+    )
+    
+    search_vector = SearchVectorField(null=True, blank=True)
+    
+    indexed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Document Search Index'
+        verbose_name_plural = 'Document Search Index'
+        indexes = [
+            models.Index(fields=['is_active', 'is_private']),
+            models.Index(fields=['owner', 'is_active']),
+        ]
+    
+    def __str__(self):
+        return f"Search index: {self.title}"
+
+
 # ==================== SIGNAL HANDLERS ====================
 
 @receiver(post_delete, sender=Document)
 def delete_document_file(sender, instance, **kwargs):
     """
-    Delete file from filesystem when document is deleted
+    Release the document's file when the document is deleted.
+    Shared blobs are only removed from disk at zero references.
     """
     if instance.file:
-        if os.path.isfile(instance.file.path):
-            os.remove(instance.file.path)
\ No newline at end of file
+        instance.file.storage.delete(instance.file.name)
+    
+    from .processing import delete_document_previews
+    delete_document_previews(instance.pk)
+
+
+@receiver(pre_save, sender=Document)
+def remember_previous_document_state(sender, instance, update_fields=None, **kwargs):
+    """
+    Snapshot the stored file, owner, category and size before an update so
+    post_save can release replaced files and adjust storage usage by delta
+    """
+    instance._previous_state = None
+    if not instance.pk:
+        return
+    tracked = {'file', 'uploaded_by', 'category', 'file_size'}
+    if update_fields is not None and not tracked.intersection(update_fields):
+        return
+    instance._previous_state = Document.objects.filter(pk=instance.pk).values(
+        'file', 'uploaded_by_id', 'category_id', 'file_size'
+    ).first()
+
+
+@receiver(post_save, sender=Document)
+def release_replaced_document_file(sender, instance, **kwargs):
+    """Release the reference held by a replaced document file"""
+    previous = getattr(instance, '_previous_state', None)
+    if previous and previous['file'] and previous['file'] != instance.file.name:
+        instance.file.storage.delete(previous['file'])
+
+
+@receiver(post_save, sender=Document)
+def queue_document_processing(sender, instance, created, **kwargs):
+    """Hand new or replaced files to the background processing pipeline"""
+    previous = getattr(instance, '_previous_state', None)
+    file_changed = previous and previous['file'] != instance.file.name
+    
+    if instance.file and (created or file_changed):
+        from .processing import enqueue_document_processing
+        
+        if instance.processing_status != 'pending':
+            Document.objects.filter(pk=instance.pk).update(processing_status='pending')
+            instance.processing_status = 'pending'
+        transaction.on_commit(lambda: enqueue_document_processing(instance.pk))
+
+
+@receiver(post_save, sender=Document)
+def track_document_storage_usage(sender, instance, created, **kwargs):
+    """Adjust per-user/per-category storage usage by the change in this document"""
+    previous = getattr(instance, '_previous_state', None)
+    
+    if created:
+        DocumentStorageUsage.objects.apply_delta(
+            instance.uploaded_by_id, instance.category_id, 1, instance.file_size or 0
+        )
+    elif previous:
+        same_bucket = (
+            previous['uploaded_by_id'] == instance.uploaded_by_id
+            and previous['category_id'] == instance.category_id
+        )
+        if same_bucket:
+            DocumentStorageUsage.objects.apply_delta(
+                instance.uploaded_by_id, instance.category_id,
+                0, (instance.file_size or 0) - (previous['file_size'] or 0)
+            )
+        else:
+            DocumentStorageUsage.objects.apply_delta(
+                previous['uploaded_by_id'], previous['category_id'],
+                -1, -(previous['file_size'] or 0)
+            )
+            DocumentStorageUsage.objects.apply_delta(
+                instance.uploaded_by_id, instance.category_id, 1, instance.file_size or 0
+            )
+    
+    instance._previous_state = None
+
+
+@receiver(post_delete, sender=Document)
+def untrack_document_storage_usage(sender, instance, **kwargs):
+    """Remove a deleted document from storage usage"""
+    DocumentStorageUsage.objects.apply_delta(
+        instance.uploaded_by_id, instance.category_id, -1, -(instance.file_size or 0)
+    )
+
+
+
+@receiver(post_save, sender=Document)
+def update_document_search_index(sender, instance, update_fields=None, **kwargs):
+    """Re-index a document once the saving transaction commits"""
+    from .search import INDEXED_FIELDS, index_document_by_id
+    
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    transaction.on_commit(lambda: index_document_by_id(instance.pk))
+
+
+@receiver(post_delete, sender=Document)
+def remove_document_search_index(sender, instance, **kwargs):
+    """Drop a deleted document from the full-text index"""
+    from .search import remove_document
+    
+    remove_document(instance.pk)
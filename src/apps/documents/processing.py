@@ -0,0 +1,232 @@
+"""
+Document processing pipeline.
+
+Runs outside the upload request (see tasks.process_document_task):
+- detects the real MIME type from file content with python-magic
+- renders preview images at several sizes (images, first PDF page)
+- extracts PDF text for the search index
+Results are recorded on the Document.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from io import BytesIO
+
+import magic
+from PIL import Image
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_ROOT = 'documents/previews'
+
+DEFAULT_PREVIEW_SIZES = {
+    'small': (128, 128),
+    'medium': (320, 320),
+    'large': (1024, 1024),
+}
+
+IMAGE_MIME_TYPES = {'image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/webp', 'image/tiff'}
+PDF_MIME_TYPE = 'application/pdf'
+
+
+class DocumentProcessingError(Exception):
+    """Raised when a document cannot be processed (not worth retrying)"""
+
+
+def get_preview_sizes():
+    return getattr(settings, 'DOCUMENT_PREVIEW_SIZES', DEFAULT_PREVIEW_SIZES)
+
+
+def detect_mime_type(file):
+    """Detect MIME type from the first 2 KB of file content"""
+    file.seek(0)
+    head = file.read(2048)
+    file.seek(0)
+    return magic.from_buffer(head, mime=True)
+
+
+# ============================================================================
+# Preview rendering
+# ============================================================================
+
+def render_previews(image, document_id):
+    """
+    Save JPEG previews of a PIL image at every configured size.
+    Returns {size_name: storage_path}.
+    """
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+
+    previews = {}
+    # Largest first so each smaller preview resamples an already reduced image
+    sizes = sorted(get_preview_sizes().items(), key=lambda item: item[1][0] * item[1][1], reverse=True)
+    working = image
+    for name, size in sizes:
+        working = working.copy()
+        working.thumbnail(size, Image.Resampling.LANCZOS)
+
+        buffer = BytesIO()
+        working.save(buffer, format='JPEG', quality=85, optimize=True)
+        path = f"{PREVIEW_ROOT}/{document_id}/{name}.jpg"
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        previews[name] = default_storage.save(path, ContentFile(buffer.getvalue()))
+
+    return previews
+
+
+def render_pdf_first_page(file):
+    """
+    Rasterize the first page of a PDF.
+
+    Uses poppler's pdftoppm when installed; otherwise falls back to the
+    largest image embedded on the first page (typical for scanned IDs and
+    logbooks). Returns a PIL image or None.
+    """
+    pdftoppm = shutil.which('pdftoppm')
+    if pdftoppm:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'source.pdf')
+            with open(source, 'wb') as out:
+                file.seek(0)
+                for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                    out.write(chunk)
+            subprocess.run(
+                [pdftoppm, '-f', '1', '-l', '1', '-r', '100', '-jpeg', source, os.path.join(tmp, 'page')],
+                check=True, capture_output=True, timeout=60,
+            )
+            pages = sorted(name for name in os.listdir(tmp) if name.startswith('page'))
+            if pages:
+                with Image.open(os.path.join(tmp, pages[0])) as page:
+                    return page.copy()
+        return None
+
+    from pypdf import PdfReader
+
+    file.seek(0)
+    reader = PdfReader(file)
+    if not reader.pages:
+        return None
+    images = list(reader.pages[0].images)
+    if not images:
+        return None
+    largest = max(images, key=lambda img: len(img.data))
+    return Image.open(BytesIO(largest.data))
+
+
+def pdf_page_count(file):
+    from pypdf import PdfReader
+
+    file.seek(0)
+    return len(PdfReader(file).pages)
+
+
+def delete_previews(previews):
+    """Remove preview files from storage"""
+    for path in (previews or {}).values():
+        try:
+            default_storage.delete(path)
+        except OSError:
+            logger.warning("Could not delete preview %s", path)
+
+
+def delete_document_previews(document_id):
+    """Remove every preview rendered for a document"""
+    directory = f"{PREVIEW_ROOT}/{document_id}"
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    delete_previews({name: f"{directory}/{name}" for name in files})
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+def process_document(document):
+    """
+    Detect type, render previews and extract text for a document.
+
+    Raises DocumentProcessingError for unreadable content and lets I/O
+    errors propagate so the task can retry them.
+    """
+    from .utils import extract_pdf_text
+
+    if not document.file:
+        raise DocumentProcessingError('Document has no file')
+
+    with document.file.open('rb') as file:
+        mime_type = detect_mime_type(file)
+        previews = {}
+        page_count = None
+        text = ''
+
+        if mime_type in IMAGE_MIME_TYPES:
+            try:
+                with Image.open(file) as image:
+                    image.load()
+                    previews = render_previews(image, document.pk)
+            except Image.UnidentifiedImageError as e:
+                raise DocumentProcessingError(f'Unreadable image: {e}')
+
+        elif mime_type == PDF_MIME_TYPE:
+            try:
+                page_count = pdf_page_count(file)
+                page = render_pdf_first_page(file)
+            except subprocess.SubprocessError as e:
+                raise DocumentProcessingError(f'PDF rendering failed: {e}')
+            except OSError:
+                raise
+            except Exception as e:
+                raise DocumentProcessingError(f'Unreadable PDF: {e}')
+            if page is not None:
+                previews = render_previews(page, document.pk)
+            text = extract_pdf_text(file)
+
+        elif mime_type.startswith('text/'):
+            file.seek(0)
+            text = file.read(100000).decode('utf-8', errors='ignore')
+
+    stale = {name: path for name, path in (document.previews or {}).items() if path not in previews.values()}
+    delete_previews(stale)
+
+    document.mime_type = mime_type
+    document.page_count = page_count
+    document.previews = previews
+    document.extracted_text = text
+    document.processing_status = 'completed'
+    document.processing_error = ''
+    document.processed_at = timezone.now()
+    document.save(update_fields=[
+        'mime_type', 'page_count', 'previews', 'extracted_text',
+        'processing_status', 'processing_error', 'processed_at',
+    ])
+    return document
+
+
+def mark_processing_failed(document_id, error):
+    from .models import Document
+
+    Document.objects.filter(pk=document_id).update(
+        processing_status='failed',
+        processing_error=str(error)[:2000],
+    )
+
+
+def enqueue_document_processing(document_id):
+    """Queue a document for background processing without blocking the caller"""
+    from .tasks import process_document_task
+
+    try:
+        process_document_task.apply_async(args=[document_id], retry=False)
+    except Exception as e:
+        # Broker unavailable: leave the document pending for the backfill command
+        logger.warning("Could not queue processing for document %s: %s", document_id, e)
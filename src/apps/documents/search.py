@@ -0,0 +1,291 @@
+"""
+Full-text search for the documents app.
+
+PostgreSQL: a weighted tsvector on DocumentSearchIndex.search_vector with a
+GIN index, ranked with ts_rank.
+SQLite (development): an FTS5 table keyed by document id, ranked with bm25().
+Any other backend falls back to icontains matching on the index table.
+
+Access control is applied on the index table's own columns (owner,
+is_private, is_active) before ranking, so it uses the indexes rather than a
+DISTINCT over joined rows.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+SQLITE_FTS_TABLE = 'documents_search_fts'
+
+# Document fields whose change requires re-indexing
+INDEXED_FIELDS = {
+    'title', 'description', 'tags', 'category', 'is_private', 'is_active',
+    'uploaded_by', 'file', 'extracted_text',
+}
+
+# Field weights: title > tags > description > extracted content
+FIELD_WEIGHTS = (('title', 'A'), ('tags', 'B'), ('description', 'C'), ('content', 'D'))
+SQLITE_BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def get_search_config():
+    """Text search configuration used for PostgreSQL vectors and queries"""
+    return getattr(settings, 'DOCUMENT_SEARCH_CONFIG', 'simple')
+
+
+def is_postgres():
+    return connection.vendor == 'postgresql'
+
+
+_sqlite_fts_tables = {}
+
+
+def has_sqlite_fts():
+    """Check (once per database) whether the SQLite FTS5 table exists"""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if not _sqlite_fts_tables.get(name):
+        _sqlite_fts_tables[name] = SQLITE_FTS_TABLE in connection.introspection.table_names()
+    return _sqlite_fts_tables[name]
+
+
+def tokenize_query(query, max_tokens=8):
+    """Split a search query into safe word tokens"""
+    return TOKEN_RE.findall((query or '').lower())[:max_tokens]
+
+
+# ============================================================================
+# Indexing
+# ============================================================================
+
+def build_index_values(document):
+    """Field values stored on a document's DocumentSearchIndex row"""
+    tags = (document.tags or '').replace(',', ' ')
+    return {
+        'owner_id': document.uploaded_by_id,
+        'category_id': document.category_id,
+        'is_private': document.is_private,
+        'is_active': document.is_active,
+        'title': document.title or '',
+        'tags': tags,
+        'description': document.description or '',
+        'content': document.extracted_text or '',
+    }
+
+
+def _update_postgres_vectors(document_ids):
+    from django.contrib.postgres.search import SearchVector
+    from .models import DocumentSearchIndex
+
+    config = get_search_config()
+    vector = None
+    for field, weight in FIELD_WEIGHTS:
+        part = SearchVector(field, weight=weight, config=config)
+        vector = part if vector is None else vector + part
+
+    DocumentSearchIndex.objects.filter(document_id__in=document_ids).update(search_vector=vector)
+
+
+def _write_sqlite_fts(rows):
+    """Replace FTS rows for (document_id, values) pairs"""
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s",
+            [(document_id,) for document_id, _ in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, tags, description, content) "
+            f"VALUES (%s, %s, %s, %s, %s)",
+            [
+                (document_id, values['title'], values['tags'], values['description'], values['content'])
+                for document_id, values in rows
+            ]
+        )
+
+
+def index_documents(documents):
+    """
+    Create or refresh the search rows for a batch of documents.
+    Returns the number of documents indexed.
+    """
+    from .models import DocumentSearchIndex
+
+    rows = [(document.pk, build_index_values(document)) for document in documents]
+    if not rows:
+        return 0
+
+    update_fields = list(rows[0][1].keys())
+    with transaction.atomic():
+        DocumentSearchIndex.objects.bulk_create(
+            [DocumentSearchIndex(document_id=pk, **values) for pk, values in rows],
+            update_conflicts=True,
+            unique_fields=['document'],
+            update_fields=update_fields,
+        )
+        if is_postgres():
+            _update_postgres_vectors([pk for pk, _ in rows])
+        elif has_sqlite_fts():
+            _write_sqlite_fts(rows)
+
+    return len(rows)
+
+
+def index_document_by_id(document_id):
+    """Re-index a single document (no-op if it no longer exists)"""
+    from .models import Document
+
+    document = Document.objects.filter(pk=document_id).first()
+    if document is not None:
+        index_documents([document])
+
+
+def remove_document(document_id):
+    """Remove a document from the SQLite FTS table (index rows cascade)"""
+    if has_sqlite_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s", [document_id])
+
+
+def rebuild_index(batch_size=500):
+    """Index every document in batches. Returns the number indexed."""
+    from .models import Document
+
+    total = 0
+    batch = []
+    for document in Document.objects.order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(document)
+        if len(batch) >= batch_size:
+            total += index_documents(batch)
+            batch = []
+    total += index_documents(batch)
+    return total
+
+
+# ============================================================================
+# Querying
+# ============================================================================
+
+def accessible_index_rows(user=None):
+    """
+    DocumentSearchIndex rows the user may see: active documents that are
+    public, owned by the user, or granted to them via DocumentPermission.
+    Anonymous users only see public documents; None means unrestricted.
+    """
+    from .models import DocumentPermission, DocumentSearchIndex
+
+    rows = DocumentSearchIndex.objects.filter(is_active=True)
+    if user is None or user.is_superuser:
+        return rows
+    if not user.is_authenticated:
+        return rows.filter(is_private=False)
+
+    permitted = DocumentPermission.objects.filter(user=user).filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
+    ).values('document_id')
+
+    return rows.filter(
+        Q(is_private=False) | Q(owner_id=user.pk) | Q(document_id__in=permitted)
+    )
+
+
+def _ordered_by_ids(queryset, ranked_ids):
+    """Restrict a Document queryset to ranked_ids, preserving their order"""
+    if not ranked_ids:
+        return queryset.none()
+    ordering = Case(
+        *[When(pk=pk, then=Value(position)) for position, pk in enumerate(ranked_ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=ranked_ids).annotate(search_rank=ordering).order_by('search_rank')
+
+
+def _search_postgres(tokens, queryset, rows):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+    from django.db.models import F
+
+    # Prefix-match every token so typeahead works on partial words
+    query = SearchQuery(
+        ' & '.join(f'{token}:*' for token in tokens),
+        search_type='raw',
+        config=get_search_config(),
+    )
+    return (
+        queryset.filter(
+            search_index__search_vector=query,
+            pk__in=rows.values('document_id'),
+        )
+        .annotate(search_rank=SearchRank(F('search_index__search_vector'), query))
+        .order_by('-search_rank', '-uploaded_at')
+    )
+
+
+def _search_sqlite_fts(tokens, queryset, rows, limit):
+    match = ' '.join(f'"{token}"*' for token in tokens)
+    access_sql, access_params = rows.values('document_id').query.sql_with_params()
+    weights = ', '.join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+
+    sql = (
+        f"SELECT rowid FROM {SQLITE_FTS_TABLE} "
+        f"WHERE {SQLITE_FTS_TABLE} MATCH %s AND rowid IN ({access_sql}) "
+        f"ORDER BY bm25({SQLITE_FTS_TABLE}, {weights})"
+    )
+    params = [match, *access_params]
+    if limit:
+        sql += " LIMIT %s"
+        params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        ranked_ids = [row[0] for row in cursor.fetchall()]
+
+    return _ordered_by_ids(queryset, ranked_ids)
+
+
+def _search_fallback(tokens, queryset, rows):
+    matched = rows
+    for token in tokens:
+        matched = matched.filter(
+            Q(title__icontains=token) | Q(tags__icontains=token) |
+            Q(description__icontains=token) | Q(content__icontains=token)
+        )
+    return queryset.filter(pk__in=matched.values('document_id')).order_by('-uploaded_at')
+
+
+def search(query, user=None, queryset=None, limit=None):
+    """
+    Ranked full-text search over documents.
+
+    Args:
+        query: Free-text query; every word is prefix-matched
+        user: Restrict to documents this user may access (None = no restriction)
+        queryset: Document queryset to search within (defaults to all documents)
+        limit: Maximum number of results (applied before ranking on SQLite)
+
+    Returns:
+        QuerySet of Document ordered by relevance
+    """
+    from .models import Document
+
+    if queryset is None:
+        queryset = Document.objects.all()
+
+    tokens = tokenize_query(query)
+    if not tokens:
+        return queryset.none()
+
+    rows = accessible_index_rows(user)
+
+    if is_postgres():
+        results = _search_postgres(tokens, queryset, rows)
+    elif has_sqlite_fts():
+        return _search_sqlite_fts(tokens, queryset, rows, limit)
+    else:
+        results = _search_fallback(tokens, queryset, rows)
+
+    return results[:limit] if limit else results
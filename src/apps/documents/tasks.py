@@ -0,0 +1,74 @@
+"""
+Documents App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .models import Document
+from .utils import run_documents_maintenance
+from .processing import DocumentProcessingError, mark_processing_failed, process_document
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# DOCUMENT PROCESSING TASKS
+# ============================================================================
+
+@shared_task(bind=True, max_retries=5, acks_late=True, ignore_result=True)
+def process_document_task(self, document_id):
+    """
+    Detect type, render previews and extract text for a document
+
+    Args:
+        document_id: Document ID
+    """
+    try:
+        document = Document.objects.get(pk=document_id)
+    except Document.DoesNotExist:
+        logger.warning(f"Document {document_id} no longer exists; skipping processing")
+        return {'status': 'missing', 'document_id': document_id}
+
+    Document.objects.filter(pk=document_id).update(processing_status='processing')
+
+    try:
+        process_document(document)
+    except DocumentProcessingError as e:
+        logger.warning(f"Document {document_id} cannot be processed: {e}")
+        mark_processing_failed(document_id, e)
+        return {'status': 'failed', 'document_id': document_id, 'error': str(e)}
+    except Exception as e:
+        # Retry transient failures with exponential backoff (1m, 2m, 4m, ... capped at 1h);
+        # the document stays 'processing' until the last attempt fails
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Error processing document {document_id}, retrying: {e}")
+            raise self.retry(exc=e, countdown=min(60 * 2 ** self.request.retries, 3600))
+        logger.error(f"Error processing document {document_id}: {e}")
+        mark_processing_failed(document_id, e)
+        return {'status': 'failed', 'document_id': document_id, 'error': str(e)}
+
+    return {'status': 'completed', 'document_id': document_id}
+
+
+# ============================================================================
+# MAINTENANCE TASKS
+# ============================================================================
+
+@shared_task
+def documents_maintenance_task():
+    """
+    Expiry digests, expired share removal and archiving in one sweep
+    Scheduled to run daily
+    """
+    report = run_documents_maintenance()
+    
+    logger.info(
+        f"Documents maintenance: {report['digests_sent']} digests for "
+        f"{report['expiring_documents']} expiring documents, "
+        f"{report['shares_deleted']} shares deleted, "
+        f"{report['documents_archived']} documents archived in "
+        f"{report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)"
+    )
+    
+    return {'status': 'completed', **report}
@@ -1,3 +1,179 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from celery.exceptions import Retry
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from config.storage_backends import ContentAddressableMediaStorage
+
+from .models import Document, DocumentBlob, DocumentCategory
+from .processing import DocumentProcessingError
+from .tasks import process_document_task
+from .utils import iter_orphaned_files
+
+
+class DocumentStorageTestMixin:
+    """Point Document.file at a content-addressable storage in a temporary MEDIA_ROOT"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.storage = ContentAddressableMediaStorage()
+        storage_patch = mock.patch.object(Document._meta.get_field('file'), 'storage', self.storage)
+        storage_patch.start()
+        self.addCleanup(storage_patch.stop)
+
+        self.category = DocumentCategory.objects.create(name='Contracts', slug='contracts')
+
+    def upload(self, content, name='contract.pdf'):
+        return Document.objects.create(title=name, category=self.category, file=ContentFile(content, name=name))
+
+    def legacy_document(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(content)
+        return Document.objects.create(title=name, category=self.category, file=name)
+
+
+class ContentAddressableStorageTests(DocumentStorageTestMixin, TestCase):
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self.upload(b'same content', 'a.pdf')
+        second = self.upload(b'same content', 'b.pdf')
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertTrue(self.storage.is_blob_name(first.file.name))
+        self.assertEqual(DocumentBlob.objects.get(name=first.file.name).ref_count, 2)
+
+    def test_deleting_one_of_two_documents_keeps_the_file(self):
+        first = self.upload(b'same content', 'a.pdf')
+        second = self.upload(b'same content', 'b.pdf')
+        name = first.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(DocumentBlob.objects.filter(name=name).exists())
+
+
+class DeduplicateDocumentsCommandTests(DocumentStorageTestMixin, TestCase):
+
+    def test_legacy_files_are_collapsed_into_one_blob(self):
+        first = self.legacy_document('documents/2023/a.pdf', b'scanned logbook')
+        second = self.legacy_document('documents/2023/b.pdf', b'scanned logbook')
+        copy = Document.objects.create(title='copy', category=self.category, file='documents/2023/a.pdf')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('deduplicate_documents', stdout=StringIO())
+
+        names = set(Document.objects.filter(pk__in=[first.pk, second.pk, copy.pk]).values_list('file', flat=True))
+        self.assertEqual(len(names), 1)
+        blob_name = names.pop()
+        self.assertTrue(self.storage.exists(blob_name))
+        self.assertEqual(DocumentBlob.objects.get(name=blob_name).ref_count, 3)
+        self.assertFalse(self.storage.exists('documents/2023/a.pdf'))
+        self.assertFalse(self.storage.exists('documents/2023/b.pdf'))
+
+    def test_failed_repoint_keeps_the_legacy_file(self):
+        document = self.legacy_document('documents/2023/a.pdf', b'scanned logbook')
+
+        with mock.patch.object(DocumentBlob.objects, 'select_for_update', side_effect=DatabaseError):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(DatabaseError):
+                    call_command('deduplicate_documents', stdout=StringIO())
+
+        document.refresh_from_db()
+        self.assertEqual(document.file.name, 'documents/2023/a.pdf')
+        self.assertTrue(self.storage.exists('documents/2023/a.pdf'))
+
+
+class OrphanedFileScanTests(DocumentStorageTestMixin, TestCase):
+
+    def write_file(self, name, age):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(b'orphan')
+        modified = time.time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    def test_recent_files_are_not_orphans_yet(self):
+        self.write_file('cas/aa/bb/old.pdf', age=2 * 3600)
+        self.write_file('cas/aa/bb/new.pdf', age=60)
+        referenced = self.upload(b'kept')
+        os.utime(self.storage.path(referenced.file.name), (0, 0))
+
+        self.assertEqual(list(iter_orphaned_files()), ['cas/aa/bb/old.pdf'])
+
+    def test_reuploading_a_blob_restarts_its_grace_period(self):
+        name = self.upload(b'shared').file.name
+        os.utime(self.storage.path(name), (0, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            Document.objects.filter(file=name).delete()
+        self.write_file(name, age=2 * 3600)
+        self.assertEqual(list(iter_orphaned_files()), [name])
+
+        # An upload in flight whose Document row has not committed yet
+        self.storage.save('again.pdf', ContentFile(b'shared'))
+        self.assertEqual(list(iter_orphaned_files()), [])
+
+
+@mock.patch('apps.documents.tasks.process_document')
+class ProcessDocumentTaskTests(TestCase):
+
+    def setUp(self):
+        category = DocumentCategory.objects.create(name='Contracts', slug='contracts')
+        self.document = Document.objects.create(
+            title='Contract', category=category, file='documents/contract.pdf', file_size=1, file_type='.pdf'
+        )
+
+    def status(self):
+        self.document.refresh_from_db()
+        return self.document.processing_status
+
+    def test_transient_error_with_retries_left_stays_processing(self, process_document):
+        process_document.side_effect = OSError('storage unavailable')
+
+        with mock.patch.object(process_document_task, 'retry', side_effect=Retry()) as retry:
+            process_document_task.apply(args=[self.document.pk], retries=2)
+
+        retry.assert_called_once()
+        self.assertEqual(self.status(), 'processing')
+        self.assertFalse(self.document.processing_error)
+
+    def test_transient_error_on_last_attempt_fails(self, process_document):
+        process_document.side_effect = OSError('storage unavailable')
+
+        result = process_document_task.apply(args=[self.document.pk], retries=process_document_task.max_retries)
+
+        self.assertEqual(result.get()['status'], 'failed')
+        self.assertEqual(self.status(), 'failed')
+        self.assertEqual(self.document.processing_error, 'storage unavailable')
+
+    def test_unprocessable_document_fails_without_retrying(self, process_document):
+        process_document.side_effect = DocumentProcessingError('Unreadable image')
+
+        with mock.patch.object(process_document_task, 'retry') as retry:
+            process_document_task.apply(args=[self.document.pk])
+
+        retry.assert_not_called()
+        self.assertEqual(self.status(), 'failed')
@@ -4,6 +4,8 @@ Handles file operations, validation, processing, and document-related tasks.
 """
 
 import os
+import logging
+import time
 import mimetypes
 import hashlib
 from pathlib import Path
@@ -14,9 +16,11 @@ from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
 from django.core.mail import send_mail
 
+logger = logging.getLogger(__name__)
 
 # ============================================================================
 # File Handling Utilities
@@ -149,26 +153,47 @@ def generate_thumbnail(image_file, size=(300, 300)):
         
         return ContentFile(thumb_io.read())
     except Exception as e:
-        print(f"Error generating thumbnail: {e}")
+        logger.warning(f"Error generating thumbnail: {e}")
         return None
 
 
 def process_document_image(document):
     """
-    Process image document to generate thumbnail.
+    Queue a document for preview generation.
+    Previews are rendered in the background (see apps.documents.processing).
     """
-    if document.file and is_image_file(document.file.name):
+    from .processing import enqueue_document_processing
+    
+    if document.file:
+        enqueue_document_processing(document.pk)
+
+
+def extract_pdf_text(file, max_pages=50, max_chars=100000):
+    """
+    Extract plain text from the first pages of a PDF for search indexing.
+    Returns an empty string if the file cannot be parsed.
+    """
+    from pypdf import PdfReader
+    
+    try:
+        file.seek(0)
+        reader = PdfReader(file)
+        parts = []
+        length = 0
+        for page in reader.pages[:max_pages]:
+            text = page.extract_text() or ''
+            parts.append(text)
+            length += len(text)
+            if length >= max_chars:
+                break
+        return '\n'.join(parts)[:max_chars]
+    except Exception:
+        return ''
+    finally:
         try:
-            thumbnail = generate_thumbnail(document.file)
-            if thumbnail:
-                # Save thumbnail with same name but in thumbnails directory
-                filename = os.path.basename(document.file.name)
-                thumb_path = f"documents/thumbnails/{filename}"
-                default_storage.save(thumb_path, thumbnail)
-                return thumb_path
-        except Exception as e:
-            print(f"Error processing document image: {e}")
-    return None
+            file.seek(0)
+        except Exception:
+            pass
 
 
 # ============================================================================
@@ -237,26 +262,14 @@ def check_duplicate_document(file, user=None):
 def search_documents(query, user=None, filters=None):
     """
     Search documents with advanced filtering.
+    Results are ranked by relevance when a query is given.
     """
     from .models import Document
+    from .search import accessible_index_rows, search
     
     # Base queryset
     documents = Document.objects.all()
     
-    # Apply user access filter
-    if user:
-        documents = documents.filter(
-            Q(uploaded_by=user) | Q(is_public=True) | Q(shared_with=user)
-        ).distinct()
-    
-    # Apply search query
-    if query:
-        documents = documents.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()
-    
     # Apply additional filters
     if filters:
         if 'category' in filters and filters['category']:
@@ -271,8 +284,16 @@ def search_documents(query, user=None, filters=None):
         if 'date_to' in filters and filters['date_to']:
             documents = documents.filter(uploaded_at__lte=filters['date_to'])
         
-        if 'is_archived' in filters:
-            documents = documents.filter(is_archived=filters['is_archived'])
+        if 'is_active' in filters:
+            documents = documents.filter(is_active=filters['is_active'])
+    
+    # Apply search query (access filter is applied inside the index)
+    if query:
+        return search(query, user=user, queryset=documents)
+    
+    # Apply user access filter
+    if user:
+        documents = documents.filter(pk__in=accessible_index_rows(user).values('document_id'))
     
     return documents
 
@@ -330,61 +351,264 @@ def get_expired_shares():
     )
 
 
-def cleanup_expired_shares():
+def cleanup_expired_shares(batch_size=1000):
     """
-    Delete expired document shares.
+    Delete expired document shares in batches.
+    Each batch is removed with a single raw DELETE (no per-row signals) and
+    recorded with one bulk insert into the audit log.
     Returns count of deleted shares.
     """
-    expired_shares = get_expired_shares()
-    count = expired_shares.count()
-    expired_shares.delete()
-    return count
+    from apps.audit.models import AuditLog
+    from .models import DocumentShare
+    
+    now = timezone.now()
+    deleted = 0
+    last_id = 0
+    
+    while True:
+        batch = list(
+            DocumentShare.objects.filter(
+                expires_at__isnull=False,
+                expires_at__lt=now,
+                pk__gt=last_id,
+            )
+            .order_by('pk')
+            .values('pk', 'document_id', 'document__title', 'created_by_id', 'share_token')[:batch_size]
+        )
+        if not batch:
+            break
+        
+        ids = [row['pk'] for row in batch]
+        last_id = ids[-1]
+        
+        with transaction.atomic():
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    user_id=row['created_by_id'],
+                    action='delete',
+                    model_name='DocumentShare',
+                    object_id=str(row['pk']),
+                    description=f"Expired share link removed for document: {row['document__title']}",
+                    additional_data={
+                        'document_id': row['document_id'],
+                        'share_token': row['share_token'][:8],
+                        'reason': 'expired',
+                    },
+                )
+                for row in batch
+            ])
+            share_qs = DocumentShare.objects.filter(pk__in=ids)
+            deleted += share_qs._raw_delete(share_qs.db)
+    
+    return deleted
 
 
-def archive_expired_documents():
+def archive_expired_documents(batch_size=1000):
     """
-    Archive documents that have passed their expiry date.
+    Archive documents that have passed their expiry date, in pk batches.
     Returns count of archived documents.
     """
-    expired_docs = get_expired_documents().filter(is_archived=False)
-    count = expired_docs.update(
-        is_archived=True,
-        archived_at=timezone.now()
-    )
-    return count
+    from .models import Document
+    
+    today = timezone.now().date()
+    now = timezone.now()
+    archived = 0
+    
+    while True:
+        ids = list(
+            Document.objects.filter(
+                is_archived=False,
+                expiry_date__isnull=False,
+                expiry_date__lt=today,
+            )
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        archived += Document.objects.filter(pk__in=ids).update(is_archived=True, archived_at=now)
+    
+    return archived
 
 
-def cleanup_orphaned_files():
+def run_documents_maintenance(reminder_days=(30, 7, 1), batch_size=1000):
     """
-    Find and optionally delete files that don't have associated database records.
+    Single scheduled sweep over documents: expiry digests, expired share
+    removal and archiving of expired documents.
+
+    Returns:
+        dict: Counts per phase, elapsed seconds and rows/second throughput
+    """
+    import time
+    
+    started = time.monotonic()
+    report = {}
+    
+    phase_start = time.monotonic()
+    by_owner = get_expiring_documents_by_owner(reminder_days, batch_size=batch_size)
+    report['expiring_documents'] = sum(len(documents) for documents in by_owner.values())
+    report['digests_sent'] = send_expiry_digests(by_owner)
+    report['expiry_seconds'] = round(time.monotonic() - phase_start, 3)
+    
+    phase_start = time.monotonic()
+    report['shares_deleted'] = cleanup_expired_shares(batch_size=batch_size)
+    report['shares_seconds'] = round(time.monotonic() - phase_start, 3)
+    
+    phase_start = time.monotonic()
+    report['documents_archived'] = archive_expired_documents(batch_size=batch_size)
+    report['archive_seconds'] = round(time.monotonic() - phase_start, 3)
+    
+    elapsed = time.monotonic() - started
+    rows = report['expiring_documents'] + report['shares_deleted'] + report['documents_archived']
+    report['elapsed_seconds'] = round(elapsed, 3)
+    report['rows_per_second'] = round(rows / elapsed, 1) if elapsed else 0
+    
+    return report
+
+
+def _iter_sorted_storage_files(root, relative_to):
     """
-    from .models import Document, DocumentVersion
+    Yield paths of files under root relative to relative_to, in plain
+    code-point order, without materialising the directory tree.
+
+    Directories sort as "name/" so a depth-first walk yields paths in the
+    same order as sorting the full path strings.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(
+                it,
+                key=lambda e: e.name + '/' if e.is_dir(follow_symlinks=False) else e.name
+            )
+    except FileNotFoundError:
+        return
     
-    # Get all document files from database
-    db_files = set()
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_sorted_storage_files(entry.path, relative_to)
+        elif entry.is_file(follow_symlinks=False):
+            yield os.path.relpath(entry.path, relative_to).replace(os.sep, '/')
+
+
+def _iter_sorted_db_files(prefix, chunk_size=2000):
+    """
+    Yield distinct file names stored on Document rows under prefix, sorted
+    with a binary collation so the order matches _iter_sorted_storage_files.
+    """
+    from django.db import connection
+    from django.db.models.functions import Collate
+    from .models import Document
     
-    for doc in Document.objects.all():
-        if doc.file:
-            db_files.add(doc.file.name)
+    collation = 'C' if connection.vendor == 'postgresql' else 'BINARY'
+    names = (
+        Document.objects.filter(file__startswith=prefix)
+        .annotate(sort_name=Collate('file', collation))
+        .order_by('sort_name')
+        .values_list('file', flat=True)
+        .iterator(chunk_size=chunk_size)
+    )
     
-    for version in DocumentVersion.objects.all():
-        if version.file:
-            db_files.add(version.file.name)
+    previous = None
+    for name in names:
+        if name != previous:
+            yield name
+            previous = name
+
+
+# Files modified more recently than this are never reported as orphans: an
+# upload writes its file before the Document row referencing it commits
+ORPHAN_MIN_AGE = timedelta(hours=1)
+
+
+def iter_orphaned_files(roots=('cas', 'documents'), exclude=('documents/previews/', 'documents/thumbnails/'),
+                        min_age=ORPHAN_MIN_AGE):
+    """
+    Stream storage paths that no Document references.
+
+    Each root is scanned as a merge-join of the sorted document file names
+    against a sorted directory walk, so memory stays constant regardless of
+    library size. Generated previews, and the thumbnails written before
+    previews replaced them, are not document files and are skipped, as are
+    files modified within min_age.
+    """
+    media_root = str(settings.MEDIA_ROOT)
+    cutoff = time.time() - min_age.total_seconds()
     
-    # Get all files from storage
-    documents_dir = os.path.join(settings.MEDIA_ROOT, 'documents')
-    orphaned_files = []
+    for root in roots:
+        db_names = _iter_sorted_db_files(f"{root}/")
+        db_name = next(db_names, None)
+        
+        for path in _iter_sorted_storage_files(os.path.join(media_root, root), media_root):
+            while db_name is not None and db_name < path:
+                db_name = next(db_names, None)
+            
+            if path == db_name:
+                continue
+            if any(path.startswith(prefix) for prefix in exclude):
+                continue
+            try:
+                if os.path.getmtime(os.path.join(media_root, path)) > cutoff:
+                    continue
+            except OSError:
+                continue
+            
+            yield path
+
+
+def cleanup_orphaned_files(delete=False, max_deletes=None, deletes_per_second=None, report_limit=100,
+                           min_age=ORPHAN_MIN_AGE):
+    """
+    Find and optionally delete files that don't have associated database records.
+
+    Args:
+        delete: Remove orphaned files (dry-run report when False)
+        max_deletes: Stop deleting after this many files
+        deletes_per_second: Throttle deletes to spare the disk
+        report_limit: Maximum number of orphan paths listed in the report
+        min_age: Skip files modified more recently (uploads still committing)
+
+    Returns:
+        dict: Report with orphan count/bytes, deletions and sample paths
+    """
+    from .models import DocumentBlob
+    
+    report = {
+        'orphaned_count': 0,
+        'orphaned_bytes': 0,
+        'deleted_count': 0,
+        'deleted_bytes': 0,
+        'files': [],
+        'dry_run': not delete,
+    }
+    interval = 1.0 / deletes_per_second if deletes_per_second else 0
     
-    if os.path.exists(documents_dir):
-        for root, dirs, files in os.walk(documents_dir):
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                relative_path = os.path.relpath(file_path, settings.MEDIA_ROOT)
-                
-                if relative_path not in db_files:
-                    orphaned_files.append(relative_path)
+    for path in iter_orphaned_files(min_age=min_age):
+        full_path = os.path.join(settings.MEDIA_ROOT, path)
+        try:
+            size = os.path.getsize(full_path)
+        except OSError:
+            continue
+        
+        report['orphaned_count'] += 1
+        report['orphaned_bytes'] += size
+        if len(report['files']) < report_limit:
+            report['files'].append(path)
+        
+        if not delete or (max_deletes is not None and report['deleted_count'] >= max_deletes):
+            continue
+        
+        try:
+            os.remove(full_path)
+        except OSError:
+            continue
+        DocumentBlob.objects.filter(name=path).delete()
+        report['deleted_count'] += 1
+        report['deleted_bytes'] += size
+        
+        if interval:
+            time.sleep(interval)
     
-    return orphaned_files
+    return report
 
 
 # ============================================================================
@@ -434,22 +658,32 @@ def get_document_stats(user=None):
 
 def get_user_storage_usage(user):
     """
-    Calculate total storage used by a user's documents.
+    Get total storage used by a user's documents from the usage table.
     """
-    from .models import Document
-    from django.db.models import Sum
+    from .models import DocumentStorageUsage
     
-    total_size = Document.objects.filter(
-        uploaded_by=user
-    ).aggregate(Sum('file_size'))['file_size__sum'] or 0
+    usage = DocumentStorageUsage.objects.for_user(user)
     
     return {
-        'total_bytes': total_size,
-        'total_formatted': format_file_size(total_size),
-        'document_count': Document.objects.filter(uploaded_by=user).count(),
+        'total_bytes': usage['total_bytes'],
+        'total_formatted': format_file_size(usage['total_bytes']),
+        'document_count': usage['document_count'],
     }
 
 
+def check_storage_quota(user, additional_bytes=0):
+    """
+    Check whether a user can store additional_bytes more without exceeding
+    DOCUMENT_STORAGE_QUOTA_MB (0 disables the quota).
+    """
+    quota_mb = getattr(settings, 'DOCUMENT_STORAGE_QUOTA_MB', 0)
+    if not quota_mb or user is None:
+        return True
+    
+    usage = get_user_storage_usage(user)
+    return usage['total_bytes'] + additional_bytes <= quota_mb * 1024 * 1024
+
+
 def get_popular_documents(limit=10, days=30):
     """
     Get most downloaded documents within specified time period.
@@ -526,42 +760,84 @@ def notify_document_comment(comment):
         )
 
 
-def notify_document_expiring(days_before=7):
+def get_expiring_documents_by_owner(days_before=7, batch_size=1000):
     """
-    Send notifications for documents expiring soon.
-    Returns count of notifications sent.
+    Collect documents expiring in days_before days (an int or a sequence
+    of reminder windows), grouped by owner id.
+    Documents are read in pk batches from the (is_archived, expiry_date) index.
     """
     from .models import Document
     
-    expiry_date = timezone.now().date() + timedelta(days=days_before)
+    if isinstance(days_before, int):
+        days_before = [days_before]
+    today = timezone.now().date()
+    expiry_dates = [today + timedelta(days=days) for days in days_before]
+    
+    by_owner = {}
+    last_id = 0
+    
+    while True:
+        batch = list(
+            Document.objects.filter(
+                is_archived=False,
+                is_active=True,
+                expiry_date__in=expiry_dates,
+                uploaded_by__isnull=False,
+                pk__gt=last_id,
+            )
+            .order_by('pk')
+            .values('pk', 'title', 'expiry_date', 'uploaded_by_id')[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1]['pk']
+        for row in batch:
+            by_owner.setdefault(row['uploaded_by_id'], []).append(row)
     
-    expiring_docs = Document.objects.filter(
-        expiry_date=expiry_date,
-        is_archived=False
-    ).select_related('uploaded_by')
+    return by_owner
+
+
+def send_expiry_digests(by_owner):
+    """
+    Send one digest notification per owner listing their expiring documents.
+    Returns count of notifications sent.
+    """
+    from apps.notifications.utils import create_notification
+    from django.contrib.auth import get_user_model
     
+    owners = get_user_model().objects.in_bulk(list(by_owner))
     count = 0
-    for doc in expiring_docs:
-        if doc.uploaded_by.email:
-            subject = f"Document expiring soon: {doc.title}"
-            message = f"""
-            Your document "{doc.title}" will expire on {doc.expiry_date}.
-            
-            Please review and take necessary action.
-            """
-            
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [doc.uploaded_by.email],
-                fail_silently=True,
-            )
+    
+    for owner_id, documents in by_owner.items():
+        owner = owners.get(owner_id)
+        if owner is None:
+            continue
+        
+        documents.sort(key=lambda row: row['expiry_date'])
+        lines = [f"- {row['title']} (expires {row['expiry_date']})" for row in documents]
+        notification = create_notification(
+            user=owner,
+            title=f"{len(documents)} document(s) expiring soon",
+            message="The following documents are about to expire:\n" + "\n".join(lines),
+            notification_type='document',
+            priority='medium',
+            group_key='documents_expiry_digest',
+            metadata={'document_ids': [row['pk'] for row in documents]},
+        )
+        if notification:
             count += 1
     
     return count
 
 
+def notify_document_expiring(days_before=7):
+    """
+    Send digest notifications for documents expiring soon.
+    Returns count of notifications sent.
+    """
+    return send_expiry_digests(get_expiring_documents_by_owner(days_before))
+
+
 # ============================================================================
 # Export and Backup Utilities
 # ============================================================================
@@ -12,6 +12,7 @@ from django.core.paginator import Paginator
 from django.utils import timezone
 
 from .models import Document, DocumentCategory, DocumentShare
+from . import search as document_search
 from .forms import DocumentForm, DocumentCategoryForm, DocumentShareForm, DocumentSearchForm, BulkDocumentActionForm
 from apps.audit.utils import log_audit
 
@@ -28,13 +29,6 @@ def document_list(request):
     
     # Apply search filters
     if form.is_valid():
-        query = form.cleaned_data.get('query')
-        if query:
-            documents = documents.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query)
-            )
-        
         category = form.cleaned_data.get('category')
         if category:
             documents = documents.filter(category=category)
@@ -42,6 +36,10 @@ def document_list(request):
         uploaded_by = form.cleaned_data.get('uploaded_by')
         if uploaded_by:
             documents = documents.filter(uploaded_by=uploaded_by)
+        
+        query = form.cleaned_data.get('query')
+        if query:
+            documents = document_search.search(query, user=request.user, queryset=documents)
     
     # Pagination
     paginator = Paginator(documents, 20)
@@ -250,10 +248,12 @@ def ajax_search_documents(request):
     documents = []
     
     if query and len(query) >= 2:
-        docs = Document.objects.filter(
-            Q(title__icontains=query) | Q(description__icontains=query),
-            is_active=True
-        ).select_related('category')[:10]
+        docs = document_search.search(
+            query,
+            user=request.user,
+            queryset=Document.objects.filter(is_active=True).select_related('category'),
+            limit=10,
+        )
         
         documents = [{
             'id': doc.pk,
@@ -12,8 +12,10 @@ from decimal import Decimal
 
 from .models import (
     Expense, ExpenseCategory, ExpenseReceipt, ExpenseReport,
-    ExpenseReportItem, ExpenseTag, RecurringExpense, ExpenseApprovalWorkflow
+    ExpenseReportItem, ExpenseTag, RecurringExpense, ExpenseApprovalWorkflow,
+    CategoryBudgetLedger
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class ExpenseReceiptInline(admin.TabularInline):
@@ -37,7 +39,7 @@ class ExpenseApprovalWorkflowInline(admin.TabularInline):
 
 
 @admin.register(Expense)
-class ExpenseAdmin(admin.ModelAdmin):
+class ExpenseAdmin(PerformanceModelAdmin):
     """Admin interface for expenses."""
     
     list_display = (
@@ -242,7 +244,7 @@ class ExpenseAdmin(admin.ModelAdmin):
                 expense.tax_amount,
                 expense.total_amount,
                 expense.get_status_display(),
-                expense.submitted_by.username,
+                expense.submitted_by.email,
                 expense.expense_date.strftime('%Y-%m-%d'),
                 expense.get_payment_method_display(),
                 expense.vendor_name,
@@ -255,7 +257,7 @@ class ExpenseAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExpenseCategory)
-class ExpenseCategoryAdmin(admin.ModelAdmin):
+class ExpenseCategoryAdmin(PerformanceModelAdmin):
     """Admin interface for expense categories."""
     
     list_display = (
@@ -323,7 +325,7 @@ class ExpenseCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExpenseReceipt)
-class ExpenseReceiptAdmin(admin.ModelAdmin):
+class ExpenseReceiptAdmin(PerformanceModelAdmin):
     """Admin interface for expense receipts."""
     
     list_display = (
@@ -371,7 +373,7 @@ class ExpenseReceiptAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExpenseReport)
-class ExpenseReportAdmin(admin.ModelAdmin):
+class ExpenseReportAdmin(PerformanceModelAdmin):
     """Admin interface for expense reports."""
     
     list_display = (
@@ -447,7 +449,7 @@ class ExpenseReportAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExpenseTag)
-class ExpenseTagAdmin(admin.ModelAdmin):
+class ExpenseTagAdmin(PerformanceModelAdmin):
     """Admin interface for expense tags."""
     
     list_display = ('name', 'color_display', 'usage_count', 'created_at')
@@ -488,19 +490,22 @@ class ExpenseTagAdmin(admin.ModelAdmin):
 
 
 @admin.register(RecurringExpense)
-class RecurringExpenseAdmin(admin.ModelAdmin):
+class RecurringExpenseAdmin(PerformanceModelAdmin):
     """Admin interface for recurring expenses."""
     
     list_display = (
         'title', 'category', 'amount', 'frequency', 
-        'start_date', 'end_date', 'is_active', 'last_generated'
+        'start_date', 'end_date', 'is_active', 'next_due_date', 'last_generated'
     )
     
     list_filter = ('is_active', 'frequency', 'category', 'start_date')
     
     search_fields = ('title', 'description', 'vendor_name')
     
-    readonly_fields = ('submitted_by', 'last_generated', 'created_at', 'updated_at')
+    readonly_fields = (
+        'submitted_by', 'last_generated', 'occurrences_generated', 'next_due_date',
+        'created_at', 'updated_at'
+    )
     
     fieldsets = (
         ('Basic Information', {
@@ -513,7 +518,10 @@ class RecurringExpenseAdmin(admin.ModelAdmin):
             'fields': ('frequency', 'start_date', 'end_date', 'is_active')
         }),
         ('Tracking', {
-            'fields': ('submitted_by', 'last_generated', 'created_at', 'updated_at'),
+            'fields': (
+                'submitted_by', 'next_due_date', 'occurrences_generated', 'last_generated',
+                'created_at', 'updated_at'
+            ),
             'classes': ('collapse',)
         }),
     )
@@ -541,7 +549,7 @@ class RecurringExpenseAdmin(admin.ModelAdmin):
 
 
 @admin.register(ExpenseApprovalWorkflow)
-class ExpenseApprovalWorkflowAdmin(admin.ModelAdmin):
+class ExpenseApprovalWorkflowAdmin(PerformanceModelAdmin):
     """Admin interface for approval workflow."""
     
     list_display = (
@@ -601,7 +609,7 @@ class ExpenseApprovalWorkflowAdmin(admin.ModelAdmin):
 
 # Register inline model (if needed)
 @admin.register(ExpenseReportItem)
-class ExpenseReportItemAdmin(admin.ModelAdmin):
+class ExpenseReportItemAdmin(PerformanceModelAdmin):
     """Admin interface for report items."""
     
     list_display = ('report_link', 'expense_link', 'added_at')
@@ -629,4 +637,31 @@ class ExpenseReportItemAdmin(admin.ModelAdmin):
         """Display expense as clickable link."""
         url = reverse('admin:expenses_expense_change', args=[obj.expense.pk])
         return format_html('<a href="{}">{}</a>', url, obj.expense.title)
-    expense_link.short_description = 'Expense'
\ No newline at end of file
+    expense_link.short_description = 'Expense'
+
+
+@admin.register(CategoryBudgetLedger)
+class CategoryBudgetLedgerAdmin(PerformanceModelAdmin):
+    """Read-only admin for the category budget ledger."""
+    
+    list_display = (
+        'category', 'month', 'pending_amount', 'pending_count',
+        'spent_amount', 'spent_count', 'alert_level', 'updated_at'
+    )
+    
+    list_filter = ('month', 'alert_level')
+    
+    search_fields = ('category__name', 'category__code')
+    
+    date_hierarchy = 'month'
+    
+    def get_queryset(self, request):
+        """Optimize queryset."""
+        qs = super().get_queryset(request)
+        return qs.select_related('category')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
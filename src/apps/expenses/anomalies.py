@@ -0,0 +1,318 @@
+"""
+Population-wide expense anomaly detection.
+
+One query loads (expense, user, category, amount, date, title) for a window
+into a pandas DataFrame. Every expense is then scored in vectorized passes:
+- robust z-scores of log amounts against the submitter's and the
+  category's median/MAD
+- a rolling z-score against the submitter's previous expenses
+- likely duplicates: same submitter and amount within a few days and a
+  similar title (or the same vendor invoice number)
+
+run_expense_anomaly_scan() runs nightly (see tasks.py) and stores the
+flagged expenses as an ExpenseAnomalyScan row, so every web process sees
+the worker's result; get_latest_anomalies() reads the newest one back.
+"""
+
+import difflib
+import logging
+import re
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Scans kept for history; older ones are deleted after each run
+ANOMALY_SCANS_KEPT = 7
+
+# Expenses that count as real spend for baselines
+SCANNED_STATUSES = ('SUBMITTED', 'APPROVED', 'PAID')
+
+# Consistency constants for normal data: MAD / 0.6745 and 1.2533 * mean
+# absolute deviation both estimate the standard deviation
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.253314
+
+FRAME_COLUMNS = [
+    'id', 'user_id', 'category_id', 'amount', 'expense_date',
+    'title', 'vendor_name', 'invoice_number',
+]
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+def load_expense_frame(start_date, end_date, statuses=SCANNED_STATUSES):
+    """
+    Load the expenses in a date window as a DataFrame with FRAME_COLUMNS.
+    Amounts are cast to float in SQL so no Decimal objects are built.
+    """
+    from .models import Expense
+
+    rows = (
+        Expense.objects.filter(
+            status__in=statuses,
+            expense_date__gte=start_date,
+            expense_date__lte=end_date,
+        )
+        .annotate(amount_float=Cast('total_amount', FloatField()))
+        .values_list(
+            'id', 'submitted_by_id', 'category_id', 'amount_float', 'expense_date',
+            'title', 'vendor_name', 'invoice_number',
+        )
+        .order_by()
+    )
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=20000), columns=FRAME_COLUMNS)
+    frame['expense_date'] = pd.to_datetime(frame['expense_date'])
+    frame['amount'] = frame['amount'].astype(np.float64)
+    return frame
+
+
+# ============================================================================
+# Scoring
+# ============================================================================
+
+def robust_zscores(values, keys, min_history=5):
+    """
+    Modified z-score of each value against the median and MAD of its group.
+
+    Groups whose MAD is zero fall back to the mean absolute deviation; groups
+    smaller than min_history score NaN.
+    """
+    median = values.groupby(keys).transform('median')
+    deviation = (values - median).abs()
+    mad = deviation.groupby(keys).transform('median')
+    mean_ad = deviation.groupby(keys).transform('mean')
+    size = values.groupby(keys).transform('size')
+
+    scale = np.where(mad > 0, mad / MAD_SCALE, mean_ad * MEAN_AD_SCALE)
+    z = np.divide(
+        (values - median).to_numpy(), scale,
+        out=np.zeros(len(values)), where=scale > 0,
+    )
+    z[size.to_numpy() < min_history] = np.nan
+    return pd.Series(z, index=values.index)
+
+
+def rolling_zscores(values, frame, window=30, min_periods=5):
+    """
+    z-score of each value against the mean and standard deviation of the
+    same submitter's previous `window` expenses (NaN with too little history).
+    """
+    ordered = frame[['user_id', 'expense_date', 'id']].assign(value=values)
+    ordered = ordered.sort_values(['user_id', 'expense_date', 'id'])
+    prior = ordered.groupby('user_id', sort=False)['value'].shift()
+    rolling = prior.groupby(ordered['user_id'], sort=False).rolling(window, min_periods=min_periods)
+
+    mean = rolling.mean().droplevel(0)
+    std = rolling.std().droplevel(0)
+    z = ((ordered['value'] - mean) / std).where(std > 0)
+    return z.reindex(values.index)
+
+
+def find_outliers(frame, threshold=3.5, rolling_threshold=3.0, min_history=5, window=30):
+    """
+    Score every expense and return the unusually high ones.
+
+    Amounts are compared on a log scale, since expense amounts are heavily
+    right-skewed. An expense is flagged when it is far above the submitter's
+    own baseline (or the category's, while the submitter has fewer than
+    min_history expenses) and, where there is enough history, also above
+    the submitter's recent rolling baseline.
+
+    Returns:
+        DataFrame of flagged rows with user_z, category_z, rolling_z and
+        score (the baseline z-score used), highest score first
+    """
+    log_amount = np.log1p(frame['amount'].clip(lower=0))
+    scores = pd.DataFrame({
+        'user_z': robust_zscores(log_amount, frame['user_id'], min_history),
+        'category_z': robust_zscores(log_amount, frame['category_id'], min_history),
+        'rolling_z': rolling_zscores(log_amount, frame, window, min_history),
+    }, index=frame.index)
+    scores['score'] = scores['user_z'].fillna(scores['category_z'])
+
+    flagged = (scores['score'] > threshold) & (
+        scores['rolling_z'].isna() | (scores['rolling_z'] > rolling_threshold)
+    )
+    result = frame.loc[flagged, ['id', 'user_id', 'category_id', 'amount', 'expense_date', 'title']]
+    return result.join(scores[flagged]).sort_values('score', ascending=False)
+
+
+def _normalise_title(title):
+    return _NON_WORD.sub(' ', (title or '').lower()).strip()
+
+
+def title_similarity(first, second):
+    """Similarity ratio (0-1) of two expense titles, ignoring case and punctuation."""
+    first, second = _normalise_title(first), _normalise_title(second)
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    return difflib.SequenceMatcher(None, first, second).ratio()
+
+
+def find_duplicates(frame, max_days=3, min_similarity=0.8, max_neighbours=5):
+    """
+    Pair expenses from the same submitter with the same amount within
+    max_days of each other and a similar title or the same invoice number.
+
+    Candidates come from comparing each row with its next max_neighbours rows
+    after sorting by (submitter, amount, date); only those few pairs get the
+    string comparison.
+
+    Returns:
+        DataFrame with expense_id, duplicate_of (the earlier expense),
+        days_apart and similarity
+    """
+    columns = ['expense_id', 'duplicate_of', 'days_apart', 'similarity']
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+
+    ordered = frame.assign(cents=np.rint(frame['amount'].to_numpy() * 100).astype(np.int64))
+    ordered = ordered.sort_values(['user_id', 'cents', 'expense_date', 'id']).reset_index(drop=True)
+
+    candidates = []
+    for lag in range(1, max_neighbours + 1):
+        previous = ordered.shift(lag)
+        days_apart = (ordered['expense_date'] - previous['expense_date']).dt.days
+        match = (
+            (ordered['user_id'] == previous['user_id'])
+            & (ordered['cents'] == previous['cents'])
+            & (days_apart <= max_days)
+        )
+        if not match.any():
+            break
+        candidates.append(pd.DataFrame({
+            'expense_id': ordered.loc[match, 'id'],
+            'duplicate_of': previous.loc[match, 'id'].astype(np.int64),
+            'days_apart': days_apart[match].astype(np.int64),
+            'title': ordered.loc[match, 'title'],
+            'other_title': previous.loc[match, 'title'],
+            'invoice': ordered.loc[match, 'invoice_number'],
+            'other_invoice': previous.loc[match, 'invoice_number'],
+        }))
+
+    if not candidates:
+        return pd.DataFrame(columns=columns)
+
+    pairs = pd.concat(candidates, ignore_index=True)
+    same_invoice = (pairs['invoice'].fillna('') != '') & (pairs['invoice'] == pairs['other_invoice'])
+    pairs['similarity'] = [
+        1.0 if invoice_match else title_similarity(title, other)
+        for title, other, invoice_match in zip(pairs['title'], pairs['other_title'], same_invoice)
+    ]
+    pairs = pairs[pairs['similarity'] >= min_similarity]
+
+    # One row per expense, keeping its closest match
+    pairs = pairs.sort_values(['similarity', 'days_apart'], ascending=[False, True])
+    return pairs.drop_duplicates('expense_id')[columns].reset_index(drop=True)
+
+
+def detect_anomalies(frame, threshold=3.5, max_days=3, min_similarity=0.8):
+    """Run outlier and duplicate detection on an expense frame."""
+    timings = {}
+
+    started = time.perf_counter()
+    outliers = find_outliers(frame, threshold=threshold)
+    timings['outliers'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    duplicates = find_duplicates(frame, max_days=max_days, min_similarity=min_similarity)
+    timings['duplicates'] = time.perf_counter() - started
+
+    return {'outliers': outliers, 'duplicates': duplicates, 'timings': timings}
+
+
+# ============================================================================
+# Nightly scan and storage
+# ============================================================================
+
+def _records(frame, columns):
+    """Convert flagged rows to JSON-friendly dicts for storage."""
+    records = []
+    for row in frame[columns].itertuples(index=False):
+        record = {}
+        for column, value in zip(columns, row):
+            if isinstance(value, pd.Timestamp):
+                value = value.date().isoformat()
+            elif isinstance(value, (np.floating, float)):
+                value = None if np.isnan(value) else round(float(value), 2)
+            elif isinstance(value, np.integer):
+                value = int(value)
+            record[column] = value
+        records.append(record)
+    return records
+
+
+def run_expense_anomaly_scan(days=180, threshold=3.5, max_days=3, min_similarity=0.8, max_results=500):
+    """
+    Scan the last `days` of expenses and store the flagged ones.
+
+    Returns:
+        The stored result: generated_at, window, scanned, outlier and
+        duplicate lists (highest score / similarity first) and timings
+    """
+    end_date = timezone.now().date()
+    start_date = end_date - timedelta(days=days)
+
+    started = time.perf_counter()
+    frame = load_expense_frame(start_date, end_date)
+    load_seconds = time.perf_counter() - started
+
+    detected = detect_anomalies(frame, threshold, max_days, min_similarity)
+
+    duplicates = detected['duplicates']
+    if not duplicates.empty:
+        details = frame.set_index('id')[['user_id', 'amount', 'expense_date', 'title']]
+        duplicates = duplicates.join(details, on='expense_id')
+
+    result = {
+        'generated_at': timezone.now().isoformat(),
+        'window': {'start': start_date.isoformat(), 'end': end_date.isoformat(), 'days': days},
+        'scanned': len(frame),
+        'outlier_count': len(detected['outliers']),
+        'duplicate_count': len(duplicates),
+        'outliers': _records(
+            detected['outliers'].head(max_results),
+            ['id', 'user_id', 'category_id', 'amount', 'expense_date', 'title',
+             'user_z', 'category_z', 'rolling_z', 'score'],
+        ),
+        'duplicates': _records(
+            duplicates.head(max_results),
+            ['expense_id', 'duplicate_of', 'user_id', 'amount', 'expense_date', 'title',
+             'days_apart', 'similarity'],
+        ) if not duplicates.empty else [],
+        'timings': {
+            'load': round(load_seconds, 3),
+            **{name: round(seconds, 3) for name, seconds in detected['timings'].items()},
+        },
+    }
+
+    from .models import ExpenseAnomalyScan
+
+    scan = ExpenseAnomalyScan.objects.create(result=result)
+    stale = ExpenseAnomalyScan.objects.values_list('pk', flat=True)[ANOMALY_SCANS_KEPT:]
+    ExpenseAnomalyScan.objects.filter(pk__in=list(stale)).exclude(pk=scan.pk).delete()
+    logger.info(
+        f"Expense anomaly scan: {result['scanned']} expenses, {result['outlier_count']} outliers, "
+        f"{result['duplicate_count']} likely duplicates"
+    )
+    return result
+
+
+def get_latest_anomalies():
+    """Return the last nightly scan result, or None if it has not run yet."""
+    from .models import ExpenseAnomalyScan
+
+    return ExpenseAnomalyScan.objects.values_list('result', flat=True).first()
@@ -12,7 +12,7 @@ from datetime import date, timedelta
 
 from .models import (
     Expense, ExpenseCategory, ExpenseReceipt, ExpenseReport,
-    ExpenseTag, RecurringExpense, ExpenseApprovalWorkflow
+    ExpenseTag, RecurringExpense, ExpenseApprovalWorkflow, LEDGER_BUCKETS
 )
 
 User = get_user_model()
@@ -144,28 +144,34 @@ class ExpenseForm(forms.ModelForm):
         if amount and amount <= 0:
             raise ValidationError('Amount must be greater than zero.')
         
-        # Check against category budget if exists
-        category = self.cleaned_data.get('category')
-        if category and category.budget_limit:
-            # Get total expenses for this category this month
-            expense_date = self.cleaned_data.get('expense_date', date.today())
-            total = category.get_total_expenses(
-                start_date=expense_date.replace(day=1),
-                end_date=expense_date
-            )
+        return amount
+    
+    def clean(self):
+        """Check the expense, tax included, against its category's monthly budget."""
+        cleaned_data = super().clean()
+        category = cleaned_data.get('category')
+        amount = cleaned_data.get('amount')
+        
+        if amount and category and category.budget_limit:
+            # The ledger's spent_amount counts total_amount (amount + tax)
+            expense_date = cleaned_data.get('expense_date') or date.today()
+            total = category.get_budget_entry(expense_date.month, expense_date.year).spent_amount
             
-            # Add current expense amount (exclude if editing)
-            if self.instance.pk:
-                total -= self.instance.amount
-            total += amount
+            # Replace this expense's own contribution when editing one already counted
+            if (self.instance.pk
+                    and LEDGER_BUCKETS.get(self.instance.status) == 'spent'
+                    and self.instance.category_id == category.pk
+                    and self.instance.expense_date.replace(day=1) == expense_date.replace(day=1)):
+                total -= self.instance.total_amount
+            total += amount + (cleaned_data.get('tax_amount') or Decimal('0.00'))
             
             if total > category.budget_limit:
-                raise ValidationError(
+                self.add_error('amount', ValidationError(
                     f'This expense would exceed the category budget limit of '
-                    f'{category.budget_limit} {self.cleaned_data.get("currency", "KES")}'
-                )
+                    f'{category.budget_limit} {cleaned_data.get("currency", "KES")}'
+                ))
         
-        return amount
+        return cleaned_data
     
     def clean_tax_amount(self):
         """Validate tax amount."""
@@ -0,0 +1,30 @@
+"""
+Expense dashboard KPIs (see apps.dashboard.kpis)
+"""
+from django.db.models import Count, Q, Sum
+
+from apps.dashboard import kpis
+
+from .models import Expense
+
+
+def expense_aggregates(today):
+    """Conditional aggregates behind the expense dashboard cards."""
+    approved = Q(status='APPROVED')
+    this_month = approved & Q(expense_date__gte=today.replace(day=1))
+    return {
+        'total_count': Count('id'),
+        'pending_count': Count('id', filter=Q(status='SUBMITTED')),
+        'approved_amount': Sum('total_amount', filter=approved),
+        'month_total': Sum('total_amount', filter=this_month),
+        'month_count': Count('id', filter=this_month),
+        **{
+            f'status_{status.lower()}': Count('id', filter=Q(status=status))
+            for status, _ in Expense.STATUS_CHOICES
+        },
+    }
+
+
+@kpis.register('expenses', models=[Expense])
+def expense_kpis(today):
+    return Expense.objects.all(), expense_aggregates(today)
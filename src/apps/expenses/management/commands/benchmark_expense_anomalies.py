@@ -0,0 +1,96 @@
+"""
+Management command to time the expense anomaly engine on a synthetic
+population (no database access) and check it finds planted anomalies
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from apps.expenses.anomalies import FRAME_COLUMNS, detect_anomalies
+
+TITLES = (
+    'Fuel top up', 'Client lunch', 'Taxi to site', 'Parking fee', 'Vehicle wash',
+    'Office supplies', 'Airtime', 'Courier delivery', 'Tyre repair', 'Hotel night',
+)
+
+
+def synthetic_expenses(rows, users, categories, seed=0, planted=1000):
+    """
+    Build an expense frame with log-normal amounts per user and category,
+    plus `planted` inflated amounts and `planted` re-submitted duplicates.
+    """
+    rng = np.random.default_rng(seed)
+    user_scale = rng.lognormal(np.log(2500), 0.6, users)
+    category_scale = rng.lognormal(0, 0.4, categories)
+
+    user_ids = rng.integers(1, users + 1, rows)
+    category_ids = rng.integers(1, categories + 1, rows)
+    amounts = np.round(
+        user_scale[user_ids - 1] * category_scale[category_ids - 1] * rng.lognormal(0, 0.35, rows), 2
+    )
+    dates = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 365, rows), unit='D')
+
+    frame = pd.DataFrame({
+        'id': np.arange(1, rows + 1),
+        'user_id': user_ids,
+        'category_id': category_ids,
+        'amount': amounts,
+        'expense_date': dates,
+        'title': np.asarray(TITLES, dtype=object)[rng.integers(0, len(TITLES), rows)],
+        'vendor_name': '',
+        'invoice_number': '',
+    })[FRAME_COLUMNS]
+
+    outliers = rng.choice(rows, planted, replace=False)
+    frame.loc[outliers, 'amount'] = np.round(frame.loc[outliers, 'amount'] * 25, 2)
+
+    originals = frame.iloc[rng.choice(rows, planted, replace=False)].copy()
+    originals['id'] = np.arange(rows + 1, rows + planted + 1)
+    originals['expense_date'] += pd.to_timedelta(rng.integers(0, 3, planted), unit='D')
+    originals['title'] = originals['title'].str.upper() + '.'
+
+    frame = pd.concat([frame, originals], ignore_index=True)
+    return frame, set(frame.loc[outliers, 'id']), set(originals['id'])
+
+
+class Command(BaseCommand):
+    help = 'Benchmark outlier and duplicate detection on a synthetic expense population'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000, help='Expense rows (default: 1000000)')
+        parser.add_argument('--users', type=int, default=5000, help='Distinct submitters (default: 5000)')
+        parser.add_argument('--categories', type=int, default=40, help='Distinct categories (default: 40)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        frame, planted_outliers, planted_duplicates = synthetic_expenses(
+            options['rows'], options['users'], options['categories'], options['seed']
+        )
+        build_seconds = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(frame):,} expenses, {options['users']:,} users, {options['categories']} categories "
+            f"(generated in {build_seconds:.2f}s, {frame.memory_usage(deep=True).sum() / 2**20:.0f} MB)"
+        )
+
+        started = time.perf_counter()
+        result = detect_anomalies(frame)
+        total_seconds = time.perf_counter() - started
+
+        outlier_ids = set(result['outliers']['id'])
+        duplicate_ids = set(result['duplicates']['expense_id'])
+        for name, seconds in result['timings'].items():
+            self.stdout.write(f'{name:<12} {seconds:8.2f}s')
+        self.stdout.write(f"{'total':<12} {total_seconds:8.2f}s ({len(frame) / total_seconds:,.0f} rows/s)")
+
+        self.stdout.write(
+            f'Outliers:   {len(outlier_ids):,} flagged, '
+            f'{len(outlier_ids & planted_outliers):,}/{len(planted_outliers):,} planted found'
+        )
+        self.stdout.write(
+            f'Duplicates: {len(duplicate_ids):,} flagged, '
+            f'{len(duplicate_ids & planted_duplicates):,}/{len(planted_duplicates):,} planted found'
+        )
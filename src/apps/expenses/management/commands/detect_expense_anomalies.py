@@ -0,0 +1,29 @@
+"""
+Management command to run the expense anomaly scan now and store a fresh
+result for the dashboard
+"""
+from django.core.management.base import BaseCommand
+
+from apps.expenses.anomalies import run_expense_anomaly_scan
+
+
+class Command(BaseCommand):
+    help = 'Scan recent expenses for outliers and likely duplicates and store the results'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=180, help='Window to scan in days (default: 180)')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=3.5,
+            help='Robust z-score above which an amount is flagged (default: 3.5)',
+        )
+
+    def handle(self, *args, **options):
+        result = run_expense_anomaly_scan(days=options['days'], threshold=options['threshold'])
+
+        timings = ', '.join(f'{name} {seconds}s' for name, seconds in result['timings'].items())
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {result['scanned']:,} expenses: {result['outlier_count']} outlier(s), "
+            f"{result['duplicate_count']} likely duplicate(s) ({timings})."
+        ))
@@ -0,0 +1,46 @@
+"""
+Management command to generate due recurring expenses, including
+occurrences missed while the scheduler was not running
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from apps.expenses.recurring import MAX_CATCH_UP, generate_due_recurring_expenses
+
+
+class Command(BaseCommand):
+    help = 'Generate draft expenses for every due recurring expense occurrence'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            default=None,
+            help='Generate as of this date (YYYY-MM-DD, default: today)',
+        )
+        parser.add_argument(
+            '--no-catch-up',
+            action='store_true',
+            help='Only generate the latest missed occurrence per template',
+        )
+        parser.add_argument(
+            '--max-per-template',
+            type=int,
+            default=MAX_CATCH_UP,
+            help=f'Occurrences generated per template in one run (default: {MAX_CATCH_UP})',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Count due occurrences only')
+
+    def handle(self, *args, **options):
+        report = generate_due_recurring_expenses(
+            today=options['date'],
+            catch_up=not options['no_catch_up'],
+            max_per_template=options['max_per_template'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would generate' if options['dry_run'] else 'Generated'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['generated']} expense(s) from {report['templates']} template(s)"
+            + (f", {report['skipped']} already existed." if report['skipped'] else '.')
+        ))
@@ -0,0 +1,35 @@
+"""
+Management command to verify the category budget ledger against the
+expenses table, optionally rewriting rows that have drifted
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.expenses.models import CategoryBudgetLedger
+
+
+class Command(BaseCommand):
+    help = 'Compare CategoryBudgetLedger with approved/submitted expenses and report (or --fix) differences'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rewrite ledger rows from the expenses table when they differ',
+        )
+
+    def handle(self, *args, **options):
+        discrepancies = CategoryBudgetLedger.objects.reconcile(fix=options['fix'])
+
+        if not discrepancies:
+            self.stdout.write(self.style.SUCCESS('Budget ledger matches the expenses table.'))
+            return
+
+        for category_id, month, field, ledger_value, expected in discrepancies:
+            self.stdout.write(
+                f'category {category_id} {month:%Y-%m} {field}: ledger {ledger_value}, expenses {expected}'
+            )
+
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Fixed {len(discrepancies)} discrepancy(ies).'))
+        else:
+            raise CommandError(f'{len(discrepancies)} discrepancy(ies); rerun with --fix to repair')
@@ -0,0 +1,83 @@
+# Generated by Django 5.1 on 2026-10-18 21:14
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def build_ledger(apps, schema_editor):
+    from django.db.models.functions import TruncMonth
+
+    Expense = apps.get_model('expenses', 'Expense')
+    ExpenseCategory = apps.get_model('expenses', 'ExpenseCategory')
+    CategoryBudgetLedger = apps.get_model('expenses', 'CategoryBudgetLedger')
+
+    pending = models.Q(status='SUBMITTED')
+    spent = models.Q(status__in=['APPROVED', 'PAID'])
+    rows = (
+        Expense.objects.filter(pending | spent)
+        .annotate(month=TruncMonth('expense_date'))
+        .values('category_id', 'month')
+        .annotate(
+            pending_amount=models.Sum('total_amount', filter=pending),
+            pending_count=models.Count('id', filter=pending),
+            spent_amount=models.Sum('total_amount', filter=spent),
+            spent_count=models.Count('id', filter=spent),
+        )
+        .order_by()
+    )
+    limits = dict(ExpenseCategory.objects.values_list('pk', 'budget_limit'))
+
+    def alert_level(spent_amount, limit):
+        # Thresholds already reached are treated as notified
+        if not limit:
+            return 0
+        if spent_amount > limit:
+            return 100
+        return 80 if spent_amount * 100 >= limit * 80 else 0
+
+    entries = []
+    for row in rows.iterator():
+        spent_amount = row['spent_amount'] or Decimal('0.00')
+        entries.append(CategoryBudgetLedger(
+            category_id=row['category_id'],
+            month=row['month'],
+            pending_amount=row['pending_amount'] or Decimal('0.00'),
+            pending_count=row['pending_count'],
+            spent_amount=spent_amount,
+            spent_count=row['spent_count'],
+            alert_level=alert_level(spent_amount, limits.get(row['category_id'])),
+        ))
+    CategoryBudgetLedger.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryBudgetLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('pending_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('pending_count', models.IntegerField(default=0)),
+                ('spent_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('spent_count', models.IntegerField(default=0)),
+                ('alert_level', models.PositiveSmallIntegerField(default=0, help_text='Highest budget threshold (%) already notified for this month')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_ledger', to='expenses.expensecategory')),
+            ],
+            options={
+                'verbose_name': 'Category Budget Ledger',
+                'verbose_name_plural': 'Category Budget Ledger',
+                'ordering': ['-month', 'category'],
+                'indexes': [models.Index(fields=['month'], name='expenses_ca_month_045e0e_idx')],
+                'unique_together': {('category', 'month')},
+            },
+        ),
+        migrations.RunPython(build_ledger, migrations.RunPython.noop),
+    ]
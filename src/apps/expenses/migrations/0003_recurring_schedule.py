@@ -0,0 +1,68 @@
+# Generated by Django 5.1 on 2026-10-18 21:21
+
+import django.db.models.deletion
+from django.conf import settings
+from dateutil.relativedelta import relativedelta
+from django.db import migrations, models
+
+
+PERIODS = {
+    'WEEKLY': relativedelta(weeks=1),
+    'MONTHLY': relativedelta(months=1),
+    'QUARTERLY': relativedelta(months=3),
+    'YEARLY': relativedelta(years=1),
+}
+
+
+def initialise_schedules(apps, schema_editor):
+    """Start each schedule at the first occurrence after last_generated."""
+    RecurringExpense = apps.get_model('expenses', 'RecurringExpense')
+
+    templates = list(RecurringExpense.objects.all())
+    for template in templates:
+        period = PERIODS[template.frequency]
+        n = 0
+        if template.last_generated:
+            while template.start_date + period * n <= template.last_generated:
+                n += 1
+        next_due = template.start_date + period * n
+        template.occurrences_generated = n
+        template.next_due_date = None if template.end_date and next_due > template.end_date else next_due
+    RecurringExpense.objects.bulk_update(templates, ['occurrences_generated', 'next_due_date'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0002_client_user'),
+        ('expenses', '0002_category_budget_ledger'),
+        ('vehicles', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='recurring_template',
+            field=models.ForeignKey(blank=True, help_text='Recurring template this expense was generated from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='generated_expenses', to='expenses.recurringexpense'),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='next_due_date',
+            field=models.DateField(blank=True, help_text='Date of the next occurrence; empty once the schedule has ended', null=True),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='occurrences_generated',
+            field=models.PositiveIntegerField(default=0, help_text='Scheduled occurrences already generated (or skipped)'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringexpense',
+            index=models.Index(fields=['is_active', 'next_due_date'], name='expenses_re_is_acti_ff9f1a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='expense',
+            constraint=models.UniqueConstraint(fields=('recurring_template', 'expense_date'), name='unique_recurring_occurrence'),
+        ),
+        migrations.RunPython(initialise_schedules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-18 23:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0003_recurring_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseAnomalyScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generated_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('result', models.JSONField(default=dict, help_text='Scan window, counts, flagged expenses and timings')),
+            ],
+            options={
+                'verbose_name': 'Expense Anomaly Scan',
+                'verbose_name_plural': 'Expense Anomaly Scans',
+                'ordering': ['-generated_at'],
+                'get_latest_by': 'generated_at',
+            },
+        ),
+    ]
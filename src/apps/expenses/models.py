@@ -3,13 +3,19 @@ Models for the expenses app.
 Handles expense tracking, categories, approvals, and reimbursements.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from django.utils import timezone
+from datetime import date
 from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+import logging
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 class ExpenseCategory(models.Model):
@@ -73,25 +79,49 @@ class ExpenseCategory(models.Model):
             total=models.Sum('amount')
         )['total'] or Decimal('0.00')
     
+    def get_budget_entry(self, month=None, year=None):
+        """
+        Return the CategoryBudgetLedger row for a month (default: current),
+        or an unsaved empty row. Views listing many categories attach the
+        current month's rows up front with CategoryBudgetLedger.objects.attach().
+        """
+        if not month or not year:
+            today = timezone.now().date()
+            month, year = today.month, today.year
+        period = date(year, month, 1)
+        
+        cached = getattr(self, '_budget_entry', None)
+        if cached is not None and cached.month == period:
+            return cached
+        
+        entry = CategoryBudgetLedger.objects.filter(category=self, month=period).first()
+        if entry is None:
+            entry = CategoryBudgetLedger(category=self, month=period)
+        self._budget_entry = entry
+        return entry
+    
+    @property
+    def budget_spent(self):
+        """Approved and paid spend for the current month."""
+        return self.get_budget_entry().spent_amount
+    
+    @property
+    def budget_remaining(self):
+        if not self.budget_limit:
+            return None
+        return self.budget_limit - self.budget_spent
+    
+    @property
+    def budget_percentage(self):
+        if not self.budget_limit:
+            return 0
+        return round(self.budget_spent / self.budget_limit * 100, 2)
+    
     def is_over_budget(self, month=None, year=None):
         """Check if category is over budget for given month."""
         if not self.budget_limit:
             return False
-        
-        if not month or not year:
-            now = timezone.now()
-            month = now.month
-            year = now.year
-        
-        from datetime import date
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1)
-        else:
-            end_date = date(year, month + 1, 1)
-        
-        total = self.get_total_expenses(start_date, end_date)
-        return total > self.budget_limit
+        return self.get_budget_entry(month, year).spent_amount > self.budget_limit
 
 
 class Expense(models.Model):
@@ -191,6 +221,14 @@ class Expense(models.Model):
     notes = models.TextField(blank=True)
     tags = models.ManyToManyField('ExpenseTag', blank=True, related_name='expenses')
     is_recurring = models.BooleanField(default=False)
+    recurring_template = models.ForeignKey(
+        'RecurringExpense',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='generated_expenses',
+        help_text="Recurring template this expense was generated from"
+    )
     recurring_frequency = models.CharField(
         max_length=20,
         blank=True,
@@ -214,14 +252,25 @@ class Expense(models.Model):
             models.Index(fields=['submitted_by', 'status']),
             models.Index(fields=['category', 'expense_date']),
         ]
+        constraints = [
+            # One generated expense per template occurrence
+            models.UniqueConstraint(
+                fields=['recurring_template', 'expense_date'],
+                name='unique_recurring_occurrence',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.amount} {self.currency}"
     
     def save(self, *args, **kwargs):
-        """Calculate total amount before saving."""
+        """
+        Calculate total amount before saving. The save and its budget
+        ledger adjustment (see post_save receivers below) share a transaction.
+        """
         self.total_amount = self.amount + self.tax_amount
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
     def approve(self, user):
         """Approve the expense."""
@@ -503,6 +552,13 @@ class RecurringExpense(models.Model):
         ('YEARLY', 'Yearly'),
     ]
     
+    FREQUENCY_PERIODS = {
+        'WEEKLY': relativedelta(weeks=1),
+        'MONTHLY': relativedelta(months=1),
+        'QUARTERLY': relativedelta(months=3),
+        'YEARLY': relativedelta(years=1),
+    }
+    
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     category = models.ForeignKey(
@@ -523,6 +579,17 @@ class RecurringExpense(models.Model):
     is_active = models.BooleanField(default=True)
     last_generated = models.DateField(null=True, blank=True)
     
+    # Schedule: occurrence n falls on start_date + n periods
+    occurrences_generated = models.PositiveIntegerField(
+        default=0,
+        help_text="Scheduled occurrences already generated (or skipped)"
+    )
+    next_due_date = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Date of the next occurrence; empty once the schedule has ended"
+    )
+    
     vendor_name = models.CharField(max_length=200, blank=True)
     payment_method = models.CharField(
         max_length=20,
@@ -536,28 +603,409 @@ class RecurringExpense(models.Model):
         verbose_name = "Recurring Expense"
         verbose_name_plural = "Recurring Expenses"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'next_due_date']),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.get_frequency_display()})"
     
-    def generate_expense(self):
-        """Generate an expense from this recurring template."""
-        expense = Expense.objects.create(
+    def save(self, *args, **kwargs):
+        """Keep next_due_date in step with the schedule fields."""
+        self.next_due_date = self.occurrence_date(self.occurrences_generated)
+        if 'update_fields' in kwargs and kwargs['update_fields'] is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'next_due_date'}
+        super().save(*args, **kwargs)
+    
+    def occurrence_date(self, n):
+        """
+        Date of the nth occurrence (0-based), or None past end_date.
+        Anchoring on start_date keeps month-end schedules on month-end
+        (31 Jan, 28 Feb, 31 Mar) instead of drifting.
+        """
+        occurrence = self.start_date + self.FREQUENCY_PERIODS[self.frequency] * n
+        if self.end_date and occurrence > self.end_date:
+            return None
+        return occurrence
+    
+    def due_occurrences(self, today, limit=None):
+        """Return [(n, date)] for occurrences due on or before today."""
+        due = []
+        n = self.occurrences_generated
+        occurrence = self.occurrence_date(n)
+        while occurrence is not None and occurrence <= today and (limit is None or len(due) < limit):
+            due.append((n, occurrence))
+            n += 1
+            occurrence = self.occurrence_date(n)
+        return due
+    
+    def build_expense(self, expense_date):
+        """Unsaved draft Expense for one occurrence (total set for bulk_create)."""
+        return Expense(
             title=self.title,
             description=self.description,
-            category=self.category,
+            category_id=self.category_id,
             amount=self.amount,
+            tax_amount=Decimal('0.00'),
+            total_amount=self.amount,
             currency=self.currency,
-            expense_date=timezone.now().date(),
+            expense_date=expense_date,
             payment_method=self.payment_method,
             vendor_name=self.vendor_name,
-            submitted_by=self.submitted_by,
+            submitted_by_id=self.submitted_by_id,
             is_recurring=True,
+            recurring_template=self,
             recurring_frequency=self.frequency,
             status='DRAFT'
         )
+    
+    def generate_expense(self):
+        """
+        Generate the next scheduled occurrence on demand, ahead of the
+        nightly run, and advance the schedule past it so the scheduler does
+        not generate the same period again. Returns the existing expense when
+        that occurrence was already generated, None once the schedule has
+        ended.
+        """
+        with transaction.atomic():
+            template = RecurringExpense.objects.select_for_update().get(pk=self.pk)
+            occurrence = template.occurrence_date(template.occurrences_generated)
+            if occurrence is None:
+                return None
+            
+            expense = Expense.objects.filter(recurring_template=template, expense_date=occurrence).first()
+            if expense is None:
+                expense = template.build_expense(occurrence)
+                expense.save()
+            
+            template.occurrences_generated += 1
+            template.last_generated = max(template.last_generated or occurrence, occurrence)
+            template.save(update_fields=['occurrences_generated', 'last_generated', 'updated_at'])
         
-        self.last_generated = timezone.now().date()
-        self.save()
+        self.occurrences_generated = template.occurrences_generated
+        self.next_due_date = template.next_due_date
+        self.last_generated = template.last_generated
+        return expense
+
+
+# ============================================================================
+# Anomaly scans
+# ============================================================================
+
+class ExpenseAnomalyScan(models.Model):
+    """
+    Flagged expenses from one population-wide anomaly scan (see anomalies.py).
+    Stored in the database so the web processes read what the worker found.
+    """
+    
+    generated_at = models.DateTimeField(default=timezone.now, db_index=True)
+    result = models.JSONField(default=dict, help_text="Scan window, counts, flagged expenses and timings")
+    
+    class Meta:
+        verbose_name = "Expense Anomaly Scan"
+        verbose_name_plural = "Expense Anomaly Scans"
+        ordering = ['-generated_at']
+        get_latest_by = 'generated_at'
+    
+    def __str__(self):
+        return f"Anomaly scan {self.generated_at:%Y-%m-%d %H:%M}"
+
+
+# ============================================================================
+# Category budget ledger
+# ============================================================================
+
+# Expense statuses that count towards a category's month, by ledger bucket
+LEDGER_BUCKETS = {
+    'SUBMITTED': 'pending',
+    'APPROVED': 'spent',
+    'PAID': 'spent',
+}
+
+# Budget usage percentages that raise a notification when crossed upwards
+BUDGET_THRESHOLDS = (80, 100)
+
+
+def budget_alert_level(spent, budget_limit):
+    """Return the highest threshold reached (0 when below all of them)."""
+    if not budget_limit:
+        return 0
+    level = 0
+    for threshold in BUDGET_THRESHOLDS:
+        reached = spent > budget_limit if threshold == 100 else spent * 100 >= budget_limit * threshold
+        if reached:
+            level = threshold
+    return level
+
+
+class CategoryBudgetLedgerManager(models.Manager):
+    """Applies expense deltas to the ledger and detects threshold crossings"""
+    
+    def contribution(self, status, category_id, expense_date, total_amount):
+        """
+        Return {(category_id, month): {field: delta}} for one expense state,
+        empty when the status does not count towards the budget.
+        """
+        bucket = LEDGER_BUCKETS.get(status)
+        if bucket is None or category_id is None or expense_date is None:
+            return {}
+        return {
+            (category_id, expense_date.replace(day=1)): {
+                f'{bucket}_amount': total_amount or Decimal('0.00'),
+                f'{bucket}_count': 1,
+            }
+        }
+    
+    def difference(self, before, after, deltas=None):
+        """
+        Return after - before as a delta map, added to deltas when given.
+        Zero deltas are dropped.
+        """
+        deltas = {} if deltas is None else deltas
+        for sign, contribution in ((-1, before), (1, after)):
+            for key, fields in contribution.items():
+                bucket = deltas.setdefault(key, {})
+                for field, value in fields.items():
+                    bucket[field] = bucket.get(field, 0) + sign * value
+        for key in list(deltas):
+            deltas[key] = {field: value for field, value in deltas[key].items() if value}
+            if not deltas[key]:
+                del deltas[key]
+        return deltas
+    
+    def apply(self, deltas):
+        """
+        Add {(category_id, month): {field: delta}} to the ledger with F()
+        updates in the caller's transaction, then check budget thresholds.
+        """
+        if not deltas:
+            return
+        
+        with transaction.atomic():
+            self.bulk_create(
+                [self.model(category_id=category_id, month=month) for category_id, month in deltas],
+                ignore_conflicts=True,
+            )
+            for (category_id, month), fields in deltas.items():
+                self.filter(category_id=category_id, month=month).update(
+                    updated_at=timezone.now(),
+                    **{field: models.F(field) + value for field, value in fields.items()}
+                )
+            self.check_thresholds(deltas.keys())
+    
+    def record_status_change(self, expenses, new_status):
+        """
+        Apply the ledger deltas for moving a queryset of expenses to
+        new_status with QuerySet.update(), which bypasses save signals.
+        Call before the update.
+        """
+        deltas = {}
+        for row in expenses.values('status', 'category_id', 'expense_date', 'total_amount'):
+            self.difference(
+                self.contribution(row['status'], row['category_id'], row['expense_date'], row['total_amount']),
+                self.contribution(new_status, row['category_id'], row['expense_date'], row['total_amount']),
+                deltas,
+            )
+        self.apply(deltas)
+    
+    def check_thresholds(self, keys):
+        """
+        Move each ledger row's alert_level to the threshold its spend has
+        reached. Upward moves notify once, after commit; downward moves
+        re-arm the threshold so a later crossing notifies again.
+        """
+        keys = list(keys)
+        if not keys:
+            return
+        
+        condition = models.Q()
+        for category_id, month in keys:
+            condition |= models.Q(category_id=category_id, month=month)
+        
+        rows = self.filter(condition).select_related('category')
+        for entry in rows:
+            level = budget_alert_level(entry.spent_amount, entry.category.budget_limit)
+            if level == entry.alert_level:
+                continue
+            # Compare-and-set so concurrent writers notify at most once
+            moved = self.filter(pk=entry.pk, alert_level=entry.alert_level).update(alert_level=level)
+            if moved and level > entry.alert_level:
+                entry.alert_level = level
+                transaction.on_commit(
+                    lambda category=entry.category, month=entry.month, level=level:
+                        _notify_budget_threshold(category, month, level)
+                )
+    
+    def attach(self, categories, month=None):
+        """Attach each category's ledger row for a month (one query)."""
+        categories = list(categories)
+        period = (month or timezone.now().date()).replace(day=1)
+        entries = {
+            entry.category_id: entry
+            for entry in self.filter(category__in=categories, month=period)
+        }
+        for category in categories:
+            category._budget_entry = entries.get(category.pk) or self.model(category=category, month=period)
+        return categories
+    
+    def expected(self):
+        """Ledger values recomputed from the expenses table, keyed by (category_id, month)."""
+        from django.db.models.functions import TruncMonth
+        
+        aggregates = {}
+        for bucket in set(LEDGER_BUCKETS.values()):
+            statuses = [status for status, name in LEDGER_BUCKETS.items() if name == bucket]
+            aggregates[f'{bucket}_amount'] = models.Sum('total_amount', filter=models.Q(status__in=statuses))
+            aggregates[f'{bucket}_count'] = models.Count('id', filter=models.Q(status__in=statuses))
+        
+        rows = (
+            Expense.objects.filter(status__in=LEDGER_BUCKETS)
+            .annotate(month=TruncMonth('expense_date'))
+            .values('category_id', 'month')
+            .annotate(**aggregates)
+            .order_by()
+        )
+        return {
+            (row['category_id'], row['month']): {
+                field: row[field] or (0 if field.endswith('_count') else Decimal('0.00'))
+                for field in aggregates
+            }
+            for row in rows
+        }
+    
+    def reconcile(self, fix=False):
+        """
+        Compare the ledger with the expenses table.
+        
+        Returns:
+            List of (category_id, month, field, ledger_value, expected_value)
+        """
+        expected = self.expected()
+        fields = ['pending_amount', 'pending_count', 'spent_amount', 'spent_count']
         
-        return expense
\ No newline at end of file
+        discrepancies = []
+        stored = {}
+        for entry in self.all():
+            stored[(entry.category_id, entry.month)] = entry
+            values = expected.get((entry.category_id, entry.month), {})
+            for field in fields:
+                actual = getattr(entry, field)
+                wanted = values.get(field, 0)
+                if actual != wanted:
+                    discrepancies.append((entry.category_id, entry.month, field, actual, wanted))
+        
+        for key, values in expected.items():
+            if key not in stored:
+                for field in fields:
+                    if values[field]:
+                        discrepancies.append((*key, field, 0, values[field]))
+        
+        if fix and discrepancies:
+            with transaction.atomic():
+                self.bulk_create(
+                    [self.model(category_id=category_id, month=month, **values)
+                     for (category_id, month), values in expected.items()],
+                    update_conflicts=True,
+                    unique_fields=['category', 'month'],
+                    update_fields=[*fields, 'updated_at'],
+                )
+                stale = [entry.pk for key, entry in stored.items() if key not in expected]
+                self.filter(pk__in=stale).update(**{field: 0 for field in fields})
+                self.check_thresholds(set(expected) | set(stored))
+        
+        return discrepancies
+
+
+class CategoryBudgetLedger(models.Model):
+    """
+    Running submitted and spent totals for one expense category and month.
+    Adjusted by deltas when an expense is saved or deleted, so budget checks
+    and views never re-sum the expenses table.
+    """
+    
+    category = models.ForeignKey(
+        ExpenseCategory,
+        on_delete=models.CASCADE,
+        related_name='budget_ledger'
+    )
+    month = models.DateField(help_text="First day of the month")
+    
+    pending_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    pending_count = models.IntegerField(default=0)
+    spent_amount = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    spent_count = models.IntegerField(default=0)
+    
+    alert_level = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Highest budget threshold (%) already notified for this month"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = CategoryBudgetLedgerManager()
+    
+    class Meta:
+        verbose_name = "Category Budget Ledger"
+        verbose_name_plural = "Category Budget Ledger"
+        ordering = ['-month', 'category']
+        unique_together = ['category', 'month']
+        indexes = [
+            models.Index(fields=['month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.category.name} - {self.month.strftime('%B %Y')}"
+
+
+def _notify_budget_threshold(category, month, level):
+    from .utils import notify_budget_threshold
+    
+    try:
+        notify_budget_threshold(category, percentage=level, month=month)
+    except Exception as e:
+        logger.error(f"Error sending budget notification for {category.name}: {e}")
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_expense_state(sender, instance, **kwargs):
+    """Record the ledger contribution of the stored row before it changes."""
+    instance._ledger_before = {}
+    if instance.pk:
+        row = Expense.objects.filter(pk=instance.pk).values(
+            'status', 'category_id', 'expense_date', 'total_amount'
+        ).first()
+        if row:
+            instance._ledger_before = CategoryBudgetLedger.objects.contribution(
+                row['status'], row['category_id'], row['expense_date'], row['total_amount']
+            )
+
+
+@receiver(post_save, sender=Expense)
+def update_budget_ledger(sender, instance, raw=False, **kwargs):
+    """Apply the expense's change in ledger contribution."""
+    if raw:
+        return
+    ledger = CategoryBudgetLedger.objects
+    after = ledger.contribution(
+        instance.status, instance.category_id, instance.expense_date, instance.total_amount
+    )
+    ledger.apply(ledger.difference(getattr(instance, '_ledger_before', {}), after))
+    instance._ledger_before = after
+
+
+@receiver(post_delete, sender=Expense)
+def update_budget_ledger_on_delete(sender, instance, **kwargs):
+    ledger = CategoryBudgetLedger.objects
+    ledger.apply(ledger.difference(
+        ledger.contribution(instance.status, instance.category_id, instance.expense_date, instance.total_amount),
+        {},
+    ))
+
+
+@receiver(post_save, sender=ExpenseCategory)
+def recheck_budget_thresholds(sender, instance, created, raw=False, **kwargs):
+    """Re-evaluate the current month when a category's budget limit changes."""
+    if created or raw:
+        return
+    month = timezone.now().date().replace(day=1)
+    CategoryBudgetLedger.objects.check_thresholds([(instance.pk, month)])
@@ -0,0 +1,192 @@
+"""
+Recurring expense scheduler.
+
+Each RecurringExpense stores next_due_date, so due templates come from one
+indexed query on (is_active, next_due_date). generate_due_recurring_expenses()
+creates the draft expenses for every due occurrence with bulk_create, advances
+the schedules with bulk_update and sends recurring_expenses_generated once per
+batch for post-processing.
+
+Occurrences missed while the job was not running are generated on the next
+run (catch-up). The unique (recurring_template, expense_date) constraint and a
+pre-insert existence check keep reruns from duplicating expenses.
+"""
+
+import logging
+
+from django.db import transaction
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .models import CategoryBudgetLedger, Expense, RecurringExpense
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on occurrences generated per template in one run
+MAX_CATCH_UP = 60
+
+# Sent after each batch with expenses=[Expense, ...] (saved, with pks)
+recurring_expenses_generated = Signal()
+
+
+def due_recurring_expenses(today=None):
+    """Active templates with an occurrence due on or before today (one query)."""
+    today = today or timezone.now().date()
+    return RecurringExpense.objects.filter(
+        is_active=True,
+        next_due_date__isnull=False,
+        next_due_date__lte=today,
+    )
+
+
+def _generate_batch(template_ids, today, catch_up, max_per_template):
+    with transaction.atomic():
+        templates = list(
+            RecurringExpense.objects.select_for_update()
+            .filter(pk__in=template_ids, is_active=True, next_due_date__lte=today)
+        )
+
+        plans = {}
+        for template in templates:
+            due = template.due_occurrences(today, limit=max_per_template if catch_up else None)
+            if not catch_up and due:
+                due = due[-1:]  # only the latest missed occurrence
+            plans[template.pk] = due
+
+        # Occurrences that already exist (manual generation or an earlier run)
+        existing = set(
+            Expense.objects.filter(
+                recurring_template_id__in=plans,
+                expense_date__in={day for due in plans.values() for _, day in due},
+            ).values_list('recurring_template_id', 'expense_date')
+        )
+
+        new_expenses = []
+        skipped = 0
+        for template in templates:
+            due = plans[template.pk]
+            if not due:
+                continue
+            for _, day in due:
+                if (template.pk, day) in existing:
+                    skipped += 1
+                else:
+                    new_expenses.append(template.build_expense(day))
+
+            last_n, last_day = due[-1]
+            template.occurrences_generated = last_n + 1
+            template.next_due_date = template.occurrence_date(template.occurrences_generated)
+            template.last_generated = max(template.last_generated or last_day, last_day)
+            template.updated_at = timezone.now()
+
+        Expense.objects.bulk_create(new_expenses)
+        RecurringExpense.objects.bulk_update(
+            templates,
+            ['occurrences_generated', 'next_due_date', 'last_generated', 'updated_at'],
+        )
+
+        if new_expenses:
+            transaction.on_commit(
+                lambda: recurring_expenses_generated.send(sender=RecurringExpense, expenses=new_expenses)
+            )
+
+    return len(templates), len(new_expenses), skipped
+
+
+def generate_due_recurring_expenses(today=None, catch_up=True, max_per_template=MAX_CATCH_UP,
+                                    batch_size=200, dry_run=False):
+    """
+    Generate draft expenses for every due recurring occurrence.
+
+    Args:
+        today: Generation date (default: today)
+        catch_up: Generate every missed occurrence; when False only the
+            latest one is generated and earlier ones are skipped
+        max_per_template: Cap on occurrences per template in one run; the
+            rest follow on later runs
+        batch_size: Templates locked and processed per transaction
+        dry_run: Count due occurrences without writing anything
+
+    Returns:
+        dict with templates, generated and skipped (already existing) counts
+    """
+    today = today or timezone.now().date()
+    report = {'templates': 0, 'generated': 0, 'skipped': 0}
+
+    if dry_run:
+        for template in due_recurring_expenses(today):
+            due = template.due_occurrences(today, limit=max_per_template if catch_up else None)
+            report['templates'] += 1
+            report['generated'] += len(due) if catch_up else min(len(due), 1)
+        return report
+
+    last_pk = 0
+    while True:
+        template_ids = list(
+            due_recurring_expenses(today).filter(pk__gt=last_pk)
+            .order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not template_ids:
+            break
+        last_pk = template_ids[-1]
+
+        templates, generated, skipped = _generate_batch(template_ids, today, catch_up, max_per_template)
+        report['templates'] += templates
+        report['generated'] += generated
+        report['skipped'] += skipped
+
+    logger.info(
+        f"Recurring expenses: {report['generated']} generated from {report['templates']} template(s), "
+        f"{report['skipped']} already existed"
+    )
+    return report
+
+
+# ============================================================================
+# Batched post-processing
+# ============================================================================
+
+@receiver(recurring_expenses_generated)
+def update_ledger_for_generated_expenses(sender, expenses, **kwargs):
+    """bulk_create skips save signals, so apply ledger contributions here."""
+    ledger = CategoryBudgetLedger.objects
+    deltas = {}
+    for expense in expenses:
+        ledger.difference(
+            {},
+            ledger.contribution(expense.status, expense.category_id, expense.expense_date, expense.total_amount),
+            deltas,
+        )
+    ledger.apply(deltas)
+
+
+@receiver(recurring_expenses_generated)
+def notify_generated_expenses(sender, expenses, **kwargs):
+    """Send each submitter one notification listing their new drafts."""
+    from django.contrib.auth import get_user_model
+    from apps.notifications.utils import create_notification
+
+    by_user = {}
+    for expense in expenses:
+        by_user.setdefault(expense.submitted_by_id, []).append(expense)
+
+    users = get_user_model().objects.in_bulk(list(by_user))
+    for user_id, drafts in by_user.items():
+        user = users.get(user_id)
+        if user is None:
+            continue
+        drafts.sort(key=lambda expense: expense.expense_date)
+        lines = [f"- {expense.title} ({expense.expense_date}): {expense.currency} {expense.total_amount}"
+                 for expense in drafts]
+        try:
+            create_notification(
+                user=user,
+                title=f"{len(drafts)} recurring expense(s) ready for review",
+                message="Draft expenses were generated from your recurring templates:\n" + "\n".join(lines),
+                notification_type='expense',
+                priority='low',
+                group_key='expenses_recurring_generated',
+                metadata={'expense_ids': [expense.pk for expense in drafts]},
+            )
+        except Exception as e:
+            logger.error(f"Error notifying user {user_id} about recurring expenses: {e}")
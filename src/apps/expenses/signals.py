@@ -14,8 +14,7 @@ from .models import (
 )
 from .utils import (
     notify_expense_submitted, notify_expense_approved,
-    notify_expense_rejected, notify_budget_threshold,
-    calculate_budget_status
+    notify_expense_rejected
 )
 
 
@@ -50,7 +49,9 @@ def expense_post_save(sender, instance, created, **kwargs):
     Process expense after saving.
     - Send notifications on status changes
     - Update timestamps
-    - Check budget thresholds
+    
+    Budget thresholds are checked by the CategoryBudgetLedger receivers in
+    models.py.
     """
     if created:
         # Log expense creation
@@ -81,15 +82,6 @@ def expense_post_save(sender, instance, created, **kwargs):
         
         if old_status and old_status != instance.status:
             handle_expense_status_change(instance, old_status, instance.status)
-    
-    # Check budget threshold after saving approved expenses
-    if instance.status == 'APPROVED' and instance.category:
-        budget_status = calculate_budget_status(instance.category)
-        if budget_status and budget_status['percentage'] >= 80:
-            try:
-                notify_budget_threshold(instance.category)
-            except Exception as e:
-                print(f"Error sending budget notification: {e}")
 
 
 @receiver(post_delete, sender=Expense)
@@ -235,23 +227,6 @@ def receipt_post_delete(sender, instance, **kwargs):
             print(f"Error deleting receipt file: {e}")
 
 
-# ============================================================================
-# Expense Category Signals
-# ============================================================================
-
-@receiver(post_save, sender=ExpenseCategory)
-def category_post_save(sender, instance, created, **kwargs):
-    """
-    Process category after saving.
-    - Check budget status if limit changed
-    """
-    if not created and instance.budget_limit:
-        # Check if we're near or over budget
-        budget_status = calculate_budget_status(instance)
-        if budget_status and budget_status['percentage'] >= 80:
-            print(f"Category {instance.name} is at {budget_status['percentage']}% of budget")
-
-
 # ============================================================================
 # Expense Report Signals
 # ============================================================================
@@ -418,31 +393,6 @@ def auto_create_approval_workflow(sender, instance, created, **kwargs):
             print(f"Approval workflow created for expense: {instance.title}")
 
 
-# ============================================================================
-# Budget Monitoring
-# ============================================================================
-
-@receiver(post_save, sender=Expense)
-def monitor_category_budget(sender, instance, created, **kwargs):
-    """
-    Monitor category budget when expenses are approved.
-    """
-    if instance.status == 'APPROVED' and instance.category and instance.category.budget_limit:
-        budget_status = calculate_budget_status(instance.category)
-        
-        if budget_status:
-            if budget_status['is_over_budget']:
-                print(f"⚠️  BUDGET EXCEEDED: {instance.category.name} is over budget!")
-                # Send urgent notification
-                try:
-                    notify_budget_threshold(instance.category, percentage=100)
-                except Exception as e:
-                    print(f"Error sending budget exceeded notification: {e}")
-            
-            elif budget_status['is_near_limit']:
-                print(f"⚠️  BUDGET WARNING: {instance.category.name} is at {budget_status['percentage']}% of budget")
-
-
 # ============================================================================
 # Reimbursement Tracking
 # ============================================================================
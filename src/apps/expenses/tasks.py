@@ -0,0 +1,39 @@
+"""
+Expenses App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .anomalies import run_expense_anomaly_scan
+from .recurring import generate_due_recurring_expenses
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# ANOMALY DETECTION TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def expense_anomaly_scan_task(days=180):
+    """
+    Nightly population-wide outlier and duplicate scan; results are stored
+    for the expense dashboard.
+    """
+    result = run_expense_anomaly_scan(days=days)
+    return {
+        'scanned': result['scanned'],
+        'outliers': result['outlier_count'],
+        'duplicates': result['duplicate_count'],
+    }
+
+
+# ============================================================================
+# RECURRING EXPENSE TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def generate_recurring_expenses_task():
+    """Daily generation of due recurring expenses, catching up missed occurrences."""
+    return generate_due_recurring_expenses()
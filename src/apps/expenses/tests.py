@@ -1,3 +1,179 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+
+from .forms import ExpenseForm
+from .models import CategoryBudgetLedger, Expense, ExpenseCategory, RecurringExpense
+from .recurring import generate_due_recurring_expenses
+
+User = get_user_model()
+
+
+class RecurringExpenseGenerationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='finance@example.com', password='password')
+        cls.category = ExpenseCategory.objects.create(name='Rent', code='RENT')
+
+    def make_template(self, **kwargs):
+        fields = {
+            'title': 'Office rent',
+            'category': self.category,
+            'amount': Decimal('1000.00'),
+            'frequency': 'MONTHLY',
+            'start_date': timezone.now().date() - timedelta(days=10),
+            'submitted_by': self.user,
+            'payment_method': 'BANK_TRANSFER',
+        }
+        fields.update(kwargs)
+        return RecurringExpense.objects.create(**fields)
+
+    def test_manual_generation_consumes_the_due_occurrence(self):
+        template = self.make_template()
+        today = timezone.now().date()
+
+        expense = template.generate_expense()
+        self.assertEqual(expense.expense_date, template.start_date)
+        self.assertEqual(template.occurrences_generated, 1)
+        self.assertGreater(template.next_due_date, today)
+
+        report = generate_due_recurring_expenses(today)
+        self.assertEqual(report['generated'], 0)
+        self.assertEqual(Expense.objects.filter(recurring_template=template).count(), 1)
+
+    def test_manual_generation_reuses_an_existing_occurrence(self):
+        template = self.make_template()
+        existing = template.build_expense(template.start_date)
+        existing.save()
+
+        self.assertEqual(template.generate_expense(), existing)
+        template.refresh_from_db()
+        self.assertEqual(template.occurrences_generated, 1)
+        self.assertEqual(Expense.objects.filter(recurring_template=template).count(), 1)
+
+    def test_manual_generation_after_schedule_end(self):
+        start = timezone.now().date() - timedelta(days=10)
+        template = self.make_template(start_date=start, end_date=start)
+
+        self.assertIsNotNone(template.generate_expense())
+        self.assertIsNone(template.generate_expense())
+        self.assertIsNone(template.next_due_date)
+
+
+class CategoryBudgetLedgerTests(TestCase):
+    """The ledger follows expense saves and deletes without re-summing"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='ledger@example.com', password='password')
+        cls.fuel = ExpenseCategory.objects.create(name='Fuel', code='FUEL', budget_limit=Decimal('1000.00'))
+        cls.travel = ExpenseCategory.objects.create(name='Travel', code='TRAVEL')
+
+    def tearDown(self):
+        self.assertEqual(CategoryBudgetLedger.objects.reconcile(), [])
+        super().tearDown()
+
+    def make_expense(self, **kwargs):
+        fields = {
+            'title': 'Diesel',
+            'category': self.fuel,
+            'amount': Decimal('100.00'),
+            'tax_amount': Decimal('16.00'),
+            'expense_date': date(2024, 3, 10),
+            'payment_method': 'CASH',
+            'submitted_by': self.user,
+        }
+        fields.update(kwargs)
+        return Expense.objects.create(**fields)
+
+    def ledger(self, category, month=date(2024, 3, 1)):
+        entry = CategoryBudgetLedger.objects.filter(category=category, month=month).first()
+        if entry is None:
+            return (Decimal('0.00'), 0, Decimal('0.00'), 0)
+        return (entry.pending_amount, entry.pending_count, entry.spent_amount, entry.spent_count)
+
+    def test_status_transitions(self):
+        expense = self.make_expense()
+        self.assertEqual(self.ledger(self.fuel), (Decimal('0.00'), 0, Decimal('0.00'), 0))
+
+        expected = {
+            'SUBMITTED': (Decimal('116.00'), 1, Decimal('0.00'), 0),
+            'APPROVED': (Decimal('0.00'), 0, Decimal('116.00'), 1),
+            'PAID': (Decimal('0.00'), 0, Decimal('116.00'), 1),
+            'REJECTED': (Decimal('0.00'), 0, Decimal('0.00'), 0),
+        }
+        for status, totals in expected.items():
+            expense.status = status
+            expense.save()
+            self.assertEqual(self.ledger(self.fuel), totals, status)
+
+    def test_amount_category_and_month_moves(self):
+        expense = self.make_expense(status='APPROVED')
+        self.make_expense(status='APPROVED', amount=Decimal('50.00'), tax_amount=Decimal('0.00'))
+
+        expense.amount = Decimal('200.00')
+        expense.save()
+        self.assertEqual(self.ledger(self.fuel), (Decimal('0.00'), 0, Decimal('266.00'), 2))
+
+        expense.category = self.travel
+        expense.save()
+        self.assertEqual(self.ledger(self.fuel), (Decimal('0.00'), 0, Decimal('50.00'), 1))
+        self.assertEqual(self.ledger(self.travel), (Decimal('0.00'), 0, Decimal('216.00'), 1))
+
+        expense.expense_date = date(2024, 4, 2)
+        expense.save()
+        self.assertEqual(self.ledger(self.travel), (Decimal('0.00'), 0, Decimal('0.00'), 0))
+        self.assertEqual(self.ledger(self.travel, date(2024, 4, 1)), (Decimal('0.00'), 0, Decimal('216.00'), 1))
+
+    def test_delete(self):
+        approved = self.make_expense(status='APPROVED')
+        submitted = self.make_expense(status='SUBMITTED', amount=Decimal('40.00'), tax_amount=Decimal('0.00'))
+
+        approved.delete()
+        self.assertEqual(self.ledger(self.fuel), (Decimal('40.00'), 1, Decimal('0.00'), 0))
+        submitted.delete()
+        self.assertEqual(self.ledger(self.fuel), (Decimal('0.00'), 0, Decimal('0.00'), 0))
+
+
+class ExpenseFormBudgetTests(TestCase):
+    """ExpenseForm.clean() checks amount plus tax against the month's spend"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email='budget@example.com', password='password')
+        cls.category = ExpenseCategory.objects.create(name='Fuel', code='FUEL', budget_limit=Decimal('1000.00'))
+        cls.today = timezone.now().date()
+        cls.approved = Expense.objects.create(
+            title='Diesel',
+            category=cls.category,
+            amount=Decimal('700.00'),
+            tax_amount=Decimal('100.00'),
+            expense_date=cls.today,
+            payment_method='CASH',
+            submitted_by=cls.user,
+            status='APPROVED',
+        )
+
+    def form(self, amount, tax_amount, instance=None):
+        data = {
+            'title': 'Diesel',
+            'category': self.category.pk,
+            'amount': amount,
+            'currency': 'KES',
+            'tax_amount': tax_amount,
+            'expense_date': self.today.isoformat(),
+            'payment_method': 'CASH',
+        }
+        return ExpenseForm(data=data, instance=instance, user=self.user)
+
+    def test_tax_counts_towards_the_budget(self):
+        self.assertNotIn('amount', self.form('150.00', '0.00').errors)
+        self.assertIn('amount', self.form('150.00', '60.00').errors)
 
-# Create your tests here.
+    def test_editing_a_counted_expense_replaces_its_contribution(self):
+        self.assertNotIn('amount', self.form('850.00', '100.00', instance=self.approved).errors)
+        self.assertIn('amount', self.form('900.00', '101.00', instance=self.approved).errors)
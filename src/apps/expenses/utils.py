@@ -118,26 +118,13 @@ def calculate_monthly_trends(expenses, months=12):
 def calculate_budget_status(category, year=None, month=None):
     """
     Calculate budget status for a category in a given month.
+    Reads the category budget ledger; spend covers approved and paid expenses.
     """
     if not category.budget_limit:
         return None
     
-    if not year or not month:
-        now = timezone.now()
-        year = now.year
-        month = now.month
-    
-    # Get start and end of month
-    start_date = date(year, month, 1)
-    last_day = calendar.monthrange(year, month)[1]
-    end_date = date(year, month, last_day)
-    
-    # Calculate spent amount
-    spent = category.expenses.filter(
-        status='APPROVED',
-        expense_date__gte=start_date,
-        expense_date__lte=end_date
-    ).aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0.00')
+    entry = category.get_budget_entry(month, year)
+    spent = entry.spent_amount
     
     remaining = category.budget_limit - spent
     percentage = (spent / category.budget_limit * 100) if category.budget_limit > 0 else 0
@@ -145,6 +132,7 @@ def calculate_budget_status(category, year=None, month=None):
     return {
         'budget_limit': category.budget_limit,
         'spent': spent,
+        'pending': entry.pending_amount,
         'remaining': remaining,
         'percentage': round(percentage, 2),
         'is_over_budget': spent > category.budget_limit,
@@ -152,6 +140,27 @@ def calculate_budget_status(category, year=None, month=None):
     }
 
 
+def get_budget_overview(month=None):
+    """
+    Budget usage for every active category with a limit, from the ledger.
+    
+    Returns:
+        dict with categories (ExpenseCategory list with ledger rows attached),
+        total_budget and total_spent
+    """
+    from .models import CategoryBudgetLedger, ExpenseCategory
+    
+    categories = CategoryBudgetLedger.objects.attach(
+        ExpenseCategory.objects.filter(is_active=True, budget_limit__isnull=False),
+        month,
+    )
+    return {
+        'categories': categories,
+        'total_budget': sum((c.budget_limit for c in categories), Decimal('0.00')),
+        'total_spent': sum((c._budget_entry.spent_amount for c in categories), Decimal('0.00')),
+    }
+
+
 def calculate_reimbursement_amount(user, status='pending'):
     """
     Calculate total reimbursement amount for a user.
@@ -271,31 +280,27 @@ def get_expense_statistics(filters=None):
     }
 
 
-def identify_unusual_expenses(user, threshold_multiplier=3.0):
+def identify_unusual_expenses(user):
     """
-    Identify expenses that are unusually high compared to user's average.
+    Expenses of a user flagged by the nightly population-wide anomaly scan
+    (outliers against robust baselines and likely duplicates).
     """
+    from .anomalies import get_latest_anomalies
     from .models import Expense
     
-    # Calculate user's average expense
-    avg_expense = Expense.objects.filter(
-        submitted_by=user,
-        status='APPROVED'
-    ).aggregate(Avg('total_amount'))['total_amount__avg'] or Decimal('0.00')
-    
-    threshold = avg_expense * Decimal(str(threshold_multiplier))
+    scan = get_latest_anomalies() or {}
+    outliers = [row for row in scan.get('outliers', []) if row['user_id'] == user.pk]
+    duplicates = [row for row in scan.get('duplicates', []) if row['user_id'] == user.pk]
     
-    # Find expenses above threshold
-    unusual = Expense.objects.filter(
-        submitted_by=user,
-        total_amount__gt=threshold
-    ).order_by('-total_amount')
+    flagged_ids = {row['id'] for row in outliers} | {row['expense_id'] for row in duplicates}
+    unusual = Expense.objects.filter(pk__in=flagged_ids).order_by('-total_amount')
     
     return {
-        'average': avg_expense,
-        'threshold': threshold,
+        'generated_at': scan.get('generated_at'),
+        'outliers': outliers,
+        'duplicates': duplicates,
         'unusual_expenses': unusual,
-        'count': unusual.count()
+        'count': len(flagged_ids)
     }
 
 
@@ -421,77 +426,32 @@ def get_due_recurring_expenses():
     """
     Get recurring expenses that are due for generation.
     """
-    from .models import RecurringExpense
-    
-    today = timezone.now().date()
-    due_expenses = []
-    
-    active_recurring = RecurringExpense.objects.filter(
-        is_active=True,
-        start_date__lte=today
-    ).filter(
-        Q(end_date__isnull=True) | Q(end_date__gte=today)
-    )
-    
-    for recurring in active_recurring:
-        if should_generate_recurring(recurring):
-            due_expenses.append(recurring)
+    from .recurring import due_recurring_expenses
     
-    return due_expenses
+    return list(due_recurring_expenses())
 
 
 def should_generate_recurring(recurring):
     """
     Check if a recurring expense should generate a new expense.
     """
-    if not recurring.is_active:
-        return False
-    
     today = timezone.now().date()
-    
-    # Check if within date range
-    if today < recurring.start_date:
-        return False
-    if recurring.end_date and today > recurring.end_date:
-        return False
-    
-    # Check if already generated recently
-    if not recurring.last_generated:
-        return True
-    
-    days_since_last = (today - recurring.last_generated).days
-    
-    if recurring.frequency == 'WEEKLY':
-        return days_since_last >= 7
-    elif recurring.frequency == 'MONTHLY':
-        return days_since_last >= 30
-    elif recurring.frequency == 'QUARTERLY':
-        return days_since_last >= 90
-    elif recurring.frequency == 'YEARLY':
-        return days_since_last >= 365
-    
-    return False
+    return bool(
+        recurring.is_active
+        and recurring.next_due_date
+        and recurring.next_due_date <= today
+    )
 
 
 def generate_recurring_expenses(dry_run=False):
     """
-    Generate expenses from due recurring templates.
+    Generate expenses from due recurring templates, including occurrences
+    missed since the last run.
     Returns count of generated expenses.
     """
-    due_recurring = get_due_recurring_expenses()
-    count = 0
-    
-    for recurring in due_recurring:
-        if not dry_run:
-            try:
-                recurring.generate_expense()
-                count += 1
-            except Exception as e:
-                print(f"Error generating recurring expense {recurring.id}: {e}")
-        else:
-            count += 1
+    from .recurring import generate_due_recurring_expenses
     
-    return count
+    return generate_due_recurring_expenses(dry_run=dry_run)['generated']
 
 
 # ============================================================================
@@ -591,39 +551,48 @@ Please review and resubmit if necessary.
         )
 
 
-def notify_budget_threshold(category, percentage=80):
+def notify_budget_threshold(category, percentage=80, month=None):
     """
-    Send notification when category budget reaches threshold.
+    Notify staff that a category's monthly budget crossed a threshold.
+    Called once per crossing by CategoryBudgetLedger.objects.check_thresholds().
     """
-    budget_status = calculate_budget_status(category)
+    from django.contrib.auth import get_user_model
+    from apps.notifications.utils import create_bulk_notification
     
-    if budget_status and budget_status['percentage'] >= percentage:
-        # Notify admin users
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        admins = User.objects.filter(is_staff=True, is_active=True)
-        
-        for admin in admins:
-            if admin.email:
-                subject = f"Budget Alert: {category.name}"
-                message = f"""
-Budget threshold alert for category: {category.name}
+    month = month or timezone.now().date().replace(day=1)
+    budget_status = calculate_budget_status(category, month.year, month.month)
+    if not budget_status:
+        return []
+    
+    exceeded = percentage >= 100
+    title = (
+        f"Budget exceeded: {category.name}" if exceeded
+        else f"Budget alert: {category.name} at {budget_status['percentage']}%"
+    )
+    message = f"""
+Budget threshold alert for category: {category.name} ({month.strftime('%B %Y')})
 
 Budget Limit: {category.budget_limit}
 Spent: {budget_status['spent']} ({budget_status['percentage']}%)
 Remaining: {budget_status['remaining']}
 
 Please review expenses in this category.
-                """
-                
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [admin.email],
-                    fail_silently=True,
-                )
+    """.strip()
+    
+    admins = get_user_model().objects.filter(is_staff=True, is_active=True)
+    return create_bulk_notification(
+        admins,
+        title=title,
+        message=message,
+        notification_type='expense',
+        priority='urgent' if exceeded else 'high',
+        group_key=f'expense_budget_{category.pk}_{month:%Y%m}',
+        metadata={
+            'category_id': category.pk,
+            'month': month.isoformat(),
+            'threshold': percentage,
+        },
+    )
 
 
 # ============================================================================
@@ -648,21 +617,20 @@ def validate_expense_date(expense_date):
     return True, ""
 
 
-def validate_expense_amount(amount, category=None):
+def validate_expense_amount(amount, category=None, tax_amount=Decimal('0.00')):
     """
     Validate expense amount against limits.
+    
+    Budget spend is tax-inclusive, so the expense counts as amount + tax_amount.
     """
     if amount <= 0:
         return False, "Amount must be greater than zero."
     
     # Check against category budget if provided
     if category and category.budget_limit:
-        month_total = category.get_total_expenses(
-            start_date=date.today().replace(day=1),
-            end_date=date.today()
-        )
+        month_total = category.budget_spent
         
-        if (month_total + amount) > category.budget_limit:
+        if (month_total + amount + tax_amount) > category.budget_limit:
             return False, f"This expense would exceed the category budget limit of {category.budget_limit}."
     
     return True, ""
@@ -698,33 +666,25 @@ def get_dashboard_stats(user):
     Get statistics for expense dashboard.
     """
     from .models import Expense
+    from .kpis import expense_aggregates
     
-    # User's expenses
-    expenses = Expense.objects.filter(submitted_by=user)
+    # User's expenses, counted with one conditional-aggregate query
+    kpis = Expense.objects.filter(submitted_by=user).aggregate(
+        **expense_aggregates(timezone.now().date())
+    )
     
-    # Count by status
-    status_counts = {}
-    for status, label in Expense.STATUS_CHOICES:
-        status_counts[status] = expenses.filter(status=status).count()
+    status_counts = {
+        status: kpis[f'status_{status.lower()}']
+        for status, label in Expense.STATUS_CHOICES
+    }
     
     # Pending reimbursement
     pending_reimbursement = calculate_reimbursement_amount(user, status='pending')
     
-    # This month's expenses
-    now = timezone.now()
-    month_start = now.replace(day=1).date()
-    month_expenses = expenses.filter(
-        expense_date__gte=month_start,
-        status='APPROVED'
-    )
-    month_total = month_expenses.aggregate(
-        Sum('total_amount')
-    )['total_amount__sum'] or Decimal('0.00')
-    
     return {
-        'total_expenses': expenses.count(),
+        'total_expenses': kpis['total_count'],
         'status_counts': status_counts,
         'pending_reimbursement': pending_reimbursement,
-        'this_month_total': month_total,
-        'this_month_count': month_expenses.count(),
+        'this_month_total': kpis['month_total'] or Decimal('0.00'),
+        'this_month_count': kpis['month_count'],
     }
\ No newline at end of file
@@ -17,13 +17,17 @@ from decimal import Decimal
 
 from .models import (
     Expense, ExpenseCategory, ExpenseReceipt, ExpenseReport,
-    ExpenseTag, RecurringExpense, ExpenseApprovalWorkflow
+    ExpenseTag, RecurringExpense, ExpenseApprovalWorkflow, CategoryBudgetLedger
 )
 from .forms import (
     ExpenseForm, ExpenseReceiptForm, ExpenseApprovalForm,
     ExpenseCategoryForm, ExpenseReportForm, RecurringExpenseForm,
     ExpenseSearchForm, BulkExpenseActionForm
 )
+from .utils import calculate_budget_status
+from .anomalies import get_latest_anomalies
+from .kpis import expense_aggregates
+from apps.dashboard.kpis import get_snapshot
 
 
 # ============================================================================
@@ -466,8 +470,14 @@ def category_list(request):
         total_amount=Sum('expenses__total_amount')
     ).order_by('name')
     
+    # Current month budget usage from the ledger (one query)
+    categories = CategoryBudgetLedger.objects.attach(categories)
+    budgeted = [category for category in categories if category.budget_limit]
+    
     context = {
         'categories': categories,
+        'total_budget': sum((c.budget_limit for c in budgeted), Decimal('0.00')),
+        'total_spent': sum((c.budget_spent for c in budgeted), Decimal('0.00')),
     }
     
     return render(request, 'expenses/category_list.html', context)
@@ -494,18 +504,14 @@ def category_expenses(request, pk):
     
     # Check budget status
     budget_info = None
-    if category.budget_limit:
-        now = timezone.now()
-        month_total = category.get_total_expenses(
-            start_date=now.replace(day=1).date(),
-            end_date=now.date()
-        )
+    budget_status = calculate_budget_status(category)
+    if budget_status:
         budget_info = {
-            'limit': category.budget_limit,
-            'used': month_total,
-            'remaining': category.budget_limit - month_total,
-            'percentage': (month_total / category.budget_limit * 100) if category.budget_limit > 0 else 0,
-            'is_over': category.is_over_budget()
+            'limit': budget_status['budget_limit'],
+            'used': budget_status['spent'],
+            'remaining': budget_status['remaining'],
+            'percentage': budget_status['percentage'],
+            'is_over': budget_status['is_over_budget'],
         }
     
     # Pagination
@@ -696,6 +702,11 @@ def recurring_generate(request, pk):
         }, status=400)
     
     expense = recurring.generate_expense()
+    if expense is None:
+        return JsonResponse({
+            'error': 'Schedule ended',
+            'message': 'This template has no occurrences left to generate'
+        }, status=400)
     messages.success(request, f'Expense created from template: {expense.title}')
     
     return JsonResponse({
@@ -751,7 +762,9 @@ def bulk_actions(request):
             messages.success(request, f'{count} expense(s) rejected.')
         
         elif action == 'submit':
-            expenses.update(status='SUBMITTED')
+            # update() skips save signals, so move the ledger explicitly
+            CategoryBudgetLedger.objects.record_status_change(expenses, 'SUBMITTED')
+            expenses.update(status='SUBMITTED', updated_at=timezone.now())
             messages.success(request, f'{count} expense(s) submitted for approval.')
         
         elif action == 'delete':
@@ -772,21 +785,27 @@ def expense_dashboard(request):
     end_date = timezone.now().date()
     start_date = end_date - timedelta(days=365)
     
-    # User's expenses
+    # User's expenses; organisation-wide cards come from the KPI snapshot
+    kpi_snapshot = None
     if request.user.has_perm('expenses.view_all_expenses'):
         expenses = Expense.objects.all()
+        kpi_snapshot = get_snapshot('expenses')
+        kpi_values = kpi_snapshot.values
     else:
         expenses = Expense.objects.filter(submitted_by=request.user)
+        kpi_values = expenses.aggregate(**expense_aggregates(end_date))
     
     # Overall stats
     stats = {
-        'total_expenses': expenses.count(),
-        'pending_approval': expenses.filter(status='SUBMITTED').count(),
-        'approved': expenses.filter(status='APPROVED').count(),
-        'rejected': expenses.filter(status='REJECTED').count(),
-        'total_amount': expenses.filter(status='APPROVED').aggregate(
-            Sum('total_amount')
-        )['total_amount__sum'] or Decimal('0.00'),
+        'total_count': kpi_values['total_count'],
+        'pending_count': kpi_values['pending_count'],
+        'total_amount': kpi_values['approved_amount'] or Decimal('0.00'),
+        'month_total': kpi_values['month_total'] or Decimal('0.00'),
+        'month_count': kpi_values['month_count'],
+    }
+    status_stats = {
+        status.lower(): kpi_values[f'status_{status.lower()}']
+        for status, _ in Expense.STATUS_CHOICES
     }
     
     # Monthly trend
@@ -800,27 +819,66 @@ def expense_dashboard(request):
         count=Count('id')
     ).order_by('month')
     
-    # By category
-    category_data = expenses.filter(
-        status='APPROVED',
-        expense_date__gte=start_date
-    ).values(
-        'category__name'
-    ).annotate(
-        total=Sum('total_amount'),
-        count=Count('id')
-    ).order_by('-total')[:10]
+    # By category: organisation-wide spend comes from the budget ledger
+    if request.user.has_perm('expenses.view_all_expenses'):
+        category_data = CategoryBudgetLedger.objects.filter(
+            month__gte=start_date.replace(day=1)
+        ).values(
+            'category__name', 'category__icon', 'category__color'
+        ).annotate(
+            total=Sum('spent_amount'),
+            count=Sum('spent_count')
+        ).filter(count__gt=0).order_by('-total')[:10]
+    else:
+        category_data = expenses.filter(
+            status__in=['APPROVED', 'PAID'],
+            expense_date__gte=start_date
+        ).values(
+            'category__name', 'category__icon', 'category__color'
+        ).annotate(
+            total=Sum('total_amount'),
+            count=Count('id')
+        ).order_by('-total')[:10]
+    
+    category_data = list(category_data)
+    category_total = sum((row['total'] or Decimal('0.00') for row in category_data), Decimal('0.00'))
+    category_stats = [
+        {
+            'name': row['category__name'],
+            'icon': row['category__icon'],
+            'color': row['category__color'],
+            'total': row['total'],
+            'count': row['count'],
+            'percentage': round(row['total'] / category_total * 100, 2) if category_total else 0,
+        }
+        for row in category_data
+    ]
     
     # Recent expenses
     recent_expenses = expenses.select_related(
         'category', 'submitted_by'
     ).order_by('-expense_date')[:10]
     
+    # Flagged expenses from the nightly anomaly scan
+    anomalies = get_latest_anomalies()
+    if anomalies and not request.user.has_perm('expenses.view_all_expenses'):
+        anomalies = {
+            **anomalies,
+            'outliers': [row for row in anomalies['outliers'] if row['user_id'] == request.user.pk],
+            'duplicates': [row for row in anomalies['duplicates'] if row['user_id'] == request.user.pk],
+        }
+    
     context = {
         'stats': stats,
+        'status_stats': status_stats,
+        'kpi_snapshot': kpi_snapshot,
         'monthly_data': list(monthly_data),
-        'category_data': list(category_data),
+        'category_data': category_data,
+        'category_stats': category_stats,
         'recent_expenses': recent_expenses,
+        'anomaly_outliers': anomalies['outliers'][:10] if anomalies else [],
+        'anomaly_duplicates': anomalies['duplicates'][:10] if anomalies else [],
+        'anomalies_generated_at': anomalies['generated_at'] if anomalies else None,
     }
     
     return render(request, 'expenses/dashboard.html', context)
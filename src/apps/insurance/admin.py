@@ -8,8 +8,9 @@ from django.urls import reverse
 from django.db.models import Sum, Count, Q
 from django.utils import timezone
 from django.http import HttpResponse
-from .models import InsuranceProvider, InsurancePolicy, InsuranceClaim, InsurancePayment
+from .models import InsuranceProvider, InsurancePolicy, InsuranceClaim, InsurancePayment, ReminderRun
 import csv
+from utils.admin import PerformanceModelAdmin
 
 
 # ==================== INLINE ADMINS ====================
@@ -59,7 +60,7 @@ class InsurancePaymentInline(admin.TabularInline):
 # ==================== INSURANCE PROVIDER ADMIN ====================
 
 @admin.register(InsuranceProvider)
-class InsuranceProviderAdmin(admin.ModelAdmin):
+class InsuranceProviderAdmin(PerformanceModelAdmin):
     """
     Admin interface for InsuranceProvider model
     """
@@ -141,21 +142,28 @@ class InsuranceProviderAdmin(admin.ModelAdmin):
     list_per_page = 25
     date_hierarchy = 'created_at'
     
+    list_annotations = {
+        'active_policy_total': Count('policies', filter=Q(policies__status='active')),
+        'policy_total': Count('policies'),
+    }
+    
     actions = ['activate_providers', 'deactivate_providers']
     
     def active_policies_display(self, obj):
         """Display count of active policies"""
-        count = obj.active_policies_count
+        count = obj.active_policy_total
         return format_html(
             '<span style="color: #28a745; font-weight: bold;">{}</span>',
             count
         )
     active_policies_display.short_description = 'Active Policies'
+    active_policies_display.admin_order_field = 'active_policy_total'
     
     def total_policies_display(self, obj):
         """Display total policies count"""
-        return format_html('<strong>{}</strong>', obj.total_policies_count)
+        return format_html('<strong>{}</strong>', obj.policy_total)
     total_policies_display.short_description = 'Total Policies'
+    total_policies_display.admin_order_field = 'policy_total'
     
     def is_active_badge(self, obj):
         """Display active status as badge"""
@@ -193,7 +201,7 @@ class InsuranceProviderAdmin(admin.ModelAdmin):
 # ==================== INSURANCE POLICY ADMIN ====================
 
 @admin.register(InsurancePolicy)
-class InsurancePolicyAdmin(admin.ModelAdmin):
+class InsurancePolicyAdmin(PerformanceModelAdmin):
     """
     Admin interface for InsurancePolicy model
     """
@@ -336,7 +344,7 @@ class InsurancePolicyAdmin(admin.ModelAdmin):
     
     def premium_display(self, obj):
         """Display premium amount formatted"""
-        return format_html('KES {:,.2f}', obj.premium_amount)
+        return format_html('KES {}', f'{obj.premium_amount:,.2f}')
     premium_display.short_description = 'Premium'
     premium_display.admin_order_field = 'premium_amount'
     
@@ -425,7 +433,7 @@ class InsurancePolicyAdmin(admin.ModelAdmin):
 # ==================== INSURANCE CLAIM ADMIN ====================
 
 @admin.register(InsuranceClaim)
-class InsuranceClaimAdmin(admin.ModelAdmin):
+class InsuranceClaimAdmin(PerformanceModelAdmin):
     """
     Admin interface for InsuranceClaim model
     """
@@ -565,7 +573,7 @@ class InsuranceClaimAdmin(admin.ModelAdmin):
     
     def claimed_amount_display(self, obj):
         """Display claimed amount"""
-        return format_html('KES {:,.2f}', obj.claimed_amount)
+        return format_html('KES {}', f'{obj.claimed_amount:,.2f}')
     claimed_amount_display.short_description = 'Claimed'
     claimed_amount_display.admin_order_field = 'claimed_amount'
     
@@ -573,8 +581,8 @@ class InsuranceClaimAdmin(admin.ModelAdmin):
         """Display approved amount"""
         if obj.approved_amount > 0:
             return format_html(
-                '<span style="color: #28a745; font-weight: bold;">KES {:,.2f}</span>',
-                obj.approved_amount
+                '<span style="color: #28a745; font-weight: bold;">KES {}</span>',
+                f'{obj.approved_amount:,.2f}'
             )
         return '-'
     approved_amount_display.short_description = 'Approved'
@@ -647,7 +655,7 @@ class InsuranceClaimAdmin(admin.ModelAdmin):
 # ==================== INSURANCE PAYMENT ADMIN ====================
 
 @admin.register(InsurancePayment)
-class InsurancePaymentAdmin(admin.ModelAdmin):
+class InsurancePaymentAdmin(PerformanceModelAdmin):
     """
     Admin interface for InsurancePayment model
     """
@@ -714,8 +722,8 @@ class InsurancePaymentAdmin(admin.ModelAdmin):
     def amount_display(self, obj):
         """Display amount formatted"""
         return format_html(
-            '<span style="color: #28a745; font-weight: bold;">KES {:,.2f}</span>',
-            obj.amount
+            '<span style="color: #28a745; font-weight: bold;">KES {}</span>',
+            f'{obj.amount:,.2f}'
         )
     amount_display.short_description = 'Amount'
     amount_display.admin_order_field = 'amount'
@@ -744,4 +752,29 @@ class InsurancePaymentAdmin(admin.ModelAdmin):
         """Save model with user tracking"""
         if not change:  # New object
             obj.recorded_by = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(ReminderRun)
+class ReminderRunAdmin(PerformanceModelAdmin):
+    """Read-only admin for bulk expiry reminder runs"""
+    
+    list_display = (
+        'id', 'status', 'reminder_type', 'days_threshold', 'progress_processed',
+        'progress_total', 'sms_sent', 'email_sent', 'failed', 'created_by', 'created_at'
+    )
+    
+    list_filter = ('status', 'reminder_type')
+    
+    date_hierarchy = 'created_at'
+    
+    def get_queryset(self, request):
+        """Optimize queryset"""
+        qs = super().get_queryset(request)
+        return qs.select_related('created_by')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
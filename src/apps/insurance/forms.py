@@ -268,7 +268,7 @@ class BulkPolicyReminderForm(forms.Form):
         required=False,
         widget=forms.Textarea(attrs={
             'class': 'w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent',
-            'placeholder': 'Custom message (Optional). Use {policy_number}, {expiry_date}, {vehicle} as placeholders',
+            'placeholder': 'Custom message (Optional). Use {policy_number}, {expiry_date}, {vehicle}, {days_left}, {provider} as placeholders',
             'rows': 4
         })
     )
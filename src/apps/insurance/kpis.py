@@ -0,0 +1,34 @@
+"""
+Insurance dashboard KPIs (see apps.dashboard.kpis)
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+
+from apps.dashboard import kpis
+
+from .models import InsuranceClaim, InsurancePolicy
+
+
+@kpis.register('insurance', models=[InsurancePolicy])
+def policy_kpis(today):
+    active = Q(status='active')
+    return InsurancePolicy.objects.all(), {
+        'total_policies': Count('id'),
+        'active_policies': Count('id', filter=active),
+        'expiring_30_days': Count(
+            'id', filter=active & Q(end_date__gte=today, end_date__lte=today + timedelta(days=30))
+        ),
+        'expired_policies': Count('id', filter=Q(status='expired')),
+        'total_premium': Sum('premium_amount', filter=active),
+    }
+
+
+@kpis.register('insurance', models=[InsuranceClaim])
+def claim_kpis(today):
+    return InsuranceClaim.objects.all(), {
+        'total_claims': Count('id'),
+        'pending_claims': Count('id', filter=Q(status__in=['pending', 'under_review'])),
+        'total_claimed': Sum('claimed_amount'),
+        'total_settled': Sum('settled_amount', filter=Q(status='settled')),
+    }
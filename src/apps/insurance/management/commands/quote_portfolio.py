@@ -0,0 +1,78 @@
+"""
+Management command to re-price the insured fleet under one or more rate
+scenarios, compare the totals per provider and optionally export to Excel
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.insurance.quoting import (
+    DEFAULT_SCENARIO, compare_providers, export_quotes_excel, load_portfolio,
+    parse_scenario, price_portfolio, verify_against_scalar,
+)
+
+
+class Command(BaseCommand):
+    help = 'Quote every active policy under rate scenarios and compare premiums per provider'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios',
+            nargs='*',
+            help='Scenario specs such as "discount:rates=0.9" or "strict:claims_loading=0.4,third_party=0.025" '
+                 '(current rates are always included)',
+        )
+        parser.add_argument('--provider', type=int, action='append', help='Limit to provider ID (repeatable)')
+        parser.add_argument('--excel', default=None, help='Write the comparison and quotes to this .xlsx path')
+        parser.add_argument(
+            '--verify',
+            type=int,
+            nargs='?',
+            const=-1,
+            default=None,
+            help='Check quotes against calculate_premium_estimate (optionally only the first N policies)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scenarios = [DEFAULT_SCENARIO] + [parse_scenario(spec) for spec in options['scenarios']]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        portfolio = load_portfolio(provider_ids=options['provider'])
+        loaded = time.perf_counter()
+        try:
+            quotes = price_portfolio(portfolio, scenarios)
+        except ValueError as e:
+            raise CommandError(str(e))
+        priced = time.perf_counter()
+
+        policies = len(portfolio['policy_id'])
+        self.stdout.write(
+            f'{policies} policies x {len(scenarios)} scenario(s): '
+            f'loaded in {loaded - started:.2f}s, priced in {priced - loaded:.3f}s'
+        )
+
+        comparison = compare_providers(portfolio, quotes)
+        for row in comparison:
+            self.stdout.write(f"\n{row['provider']} ({row['policies']} policies)")
+            self.stdout.write(f"  {'Current':<24} KES {row['current_premium']:>16,.2f}")
+            for scenario in row['scenarios']:
+                self.stdout.write(
+                    f"  {scenario['name'][:24]:<24} KES {scenario['premium']:>16,.2f} "
+                    f"({scenario['change_percentage']:+.1f}%)"
+                )
+
+        if options['verify'] is not None:
+            limit = None if options['verify'] < 0 else options['verify']
+            mismatches = verify_against_scalar(portfolio, quotes, limit=limit)
+            if mismatches:
+                for policy_id, name, engine, scalar in mismatches[:20]:
+                    self.stderr.write(f'Policy {policy_id} / {name}: engine {engine} != scalar {scalar}')
+                raise CommandError(f'{len(mismatches)} quote(s) disagree with calculate_premium_estimate')
+            self.stdout.write(self.style.SUCCESS('\nAll quotes match calculate_premium_estimate exactly.'))
+
+        if options['excel']:
+            export_quotes_excel(portfolio, quotes, comparison, options['excel'])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['excel']}"))
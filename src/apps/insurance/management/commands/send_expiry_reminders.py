@@ -0,0 +1,53 @@
+"""
+Management command to send expiry reminders for policies expiring soon,
+either queued as a background reminder run or in this process
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.insurance.reminders import (
+    PAGE_SIZE, ReminderRunInProgress, create_reminder_run, enqueue_reminder_run, process_reminder_run,
+)
+
+
+class Command(BaseCommand):
+    help = 'Send expiry reminders for active policies expiring within the given number of days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Expiry window in days (default: 30)')
+        parser.add_argument(
+            '--type',
+            choices=['sms', 'email', 'both'],
+            default='both',
+            help='Reminder channel (default: both)',
+        )
+        parser.add_argument(
+            '--queue',
+            action='store_true',
+            help='Queue the run for the Celery workers instead of sending here',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=PAGE_SIZE,
+            help=f'Policies per page (default: {PAGE_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            run = create_reminder_run(days_threshold=options['days'], reminder_type=options['type'])
+        except ReminderRunInProgress as e:
+            raise CommandError(str(e))
+
+        if options['queue']:
+            if enqueue_reminder_run(run):
+                self.stdout.write(self.style.SUCCESS(
+                    f'Queued reminder run #{run.pk} for {run.progress_total} policies.'
+                ))
+                return
+            self.stdout.write(self.style.WARNING('Task queue unavailable; sending in this process.'))
+
+        process_reminder_run(run, page_size=options['page_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Reminder run #{run.pk}: {run.progress_processed} policies, {run.sms_sent} SMS, '
+            f'{run.email_sent} emails, {run.failed} without a reminder.'
+        ))
@@ -0,0 +1,50 @@
+# Generated by Django 5.1 on 2026-10-18 21:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days_threshold', models.PositiveIntegerField(default=30, help_text='Remind policies expiring within this many days')),
+                ('reminder_type', models.CharField(choices=[('sms', 'SMS'), ('email', 'Email'), ('both', 'SMS & Email')], default='both', max_length=10)),
+                ('custom_message', models.TextField(blank=True, help_text='Optional message template with {policy_number}, {expiry_date}, {vehicle}, {days_left}, {provider}')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('task_id', models.CharField(blank=True, max_length=255)),
+                ('last_policy_id', models.PositiveIntegerField(default=0, help_text='Keyset cursor: highest policy ID already processed')),
+                ('progress_total', models.PositiveIntegerField(default=0)),
+                ('progress_processed', models.PositiveIntegerField(default=0)),
+                ('sms_sent', models.PositiveIntegerField(default=0)),
+                ('email_sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Reminder Run',
+                'verbose_name_plural': 'Reminder Runs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='insurancepolicy',
+            index=models.Index(fields=['status', 'reminder_sent', 'end_date'], name='policy_reminder_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='reminderrun',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='insurance_reminder_runs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
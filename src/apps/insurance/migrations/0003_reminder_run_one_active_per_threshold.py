@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-18 23:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_active_runs(apps, schema_editor):
+    """Keep only the newest queued or running run per threshold"""
+    ReminderRun = apps.get_model('insurance', 'ReminderRun')
+    seen = set()
+    duplicates = []
+    for run in ReminderRun.objects.filter(status__in=['queued', 'running']).order_by('-created_at', '-pk'):
+        if run.days_threshold in seen:
+            duplicates.append(run.pk)
+        seen.add(run.days_threshold)
+    ReminderRun.objects.filter(pk__in=duplicates).update(
+        status='failed', error='Superseded by a newer run for the same threshold'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insurance', '0002_reminder_runs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_runs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reminderrun',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('days_threshold',), name='unique_active_reminder_run'),
+        ),
+    ]
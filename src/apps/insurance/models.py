@@ -373,6 +373,8 @@ class InsurancePolicy(models.Model):
             models.Index(fields=['start_date', 'end_date']),
             models.Index(fields=['status']),
             models.Index(fields=['vehicle']),
+            # Expiry reminder pages: status='active', reminder_sent=False, end_date range
+            models.Index(fields=['status', 'reminder_sent', 'end_date'], name='policy_reminder_due_idx'),
         ]
     
     def __str__(self):
@@ -817,4 +819,99 @@ class InsurancePayment(models.Model):
             
             self.receipt_number = f'INS-{date_str}-{new_num:04d}'
         
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+# ==================== REMINDER RUN MODEL ====================
+
+class ReminderRun(models.Model):
+    """
+    One bulk expiry reminder job, processed page by page in the background
+    """
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    REMINDER_TYPE_CHOICES = [
+        ('sms', 'SMS'),
+        ('email', 'Email'),
+        ('both', 'SMS & Email'),
+    ]
+    
+    days_threshold = models.PositiveIntegerField(
+        default=30,
+        help_text="Remind policies expiring within this many days"
+    )
+    
+    reminder_type = models.CharField(
+        max_length=10,
+        choices=REMINDER_TYPE_CHOICES,
+        default='both'
+    )
+    
+    custom_message = models.TextField(
+        blank=True,
+        help_text="Optional message template with {policy_number}, {expiry_date}, {vehicle}, {days_left}, {provider}"
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued'
+    )
+    
+    # Background processing progress
+    task_id = models.CharField(max_length=255, blank=True)
+    last_policy_id = models.PositiveIntegerField(
+        default=0,
+        help_text="Keyset cursor: highest policy ID already processed"
+    )
+    progress_total = models.PositiveIntegerField(default=0)
+    progress_processed = models.PositiveIntegerField(default=0)
+    sms_sent = models.PositiveIntegerField(default=0)
+    email_sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    
+    # System Fields
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='insurance_reminder_runs'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Reminder Run'
+        verbose_name_plural = 'Reminder Runs'
+        constraints = [
+            # One queued or running run per threshold
+            models.UniqueConstraint(
+                fields=['days_threshold'],
+                condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_reminder_run',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Reminder run #{self.pk} ({self.get_status_display()})"
+    
+    @property
+    def is_running(self):
+        """Whether the run is queued or still processing"""
+        return self.status in ('queued', 'running')
+    
+    def get_progress_percentage(self):
+        """Percentage of selected policies processed"""
+        if self.progress_total:
+            return int(self.progress_processed * 100 / self.progress_total)
+        return 100 if self.status == 'completed' else 0
@@ -0,0 +1,384 @@
+"""
+Vectorized premium quoting over the insured fleet.
+
+load_portfolio() reads the pricing inputs of every policy (sum insured,
+policy type, vehicle age, driver age, recent claims) into numpy arrays with
+one query. price_portfolio() then evaluates the premium formula of
+utils.calculate_premium_estimate for every policy x scenario at once.
+
+A scenario is a dict shaped like DEFAULT_SCENARIO (base rates per policy
+type plus age and claims loadings); make_scenario() derives one from the
+defaults. Premiums are computed in exact integer arithmetic (cents x rate x
+loading factor), so each quote equals the scalar Decimal result exactly;
+verify_against_scalar() checks that on real data.
+"""
+
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import InsuranceClaim, InsurancePolicy, InsuranceProvider
+
+DEFAULT_SCENARIO = {
+    'name': 'Current rates',
+    'base_rates': {
+        'comprehensive': Decimal('0.05'),
+        'third_party_fire_theft': Decimal('0.03'),
+        'third_party': Decimal('0.02'),
+    },
+    'default_rate': Decimal('0.03'),
+    'old_vehicle_age': 10,
+    'old_vehicle_loading': Decimal('0.20'),
+    'young_driver_age': 25,
+    'young_driver_loading': Decimal('0.30'),
+    'senior_driver_age': 65,
+    'senior_driver_loading': Decimal('0.15'),
+    'claims_loading': Decimal('0.25'),
+}
+
+LOADINGS = ('old_vehicle_loading', 'young_driver_loading', 'senior_driver_loading', 'claims_loading')
+THRESHOLDS = ('old_vehicle_age', 'young_driver_age', 'senior_driver_age')
+
+POLICY_TYPES = [value for value, _ in InsurancePolicy.POLICY_TYPE_CHOICES]
+
+# Rates and loadings are held as integers at these scales, which bounds the
+# precision a scenario may use (0.0001% of value, 0.01% loading)
+RATE_SCALE = 10 ** 6
+LOADING_SCALE = 10 ** 4
+
+# Claims within this many days count as claims history
+CLAIMS_LOOKBACK_DAYS = 3 * 365
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+# ============================================================================
+# Scenarios
+# ============================================================================
+
+def _scaled(value, scale, label):
+    scaled = Decimal(value) * scale
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"{label} {value} has more precision than the quoting engine supports")
+    return int(scaled)
+
+
+def make_scenario(name, base_rates=None, rate_factor=None, **overrides):
+    """
+    Copy DEFAULT_SCENARIO with changes.
+
+    Args:
+        name: Scenario label
+        base_rates: {policy_type: rate} replacing individual base rates
+        rate_factor: Multiplier applied to every base rate (and the default)
+        **overrides: Any other DEFAULT_SCENARIO key, e.g. claims_loading
+    """
+    unknown = set(overrides) - set(DEFAULT_SCENARIO)
+    if unknown:
+        raise ValueError(f"Unknown scenario setting(s): {', '.join(sorted(unknown))}")
+
+    scenario = {**DEFAULT_SCENARIO, 'base_rates': dict(DEFAULT_SCENARIO['base_rates']), 'name': name}
+    scenario['base_rates'].update({key: Decimal(str(rate)) for key, rate in (base_rates or {}).items()})
+    for key, value in overrides.items():
+        scenario[key] = int(value) if key in THRESHOLDS else Decimal(str(value))
+
+    if rate_factor is not None:
+        factor = Decimal(str(rate_factor))
+        scenario['base_rates'] = {key: rate * factor for key, rate in scenario['base_rates'].items()}
+        scenario['default_rate'] = scenario['default_rate'] * factor
+
+    for policy_type, rate in [*scenario['base_rates'].items(), ('default', scenario['default_rate'])]:
+        _scaled(rate, RATE_SCALE, f'{policy_type} rate')
+    for key in LOADINGS:
+        _scaled(scenario[key], LOADING_SCALE, key)
+    return scenario
+
+
+def parse_scenario(spec):
+    """
+    Build a scenario from text such as "renegotiated:rates=0.9,claims_loading=0.3".
+
+    "rates" is a factor on every base rate; policy type names set that base
+    rate; other keys are DEFAULT_SCENARIO settings.
+    """
+    name, _, settings = spec.partition(':')
+    base_rates, overrides, rate_factor = {}, {}, None
+    for item in filter(None, settings.split(',')):
+        key, sep, value = item.partition('=')
+        key = key.strip()
+        if not sep:
+            raise ValueError(f"Expected key=value, got '{item}'")
+        if key == 'rates':
+            rate_factor = value.strip()
+        elif key in POLICY_TYPES:
+            base_rates[key] = value.strip()
+        else:
+            overrides[key] = value.strip()
+    return make_scenario(name.strip() or spec, base_rates, rate_factor, **overrides)
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+def load_portfolio(statuses=('active',), provider_ids=None, today=None):
+    """
+    Load the pricing inputs of every matching policy as numpy arrays.
+
+    Returns:
+        dict of equal-length arrays: policy_id, policy_number, vehicle_id,
+        provider_id, policy_type (index into POLICY_TYPES, len(POLICY_TYPES)
+        for unknown types), value_cents, premium_cents (current premium),
+        vehicle_age, driver_age (0 when unknown) and has_claims; plus
+        providers {id: name}
+    """
+    today = today or timezone.now().date()
+
+    recent_claims = InsuranceClaim.objects.filter(
+        policy__vehicle=OuterRef('vehicle'),
+        claim_date__gte=today - timedelta(days=CLAIMS_LOOKBACK_DAYS),
+    )
+    policies = InsurancePolicy.objects.filter(status__in=statuses)
+    if provider_ids:
+        policies = policies.filter(provider_id__in=provider_ids)
+
+    rows = list(
+        policies.annotate(has_claims=Exists(recent_claims))
+        .values_list(
+            'pk', 'policy_number', 'vehicle_id', 'provider_id', 'policy_type',
+            'sum_insured', 'premium_amount', 'vehicle__year', 'client__date_of_birth', 'has_claims',
+        )
+        .order_by('pk')
+    )
+    columns = list(zip(*rows)) or [()] * 10
+    (policy_ids, numbers, vehicle_ids, provider_col, types,
+     values, premiums, years, births, claims) = columns
+
+    type_codes = {policy_type: code for code, policy_type in enumerate(POLICY_TYPES)}
+
+    def age(birth):
+        if birth is None:
+            return 0
+        return today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
+
+    provider_id = np.array(provider_col, dtype=np.int64)
+    return {
+        'policy_id': np.array(policy_ids, dtype=np.int64),
+        'policy_number': np.array(numbers, dtype=object),
+        'vehicle_id': np.array(vehicle_ids, dtype=np.int64),
+        'provider_id': provider_id,
+        'policy_type': np.array([type_codes.get(t, len(POLICY_TYPES)) for t in types], dtype=np.int64),
+        'value_cents': np.array([int(v.scaleb(2)) for v in values], dtype=np.int64),
+        'premium_cents': np.array([int(p.scaleb(2)) for p in premiums], dtype=np.int64),
+        'vehicle_age': today.year - np.array(years, dtype=np.int64),
+        'driver_age': np.array([age(b) for b in births], dtype=np.int64),
+        'has_claims': np.array(claims, dtype=bool),
+        'providers': dict(
+            InsuranceProvider.objects.filter(pk__in=np.unique(provider_id).tolist()).values_list('pk', 'name')
+        ),
+    }
+
+
+# ============================================================================
+# Pricing
+# ============================================================================
+
+def price_portfolio(portfolio, scenarios):
+    """
+    Quote every policy under every scenario.
+
+    Returns:
+        dict with scenarios, numerators (S x N premiums in units of
+        1 / denominator KES), denominator and premium_cents (S x N,
+        rounded half up)
+    """
+    scenarios = list(scenarios)
+    size = len(portfolio['policy_id'])
+
+    # Base rate per (scenario, policy type); the last column is the default rate
+    rate_table = np.array([
+        [_scaled(scenario['base_rates'].get(t, scenario['default_rate']), RATE_SCALE, f'{t} rate')
+         for t in POLICY_TYPES]
+        + [_scaled(scenario['default_rate'], RATE_SCALE, 'default rate')]
+        for scenario in scenarios
+    ], dtype=np.int64).reshape(len(scenarios), len(POLICY_TYPES) + 1)
+    loadings = {
+        key: np.array([_scaled(s[key], LOADING_SCALE, key) for s in scenarios], dtype=np.int64)[:, None]
+        for key in LOADINGS
+    }
+    thresholds = {key: np.array([s[key] for s in scenarios], dtype=np.int64)[:, None] for key in THRESHOLDS}
+
+    driver_age = portfolio['driver_age'][None, :]
+    has_driver = driver_age > 0
+    young = has_driver & (driver_age < thresholds['young_driver_age'])
+    senior = has_driver & ~young & (driver_age > thresholds['senior_driver_age'])
+    old_vehicle = portfolio['vehicle_age'][None, :] > thresholds['old_vehicle_age']
+    claims = np.broadcast_to(portfolio['has_claims'][None, :], (len(scenarios), size))
+
+    factor = (
+        LOADING_SCALE
+        + old_vehicle * loadings['old_vehicle_loading']
+        + young * loadings['young_driver_loading']
+        + senior * loadings['senior_driver_loading']
+        + claims * loadings['claims_loading']
+    )
+    rates = rate_table[:, portfolio['policy_type']]
+    values = portfolio['value_cents'][None, :]
+
+    # Fall back to Python integers when the products could overflow int64
+    bound = (
+        int(values.max(initial=0)) * int(rates.max(initial=0)) * int(factor.max(initial=0))
+    )
+    dtype = np.int64 if bound < _INT64_MAX else object
+    numerators = values.astype(dtype) * rates.astype(dtype) * factor.astype(dtype)
+
+    scale = RATE_SCALE * LOADING_SCALE
+    return {
+        'scenarios': scenarios,
+        'numerators': numerators,
+        'denominator': 100 * scale,
+        'premium_cents': ((numerators + scale // 2) // scale).astype(np.int64),
+    }
+
+
+def quoted_premium(quotes, scenario_index, position):
+    """Exact Decimal premium of one policy under one scenario."""
+    return Decimal(int(quotes['numerators'][scenario_index, position])) / quotes['denominator']
+
+
+def verify_against_scalar(portfolio, quotes, limit=None):
+    """
+    Re-price policies with utils.calculate_premium_estimate and compare.
+
+    Returns:
+        list of (policy_id, scenario name, engine premium, scalar premium)
+        for every disagreement (empty when the engine agrees exactly)
+    """
+    from .utils import calculate_premium_estimate
+
+    mismatches = []
+    positions = range(len(portfolio['policy_id']) if limit is None else min(limit, len(portfolio['policy_id'])))
+    for s, scenario in enumerate(quotes['scenarios']):
+        for i in positions:
+            code = portfolio['policy_type'][i]
+            scalar = calculate_premium_estimate(
+                Decimal(int(portfolio['value_cents'][i])).scaleb(-2),
+                POLICY_TYPES[code] if code < len(POLICY_TYPES) else None,
+                vehicle_age=int(portfolio['vehicle_age'][i]),
+                driver_age=int(portfolio['driver_age'][i]) or None,
+                has_claims=bool(portfolio['has_claims'][i]),
+                scenario=scenario,
+            )['final_premium']
+            engine = quoted_premium(quotes, s, i)
+            if engine != scalar:
+                mismatches.append((int(portfolio['policy_id'][i]), scenario['name'], engine, scalar))
+    return mismatches
+
+
+# ============================================================================
+# Provider comparison and export
+# ============================================================================
+
+def _kes(cents):
+    return (Decimal(int(cents)) / 100).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def compare_providers(portfolio, quotes):
+    """
+    Total current and quoted premiums per provider.
+
+    Returns:
+        list of dicts (largest current premium first) with provider_id,
+        provider, policies, current_premium and scenarios, a list of
+        {name, premium, change, change_percentage} in scenario order
+    """
+    provider_ids, inverse = np.unique(portfolio['provider_id'], return_inverse=True)
+    count = len(provider_ids)
+
+    policies = np.bincount(inverse, minlength=count)
+    current = np.zeros(count, dtype=np.int64)
+    np.add.at(current, inverse, portfolio['premium_cents'])
+    quoted = np.zeros((len(quotes['scenarios']), count), dtype=np.int64)
+    for s in range(len(quotes['scenarios'])):
+        np.add.at(quoted[s], inverse, quotes['premium_cents'][s])
+
+    comparison = []
+    for p, provider_id in enumerate(provider_ids):
+        current_premium = _kes(current[p])
+        scenarios = []
+        for s, scenario in enumerate(quotes['scenarios']):
+            premium = _kes(quoted[s, p])
+            change = premium - current_premium
+            scenarios.append({
+                'name': scenario['name'],
+                'premium': premium,
+                'change': change,
+                'change_percentage': float(change * 100 / current_premium) if current_premium else 0.0,
+            })
+        comparison.append({
+            'provider_id': int(provider_id),
+            'provider': portfolio['providers'].get(int(provider_id), f'Provider {provider_id}'),
+            'policies': int(policies[p]),
+            'current_premium': current_premium,
+            'scenarios': scenarios,
+        })
+
+    comparison.sort(key=lambda row: row['current_premium'], reverse=True)
+    return comparison
+
+
+def export_quotes_excel(portfolio, quotes, comparison, file):
+    """
+    Write the provider comparison and per-policy quotes to an .xlsx file
+    (path or binary file object). Rows are streamed with a write-only
+    workbook, so large fleets do not build a full sheet in memory.
+    """
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, PatternFill
+
+    workbook = openpyxl.Workbook(write_only=True)
+    names = [scenario['name'] for scenario in quotes['scenarios']]
+
+    def header(sheet, titles):
+        cells = []
+        for title in titles:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="3498db", end_color="3498db", fill_type="solid")
+            cells.append(cell)
+        sheet.append(cells)
+
+    summary = workbook.create_sheet('Providers')
+    header(summary, ['Provider', 'Policies', 'Current Premium']
+           + [title for name in names for title in (name, f'{name} Change %')])
+    for row in comparison:
+        summary.append(
+            [row['provider'], row['policies'], row['current_premium']]
+            + [value for s in row['scenarios'] for value in (s['premium'], round(s['change_percentage'], 2))]
+        )
+
+    detail = workbook.create_sheet('Quotes')
+    header(detail, ['Policy Number', 'Provider', 'Policy Type', 'Sum Insured', 'Vehicle Age',
+                    'Driver Age', 'Claims History', 'Current Premium'] + names)
+    type_labels = dict(InsurancePolicy.POLICY_TYPE_CHOICES)
+    for i in range(len(portfolio['policy_id'])):
+        code = portfolio['policy_type'][i]
+        detail.append(
+            [
+                portfolio['policy_number'][i],
+                portfolio['providers'].get(int(portfolio['provider_id'][i]), ''),
+                type_labels.get(POLICY_TYPES[code], '') if code < len(POLICY_TYPES) else '',
+                _kes(portfolio['value_cents'][i]),
+                int(portfolio['vehicle_age'][i]),
+                int(portfolio['driver_age'][i]) or None,
+                'Yes' if portfolio['has_claims'][i] else 'No',
+                _kes(portfolio['premium_cents'][i]),
+            ]
+            + [_kes(quotes['premium_cents'][s, i]) for s in range(len(names))]
+        )
+
+    workbook.save(file)
@@ -0,0 +1,388 @@
+"""
+Batched insurance expiry reminders.
+
+A ReminderRun selects the active, not yet reminded policies expiring within
+its threshold in keyset pages (policy ID order) over the
+(status, reminder_sent, end_date) index. Each page is loaded with one query,
+its SMS and email messages are rendered together and handed to the
+dispatcher, which sends them from a small thread pool under a per-second
+rate limit. Policies that received at least one reminder are then marked with
+a single UPDATE per page.
+
+tasks.send_reminder_page_task processes one page and queues the next, so a
+run over thousands of policies never holds a web request or one long task.
+Runs left queued while the broker was down are queued again by
+tasks.requeue_reminder_runs_task.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import InsurancePolicy, ReminderRun
+
+logger = logging.getLogger(__name__)
+
+# Policies loaded, rendered and marked per page
+PAGE_SIZE = 200
+
+# Runs younger than this may still be queued by whoever created them
+REQUEUE_GRACE = timedelta(minutes=1)
+
+# Dispatcher defaults; override with INSURANCE_REMINDER_* settings
+DEFAULT_CONCURRENCY = 4
+DEFAULT_SMS_RATE = 10    # messages per second, 0 = unlimited
+DEFAULT_EMAIL_RATE = 5
+
+
+def _setting(name, default):
+    return getattr(settings, f'INSURANCE_REMINDER_{name}', default)
+
+
+class _KeepPlaceholder(dict):
+    def __missing__(self, key):
+        return '{' + key + '}'
+
+
+# ============================================================================
+# Selection
+# ============================================================================
+
+def reminder_queryset(days, today=None):
+    """Active policies expiring within `days` that have not been reminded yet."""
+    today = today or timezone.now().date()
+    return InsurancePolicy.objects.filter(
+        status='active',
+        reminder_sent=False,
+        end_date__range=[today, today + timedelta(days=days)],
+    )
+
+
+def _run_date(run):
+    # Every page of a run uses the day it was created, even across midnight
+    return run.created_at.date() if run.created_at else timezone.now().date()
+
+
+# ============================================================================
+# Rendering
+# ============================================================================
+
+def _message_context(policy, today):
+    return {
+        'policy_number': policy.policy_number,
+        'expiry_date': policy.end_date.strftime('%d/%m/%Y'),
+        'vehicle': str(policy.vehicle),
+        'days_left': (policy.end_date - today).days,
+        'provider': policy.provider.name,
+        'provider_phone': policy.provider.phone_primary,
+    }
+
+
+def render_sms(policy, today, custom_message=''):
+    """SMS text for one policy (custom_message placeholders are filled in)."""
+    context = _message_context(policy, today)
+    if custom_message:
+        return custom_message.format_map(_KeepPlaceholder(context))
+    return (
+        f"Reminder: Your insurance policy {context['policy_number']} "
+        f"for {context['vehicle']} expires in {context['days_left']} days on "
+        f"{context['expiry_date']}. Please renew to maintain coverage. "
+        f"Contact {context['provider']} at {context['provider_phone']}."
+    )
+
+
+def render_email(policy, today, custom_message=''):
+    """Unsent EmailMessage for one policy."""
+    context = _message_context(policy, today)
+    if custom_message:
+        body = custom_message.format_map(_KeepPlaceholder(context))
+    else:
+        body = (
+            f"Dear {policy.client.get_full_name()},\n\n"
+            f"This is a reminder that your insurance policy is expiring soon.\n\n"
+            f"Policy Details:\n"
+            f"- Policy Number: {context['policy_number']}\n"
+            f"- Vehicle: {context['vehicle']}\n"
+            f"- Provider: {context['provider']}\n"
+            f"- Expiry Date: {policy.end_date.strftime('%d %B %Y')}\n"
+            f"- Days Remaining: {context['days_left']} days\n\n"
+            f"Please renew your policy to maintain continuous coverage.\n\n"
+            f"Contact Details:\n"
+            f"{context['provider']}\n"
+            f"Phone: {context['provider_phone']}\n"
+            f"Email: {policy.provider.email or 'N/A'}\n\n"
+            f"Best regards,\n"
+            f"Vehicle Management System\n"
+        )
+    return EmailMessage(
+        subject=f"Insurance Expiry Reminder - Policy {policy.policy_number}",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[policy.client.email],
+    )
+
+
+def render_reminders(policies, reminder_type, today, custom_message=''):
+    """
+    Render a page of reminders.
+
+    Returns:
+        (sms, emails): lists of (policy_id, phone, text) and
+        (policy_id, EmailMessage); policies without a client phone or
+        email are left out of the corresponding list
+    """
+    sms, emails = [], []
+    for policy in policies:
+        client = policy.client
+        if client is None:
+            continue
+        if reminder_type in ('sms', 'both') and client.phone_primary:
+            sms.append((policy.pk, client.phone_primary, render_sms(policy, today, custom_message)))
+        if reminder_type in ('email', 'both') and client.email:
+            emails.append((policy.pk, render_email(policy, today, custom_message)))
+    return sms, emails
+
+
+# ============================================================================
+# Dispatch
+# ============================================================================
+
+class RateLimiter:
+    """
+    Thread-safe pacing of at most `rate` calls per second (0 = unlimited).
+    The limit applies per process; concurrent runs each get their own budget.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def dispatch_sms(messages, concurrency=None, rate=None):
+    """
+    Send (policy_id, phone, text) messages through the SMS provider.
+
+    Returns:
+        set of policy IDs whose SMS was accepted
+    """
+    from apps.notifications.utils import send_sms
+
+    if not messages:
+        return set()
+
+    limiter = RateLimiter(_setting('SMS_RATE', DEFAULT_SMS_RATE) if rate is None else rate)
+
+    def send(item):
+        policy_id, phone, text = item
+        limiter.wait()
+        try:
+            return policy_id if send_sms(phone, text) else None
+        except Exception as e:
+            logger.warning(f"Reminder SMS for policy {policy_id} failed: {e}")
+            return None
+
+    workers = concurrency or _setting('CONCURRENCY', DEFAULT_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=min(workers, len(messages))) as pool:
+        return {policy_id for policy_id in pool.map(send, messages) if policy_id is not None}
+
+
+def _send_email_chunk(chunk, limiter):
+    sent = set()
+    connection = get_connection(fail_silently=True)
+    try:
+        connection.open()
+        for policy_id, message in chunk:
+            limiter.wait()
+            message.connection = connection
+            if connection.send_messages([message]):
+                sent.add(policy_id)
+    except Exception as e:
+        logger.warning(f"Reminder email connection failed: {e}")
+    finally:
+        connection.close()
+    return sent
+
+
+def dispatch_emails(messages, concurrency=None, rate=None):
+    """
+    Send (policy_id, EmailMessage) messages. Each worker reuses one mail
+    connection for its share of the page.
+
+    Returns:
+        set of policy IDs whose email was accepted
+    """
+    if not messages:
+        return set()
+
+    limiter = RateLimiter(_setting('EMAIL_RATE', DEFAULT_EMAIL_RATE) if rate is None else rate)
+    workers = min(concurrency or _setting('CONCURRENCY', DEFAULT_CONCURRENCY), len(messages))
+    chunks = [messages[i::workers] for i in range(workers)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return set().union(*pool.map(lambda chunk: _send_email_chunk(chunk, limiter), chunks))
+
+
+# ============================================================================
+# Runs
+# ============================================================================
+
+class ReminderRunInProgress(Exception):
+    """Raised when a run for the same threshold is already queued or running"""
+    
+    def __init__(self, run):
+        self.run = run
+        super().__init__(f"Reminder run #{run.pk} for {run.days_threshold} days is still {run.status}")
+
+
+def active_reminder_run(days_threshold):
+    """The queued or running ReminderRun for a threshold, if any."""
+    return ReminderRun.objects.filter(days_threshold=days_threshold, status__in=('queued', 'running')).first()
+
+
+def create_reminder_run(days_threshold=30, reminder_type='both', custom_message='', user=None):
+    """
+    Create a queued ReminderRun and count the policies it will cover.
+    
+    Raises ReminderRunInProgress while another run for the same threshold
+    is queued or running (the unique_active_reminder_run constraint closes
+    the race between two submits).
+    """
+    active = active_reminder_run(days_threshold)
+    if active is not None:
+        raise ReminderRunInProgress(active)
+    try:
+        with transaction.atomic():
+            run = ReminderRun.objects.create(
+                days_threshold=days_threshold,
+                reminder_type=reminder_type,
+                custom_message=custom_message or '',
+                created_by=user,
+            )
+    except IntegrityError:
+        active = active_reminder_run(days_threshold)
+        if active is None:
+            raise
+        raise ReminderRunInProgress(active)
+    run.progress_total = reminder_queryset(days_threshold, _run_date(run)).count()
+    run.save(update_fields=['progress_total'])
+    return run
+
+
+def process_reminder_page(run, page_size=PAGE_SIZE):
+    """
+    Send the next page of a run's reminders.
+
+    Returns:
+        True while more pages remain; False once the run is completed
+    """
+    today = _run_date(run)
+    policies = list(
+        reminder_queryset(run.days_threshold, today)
+        .filter(pk__gt=run.last_policy_id)
+        .select_related('vehicle', 'provider', 'client')
+        .order_by('pk')[:page_size]
+    )
+
+    if not policies:
+        ReminderRun.objects.filter(pk=run.pk).update(status='completed', completed_at=timezone.now())
+        run.refresh_from_db()
+        return False
+
+    if run.status == 'queued':
+        ReminderRun.objects.filter(pk=run.pk, status='queued').update(status='running')
+
+    sms, emails = render_reminders(policies, run.reminder_type, today, run.custom_message)
+    sms_sent = dispatch_sms(sms)
+    email_sent = dispatch_emails(emails)
+    reminded = sms_sent | email_sent
+
+    with transaction.atomic():
+        InsurancePolicy.objects.filter(pk__in=reminded, reminder_sent=False).update(
+            reminder_sent=True,
+            reminder_sent_date=today,
+            updated_at=timezone.now(),
+        )
+        ReminderRun.objects.filter(pk=run.pk).update(
+            last_policy_id=policies[-1].pk,
+            progress_processed=F('progress_processed') + len(policies),
+            sms_sent=F('sms_sent') + len(sms_sent),
+            email_sent=F('email_sent') + len(email_sent),
+            failed=F('failed') + (len(policies) - len(reminded)),
+        )
+
+    run.refresh_from_db()
+    return True
+
+
+def process_reminder_run(run, page_size=PAGE_SIZE):
+    """Process every remaining page of a run in this process."""
+    try:
+        while process_reminder_page(run, page_size):
+            pass
+    except Exception as e:
+        logger.error(f"Reminder run {run.pk} failed: {e}")
+        ReminderRun.objects.filter(pk=run.pk).update(status='failed', error=str(e))
+        run.refresh_from_db()
+        raise
+
+    logger.info(
+        f"Reminder run {run.pk}: {run.progress_processed} policies, {run.sms_sent} SMS, "
+        f"{run.email_sent} emails, {run.failed} without a reminder"
+    )
+    return run
+
+
+def enqueue_reminder_run(run):
+    """
+    Queue a reminder run for background processing.
+
+    Returns the Celery task id, or None when the broker is unavailable.
+    """
+    from .tasks import send_reminder_page_task
+
+    # Record the task before queueing so a fast worker cannot be overwritten
+    task_id = str(uuid.uuid4())
+    ReminderRun.objects.filter(pk=run.pk).update(task_id=task_id)
+
+    try:
+        send_reminder_page_task.apply_async(args=[run.pk], task_id=task_id, retry=False)
+    except Exception as e:
+        logger.warning(f"Could not queue reminder run {run.pk}: {e}")
+        ReminderRun.objects.filter(pk=run.pk).update(task_id='')
+        return None
+
+    run.task_id = task_id
+    return task_id
+
+
+def requeue_unqueued_reminder_runs(now=None):
+    """
+    Queue again the runs left queued without a task because the broker was
+    unavailable when they were created.
+    
+    Returns:
+        int: number of runs queued
+    """
+    cutoff = (now or timezone.now()) - REQUEUE_GRACE
+    runs = list(ReminderRun.objects.filter(status='queued', task_id='', created_at__lt=cutoff))
+    return sum(1 for run in runs if enqueue_reminder_run(run))
@@ -0,0 +1,58 @@
+"""
+Insurance App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+import logging
+
+from .models import ReminderRun
+from .reminders import process_reminder_page, requeue_unqueued_reminder_runs
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# EXPIRY REMINDER TASKS
+# ============================================================================
+
+@shared_task(ignore_result=True)
+def send_reminder_page_task(run_id):
+    """
+    Send one page of a reminder run, then queue the next page
+    Progress is recorded on the ReminderRun (progress_processed / progress_total)
+
+    Args:
+        run_id: ReminderRun ID
+    """
+    run = ReminderRun.objects.filter(pk=run_id).first()
+    if run is None or not run.is_running:
+        return {'status': 'skipped', 'run_id': run_id}
+
+    try:
+        more = process_reminder_page(run)
+    except Exception as e:
+        logger.error(f"Reminder run {run_id} failed: {e}")
+        ReminderRun.objects.filter(pk=run_id).update(status='failed', error=str(e))
+        return {'status': 'failed', 'run_id': run_id, 'error': str(e)}
+
+    if more:
+        send_reminder_page_task.delay(run_id)
+        return {'status': 'running', 'run_id': run_id, 'processed': run.progress_processed}
+
+    logger.info(
+        f"Reminder run {run_id} completed: {run.sms_sent} SMS, {run.email_sent} emails, "
+        f"{run.failed} without a reminder"
+    )
+    return {'status': 'completed', 'run_id': run_id}
+
+
+@shared_task(ignore_result=True)
+def requeue_reminder_runs_task():
+    """
+    Queue the reminder runs created while the broker was unavailable
+    Scheduled to run every 5 minutes
+    """
+    queued = requeue_unqueued_reminder_runs()
+    if queued:
+        logger.info(f"Re-queued {queued} reminder run(s)")
+    return {'status': 'completed', 'queued': queued}
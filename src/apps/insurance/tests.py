@@ -1,3 +1,78 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import reminders
+from .models import ReminderRun
+from .reminders import ReminderRunInProgress, create_reminder_run, requeue_unqueued_reminder_runs
+from .tasks import send_reminder_page_task
+
+User = get_user_model()
+
+
+class ReminderRunTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(email='insurance@example.com', password='password')
+
+    def submit(self, days_threshold=30):
+        return self.client.post(
+            reverse('insurance:send_bulk_reminders'),
+            {'days_threshold': days_threshold, 'reminder_type': 'sms'},
+            secure=True,
+        )
+
+    @mock.patch.object(send_reminder_page_task, 'apply_async', side_effect=OSError('broker down'))
+    def test_broker_outage_leaves_run_queued(self, apply_async):
+        self.client.force_login(self.user)
+
+        with mock.patch.object(reminders, 'process_reminder_page') as process_reminder_page:
+            response = self.submit()
+
+        run = ReminderRun.objects.get()
+        self.assertRedirects(
+            response, reverse('insurance:reminder_run_detail', args=[run.pk]),
+            fetch_redirect_response=False,
+        )
+        process_reminder_page.assert_not_called()
+        self.assertEqual(run.status, 'queued')
+        self.assertEqual(run.task_id, '')
+
+    @mock.patch.object(send_reminder_page_task, 'apply_async')
+    def test_second_run_for_same_threshold_is_refused(self, apply_async):
+        self.client.force_login(self.user)
+        self.submit()
+        first = ReminderRun.objects.get()
+
+        response = self.submit()
+        self.assertRedirects(
+            response, reverse('insurance:reminder_run_detail', args=[first.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(ReminderRun.objects.count(), 1)
+        self.assertEqual(apply_async.call_count, 1)
+
+        self.submit(days_threshold=7)
+        self.assertEqual(ReminderRun.objects.count(), 2)
+
+        ReminderRun.objects.filter(pk=first.pk).update(status='completed')
+        create_reminder_run(days_threshold=30)
+        with self.assertRaises(ReminderRunInProgress):
+            create_reminder_run(days_threshold=30)
+
+    @mock.patch.object(send_reminder_page_task, 'apply_async')
+    def test_unqueued_runs_are_requeued_after_grace(self, apply_async):
+        run = create_reminder_run(days_threshold=30)
+
+        self.assertEqual(requeue_unqueued_reminder_runs(), 0)
 
-# Create your tests here.
+        later = timezone.now() + reminders.REQUEUE_GRACE + timedelta(seconds=1)
+        self.assertEqual(requeue_unqueued_reminder_runs(now=later), 1)
+        run.refresh_from_db()
+        self.assertTrue(run.task_id)
+        self.assertEqual(requeue_unqueued_reminder_runs(now=later), 0)
@@ -62,6 +62,7 @@ urlpatterns = [
     
     # Quote Generator
     path('quote/', views.generate_quote, name='generate_quote'),
+    path('quote/portfolio/', views.portfolio_quotes, name='portfolio_quotes'),
     
     # ==================== EXPORT URLS ====================
     
@@ -83,6 +84,8 @@ urlpatterns = [
     
     # Bulk Reminders
     path('reminders/send-bulk/', views.send_bulk_reminders, name='send_bulk_reminders'),
+    path('reminders/runs/<int:pk>/', views.reminder_run_detail, name='reminder_run_detail'),
+    path('reminders/runs/<int:pk>/progress/', views.reminder_run_progress, name='reminder_run_progress'),
     
     # Policy Comparison
     path('policies/compare/', views.policy_comparison, name='policy_comparison'),
@@ -189,65 +189,44 @@ def get_expiring_policies(days=30):
     Returns:
         QuerySet: Expiring policies
     """
-    from .models import InsurancePolicy
+    from .reminders import reminder_queryset
     
-    today = timezone.now().date()
-    future_date = today + timedelta(days=days)
-    
-    return InsurancePolicy.objects.filter(
-        status='active',
-        end_date__range=[today, future_date],
-        reminder_sent=False
-    ).select_related('vehicle', 'provider', 'client')
+    return reminder_queryset(days).select_related('vehicle', 'provider', 'client')
 
 
-def send_bulk_expiry_reminders(days=30, method='both'):
+def send_bulk_expiry_reminders(days=30, method='both', user=None):
     """
-    Send bulk expiry reminders
+    Send bulk expiry reminders in this process (see reminders.py; views and
+    scheduled jobs queue a background run instead)
     
     Args:
         days: Days threshold for expiry
         method: 'sms', 'email', or 'both'
+        user: User recorded on the reminder run
     
     Returns:
         dict: Statistics of sent reminders
+    
+    Raises:
+        ReminderRunInProgress: A run for the same threshold is queued or running
     """
-    policies = get_expiring_policies(days)
+    from .reminders import create_reminder_run, process_reminder_run
     
-    stats = {
-        'total': policies.count(),
-        'sms_sent': 0,
-        'email_sent': 0,
-        'failed': 0
-    }
+    run = process_reminder_run(create_reminder_run(days, method, user=user))
     
-    for policy in policies:
-        success = False
-        
-        if method in ['sms', 'both']:
-            if send_expiry_reminder_sms(policy):
-                stats['sms_sent'] += 1
-                success = True
-        
-        if method in ['email', 'both']:
-            if send_expiry_reminder_email(policy):
-                stats['email_sent'] += 1
-                success = True
-        
-        if success:
-            # Mark reminder as sent
-            policy.reminder_sent = True
-            policy.reminder_sent_date = timezone.now().date()
-            policy.save()
-        else:
-            stats['failed'] += 1
-    
-    return stats
+    return {
+        'total': run.progress_total,
+        'sms_sent': run.sms_sent,
+        'email_sent': run.email_sent,
+        'failed': run.failed,
+        'run_id': run.pk,
+    }
 
 
 # ==================== CALCULATION UTILITIES ====================
 
-def calculate_premium_estimate(vehicle_value, policy_type, vehicle_age=0, driver_age=None, has_claims=False):
+def calculate_premium_estimate(vehicle_value, policy_type, vehicle_age=0, driver_age=None, has_claims=False,
+                               scenario=None):
     """
     Calculate estimated insurance premium
     
@@ -257,59 +236,61 @@ def calculate_premium_estimate(vehicle_value, policy_type, vehicle_age=0, driver
         vehicle_age: Age of vehicle in years
         driver_age: Age of driver
         has_claims: Whether there's claims history
+        scenario: Rate scenario (see quoting.make_scenario); default rates if omitted
     
     Returns:
         dict: Premium calculation breakdown
     """
-    # Base rates
-    base_rates = {
-        'comprehensive': Decimal('0.05'),  # 5%
-        'third_party_fire_theft': Decimal('0.03'),  # 3%
-        'third_party': Decimal('0.02'),  # 2%
-    }
+    from .quoting import DEFAULT_SCENARIO
+    
+    scenario = scenario or DEFAULT_SCENARIO
+    
+    def percentage(loading):
+        value = loading * 100
+        return int(value) if value == value.to_integral_value() else float(value)
     
-    base_rate = base_rates.get(policy_type, Decimal('0.03'))
+    base_rate = scenario['base_rates'].get(policy_type, scenario['default_rate'])
     base_premium = vehicle_value * base_rate
     
     adjustments = []
     final_premium = base_premium
     
     # Vehicle age adjustment
-    if vehicle_age > 10:
-        adjustment = base_premium * Decimal('0.20')  # +20%
+    if vehicle_age > scenario['old_vehicle_age']:
+        adjustment = base_premium * scenario['old_vehicle_loading']
         final_premium += adjustment
         adjustments.append({
-            'factor': 'Vehicle Age (>10 years)',
-            'percentage': 20,
+            'factor': f"Vehicle Age (>{scenario['old_vehicle_age']} years)",
+            'percentage': percentage(scenario['old_vehicle_loading']),
             'amount': adjustment
         })
     
     # Driver age adjustment
     if driver_age:
-        if driver_age < 25:
-            adjustment = base_premium * Decimal('0.30')  # +30%
+        if driver_age < scenario['young_driver_age']:
+            adjustment = base_premium * scenario['young_driver_loading']
             final_premium += adjustment
             adjustments.append({
-                'factor': 'Young Driver (<25 years)',
-                'percentage': 30,
+                'factor': f"Young Driver (<{scenario['young_driver_age']} years)",
+                'percentage': percentage(scenario['young_driver_loading']),
                 'amount': adjustment
             })
-        elif driver_age > 65:
-            adjustment = base_premium * Decimal('0.15')  # +15%
+        elif driver_age > scenario['senior_driver_age']:
+            adjustment = base_premium * scenario['senior_driver_loading']
             final_premium += adjustment
             adjustments.append({
-                'factor': 'Senior Driver (>65 years)',
-                'percentage': 15,
+                'factor': f"Senior Driver (>{scenario['senior_driver_age']} years)",
+                'percentage': percentage(scenario['senior_driver_loading']),
                 'amount': adjustment
             })
     
     # Claims history adjustment
     if has_claims:
-        adjustment = base_premium * Decimal('0.25')  # +25%
+        adjustment = base_premium * scenario['claims_loading']
         final_premium += adjustment
         adjustments.append({
             'factor': 'Claims History',
-            'percentage': 25,
+            'percentage': percentage(scenario['claims_loading']),
             'amount': adjustment
         })
     
@@ -14,16 +14,22 @@ from datetime import datetime, timedelta
 import csv
 import json
 
-from .models import InsuranceProvider, InsurancePolicy, InsuranceClaim, InsurancePayment
+from .models import InsuranceProvider, InsurancePolicy, InsuranceClaim, InsurancePayment, ReminderRun
 from .forms import (
     InsuranceProviderForm, InsurancePolicyForm, InsuranceClaimForm,
     ClaimUpdateForm, InsurancePaymentForm, InsurancePolicySearchForm,
     InsuranceClaimSearchForm, PolicyRenewalForm, BulkPolicyReminderForm,
     PolicyCancellationForm, InsuranceQuoteForm
 )
+from .quoting import (
+    DEFAULT_SCENARIO, compare_providers, export_quotes_excel, load_portfolio,
+    parse_scenario, price_portfolio,
+)
+from .reminders import ReminderRunInProgress, create_reminder_run, enqueue_reminder_run
 from apps.vehicles.models import Vehicle
 from apps.clients.models import Client
 from apps.audit.utils import log_audit
+from apps.dashboard.kpis import get_snapshot
 
 
 # ==================== INSURANCE PROVIDER VIEWS ====================
@@ -665,36 +671,8 @@ def insurance_dashboard(request):
     """
     Insurance analytics dashboard
     """
-    today = timezone.now().date()
-    
-    # Policy statistics
-    total_policies = InsurancePolicy.objects.count()
-    active_policies = InsurancePolicy.objects.filter(status='active').count()
-    expiring_30_days = InsurancePolicy.objects.filter(
-        status='active',
-        end_date__lte=today + timedelta(days=30),
-        end_date__gte=today
-    ).count()
-    expired_policies = InsurancePolicy.objects.filter(status='expired').count()
-    
-    # Claim statistics
-    total_claims = InsuranceClaim.objects.count()
-    pending_claims = InsuranceClaim.objects.filter(
-        status__in=['pending', 'under_review']
-    ).count()
-    
-    # Financial statistics
-    total_premium = InsurancePolicy.objects.filter(
-        status='active'
-    ).aggregate(Sum('premium_amount'))['premium_amount__sum'] or 0
-    
-    total_claimed = InsuranceClaim.objects.aggregate(
-        Sum('claimed_amount')
-    )['claimed_amount__sum'] or 0
-    
-    total_settled = InsuranceClaim.objects.filter(
-        status='settled'
-    ).aggregate(Sum('settled_amount'))['settled_amount__sum'] or 0
+    # Policy, claim and premium totals come from the KPI snapshot
+    kpi_snapshot = get_snapshot('insurance')
     
     # Recent activity
     recent_policies = InsurancePolicy.objects.select_related(
@@ -706,15 +684,8 @@ def insurance_dashboard(request):
     ).order_by('-claim_date')[:5]
     
     context = {
-        'total_policies': total_policies,
-        'active_policies': active_policies,
-        'expiring_30_days': expiring_30_days,
-        'expired_policies': expired_policies,
-        'total_claims': total_claims,
-        'pending_claims': pending_claims,
-        'total_premium': total_premium,
-        'total_claimed': total_claimed,
-        'total_settled': total_settled,
+        **kpi_snapshot.values,
+        'kpi_snapshot': kpi_snapshot,
         'recent_policies': recent_policies,
         'recent_claims': recent_claims,
     }
@@ -756,6 +727,46 @@ def generate_quote(request):
     return render(request, 'insurance/generate_quote.html', context)
 
 
+@login_required
+def portfolio_quotes(request):
+    """
+    Re-price the active fleet under rate scenarios and compare per provider
+    
+    Scenarios come from the "scenarios" parameter, one per line, e.g.
+    "discount:rates=0.9" (see quoting.parse_scenario). ?export=xlsx downloads
+    the comparison and per-policy quotes.
+    """
+    scenario_text = request.GET.get('scenarios', '').strip()
+    scenarios = [DEFAULT_SCENARIO]
+    try:
+        scenarios += [parse_scenario(line) for line in scenario_text.splitlines() if line.strip()]
+    except ValueError as e:
+        messages.error(request, f'Invalid scenario: {str(e)}')
+        scenarios = [DEFAULT_SCENARIO]
+    
+    portfolio = load_portfolio()
+    quotes = price_portfolio(portfolio, scenarios)
+    comparison = compare_providers(portfolio, quotes)
+    
+    if request.GET.get('export') == 'xlsx':
+        response = HttpResponse(
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+        response['Content-Disposition'] = f'attachment; filename="portfolio_quotes_{timezone.now().strftime("%Y%m%d")}.xlsx"'
+        export_quotes_excel(portfolio, quotes, comparison, response)
+        log_audit(request.user, 'export', 'InsurancePolicy', f'Exported portfolio quotes ({len(scenarios)} scenarios)')
+        return response
+    
+    context = {
+        'comparison': comparison,
+        'scenario_names': [scenario['name'] for scenario in scenarios],
+        'scenario_text': scenario_text,
+        'policy_count': len(portfolio['policy_id']),
+    }
+    
+    return render(request, 'insurance/portfolio_quotes.html', context)
+
+
 @login_required
 def export_policies_csv(request):
     """
@@ -931,63 +942,41 @@ def expiring_policies_api(request):
 @login_required
 def send_bulk_reminders(request):
     """
-    Send bulk expiry reminders
+    Queue bulk expiry reminders as a background reminder run
     """
     if request.method == 'POST':
         form = BulkPolicyReminderForm(request.POST)
         if form.is_valid():
-            days_threshold = form.cleaned_data['days_threshold']
-            reminder_type = form.cleaned_data['reminder_type']
-            custom_message = form.cleaned_data.get('custom_message')
-            
-            # Get expiring policies
-            today = timezone.now().date()
-            expiring_policies = InsurancePolicy.objects.filter(
-                status='active',
-                end_date__lte=today + timedelta(days=days_threshold),
-                end_date__gte=today,
-                reminder_sent=False
-            ).select_related('vehicle', 'client')
-            
-            sent_count = 0
-            for policy in expiring_policies:
-                # Prepare message
-                if custom_message:
-                    message = custom_message.format(
-                        policy_number=policy.policy_number,
-                        expiry_date=policy.end_date.strftime('%d/%m/%Y'),
-                        vehicle=str(policy.vehicle)
-                    )
-                else:
-                    message = (
-                        f"Reminder: Your insurance policy {policy.policy_number} "
-                        f"for {policy.vehicle} expires on {policy.end_date.strftime('%d/%m/%Y')}. "
-                        f"Please renew to maintain coverage."
-                    )
-                
-                # Send reminder (implement actual sending logic)
-                if reminder_type in ['sms', 'both'] and policy.client:
-                    # send_sms(policy.client.phone_primary, message)
-                    pass
-                
-                if reminder_type in ['email', 'both'] and policy.client and policy.client.email:
-                    # send_email(policy.client.email, 'Insurance Expiry Reminder', message)
-                    pass
-                
-                # Mark reminder as sent
-                policy.reminder_sent = True
-                policy.reminder_sent_date = today
-                policy.save()
-                
-                sent_count += 1
+            try:
+                run = create_reminder_run(
+                    days_threshold=form.cleaned_data['days_threshold'],
+                    reminder_type=form.cleaned_data['reminder_type'],
+                    custom_message=form.cleaned_data.get('custom_message'),
+                    user=request.user,
+                )
+            except ReminderRunInProgress as e:
+                messages.warning(
+                    request,
+                    f'Reminder run #{e.run.pk} for policies expiring within {e.run.days_threshold} days '
+                    f'is still {e.run.get_status_display().lower()}.'
+                )
+                return redirect('insurance:reminder_run_detail', pk=e.run.pk)
             
             log_audit(
                 request.user, 'action', 'InsurancePolicy',
-                f'Sent bulk reminders to {sent_count} policies'
+                f'Started bulk reminder run #{run.pk} for {run.progress_total} policies'
             )
             
-            messages.success(request, f'Reminders sent to {sent_count} policies!')
-            return redirect('insurance:expiring_policies')
+            if enqueue_reminder_run(run):
+                messages.info(request, f'Sending reminders for {run.progress_total} policies. Progress is shown below.')
+            else:
+                # Never send a whole run inside the request; it is queued again once the broker is back
+                messages.warning(
+                    request,
+                    f'The task queue is unavailable. Reminders for {run.progress_total} policies '
+                    f'will start automatically once it is back.'
+                )
+            return redirect('insurance:reminder_run_detail', pk=run.pk)
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
@@ -995,6 +984,7 @@ def send_bulk_reminders(request):
     
     context = {
         'form': form,
+        'recent_runs': ReminderRun.objects.select_related('created_by')[:10],
         'title': 'Send Bulk Expiry Reminders',
         'button_text': 'Send Reminders'
     }
@@ -1002,6 +992,37 @@ def send_bulk_reminders(request):
     return render(request, 'insurance/send_bulk_reminders.html', context)
 
 
+@login_required
+def reminder_run_detail(request, pk):
+    """
+    Display a reminder run and its progress
+    """
+    run = get_object_or_404(ReminderRun.objects.select_related('created_by'), pk=pk)
+    
+    context = {
+        'run': run,
+    }
+    
+    return render(request, 'insurance/reminder_run_detail.html', context)
+
+
+@login_required
+def reminder_run_progress(request, pk):
+    """Return reminder run progress (polled via AJAX)."""
+    run = get_object_or_404(ReminderRun, pk=pk)
+    
+    return JsonResponse({
+        'status': run.status,
+        'processed': run.progress_processed,
+        'total': run.progress_total,
+        'percentage': run.get_progress_percentage(),
+        'sms_sent': run.sms_sent,
+        'email_sent': run.email_sent,
+        'failed': run.failed,
+        'error': run.error,
+    })
+
+
 @login_required
 def policy_comparison(request):
     """
@@ -16,6 +16,7 @@ from .models import (
     NotificationLog,
     NotificationSchedule
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class NotificationLogInline(admin.TabularInline):
@@ -30,7 +31,7 @@ class NotificationLogInline(admin.TabularInline):
 
 
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(PerformanceModelAdmin):
     list_display = [
         'title_short',
         'user_link',
@@ -143,8 +144,8 @@ class NotificationAdmin(admin.ModelAdmin):
     title_short.short_description = 'Title'
     
     def user_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.user.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+        url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
     user_link.short_description = 'User'
     
     def notification_type_badge(self, obj):
@@ -237,7 +238,7 @@ class NotificationAdmin(admin.ModelAdmin):
 
 
 @admin.register(NotificationPreference)
-class NotificationPreferenceAdmin(admin.ModelAdmin):
+class NotificationPreferenceAdmin(PerformanceModelAdmin):
     list_display = [
         'user_link',
         'enabled',
@@ -248,6 +249,7 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
         'email_digest',
         'quiet_hours_enabled',
     ]
+    list_select_related = ['user']
     list_filter = [
         'enabled',
         'in_app_enabled',
@@ -312,8 +314,8 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
     actions = ['enable_all', 'disable_all', 'enable_email', 'disable_email']
     
     def user_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.user.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+        url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
     user_link.short_description = 'User'
     
     def enable_all(self, request, queryset):
@@ -338,7 +340,7 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
 
 
 @admin.register(NotificationTemplate)
-class NotificationTemplateAdmin(admin.ModelAdmin):
+class NotificationTemplateAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'template_type',
@@ -401,7 +403,7 @@ class NotificationTemplateAdmin(admin.ModelAdmin):
 
 
 @admin.register(NotificationLog)
-class NotificationLogAdmin(admin.ModelAdmin):
+class NotificationLogAdmin(PerformanceModelAdmin):
     list_display = [
         'notification_link',
         'delivery_method',
@@ -412,6 +414,7 @@ class NotificationLogAdmin(admin.ModelAdmin):
         'delivered_at',
         'retry_count',
     ]
+    list_select_related = ['notification']
     list_filter = [
         'delivery_method',
         'status',
@@ -492,7 +495,7 @@ class NotificationLogAdmin(admin.ModelAdmin):
 
 
 @admin.register(NotificationSchedule)
-class NotificationScheduleAdmin(admin.ModelAdmin):
+class NotificationScheduleAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'frequency',
@@ -10,6 +10,7 @@ from django.utils import timezone
 from django.http import HttpResponse
 from .models import Payment, InstallmentPlan, PaymentSchedule, PaymentReminder
 import csv
+from utils.admin import PerformanceModelAdmin
 
 
 # ==================== INLINE ADMINS ====================
@@ -41,7 +42,7 @@ class PaymentReminderInline(admin.TabularInline):
 # ==================== PAYMENT ADMIN ====================
 
 @admin.register(Payment)
-class PaymentAdmin(admin.ModelAdmin):
+class PaymentAdmin(PerformanceModelAdmin):
     """
     Admin interface for Payment model
     """
@@ -155,8 +156,8 @@ class PaymentAdmin(admin.ModelAdmin):
         """Display amount formatted with color"""
         return format_html(
             '<span style="color: #28a745; font-weight: bold; font-size: 13px;">'
-            'KES {:,.2f}</span>',
-            obj.amount
+            'KES {}</span>',
+            f'{obj.amount:,.2f}'
         )
     amount_display.short_description = 'Amount'
     amount_display.admin_order_field = 'amount'
@@ -188,9 +189,9 @@ class PaymentAdmin(admin.ModelAdmin):
         color = '#dc3545' if balance > 0 else '#28a745'
         return format_html(
             '<span style="color: {}; font-weight: bold; font-size: 14px;">'
-            'KES {:,.2f}</span>',
+            'KES {}</span>',
             color,
-            balance
+            f'{balance:,.2f}'
         )
     remaining_balance_display.short_description = 'Remaining Balance'
     
@@ -238,7 +239,7 @@ class PaymentAdmin(admin.ModelAdmin):
 # ==================== INSTALLMENT PLAN ADMIN ====================
 
 @admin.register(InstallmentPlan)
-class InstallmentPlanAdmin(admin.ModelAdmin):
+class InstallmentPlanAdmin(PerformanceModelAdmin):
     """
     Admin interface for InstallmentPlan model
     """
@@ -348,39 +349,39 @@ class InstallmentPlanAdmin(admin.ModelAdmin):
     
     def total_amount_display(self, obj):
         """Display total amount formatted"""
-        return format_html('KES {:,.2f}', obj.total_amount)
+        return format_html('KES {}', f'{obj.total_amount:,.2f}')
     total_amount_display.short_description = 'Total Amount'
     total_amount_display.admin_order_field = 'total_amount'
     
     def monthly_installment_display(self, obj):
         """Display monthly installment formatted"""
-        return format_html('KES {:,.2f}', obj.monthly_installment)
+        return format_html('KES {}', f'{obj.monthly_installment:,.2f}')
     monthly_installment_display.short_description = 'Monthly'
     monthly_installment_display.admin_order_field = 'monthly_installment'
     
     def balance_after_deposit_display(self, obj):
         """Display balance after deposit"""
-        return format_html('KES {:,.2f}', obj.balance_after_deposit)
+        return format_html('KES {}', f'{obj.balance_after_deposit:,.2f}')
     balance_after_deposit_display.short_description = 'Balance After Deposit'
     
     def total_with_interest_display(self, obj):
         """Display total with interest"""
-        return format_html('KES {:,.2f}', obj.total_with_interest)
+        return format_html('KES {}', f'{obj.total_with_interest:,.2f}')
     total_with_interest_display.short_description = 'Total with Interest'
     
     def total_interest_display(self, obj):
         """Display total interest"""
         return format_html(
-            '<span style="color: #ffc107; font-weight: bold;">KES {:,.2f}</span>',
-            obj.total_interest
+            '<span style="color: #ffc107; font-weight: bold;">KES {}</span>',
+            f'{obj.total_interest:,.2f}'
         )
     total_interest_display.short_description = 'Total Interest'
     
     def amount_paid_display(self, obj):
         """Display amount paid"""
         return format_html(
-            '<span style="color: #28a745; font-weight: bold;">KES {:,.2f}</span>',
-            obj.amount_paid
+            '<span style="color: #28a745; font-weight: bold;">KES {}</span>',
+            f'{obj.amount_paid:,.2f}'
         )
     amount_paid_display.short_description = 'Amount Paid'
     
@@ -389,15 +390,15 @@ class InstallmentPlanAdmin(admin.ModelAdmin):
         balance = obj.remaining_balance
         color = '#dc3545' if balance > 0 else '#28a745'
         return format_html(
-            '<span style="color: {}; font-weight: bold;">KES {:,.2f}</span>',
+            '<span style="color: {}; font-weight: bold;">KES {}</span>',
             color,
-            balance
+            f'{balance:,.2f}'
         )
     remaining_balance_display.short_description = 'Remaining Balance'
     
     def payment_progress_display(self, obj):
         """Display payment progress"""
-        return format_html('{:.1f}%', obj.payment_progress)
+        return format_html('{}%', f'{obj.payment_progress:.1f}')
     payment_progress_display.short_description = 'Progress'
     
     def progress_bar(self, obj):
@@ -502,7 +503,7 @@ class InstallmentPlanAdmin(admin.ModelAdmin):
 # ==================== PAYMENT SCHEDULE ADMIN ====================
 
 @admin.register(PaymentSchedule)
-class PaymentScheduleAdmin(admin.ModelAdmin):
+class PaymentScheduleAdmin(PerformanceModelAdmin):
     """
     Admin interface for PaymentSchedule model
     """
@@ -589,15 +590,15 @@ class PaymentScheduleAdmin(admin.ModelAdmin):
     
     def amount_due_display(self, obj):
         """Display amount due formatted"""
-        return format_html('KES {:,.2f}', obj.amount_due)
+        return format_html('KES {}', f'{obj.amount_due:,.2f}')
     amount_due_display.short_description = 'Amount Due'
     amount_due_display.admin_order_field = 'amount_due'
     
     def amount_paid_display(self, obj):
         """Display amount paid formatted"""
         return format_html(
-            '<span style="color: #28a745; font-weight: bold;">KES {:,.2f}</span>',
-            obj.amount_paid
+            '<span style="color: #28a745; font-weight: bold;">KES {}</span>',
+            f'{obj.amount_paid:,.2f}'
         )
     amount_paid_display.short_description = 'Amount Paid'
     amount_paid_display.admin_order_field = 'amount_paid'
@@ -607,9 +608,9 @@ class PaymentScheduleAdmin(admin.ModelAdmin):
         remaining = obj.remaining_amount
         color = '#dc3545' if remaining > 0 else '#28a745'
         return format_html(
-            '<span style="color: {}; font-weight: bold;">KES {:,.2f}</span>',
+            '<span style="color: {}; font-weight: bold;">KES {}</span>',
             color,
-            remaining
+            f'{remaining:,.2f}'
         )
     remaining_amount_display.short_description = 'Remaining'
     
@@ -690,7 +691,7 @@ class PaymentScheduleAdmin(admin.ModelAdmin):
 # ==================== PAYMENT REMINDER ADMIN ====================
 
 @admin.register(PaymentReminder)
-class PaymentReminderAdmin(admin.ModelAdmin):
+class PaymentReminderAdmin(PerformanceModelAdmin):
     """
     Admin interface for PaymentReminder model
     """
@@ -698,6 +699,7 @@ class PaymentReminderAdmin(admin.ModelAdmin):
         'id', 'client_link', 'reminder_type_badge', 
         'reminder_date', 'status_badge', 'sent_by'
     ]
+    list_select_related = ['payment_schedule__installment_plan__client_vehicle__client', 'sent_by']
     
     list_filter = [
         'reminder_type',
@@ -12,8 +12,9 @@ from decimal import Decimal
 
 from .models import (
     Employee, SalaryStructure, Commission, Deduction,
-    PayrollRun, Payslip, Attendance, Leave, Loan
+    PayrollRun, Payslip, Attendance, AttendanceMonthlySummary, Leave, Loan
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class SalaryStructureInline(admin.StackedInline):
@@ -41,7 +42,7 @@ class SalaryStructureInline(admin.StackedInline):
 
 
 @admin.register(Employee)
-class EmployeeAdmin(admin.ModelAdmin):
+class EmployeeAdmin(PerformanceModelAdmin):
     """Admin interface for employees."""
     
     list_display = (
@@ -194,7 +195,7 @@ class EmployeeAdmin(admin.ModelAdmin):
 
 
 @admin.register(SalaryStructure)
-class SalaryStructureAdmin(admin.ModelAdmin):
+class SalaryStructureAdmin(PerformanceModelAdmin):
     """Admin interface for salary structures."""
     
     list_display = (
@@ -261,7 +262,7 @@ class SalaryStructureAdmin(admin.ModelAdmin):
 
 
 @admin.register(Commission)
-class CommissionAdmin(admin.ModelAdmin):
+class CommissionAdmin(PerformanceModelAdmin):
     """Admin interface for commissions."""
     
     list_display = (
@@ -343,7 +344,7 @@ class CommissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(Deduction)
-class DeductionAdmin(admin.ModelAdmin):
+class DeductionAdmin(PerformanceModelAdmin):
     """Admin interface for deductions."""
     
     list_display = (
@@ -437,7 +438,7 @@ class PayslipInline(admin.TabularInline):
 
 
 @admin.register(PayrollRun)
-class PayrollRunAdmin(admin.ModelAdmin):
+class PayrollRunAdmin(PerformanceModelAdmin):
     """Admin interface for payroll runs."""
     
     list_display = (
@@ -453,6 +454,7 @@ class PayrollRunAdmin(admin.ModelAdmin):
         'payroll_number', 'total_employees', 'total_gross',
         'total_deductions', 'total_net', 'processed_by',
         'processed_at', 'approved_by', 'approved_at',
+        'task_id', 'progress_total', 'progress_processed', 'processing_error',
         'created_at', 'updated_at'
     )
     
@@ -467,7 +469,10 @@ class PayrollRunAdmin(admin.ModelAdmin):
             )
         }),
         ('Processing', {
-            'fields': ('processed_by', 'processed_at')
+            'fields': (
+                'processed_by', 'processed_at', 'task_id',
+                'progress_total', 'progress_processed', 'processing_error'
+            )
         }),
         ('Approval', {
             'fields': ('approved_by', 'approved_at')
@@ -522,7 +527,7 @@ class PayrollRunAdmin(admin.ModelAdmin):
 
 
 @admin.register(Payslip)
-class PayslipAdmin(admin.ModelAdmin):
+class PayslipAdmin(PerformanceModelAdmin):
     """Admin interface for payslips."""
     
     list_display = (
@@ -596,7 +601,7 @@ class PayslipAdmin(admin.ModelAdmin):
 
 
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
+class AttendanceAdmin(PerformanceModelAdmin):
     """Admin interface for attendance."""
     
     list_display = (
@@ -642,8 +647,37 @@ class AttendanceAdmin(admin.ModelAdmin):
     status_badge.short_description = 'Status'
 
 
+@admin.register(AttendanceMonthlySummary)
+class AttendanceMonthlySummaryAdmin(PerformanceModelAdmin):
+    """Read-only admin for attendance rollups."""
+    
+    list_display = (
+        'employee', 'month', 'present_days', 'absent_days', 'late_days',
+        'half_days', 'leave_days', 'holiday_days', 'total_hours', 'updated_at'
+    )
+    
+    list_filter = ('month',)
+    
+    search_fields = (
+        'employee__employee_id', 'employee__first_name', 'employee__last_name'
+    )
+    
+    date_hierarchy = 'month'
+    
+    def get_queryset(self, request):
+        """Optimize queryset."""
+        qs = super().get_queryset(request)
+        return qs.select_related('employee')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Leave)
-class LeaveAdmin(admin.ModelAdmin):
+class LeaveAdmin(PerformanceModelAdmin):
     """Admin interface for leave requests."""
     
     list_display = (
@@ -713,7 +747,7 @@ class LeaveAdmin(admin.ModelAdmin):
 
 
 @admin.register(Loan)
-class LoanAdmin(admin.ModelAdmin):
+class LoanAdmin(PerformanceModelAdmin):
     """Admin interface for loans."""
     
     list_display = (
@@ -771,8 +805,8 @@ class LoanAdmin(admin.ModelAdmin):
         return format_html(
             '<div style="width: 100px; background-color: #e9ecef; border-radius: 3px;">'
             '<div style="width: {}%; background-color: #28a745; color: white; '
-            'text-align: center; border-radius: 3px; padding: 2px;">{:.0f}%</div></div>',
-            percentage, percentage
+            'text-align: center; border-radius: 3px; padding: 2px;">{}%</div></div>',
+            percentage, f'{percentage:.0f}'
         )
     repayment_progress.short_description = 'Progress'
     
@@ -0,0 +1,272 @@
+"""
+Set-based attendance writes.
+
+upsert_attendance() writes many attendance marks with one
+INSERT ... ON CONFLICT (employee, attendance_date) DO UPDATE per batch and
+then refreshes the affected AttendanceMonthlySummary rollups.
+import_attendance_csv() streams a CSV or biometric export through the same
+path in fixed-size batches.
+"""
+
+import codecs
+import csv
+import io
+import logging
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .models import Attendance, AttendanceMonthlySummary, Employee
+
+logger = logging.getLogger(__name__)
+
+# Fields an upsert may overwrite on an existing (employee, date) row
+UPSERT_FIELDS = ('status', 'check_in_time', 'check_out_time', 'hours_worked', 'notes')
+
+# Accepted CSV headers (lower-cased) for each attendance field
+COLUMN_ALIASES = {
+    'employee': ('employee_id', 'employee', 'emp_id', 'emp_no', 'badge', 'badge_number', 'user_id'),
+    'date': ('attendance_date', 'date', 'day'),
+    'status': ('status',),
+    'check_in': ('check_in_time', 'check_in', 'time_in', 'clock_in', 'in'),
+    'check_out': ('check_out_time', 'check_out', 'time_out', 'clock_out', 'out'),
+    'hours': ('hours_worked', 'hours', 'worked_hours'),
+    'notes': ('notes', 'remarks'),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%m/%d/%Y')
+TIME_FORMATS = ('%H:%M', '%H:%M:%S', '%I:%M %p', '%I:%M:%S %p')
+
+STATUS_ALIASES = {
+    'P': 'PRESENT', 'A': 'ABSENT', 'L': 'LATE', 'HD': 'HALF_DAY',
+    'LV': 'ON_LEAVE', 'LEAVE': 'ON_LEAVE', 'H': 'HOLIDAY', 'HALF DAY': 'HALF_DAY',
+    'ON LEAVE': 'ON_LEAVE',
+}
+VALID_STATUSES = {status for status, _ in Attendance.STATUS_CHOICES}
+
+MAX_REPORTED_ERRORS = 100
+
+
+class AttendanceImportError(ValueError):
+    """Raised for an unusable row or file in an attendance import"""
+
+
+# ============================================================================
+# Upsert
+# ============================================================================
+
+def upsert_attendance(records, update_fields=UPSERT_FIELDS, batch_size=1000):
+    """
+    Insert or update attendance rows keyed by (employee, attendance_date).
+
+    Args:
+        records: Iterable of unsaved Attendance instances; a later record for
+            the same employee and date replaces an earlier one
+        update_fields: Fields overwritten when the row already exists
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        Number of distinct attendance rows written
+    """
+    unique = {}
+    for record in records:
+        unique[(record.employee_id, record.attendance_date)] = record
+    if not unique:
+        return 0
+
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            unique.values(),
+            update_conflicts=True,
+            unique_fields=['employee', 'attendance_date'],
+            update_fields=[*update_fields, 'updated_at'],
+            batch_size=batch_size,
+        )
+        AttendanceMonthlySummary.objects.refresh(unique.keys())
+
+    return len(unique)
+
+
+def mark_attendance(employee_ids, attendance_date, status):
+    """Set one status for many employees on a day, keeping recorded times."""
+    return upsert_attendance(
+        (Attendance(employee_id=employee_id, attendance_date=attendance_date, status=status)
+         for employee_id in employee_ids),
+        update_fields=('status',),
+    )
+
+
+# ============================================================================
+# CSV / biometric export import
+# ============================================================================
+
+def _resolve_columns(fieldnames):
+    headers = {
+        name.strip().lower().replace(' ', '_').replace('-', '_'): name
+        for name in fieldnames or () if name
+    }
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in headers:
+                columns[field] = headers[alias]
+                break
+    missing = {'employee', 'date'} - set(columns)
+    if missing:
+        raise AttendanceImportError(f"Missing column(s): {', '.join(sorted(missing))}")
+    return columns
+
+
+def _parse(value, formats, kind):
+    value = value.strip()
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise AttendanceImportError(f"Unrecognised {kind} '{value}'")
+
+
+def _parse_time(value):
+    value = (value or '').strip()
+    if not value:
+        return None
+    # Biometric exports often carry a full timestamp
+    if ' ' in value and ':' in value.split(' ', 1)[1]:
+        date_part, time_part = value.split(' ', 1)
+        if any(sep in date_part for sep in '-/'):
+            value = time_part
+    return _parse(value, TIME_FORMATS, 'time').time()
+
+
+def _hours_between(check_in, check_out):
+    start = check_in.hour * 60 + check_in.minute
+    end = check_out.hour * 60 + check_out.minute
+    if end < start:
+        end += 24 * 60  # overnight shift
+    return (Decimal(end - start) / 60).quantize(Decimal('0.01'))
+
+
+def _build_record(row, columns, employees):
+    def get(field):
+        column = columns.get(field)
+        return (row.get(column) or '').strip() if column else ''
+
+    code = get('employee')
+    employee_id = employees.get(code) or employees.get(code.upper())
+    if employee_id is None:
+        raise AttendanceImportError(f"Unknown employee '{code}'")
+
+    attendance_date = _parse(get('date').split(' ')[0], DATE_FORMATS, 'date').date()
+    check_in = _parse_time(get('check_in'))
+    check_out = _parse_time(get('check_out'))
+
+    status = get('status').upper()
+    status = STATUS_ALIASES.get(status, status)
+    if not status:
+        status = 'PRESENT' if check_in else 'ABSENT'
+    if status not in VALID_STATUSES:
+        raise AttendanceImportError(f"Unknown status '{get('status')}'")
+
+    hours = get('hours')
+    if hours:
+        try:
+            hours_worked = Decimal(hours).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise AttendanceImportError(f"Invalid hours '{hours}'")
+    elif check_in and check_out:
+        hours_worked = _hours_between(check_in, check_out)
+    else:
+        hours_worked = Decimal('0.00')
+
+    return Attendance(
+        employee_id=employee_id,
+        attendance_date=attendance_date,
+        status=status,
+        check_in_time=check_in,
+        check_out_time=check_out,
+        hours_worked=hours_worked,
+        notes=get('notes'),
+    )
+
+
+def _check_encoding(file, encoding, chunk_size=64 * 1024):
+    """
+    Decode a binary file once before importing so a file in another encoding
+    is rejected before any row is written, then rewind it.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    offset = 0
+    try:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            decoder.decode(chunk)
+            offset += len(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        name = 'UTF-8' if codecs.lookup(encoding).name.startswith('utf-8') else encoding
+        raise AttendanceImportError(
+            f"The file is not {name} text (invalid byte at position {offset + e.start}). "
+            f"Save it as CSV UTF-8 and upload it again."
+        )
+    finally:
+        file.seek(0)
+
+
+def import_attendance_csv(file, batch_size=2000, encoding='utf-8-sig'):
+    """
+    Stream attendance rows from a CSV (or biometric export saved as CSV).
+
+    Rows are matched to employees by employee number (Employee.employee_id)
+    or national ID and written through upsert_attendance() every batch_size
+    rows, so memory use does not grow with the file. Bad rows are skipped
+    and reported.
+
+    Args:
+        file: Binary (seekable) or text file object
+        batch_size: Rows per upsert batch
+        encoding: Encoding used when file is binary
+
+    Returns:
+        dict with rows, imported, skipped and errors (line, message) lists
+
+    Raises:
+        AttendanceImportError: Missing columns, or a binary file that does
+            not decode with encoding
+    """
+    if isinstance(file.read(0), bytes):
+        _check_encoding(file, encoding)
+        file = io.TextIOWrapper(file, encoding=encoding, newline='')
+
+    reader = csv.DictReader(file)
+    columns = _resolve_columns(reader.fieldnames)
+
+    employees = {}
+    for pk, employee_number, national_id in Employee.objects.values_list('pk', 'employee_id', 'national_id'):
+        employees[employee_number] = pk
+        employees.setdefault(national_id, pk)
+
+    report = {'rows': 0, 'imported': 0, 'skipped': 0, 'errors': []}
+    batch = []
+
+    for row in reader:
+        report['rows'] += 1
+        try:
+            batch.append(_build_record(row, columns, employees))
+        except AttendanceImportError as e:
+            report['skipped'] += 1
+            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                report['errors'].append((reader.line_num, str(e)))
+            continue
+
+        if len(batch) >= batch_size:
+            report['imported'] += upsert_attendance(batch, batch_size=batch_size)
+            batch = []
+
+    report['imported'] += upsert_attendance(batch, batch_size=batch_size)
+
+    logger.info(
+        f"Attendance import: {report['rows']} rows, {report['imported']} imported, "
+        f"{report['skipped']} skipped"
+    )
+    return report
@@ -0,0 +1,289 @@
+"""
+Set-based payroll computation engine.
+
+Processes a payroll run in employee batches. Each batch loads attendance
+counts (from the monthly rollups), approved commissions and applicable
+deductions with one grouped query apiece, builds the payslips in memory and
+inserts them with bulk_create. Run totals are summed in SQL. Progress is written to the
+PayrollRun after every batch so the UI can poll it while the Celery job runs.
+"""
+
+import calendar
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import AttendanceMonthlySummary, Commission, Deduction, Employee, PayrollRun, Payslip
+from .pdf import delete_payslip_pdfs
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+
+# Deduction type -> Payslip field; anything else goes to other_deductions
+DEDUCTION_FIELDS = {
+    'TAX': 'income_tax',
+    'PENSION': 'pension_contribution',
+    'INSURANCE': 'insurance_deduction',
+    'LOAN': 'loan_repayment',
+    'ADVANCE': 'loan_repayment',
+}
+OTHER_DEDUCTION_FIELD = 'other_deductions'
+
+SALARY_FIELDS = (
+    'basic_salary', 'housing_allowance', 'transport_allowance',
+    'medical_allowance', 'meal_allowance', 'other_allowances',
+)
+
+
+def _money(amount):
+    return Decimal(amount).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _month_bounds(payroll_month):
+    month_start = payroll_month.replace(day=1)
+    last_day = calendar.monthrange(month_start.year, month_start.month)[1]
+    return month_start, month_start.replace(day=last_day)
+
+
+# ============================================================================
+# Grouped loaders (one query per batch each)
+# ============================================================================
+
+def load_attendance_counts(employee_ids, payroll_month):
+    """Return {employee_id: (present_days, absent_days)} from the monthly rollups."""
+    rows = AttendanceMonthlySummary.objects.filter(
+        employee_id__in=employee_ids,
+        month=payroll_month.replace(day=1),
+    ).values_list('employee_id', 'present_days', 'absent_days')
+    return {employee_id: (present, absent) for employee_id, present, absent in rows}
+
+
+def load_commission_totals(employee_ids, payroll_month):
+    """Return {employee_id: approved commission total} for the payroll month."""
+    rows = (
+        Commission.objects
+        .filter(employee_id__in=employee_ids, payroll_month=payroll_month, status='APPROVED')
+        .values('employee_id')
+        .annotate(total=Sum('amount'))
+        .order_by()
+    )
+    return {row['employee_id']: row['total'] or ZERO for row in rows}
+
+
+def load_applicable_deductions(employee_ids, payroll_month):
+    """
+    Return {employee_id: [Deduction, ...]} for deductions that apply to the
+    month. The filter mirrors Deduction.is_applicable_for_month.
+    """
+    month_start, _ = _month_bounds(payroll_month)
+    deductions = (
+        Deduction.objects
+        .filter(employee_id__in=employee_ids, is_active=True, start_date__lte=month_start)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gte=month_start))
+        # One-time deductions only apply in the month they start
+        .filter(~Q(frequency='ONE_TIME') | Q(start_date__gte=month_start))
+        .only('employee_id', 'deduction_type', 'amount', 'is_percentage')
+        .order_by()
+    )
+    grouped = defaultdict(list)
+    for deduction in deductions:
+        grouped[deduction.employee_id].append(deduction)
+    return grouped
+
+
+# ============================================================================
+# Payslip computation
+# ============================================================================
+
+def build_payslip(payroll_run, employee, working_days, attendance, commission_amount, deductions):
+    """Compute an unsaved Payslip for one employee from preloaded data."""
+    salary = employee.salary_structure
+    gross = salary.calculate_gross_salary()
+
+    deduction_amounts = dict.fromkeys(set(DEDUCTION_FIELDS.values()) | {OTHER_DEDUCTION_FIELD}, ZERO)
+    for deduction in deductions:
+        field = DEDUCTION_FIELDS.get(deduction.deduction_type, OTHER_DEDUCTION_FIELD)
+        deduction_amounts[field] += deduction.calculate_deduction_amount(gross)
+
+    days_worked, absent_days = attendance
+
+    payslip = Payslip(
+        payroll_run=payroll_run,
+        employee=employee,
+        commission_amount=_money(commission_amount),
+        # Nothing records approved overtime hours or bonuses yet, so both are
+        # zero on generated payslips
+        overtime_amount=ZERO,
+        bonus_amount=ZERO,
+        working_days=working_days,
+        days_worked=days_worked,
+        absent_days=absent_days,
+        **{field: getattr(salary, field) for field in SALARY_FIELDS},
+        **{field: _money(amount) for field, amount in deduction_amounts.items()},
+    )
+    # bulk_create bypasses save(), so fill in the derived totals here
+    payslip.calculate_totals()
+    return payslip
+
+
+def build_payslips(payroll_run, employees):
+    """Compute unsaved payslips for a batch of employees with three queries."""
+    payroll_month = payroll_run.payroll_month
+    employee_ids = [employee.pk for employee in employees]
+    working_days = calendar.monthrange(payroll_month.year, payroll_month.month)[1]
+
+    attendance = load_attendance_counts(employee_ids, payroll_month)
+    commissions = load_commission_totals(employee_ids, payroll_month)
+    deductions = load_applicable_deductions(employee_ids, payroll_month)
+
+    return [
+        build_payslip(
+            payroll_run,
+            employee,
+            working_days,
+            attendance.get(employee.pk, (0, 0)),
+            commissions.get(employee.pk, ZERO),
+            deductions.get(employee.pk, ()),
+        )
+        for employee in employees
+    ]
+
+
+def get_payable_employees():
+    """Active employees that have a salary structure."""
+    return Employee.objects.filter(status='ACTIVE', salary_structure__isnull=False)
+
+
+# ============================================================================
+# Run processing
+# ============================================================================
+
+def process_payroll_run(payroll_run, user=None, batch_size=500):
+    """
+    Generate payslips for every payable employee and complete the run.
+
+    Payslips left by an earlier, interrupted attempt are replaced. Each batch
+    commits on its own so progress is visible to other connections; on
+    failure the partial payslips are removed and the run returns to DRAFT.
+
+    Returns:
+        The completed PayrollRun
+    """
+    employee_ids = list(get_payable_employees().order_by('pk').values_list('pk', flat=True))
+    total = len(employee_ids)
+
+    PayrollRun.objects.filter(pk=payroll_run.pk).update(
+        status='PROCESSING',
+        progress_total=total,
+        progress_processed=0,
+        processing_error='',
+        updated_at=timezone.now(),
+    )
+    delete_payslip_pdfs(payroll_run.payslips.all())
+    payroll_run.payslips.all().delete()
+
+    processed = 0
+    try:
+        for offset in range(0, total, batch_size):
+            batch_ids = employee_ids[offset:offset + batch_size]
+            employees = list(
+                Employee.objects.filter(pk__in=batch_ids)
+                .select_related('salary_structure')
+                .order_by('pk')
+            )
+            payslips = build_payslips(payroll_run, employees)
+
+            with transaction.atomic():
+                Payslip.objects.bulk_create(payslips, batch_size=batch_size)
+
+            processed += len(batch_ids)
+            # updated_at doubles as the heartbeat checked by processing_stale_before()
+            PayrollRun.objects.filter(pk=payroll_run.pk).update(
+                progress_processed=processed, updated_at=timezone.now()
+            )
+            logger.info(f"Payroll {payroll_run.payroll_number}: {processed}/{total} payslips generated")
+
+        with transaction.atomic():
+            payroll_run.calculate_totals()
+            payroll_run.status = 'COMPLETED'
+            payroll_run.progress_total = total
+            payroll_run.progress_processed = processed
+            payroll_run.processing_error = ''
+            payroll_run.processed_by = user
+            payroll_run.processed_at = timezone.now()
+            payroll_run.save(update_fields=[
+                'status', 'progress_total', 'progress_processed', 'processing_error',
+                'processed_by', 'processed_at', 'updated_at',
+            ])
+
+    except Exception as e:
+        logger.error(f"Payroll {payroll_run.payroll_number} failed after {processed}/{total} employees: {e}")
+        delete_payslip_pdfs(payroll_run.payslips.all())
+        payroll_run.payslips.all().delete()
+        PayrollRun.objects.filter(pk=payroll_run.pk).update(
+            status='DRAFT',
+            task_id='',
+            progress_processed=0,
+            processing_error=str(e)[:2000],
+            updated_at=timezone.now(),
+        )
+        raise
+
+    return payroll_run
+
+
+def processing_stale_before():
+    """
+    A PROCESSING run whose progress has not moved since this time has
+    outlived the task time limit; its worker is assumed dead.
+    """
+    return timezone.now() - timedelta(seconds=getattr(settings, 'CELERY_TASK_TIME_LIMIT', 30 * 60))
+
+
+def enqueue_payroll_run(payroll_run, user=None):
+    """
+    Queue a payroll run for background processing.
+
+    The run is claimed with a conditional UPDATE: only a DRAFT run, or a
+    PROCESSING run that has gone stale, can be claimed, so a double submit
+    queues one task.
+
+    Returns the id of the task processing the run (the one already holding
+    it if the claim lost), or None when the broker is unavailable; the run
+    then stays claimed for the caller to process inline.
+    """
+    from .tasks import process_payroll_run_task
+
+    # Record the task before queueing so a fast worker cannot be overwritten
+    task_id = str(uuid.uuid4())
+    claimable = Q(status='DRAFT') | Q(status='PROCESSING', updated_at__lt=processing_stale_before())
+    claimed = PayrollRun.objects.filter(claimable, pk=payroll_run.pk).update(
+        status='PROCESSING',
+        task_id=task_id,
+        progress_processed=0,
+        processing_error='',
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        return PayrollRun.objects.filter(pk=payroll_run.pk).values_list('task_id', flat=True).first() or ''
+
+    try:
+        process_payroll_run_task.apply_async(
+            args=[payroll_run.pk, user.pk if user else None],
+            task_id=task_id,
+            retry=False,
+        )
+    except Exception as e:
+        logger.warning(f"Could not queue payroll {payroll_run.payroll_number}: {e}")
+        return None
+
+    return task_id
@@ -546,4 +546,23 @@ class BulkAttendanceForm(forms.Form):
                 raise ValidationError('No employees selected.')
             return ids
         except ValueError:
-            raise ValidationError('Invalid employee IDs.')
\ No newline at end of file
+            raise ValidationError('Invalid employee IDs.')
+
+
+class AttendanceImportForm(forms.Form):
+    """Form for importing attendance from a CSV or biometric export."""
+    
+    file = forms.FileField(
+        help_text='CSV file, one row per employee per day',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,text/csv'
+        })
+    )
+    
+    def clean_file(self):
+        """Validate file type."""
+        file = self.cleaned_data.get('file')
+        if file and not file.name.lower().endswith('.csv'):
+            raise ValidationError('Please upload a CSV file.')
+        return file
@@ -0,0 +1,31 @@
+"""
+Payroll dashboard KPIs (see apps.dashboard.kpis)
+"""
+from django.db.models import Count, Q
+
+from apps.dashboard import kpis
+
+from .models import Commission, Employee, Leave, Loan
+
+
+@kpis.register('payroll', models=[Employee])
+def employee_kpis(today):
+    return Employee.objects.all(), {
+        'total_employees': Count('id'),
+        'active_employees': Count('id', filter=Q(status='ACTIVE')),
+    }
+
+
+@kpis.register('payroll', models=[Leave])
+def leave_kpis(today):
+    return Leave.objects.all(), {'pending_leaves': Count('id', filter=Q(status='PENDING'))}
+
+
+@kpis.register('payroll', models=[Loan])
+def loan_kpis(today):
+    return Loan.objects.all(), {'pending_loans': Count('id', filter=Q(status='PENDING'))}
+
+
+@kpis.register('payroll', models=[Commission])
+def commission_kpis(today):
+    return Commission.objects.all(), {'pending_commissions': Count('id', filter=Q(status='PENDING'))}
@@ -0,0 +1,205 @@
+"""
+Management command to benchmark the batch statutory deduction API against
+per-salary calculation and check that both agree to the cent.
+
+The baseline is a verbatim copy of the per-employee functions payroll.utils
+had before the rate tables (hard-coded 2024 rates, unrounded Decimals), so
+the speed-up can be reproduced after the scalar API itself moved onto the
+tables.
+"""
+import time
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payroll import statutory
+from apps.payroll.utils import (
+    calculate_housing_levy, calculate_nhif_contribution,
+    calculate_nssf_contribution, calculate_paye_tax,
+)
+
+# Rate table the legacy functions hard-code
+LEGACY_TABLE_VERSION = '2024'
+
+
+# ============================================================================
+# Legacy per-employee implementation (payroll.utils before rate tables)
+# ============================================================================
+
+def legacy_paye_tax(gross_salary):
+    tax = Decimal('0.00')
+    bands = [
+        (Decimal('24000'), Decimal('0.10')),
+        (Decimal('8333'), Decimal('0.25')),
+        (Decimal('467667'), Decimal('0.30')),
+        (Decimal('300000'), Decimal('0.325')),
+    ]
+    remaining = gross_salary
+    for band_limit, rate in bands:
+        if remaining <= 0:
+            break
+        taxable_in_band = min(remaining, band_limit)
+        tax += taxable_in_band * rate
+        remaining -= taxable_in_band
+    if remaining > 0:
+        tax += remaining * Decimal('0.35')
+    return max(tax - Decimal('2400'), Decimal('0.00'))
+
+
+def legacy_nhif_contribution(gross_salary):
+    if gross_salary <= 5999:
+        return Decimal('150')
+    elif gross_salary <= 7999:
+        return Decimal('300')
+    elif gross_salary <= 11999:
+        return Decimal('400')
+    elif gross_salary <= 14999:
+        return Decimal('500')
+    elif gross_salary <= 19999:
+        return Decimal('600')
+    elif gross_salary <= 24999:
+        return Decimal('750')
+    elif gross_salary <= 29999:
+        return Decimal('850')
+    elif gross_salary <= 34999:
+        return Decimal('900')
+    elif gross_salary <= 39999:
+        return Decimal('950')
+    elif gross_salary <= 44999:
+        return Decimal('1000')
+    elif gross_salary <= 49999:
+        return Decimal('1100')
+    elif gross_salary <= 59999:
+        return Decimal('1200')
+    elif gross_salary <= 69999:
+        return Decimal('1300')
+    elif gross_salary <= 79999:
+        return Decimal('1400')
+    elif gross_salary <= 89999:
+        return Decimal('1500')
+    elif gross_salary <= 99999:
+        return Decimal('1600')
+    else:
+        return Decimal('1700')
+
+
+def legacy_nssf_contribution(gross_salary):
+    tier1_limit = Decimal('7000')
+    tier2_limit = Decimal('36000')
+    rate = Decimal('0.06')
+    contribution = min(gross_salary, tier1_limit) * rate
+    if gross_salary > tier1_limit:
+        contribution += min(gross_salary - tier1_limit, tier2_limit - tier1_limit) * rate
+    return contribution
+
+
+def legacy_housing_levy(gross_salary):
+    return gross_salary * Decimal('0.015')
+
+
+LEGACY_FUNCTIONS = {
+    'paye': legacy_paye_tax,
+    'nhif': legacy_nhif_contribution,
+    'nssf': legacy_nssf_contribution,
+    'housing_levy': legacy_housing_levy,
+}
+
+
+def _time_per_salary(functions, salaries):
+    started = time.perf_counter()
+    results = {name: [] for name in statutory.DEDUCTION_NAMES}
+    for gross in salaries:
+        for name in statutory.DEDUCTION_NAMES:
+            results[name].append(functions[name](gross))
+    return results, time.perf_counter() - started
+
+
+def _mismatches(results, batch):
+    count = 0
+    for name in statutory.DEDUCTION_NAMES:
+        expected = np.fromiter((statutory.to_cents(value) for value in results[name]), dtype=np.int64)
+        count += int(np.count_nonzero(expected != batch[name]))
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Benchmark legacy per-salary vs batch PAYE/NHIF/NSSF/housing levy calculation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=100000,
+            help='Number of gross salaries to evaluate (default: 100000)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the generated salaries',
+        )
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            default=None,
+            help='Payroll date selecting the rate table (YYYY-MM-DD, default: today)',
+        )
+
+    def handle(self, *args, **options):
+        count = options['count']
+        on_date = options['date']
+        table = statutory.get_rate_table(on_date)
+
+        # Log-normal salaries around KES 60k, including the low and high bands
+        rng = np.random.default_rng(options['seed'])
+        cents = np.clip(rng.lognormal(np.log(6000000), 0.9, count), 100000, 200000000).astype(np.int64)
+        salaries = [statutory.from_cents(value) for value in cents.tolist()]
+
+        self.stdout.write(f'Rate table {table.version}, {count:,} salaries')
+
+        legacy, legacy_seconds = _time_per_salary(LEGACY_FUNCTIONS, salaries)
+        scalar, scalar_seconds = _time_per_salary({
+            'paye': lambda gross: calculate_paye_tax(gross, on_date),
+            'nhif': lambda gross: calculate_nhif_contribution(gross, on_date),
+            'nssf': lambda gross: calculate_nssf_contribution(gross, on_date),
+            'housing_levy': lambda gross: calculate_housing_levy(gross, on_date),
+        }, salaries)
+
+        started = time.perf_counter()
+        batch = statutory.compute_batch(salaries, on_date, as_cents=True)
+        batch_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        table.batch_cents(cents)
+        kernel_seconds = time.perf_counter() - started
+
+        self.stdout.write(f'Legacy per-salary (baseline): {legacy_seconds:8.3f}s')
+        self.stdout.write(
+            f'Per-salary functions:         {scalar_seconds:8.3f}s '
+            f'({legacy_seconds / scalar_seconds:,.1f}x)'
+        )
+        self.stdout.write(
+            f'Batch (Decimal input):        {batch_seconds:8.3f}s '
+            f'({legacy_seconds / batch_seconds:,.0f}x)'
+        )
+        self.stdout.write(
+            f'Batch (cent array input):     {kernel_seconds:8.3f}s '
+            f'({legacy_seconds / kernel_seconds:,.0f}x)'
+        )
+
+        mismatches = _mismatches(scalar, batch)
+        if mismatches:
+            raise CommandError(f'{mismatches} amount(s) differ between the batch and scalar APIs')
+
+        if table.version != LEGACY_TABLE_VERSION:
+            self.stdout.write(self.style.WARNING(
+                f'Rate table {table.version} is not the legacy {LEGACY_TABLE_VERSION} rates; '
+                'legacy results not compared.'
+            ))
+        else:
+            mismatches = _mismatches(legacy, batch)
+            if mismatches:
+                raise CommandError(f'{mismatches} amount(s) differ between the batch and legacy functions')
+        self.stdout.write(self.style.SUCCESS('Batch and per-salary results agree to the cent.'))
@@ -0,0 +1,83 @@
+"""
+Management command to render and store payslip PDFs for a payroll run,
+or to benchmark rendering throughput against the number of worker processes
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payroll.models import PayrollRun
+from apps.payroll.pdf import generate_payroll_run_pdfs, iter_rendered, payslip_context
+
+
+class Command(BaseCommand):
+    help = 'Render payslip PDFs for a payroll run (or benchmark payslips/second by worker count)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('payroll_number', help='Payroll number, e.g. PAY-202501-001')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes (default: CPU count)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render payslips that already have a current PDF',
+        )
+        parser.add_argument(
+            '--benchmark',
+            default=None,
+            help='Comma-separated worker counts to time, e.g. 1,2,4,8 (nothing is stored)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=1,
+            help='Render each payslip this many times when benchmarking',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            payroll_run = PayrollRun.objects.get(payroll_number=options['payroll_number'])
+        except PayrollRun.DoesNotExist:
+            raise CommandError(f"Payroll run {options['payroll_number']} not found")
+
+        if options['benchmark']:
+            self._benchmark(payroll_run, options)
+            return
+
+        report = generate_payroll_run_pdfs(payroll_run, workers=options['workers'], force=options['force'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {report['rendered']} PDF(s), reused {report['reused']} "
+            f"in {report['elapsed_seconds']}s ({report['payslips_per_second']} payslips/s, "
+            f"{report['workers']} worker(s))."
+        ))
+
+    def _benchmark(self, payroll_run, options):
+        try:
+            worker_counts = [int(value) for value in options['benchmark'].split(',')]
+        except ValueError:
+            raise CommandError('--benchmark expects comma-separated integers')
+
+        payslips = payroll_run.payslips.select_related('employee', 'payroll_run')
+        items = [(p.pk, payslip_context(p)) for p in payslips] * options['repeat']
+        if not items:
+            raise CommandError(f'{payroll_run.payroll_number} has no payslips')
+
+        self.stdout.write(f'{len(items)} payslips, {os.cpu_count()} CPU(s)')
+        self.stdout.write(f"{'workers':>8} {'seconds':>9} {'payslips/s':>11} {'speedup':>8}")
+
+        baseline = None
+        for workers in worker_counts:
+            started = time.perf_counter()
+            size = sum(len(content) for _, content in iter_rendered(items, workers=workers))
+            elapsed = time.perf_counter() - started
+
+            rate = len(items) / elapsed
+            baseline = baseline or rate
+            self.stdout.write(f'{workers:>8} {elapsed:>9.2f} {rate:>11.1f} {rate / baseline:>7.2f}x')
+
+        self.stdout.write(f'Average PDF size: {size / len(items) / 1024:.1f} KB')
@@ -0,0 +1,36 @@
+"""
+Management command to import attendance from a CSV or biometric export
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payroll.attendance import AttendanceImportError, import_attendance_csv
+
+
+class Command(BaseCommand):
+    help = 'Import attendance rows from a CSV file (upserts by employee and date)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the CSV file')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per upsert batch (default: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as file:
+                report = import_attendance_csv(file, batch_size=options['batch_size'])
+        except OSError as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+        except AttendanceImportError as e:
+            raise CommandError(str(e))
+
+        for line, error in report['errors']:
+            self.stderr.write(f'Line {line}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['imported']} attendance record(s) from {report['rows']} row(s), "
+            f"{report['skipped']} skipped."
+        ))
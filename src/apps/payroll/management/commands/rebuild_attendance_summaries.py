@@ -0,0 +1,15 @@
+"""
+Management command to recompute attendance monthly rollups from the
+attendance table
+"""
+from django.core.management.base import BaseCommand
+
+from apps.payroll.models import AttendanceMonthlySummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every AttendanceMonthlySummary row from attendance records'
+
+    def handle(self, *args, **options):
+        count = AttendanceMonthlySummary.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} attendance summary row(s).'))
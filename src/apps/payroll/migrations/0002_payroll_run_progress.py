@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-18 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrollrun',
+            name='processing_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='progress_processed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='progress_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='task_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
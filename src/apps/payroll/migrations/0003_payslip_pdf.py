@@ -0,0 +1,23 @@
+# Generated by Django 5.1 on 2026-10-18 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0002_payroll_run_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='pdf_file',
+            field=models.FileField(blank=True, upload_to='payroll/payslips/%Y/%m/'),
+        ),
+        migrations.AddField(
+            model_name='payslip',
+            name='pdf_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
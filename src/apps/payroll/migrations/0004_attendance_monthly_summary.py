@@ -0,0 +1,75 @@
+# Generated by Django 5.1 on 2026-10-18 21:09
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+STATUS_FIELDS = {
+    'PRESENT': 'present_days',
+    'ABSENT': 'absent_days',
+    'LATE': 'late_days',
+    'HALF_DAY': 'half_days',
+    'ON_LEAVE': 'leave_days',
+    'HOLIDAY': 'holiday_days',
+}
+
+
+def build_summaries(apps, schema_editor):
+    from django.db.models.functions import TruncMonth
+
+    Attendance = apps.get_model('payroll', 'Attendance')
+    AttendanceMonthlySummary = apps.get_model('payroll', 'AttendanceMonthlySummary')
+
+    rows = (
+        Attendance.objects.annotate(month=TruncMonth('attendance_date'))
+        .values('employee_id', 'month')
+        .annotate(
+            total_hours=models.Sum('hours_worked'),
+            **{field: models.Count('id', filter=models.Q(status=status)) for status, field in STATUS_FIELDS.items()}
+        )
+        .order_by()
+    )
+    AttendanceMonthlySummary.objects.bulk_create((
+        AttendanceMonthlySummary(
+            employee_id=row['employee_id'],
+            month=row['month'],
+            total_hours=row['total_hours'] or Decimal('0.00'),
+            **{field: row[field] for field in STATUS_FIELDS.values()}
+        )
+        for row in rows.iterator()
+    ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0003_payslip_pdf'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('present_days', models.PositiveIntegerField(default=0)),
+                ('absent_days', models.PositiveIntegerField(default=0)),
+                ('late_days', models.PositiveIntegerField(default=0)),
+                ('half_days', models.PositiveIntegerField(default=0)),
+                ('leave_days', models.PositiveIntegerField(default=0)),
+                ('holiday_days', models.PositiveIntegerField(default=0)),
+                ('total_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=7)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='payroll.employee')),
+            ],
+            options={
+                'verbose_name': 'Attendance Monthly Summary',
+                'verbose_name_plural': 'Attendance Monthly Summaries',
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['month'], name='payroll_att_month_008bd4_idx')],
+                'unique_together': {('employee', 'month')},
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-18 23:20
+
+import apps.payroll.models
+import config.storage_backends
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def remove_public_pdfs(apps, schema_editor):
+    """
+    PDFs rendered so far sit in public MEDIA_ROOT under guessable names:
+    delete them; each payslip is re-rendered into private storage on its
+    next download.
+    """
+    Payslip = apps.get_model('payroll', 'Payslip')
+
+    payslips = Payslip.objects.exclude(pdf_file='')
+    for name in payslips.values_list('pdf_file', flat=True).iterator():
+        try:
+            default_storage.delete(name)
+        except OSError:
+            pass
+    payslips.update(pdf_file='', pdf_generated_at=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0004_attendance_monthly_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payslip',
+            name='pdf_file',
+            field=models.FileField(blank=True, storage=config.storage_backends.get_private_storage, upload_to=apps.payroll.models.payslip_pdf_upload_to),
+        ),
+        migrations.RunPython(remove_public_pdfs, migrations.RunPython.noop),
+    ]
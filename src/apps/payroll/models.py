@@ -3,13 +3,19 @@ Models for the payroll app.
 Handles employee management, salary processing, commissions, and deductions.
 """
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from decimal import Decimal
 from datetime import date, timedelta
 import calendar
+import uuid
+
+from config.storage_backends import get_private_storage
+from utils.signals import batch_receiver
 
 User = get_user_model()
 
@@ -477,6 +483,12 @@ class PayrollRun(models.Model):
     # Payment
     payment_date = models.DateField(null=True, blank=True)
     
+    # Background processing progress
+    task_id = models.CharField(max_length=255, blank=True)
+    progress_total = models.PositiveIntegerField(default=0)
+    progress_processed = models.PositiveIntegerField(default=0)
+    processing_error = models.TextField(blank=True)
+    
     # Metadata
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -511,19 +523,46 @@ class PayrollRun(models.Model):
         
         super().save(*args, **kwargs)
     
+    @property
+    def is_processing(self):
+        """A background job holds the run and is still making progress."""
+        from .engine import processing_stale_before
+        
+        return (
+            self.status == 'PROCESSING'
+            and bool(self.task_id)
+            and self.updated_at >= processing_stale_before()
+        )
+    
     def calculate_totals(self):
         """Calculate total amounts from payslips."""
-        payslips = self.payslips.all()
+        totals = self.payslips.aggregate(
+            count=models.Count('id'),
+            gross=models.Sum('gross_salary'),
+            deductions=models.Sum('total_deductions'),
+            net=models.Sum('net_salary'),
+        )
         
-        self.total_employees = payslips.count()
-        self.total_gross = sum(p.gross_salary for p in payslips)
-        self.total_deductions = sum(p.total_deductions for p in payslips)
-        self.total_net = sum(p.net_salary for p in payslips)
+        self.total_employees = totals['count']
+        self.total_gross = totals['gross'] or Decimal('0.00')
+        self.total_deductions = totals['deductions'] or Decimal('0.00')
+        self.total_net = totals['net'] or Decimal('0.00')
         
         self.save(update_fields=[
             'total_employees', 'total_gross', 
             'total_deductions', 'total_net'
         ])
+    
+    def get_progress_percentage(self):
+        """Percentage of employees processed by the background job."""
+        if self.progress_total:
+            return int(self.progress_processed * 100 / self.progress_total)
+        return 100 if self.status == 'COMPLETED' else 0
+
+
+def payslip_pdf_upload_to(instance, filename):
+    """Random name, so a stored payslip cannot be found by guessing its path"""
+    return f"payslips/{timezone.now():%Y/%m}/{uuid.uuid4().hex}.pdf"
 
 
 class Payslip(models.Model):
@@ -573,6 +612,11 @@ class Payslip(models.Model):
     payment_date = models.DateField(null=True, blank=True)
     payment_reference = models.CharField(max_length=100, blank=True)
     
+    # Rendered PDF (see pdf.py); stale once updated_at passes pdf_generated_at.
+    # Private storage under a random name: served only by payslip_download
+    pdf_file = models.FileField(upload_to=payslip_pdf_upload_to, storage=get_private_storage, blank=True)
+    pdf_generated_at = models.DateTimeField(null=True, blank=True)
+    
     # Metadata
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -592,6 +636,11 @@ class Payslip(models.Model):
     
     def save(self, *args, **kwargs):
         """Calculate totals before saving."""
+        self.calculate_totals()
+        super().save(*args, **kwargs)
+    
+    def calculate_totals(self):
+        """Set gross, total deductions and net from the line items."""
         # Calculate gross salary
         self.gross_salary = (
             self.basic_salary +
@@ -616,8 +665,6 @@ class Payslip(models.Model):
         
         # Calculate net salary
         self.net_salary = self.gross_salary - self.total_deductions
-        
-        super().save(*args, **kwargs)
 
 
 class Attendance(models.Model):
@@ -668,6 +715,129 @@ class Attendance(models.Model):
         return f"{self.employee.get_full_name()} - {self.attendance_date}"
 
 
+class AttendanceMonthlySummaryManager(models.Manager):
+    """Per employee-month attendance rollups, refreshed from attendance rows"""
+    
+    def _aggregate(self, attendance):
+        """Annotate grouped attendance rows with per-status counts and hours."""
+        counts = {
+            field: models.Count('id', filter=models.Q(status=status))
+            for status, field in AttendanceMonthlySummary.STATUS_FIELDS.items()
+        }
+        return attendance.annotate(total_hours=models.Sum('hours_worked'), **counts).order_by()
+    
+    def _values(self, row=None):
+        values = {field: (row or {}).get(field, 0) for field in AttendanceMonthlySummary.STATUS_FIELDS.values()}
+        values['total_hours'] = (row or {}).get('total_hours') or Decimal('0.00')
+        return values
+    
+    def refresh(self, buckets):
+        """
+        Recompute the rollups for (employee_id, date) buckets; dates are
+        reduced to their month. Runs one grouped query per month and a
+        single upsert.
+        """
+        months = {}
+        for employee_id, day in buckets:
+            months.setdefault(day.replace(day=1), set()).add(employee_id)
+        
+        summaries = []
+        for month, employee_ids in months.items():
+            last_day = month.replace(day=calendar.monthrange(month.year, month.month)[1])
+            rows = self._aggregate(
+                Attendance.objects.filter(
+                    employee_id__in=employee_ids,
+                    attendance_date__range=(month, last_day),
+                ).values('employee_id')
+            )
+            found = {row['employee_id']: row for row in rows}
+            summaries.extend(
+                self.model(employee_id=employee_id, month=month, **self._values(found.get(employee_id)))
+                for employee_id in employee_ids
+            )
+        
+        if summaries:
+            self.bulk_create(
+                summaries,
+                update_conflicts=True,
+                unique_fields=['employee', 'month'],
+                update_fields=[*AttendanceMonthlySummary.STATUS_FIELDS.values(), 'total_hours', 'updated_at'],
+                batch_size=1000,
+            )
+        return len(summaries)
+    
+    def for_month(self, employee_ids, month):
+        """Return {employee_id: AttendanceMonthlySummary} for a month."""
+        return {
+            summary.employee_id: summary
+            for summary in self.filter(employee_id__in=employee_ids, month=month.replace(day=1))
+        }
+    
+    def rebuild(self):
+        """Recompute every rollup from the attendance table"""
+        from django.db.models.functions import TruncMonth
+        
+        rows = self._aggregate(
+            Attendance.objects.annotate(month=TruncMonth('attendance_date')).values('employee_id', 'month')
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create((
+                self.model(employee_id=row['employee_id'], month=row['month'], **self._values(row))
+                for row in rows.iterator()
+            ), batch_size=1000)
+        return self.count()
+
+
+class AttendanceMonthlySummary(models.Model):
+    """
+    Attendance counts per status and total hours for one employee-month.
+    Kept current by the attendance upsert path and, once per committed
+    transaction, by Attendance save/delete, so payroll and summaries never
+    re-count daily rows.
+    """
+    
+    STATUS_FIELDS = {
+        'PRESENT': 'present_days',
+        'ABSENT': 'absent_days',
+        'LATE': 'late_days',
+        'HALF_DAY': 'half_days',
+        'ON_LEAVE': 'leave_days',
+        'HOLIDAY': 'holiday_days',
+    }
+    
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='attendance_summaries'
+    )
+    month = models.DateField(help_text="First day of the month")
+    
+    present_days = models.PositiveIntegerField(default=0)
+    absent_days = models.PositiveIntegerField(default=0)
+    late_days = models.PositiveIntegerField(default=0)
+    half_days = models.PositiveIntegerField(default=0)
+    leave_days = models.PositiveIntegerField(default=0)
+    holiday_days = models.PositiveIntegerField(default=0)
+    total_hours = models.DecimalField(max_digits=7, decimal_places=2, default=Decimal('0.00'))
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = AttendanceMonthlySummaryManager()
+    
+    class Meta:
+        verbose_name = "Attendance Monthly Summary"
+        verbose_name_plural = "Attendance Monthly Summaries"
+        ordering = ['-month']
+        unique_together = ['employee', 'month']
+        indexes = [
+            models.Index(fields=['month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.employee.get_full_name()} - {self.month.strftime('%B %Y')}"
+
+
 class Leave(models.Model):
     """Employee leave management."""
     
@@ -810,4 +980,31 @@ class Loan(models.Model):
         """Get percentage of loan repaid."""
         if self.total_repayable > 0:
             return (self.amount_repaid / self.total_repayable) * 100
-        return 0
\ No newline at end of file
+        return 0
+
+
+# ==================== SIGNAL RECEIVERS ====================
+
+@receiver(pre_save, sender=Attendance)
+def remember_previous_attendance_bucket(sender, instance, **kwargs):
+    """Remember the employee-month a changed attendance row belonged to"""
+    instance._previous_bucket = None
+    if instance.pk:
+        instance._previous_bucket = Attendance.objects.filter(pk=instance.pk).values_list(
+            'employee_id', 'attendance_date'
+        ).first()
+
+
+def _attendance_buckets(attendance):
+    """The employee-months an attendance save or delete touches"""
+    buckets = {(attendance.employee_id, attendance.attendance_date)}
+    previous = getattr(attendance, '_previous_bucket', None)
+    if previous:
+        buckets.add(previous)
+    return buckets
+
+
+@batch_receiver([post_save, post_delete], sender=Attendance, snapshot=_attendance_buckets)
+def refresh_attendance_summaries(sender, events):
+    """Keep the employee-month rollups current, once per transaction"""
+    AttendanceMonthlySummary.objects.refresh(set().union(*(event.data for event in events)))
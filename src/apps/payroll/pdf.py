@@ -0,0 +1,379 @@
+"""
+Payslip PDF rendering and bulk export.
+
+Rendering works on plain dicts built by payslip_context(), so a whole
+PayrollRun can be rendered in a process pool: workers never touch the
+database and each keeps its own ReportLab style cache. Finished PDFs are
+stored on Payslip.pdf_file (private storage outside MEDIA_ROOT, under
+random names) and reused by the download views and email delivery until
+the payslip changes. iter_payroll_run_zip() streams stored PDFs into a
+ZIP without holding the archive in memory.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+logger = logging.getLogger(__name__)
+
+EARNING_FIELDS = (
+    ('basic_salary', 'Basic Salary'),
+    ('housing_allowance', 'Housing Allowance'),
+    ('transport_allowance', 'Transport Allowance'),
+    ('medical_allowance', 'Medical Allowance'),
+    ('meal_allowance', 'Meal Allowance'),
+    ('other_allowances', 'Other Allowances'),
+    ('commission_amount', 'Commission'),
+    ('overtime_amount', 'Overtime'),
+    ('bonus_amount', 'Bonus'),
+)
+
+DEDUCTION_FIELDS = (
+    ('income_tax', 'Income Tax (PAYE)'),
+    ('pension_contribution', 'Pension'),
+    ('insurance_deduction', 'Insurance'),
+    ('loan_repayment', 'Loan Repayment'),
+    ('other_deductions', 'Other Deductions'),
+)
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+# ============================================================================
+# Rendering (runs in pool workers; no database access)
+# ============================================================================
+
+_styles = None
+_table_styles = None
+
+
+def _get_styles():
+    """Build paragraph and table styles once per process."""
+    global _styles, _table_styles
+
+    if _styles is None:
+        base = getSampleStyleSheet()
+        _styles = {
+            'title': ParagraphStyle(
+                'PayslipTitle',
+                parent=base['Heading1'],
+                fontSize=20,
+                textColor=colors.HexColor('#1e40af'),
+                spaceAfter=6,
+                alignment=TA_CENTER,
+            ),
+            'subtitle': ParagraphStyle(
+                'PayslipSubtitle',
+                parent=base['Normal'],
+                fontSize=11,
+                alignment=TA_CENTER,
+                spaceAfter=18,
+            ),
+            'heading': ParagraphStyle(
+                'PayslipHeading',
+                parent=base['Heading2'],
+                fontSize=12,
+                textColor=colors.HexColor('#1e40af'),
+                spaceAfter=8,
+            ),
+            'normal': base['Normal'],
+        }
+        _table_styles = {
+            'details': TableStyle([
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ]),
+            'amounts': TableStyle([
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+                ('LINEABOVE', (0, -1), (-1, -1), 1, colors.black),
+            ]),
+            'net': TableStyle([
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 12),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+                ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#eff6ff')),
+                ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#1e40af')),
+                ('TOPPADDING', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ]),
+        }
+    return _styles, _table_styles
+
+
+def render_payslip_pdf(context):
+    """
+    Render one payslip to PDF bytes.
+
+    Args:
+        context: dict produced by payslip_context()
+    """
+    styles, table_styles = _get_styles()
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        title=f"Payslip {context['employee_id']} {context['period']}",
+        leftMargin=0.75 * inch,
+        rightMargin=0.75 * inch,
+        topMargin=0.75 * inch,
+        bottomMargin=0.75 * inch,
+    )
+
+    elements = [
+        Paragraph(escape(context['company_name']), styles['title']),
+        Paragraph(f"PAYSLIP &mdash; {context['period']}", styles['subtitle']),
+    ]
+
+    details = Table([
+        ['Employee:', context['employee_name'], 'Payroll No:', context['payroll_number']],
+        ['Employee ID:', context['employee_id'], 'Working Days:', context['working_days']],
+        ['Job Title:', context['job_title'], 'Days Worked:', context['days_worked']],
+        ['Department:', context['department'], 'Bank:', context['bank']],
+    ], colWidths=[1.1 * inch, 2.4 * inch, 1.1 * inch, 2.2 * inch])
+    details.setStyle(table_styles['details'])
+    elements += [details, Spacer(1, 0.25 * inch)]
+
+    for heading, rows, total_label, total in (
+        ('Earnings', context['earnings'], 'Gross Salary', context['gross_salary']),
+        ('Deductions', context['deductions'], 'Total Deductions', context['total_deductions']),
+    ):
+        elements.append(Paragraph(heading, styles['heading']))
+        table = Table(rows + [[total_label, total]], colWidths=[4.8 * inch, 2 * inch])
+        table.setStyle(table_styles['amounts'])
+        elements += [table, Spacer(1, 0.2 * inch)]
+
+    net = Table([['Net Pay', context['net_salary']]], colWidths=[4.8 * inch, 2 * inch])
+    net.setStyle(table_styles['net'])
+    elements += [net, Spacer(1, 0.4 * inch)]
+
+    elements.append(Paragraph(
+        "This is a computer generated payslip and does not require a signature.",
+        styles['normal'],
+    ))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def _render_item(item):
+    """Pool entry point: (payslip_id, context) -> (payslip_id, pdf bytes)."""
+    payslip_id, context = item
+    return payslip_id, render_payslip_pdf(context)
+
+
+def _money(amount):
+    return f"KES {amount:,.2f}"
+
+
+def payslip_context(payslip, company_name=None):
+    """Plain, picklable rendering data for a payslip (select employee and payroll_run)."""
+    from django.conf import settings
+
+    employee = payslip.employee
+    return {
+        'company_name': company_name or getattr(settings, 'COMPANY_NAME', ''),
+        'period': payslip.payroll_run.payroll_month.strftime('%B %Y'),
+        'payroll_number': payslip.payroll_run.payroll_number,
+        'employee_name': employee.get_full_name(),
+        'employee_id': employee.employee_id,
+        'job_title': employee.job_title,
+        'department': employee.department,
+        'bank': f"{employee.bank_name} ****{employee.bank_account_number[-4:]}",
+        'working_days': str(payslip.working_days),
+        'days_worked': str(payslip.days_worked),
+        'earnings': [
+            [label, _money(getattr(payslip, field))]
+            for field, label in EARNING_FIELDS
+            if getattr(payslip, field) or field == 'basic_salary'
+        ],
+        'deductions': [
+            [label, _money(getattr(payslip, field))]
+            for field, label in DEDUCTION_FIELDS
+            if getattr(payslip, field)
+        ],
+        'gross_salary': _money(payslip.gross_salary),
+        'total_deductions': _money(payslip.total_deductions),
+        'net_salary': _money(payslip.net_salary),
+    }
+
+
+def iter_rendered(items, workers=None, chunksize=8):
+    """
+    Render (payslip_id, context) items, yielding (payslip_id, pdf bytes) in order.
+
+    Uses a process pool when workers > 1. Daemonic processes (Celery prefork
+    workers) cannot start children, so they render inline instead.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and multiprocessing.current_process().daemon:
+        logger.info("Rendering payslips inline: daemonic process cannot start a pool")
+        workers = 1
+
+    if workers == 1:
+        yield from map(_render_item, items)
+        return
+
+    # spawn: workers import only this module and ReportLab, never the parent's DB connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        yield from pool.map(_render_item, items, chunksize=chunksize)
+
+
+# ============================================================================
+# Stored PDFs
+# ============================================================================
+
+def payslip_pdf_is_current(payslip):
+    """True when the stored PDF was rendered after the payslip last changed."""
+    return bool(
+        payslip.pdf_file and payslip.pdf_generated_at
+        and payslip.pdf_generated_at >= payslip.updated_at
+    )
+
+
+def payslip_pdf_filename(payslip):
+    month = payslip.payroll_run.payroll_month.strftime('%Y-%m')
+    return f"payslip_{payslip.employee.employee_id}_{month}.pdf"
+
+
+def _store_pdf(payslip, content):
+    from django.core.files.base import ContentFile
+    from django.utils import timezone
+    from .models import Payslip
+
+    if payslip.pdf_file:
+        payslip.pdf_file.delete(save=False)
+    payslip.pdf_file.save(payslip_pdf_filename(payslip), ContentFile(content), save=False)
+    payslip.pdf_generated_at = timezone.now()
+    # Queryset update keeps updated_at (and so the freshness check) unchanged
+    Payslip.objects.filter(pk=payslip.pk).update(
+        pdf_file=payslip.pdf_file.name,
+        pdf_generated_at=payslip.pdf_generated_at,
+    )
+
+
+def delete_payslip_pdfs(payslips):
+    """Remove stored PDF files for a Payslip queryset (before deleting the rows)."""
+    storage = payslips.model._meta.get_field('pdf_file').storage
+
+    for name in payslips.exclude(pdf_file='').values_list('pdf_file', flat=True).iterator():
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Could not delete payslip PDF %s", name)
+
+
+def get_payslip_pdf(payslip):
+    """Return the payslip's stored PDF file, rendering it first if missing or stale."""
+    if not payslip_pdf_is_current(payslip):
+        _store_pdf(payslip, render_payslip_pdf(payslip_context(payslip)))
+    return payslip.pdf_file
+
+
+def generate_payroll_run_pdfs(payroll_run, workers=None, force=False):
+    """
+    Render and store PDFs for every payslip in a run that lacks a current one.
+
+    Returns:
+        dict with rendered, reused, workers, elapsed_seconds, payslips_per_second
+    """
+    from django.conf import settings
+
+    payslips = {
+        payslip.pk: payslip
+        for payslip in payroll_run.payslips.select_related('employee', 'payroll_run')
+    }
+    pending = [p for p in payslips.values() if force or not payslip_pdf_is_current(p)]
+
+    company_name = getattr(settings, 'COMPANY_NAME', '')
+    items = [(p.pk, payslip_context(p, company_name)) for p in pending]
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    for payslip_id, content in iter_rendered(items, workers=min(workers, max(len(items), 1))):
+        _store_pdf(payslips[payslip_id], content)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'rendered': len(items),
+        'reused': len(payslips) - len(items),
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 3),
+        'payslips_per_second': round(len(items) / elapsed, 1) if elapsed and items else 0,
+    }
+
+
+# ============================================================================
+# ZIP streaming
+# ============================================================================
+
+class _ZipOutput(io.RawIOBase):
+    """Write-only, non-seekable sink whose contents are drained after each write."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_payroll_run_zip(payroll_run):
+    """
+    Yield a ZIP archive of the run's stored payslip PDFs in chunks.
+
+    Stored PDFs are copied in; a payslip without a current PDF is rendered
+    and stored when its entry is reached. Only one chunk is held in memory
+    at a time.
+    """
+    output = _ZipOutput()
+    payslips = (
+        payroll_run.payslips.select_related('employee', 'payroll_run')
+        .order_by('employee__employee_id')
+    )
+
+    # PDFs are already compressed, so store them as-is
+    with zipfile.ZipFile(output, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for payslip in payslips.iterator(chunk_size=200):
+            pdf_file = get_payslip_pdf(payslip)
+            with pdf_file.open('rb') as source, archive.open(payslip_pdf_filename(payslip), 'w') as entry:
+                for chunk in iter(lambda: source.read(ZIP_CHUNK_SIZE), b''):
+                    entry.write(chunk)
+                    data = output.drain()
+                    if data:
+                        yield data
+            data = output.drain()
+            if data:
+                yield data
+
+    yield output.drain()
@@ -0,0 +1,276 @@
+"""
+Kenyan statutory deductions: PAYE, NHIF, NSSF and the housing levy.
+
+Rates are held in versioned, effective-dated tables (STATUTORY_RATE_TABLES).
+Two APIs share each table:
+- compute_batch() works on an array of gross salaries at once with numpy
+- compute() and the per-deduction helpers work on a single Decimal
+
+Both run the same integer arithmetic: salaries are whole cents, rates are
+integers out of RATE_SCALE, and each amount is rounded half-up to a cent
+once at the end. The two APIs therefore agree to the cent.
+"""
+
+import bisect
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+
+RATE_SCALE = 10000
+CENT = Decimal('0.01')
+
+DEDUCTION_NAMES = ('paye', 'nhif', 'nssf', 'housing_levy')
+
+
+def to_cents(amount):
+    """Convert a money amount to whole cents (half-up)."""
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_cents(cents):
+    """Convert whole cents back to a Decimal amount."""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _scaled_rate(rate):
+    scaled = Decimal(rate) * RATE_SCALE
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"Rate {rate} needs more precision than 1/{RATE_SCALE}")
+    return int(scaled)
+
+
+def _round_scaled(units):
+    """Round amounts in cents * RATE_SCALE to whole cents (half-up, non-negative)."""
+    return (units + RATE_SCALE // 2) // RATE_SCALE
+
+
+class StatutoryRateTable:
+    """
+    One version of the statutory rates.
+
+    Args:
+        version: Label shown in reports
+        effective_from: First payroll date the table applies to
+        paye_bands: ((upper_limit, rate), ...) in ascending order; the last
+            band's upper_limit is None
+        personal_relief: Monthly PAYE relief
+        nhif_bands: ((upper_limit, contribution), ...); gross salaries up to
+            and including upper_limit pay contribution; last upper_limit is None
+        nssf_rate: Employee NSSF rate (Tier I and II)
+        nssf_upper_limit: Upper earnings limit for NSSF
+        housing_levy_rate: Affordable Housing Levy rate
+    """
+
+    def __init__(self, version, effective_from, paye_bands, personal_relief,
+                 nhif_bands, nssf_rate, nssf_upper_limit, housing_levy_rate):
+        self.version = version
+        self.effective_from = effective_from
+        self.paye_bands = paye_bands
+        self.personal_relief = Decimal(personal_relief)
+        self.nhif_bands = nhif_bands
+        self.nssf_rate = Decimal(nssf_rate)
+        self.nssf_upper_limit = Decimal(nssf_upper_limit)
+        self.housing_levy_rate = Decimal(housing_levy_rate)
+
+        # PAYE: lower edge, marginal rate and tax accrued below each band
+        self._paye_lower = [0]
+        self._paye_rates = []
+        self._paye_base = [0]
+        for upper, rate in paye_bands:
+            self._paye_rates.append(_scaled_rate(rate))
+            if upper is not None:
+                upper = to_cents(upper)
+                width = upper - self._paye_lower[-1]
+                self._paye_base.append(self._paye_base[-1] + width * self._paye_rates[-1])
+                self._paye_lower.append(upper)
+        self._relief = to_cents(self.personal_relief) * RATE_SCALE
+
+        # NHIF: fixed contribution per band
+        self._nhif_edges = [to_cents(upper) for upper, _ in nhif_bands if upper is not None]
+        self._nhif_amounts = [to_cents(amount) for _, amount in nhif_bands]
+
+        self._nssf_rate = _scaled_rate(self.nssf_rate)
+        self._nssf_ceiling = to_cents(self.nssf_upper_limit)
+        self._levy_rate = _scaled_rate(self.housing_levy_rate)
+
+        self._np = {
+            'paye_lower': np.array(self._paye_lower, dtype=np.int64),
+            'paye_rates': np.array(self._paye_rates, dtype=np.int64),
+            'paye_base': np.array(self._paye_base, dtype=np.int64),
+            'nhif_edges': np.array(self._nhif_edges, dtype=np.int64),
+            'nhif_amounts': np.array(self._nhif_amounts, dtype=np.int64),
+        }
+
+    def __repr__(self):
+        return f"<StatutoryRateTable {self.version} from {self.effective_from}>"
+
+    # ------------------------------------------------------------------
+    # Scalar (whole cents in, whole cents out)
+    # ------------------------------------------------------------------
+
+    def paye_cents(self, gross):
+        gross = max(gross, 0)
+        band = bisect.bisect_right(self._paye_lower, gross) - 1
+        units = self._paye_base[band] + (gross - self._paye_lower[band]) * self._paye_rates[band]
+        return _round_scaled(max(units - self._relief, 0))
+
+    def nhif_cents(self, gross):
+        return self._nhif_amounts[bisect.bisect_left(self._nhif_edges, gross)]
+
+    def nssf_cents(self, gross):
+        return _round_scaled(min(max(gross, 0), self._nssf_ceiling) * self._nssf_rate)
+
+    def housing_levy_cents(self, gross):
+        return _round_scaled(max(gross, 0) * self._levy_rate)
+
+    # ------------------------------------------------------------------
+    # Batch (int64 cent arrays)
+    # ------------------------------------------------------------------
+
+    def batch_cents(self, gross):
+        """Return {deduction: int64 array of cents} for an int64 array of gross cents."""
+        tables = self._np
+        positive = np.maximum(gross, 0)
+
+        band = np.searchsorted(tables['paye_lower'], positive, side='right') - 1
+        units = tables['paye_base'][band] + (positive - tables['paye_lower'][band]) * tables['paye_rates'][band]
+        paye = _round_scaled(np.maximum(units - self._relief, 0))
+
+        nhif = tables['nhif_amounts'][np.searchsorted(tables['nhif_edges'], gross, side='left')]
+        nssf = _round_scaled(np.minimum(positive, self._nssf_ceiling) * self._nssf_rate)
+        housing_levy = _round_scaled(positive * self._levy_rate)
+
+        return {'paye': paye, 'nhif': nhif, 'nssf': nssf, 'housing_levy': housing_levy}
+
+
+# ============================================================================
+# Rate tables (ordered by effective_from, newest last)
+# ============================================================================
+
+STATUTORY_RATE_TABLES = (
+    # Baseline table; also applies to every earlier payroll period
+    StatutoryRateTable(
+        version='2024',
+        effective_from=date.min,
+        paye_bands=(
+            (Decimal('24000'), Decimal('0.10')),
+            (Decimal('32333'), Decimal('0.25')),
+            (Decimal('500000'), Decimal('0.30')),
+            (Decimal('800000'), Decimal('0.325')),
+            (None, Decimal('0.35')),
+        ),
+        personal_relief=Decimal('2400'),
+        nhif_bands=(
+            (Decimal('5999'), Decimal('150')),
+            (Decimal('7999'), Decimal('300')),
+            (Decimal('11999'), Decimal('400')),
+            (Decimal('14999'), Decimal('500')),
+            (Decimal('19999'), Decimal('600')),
+            (Decimal('24999'), Decimal('750')),
+            (Decimal('29999'), Decimal('850')),
+            (Decimal('34999'), Decimal('900')),
+            (Decimal('39999'), Decimal('950')),
+            (Decimal('44999'), Decimal('1000')),
+            (Decimal('49999'), Decimal('1100')),
+            (Decimal('59999'), Decimal('1200')),
+            (Decimal('69999'), Decimal('1300')),
+            (Decimal('79999'), Decimal('1400')),
+            (Decimal('89999'), Decimal('1500')),
+            (Decimal('99999'), Decimal('1600')),
+            (None, Decimal('1700')),
+        ),
+        nssf_rate=Decimal('0.06'),
+        nssf_upper_limit=Decimal('36000'),
+        housing_levy_rate=Decimal('0.015'),
+    ),
+)
+
+
+def get_rate_table(on_date=None):
+    """Return the rate table in force on a date (default: today)."""
+    on_date = on_date or date.today()
+    for table in reversed(STATUTORY_RATE_TABLES):
+        if table.effective_from <= on_date:
+            return table
+    raise LookupError(f"No statutory rate table in force on {on_date}")
+
+
+# ============================================================================
+# Scalar API
+# ============================================================================
+
+def calculate_paye(gross_salary, on_date=None):
+    return from_cents(get_rate_table(on_date).paye_cents(to_cents(gross_salary)))
+
+
+def calculate_nhif(gross_salary, on_date=None):
+    return from_cents(get_rate_table(on_date).nhif_cents(to_cents(gross_salary)))
+
+
+def calculate_nssf(gross_salary, on_date=None):
+    return from_cents(get_rate_table(on_date).nssf_cents(to_cents(gross_salary)))
+
+
+def calculate_housing_levy(gross_salary, on_date=None):
+    return from_cents(get_rate_table(on_date).housing_levy_cents(to_cents(gross_salary)))
+
+
+def compute(gross_salary, on_date=None):
+    """
+    Compute every statutory deduction for one gross salary.
+
+    Returns:
+        dict of Decimal amounts keyed by DEDUCTION_NAMES plus 'total'
+    """
+    table = get_rate_table(on_date)
+    gross = to_cents(gross_salary)
+    amounts = {
+        'paye': table.paye_cents(gross),
+        'nhif': table.nhif_cents(gross),
+        'nssf': table.nssf_cents(gross),
+        'housing_levy': table.housing_levy_cents(gross),
+    }
+    amounts['total'] = sum(amounts.values())
+    return {name: from_cents(cents) for name, cents in amounts.items()}
+
+
+# ============================================================================
+# Batch API
+# ============================================================================
+
+def salaries_to_cents(gross_salaries):
+    """
+    Convert gross salaries to an int64 array of cents.
+
+    Decimal (or other non-float) sequences convert exactly; float arrays are
+    rounded to the nearest cent.
+    """
+    if isinstance(gross_salaries, np.ndarray):
+        if np.issubdtype(gross_salaries.dtype, np.integer):
+            return gross_salaries.astype(np.int64) * 100
+        if np.issubdtype(gross_salaries.dtype, np.floating):
+            return np.rint(gross_salaries * 100).astype(np.int64)
+    return np.fromiter((to_cents(amount) for amount in gross_salaries), dtype=np.int64)
+
+
+def compute_batch(gross_salaries, on_date=None, as_cents=False):
+    """
+    Compute every statutory deduction for an array of gross salaries.
+
+    Args:
+        gross_salaries: Sequence of Decimal amounts or a numpy array
+        on_date: Payroll date selecting the rate table (default: today)
+        as_cents: Return int64 cent arrays instead of Decimal lists
+
+    Returns:
+        dict keyed by DEDUCTION_NAMES plus 'total'
+    """
+    cents = salaries_to_cents(gross_salaries)
+    amounts = get_rate_table(on_date).batch_cents(cents)
+    amounts['total'] = sum(amounts[name] for name in DEDUCTION_NAMES)
+    if as_cents:
+        return amounts
+    return {name: [from_cents(value) for value in values.tolist()] for name, values in amounts.items()}
@@ -0,0 +1,85 @@
+"""
+Payroll App - Background Tasks (Celery)
+"""
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+import logging
+
+from .engine import process_payroll_run
+from .pdf import generate_payroll_run_pdfs
+from .models import PayrollRun
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# PAYROLL PROCESSING TASKS
+# ============================================================================
+
+@shared_task(bind=True, acks_late=True, ignore_result=True)
+def process_payroll_run_task(self, payroll_run_id, user_id=None):
+    """
+    Generate payslips for a payroll run
+    Progress is recorded on the PayrollRun (progress_processed / progress_total)
+
+    Args:
+        payroll_run_id: PayrollRun ID
+        user_id: ID of the user who started processing
+    """
+    try:
+        payroll_run = PayrollRun.objects.get(pk=payroll_run_id)
+    except PayrollRun.DoesNotExist:
+        logger.warning(f"Payroll run {payroll_run_id} no longer exists; skipping processing")
+        return {'status': 'missing', 'payroll_run_id': payroll_run_id}
+
+    if payroll_run.status not in ['DRAFT', 'PROCESSING']:
+        logger.info(f"Payroll run {payroll_run.payroll_number} is already {payroll_run.status}; skipping")
+        return {'status': 'skipped', 'payroll_run_id': payroll_run_id}
+
+    # A stale run re-claimed by a newer job; this delivery is superseded
+    if payroll_run.task_id and self.request.id and payroll_run.task_id != self.request.id:
+        logger.info(f"Payroll run {payroll_run.payroll_number} is held by task {payroll_run.task_id}; skipping")
+        return {'status': 'superseded', 'payroll_run_id': payroll_run_id}
+
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+
+    try:
+        process_payroll_run(payroll_run, user=user)
+    except Exception as e:
+        # The engine has already rolled the run back to DRAFT with the error
+        return {'status': 'failed', 'payroll_run_id': payroll_run_id, 'error': str(e)}
+
+    logger.info(
+        f"Payroll {payroll_run.payroll_number} processed: {payroll_run.total_employees} payslips, "
+        f"net KES {payroll_run.total_net:,.2f}"
+    )
+    generate_payslip_pdfs_task.delay(payroll_run_id)
+    return {
+        'status': 'completed',
+        'payroll_run_id': payroll_run_id,
+        'total_employees': payroll_run.total_employees,
+    }
+
+
+@shared_task(ignore_result=True)
+def generate_payslip_pdfs_task(payroll_run_id, force=False):
+    """
+    Render and store PDFs for a payroll run's payslips
+
+    Args:
+        payroll_run_id: PayrollRun ID
+        force: Re-render payslips that already have a current PDF
+    """
+    try:
+        payroll_run = PayrollRun.objects.get(pk=payroll_run_id)
+    except PayrollRun.DoesNotExist:
+        return {'status': 'missing', 'payroll_run_id': payroll_run_id}
+
+    report = generate_payroll_run_pdfs(payroll_run, force=force)
+
+    logger.info(
+        f"Payslip PDFs for {payroll_run.payroll_number}: {report['rendered']} rendered, "
+        f"{report['reused']} reused, {report['payslips_per_second']} payslips/s"
+    )
+    return {'status': 'completed', 'payroll_run_id': payroll_run_id, **report}
@@ -1,3 +1,302 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import statutory
+from .engine import enqueue_payroll_run, load_applicable_deductions, process_payroll_run
+from .models import Attendance, Deduction, Employee, PayrollRun, SalaryStructure
+from .tasks import process_payroll_run_task
+
+User = get_user_model()
+
+
+def make_employee(index, basic_salary=Decimal('50000')):
+    user = User.objects.create_user(email=f'employee{index}@example.com', password='password')
+    employee = Employee.objects.create(
+        user=user,
+        first_name=f'Employee{index}',
+        last_name='Test',
+        date_of_birth=date(1990, 1, 1),
+        phone_number=f'+2547{index:08d}',
+        email=f'employee{index}@example.com',
+        national_id=f'{20000000 + index}',
+        employment_type='FULL_TIME',
+        job_title='Sales',
+        department='Sales',
+        hire_date=date(2020, 1, 1),
+        bank_name='Test Bank',
+        bank_account_number=f'{index:010d}',
+        emergency_contact_name='Contact',
+        emergency_contact_phone='+254700000000',
+        emergency_contact_relationship='Sibling',
+        address_line1='1 Test Road',
+        city='Nairobi',
+    )
+    SalaryStructure.objects.create(
+        employee=employee,
+        basic_salary=basic_salary,
+        effective_from=date(2020, 1, 1),
+    )
+    return employee
+
+
+class PrivateMediaTestMixin:
+
+    def setUp(self):
+        super().setUp()
+        self.private_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.private_root, ignore_errors=True)
+        settings_override = override_settings(PRIVATE_MEDIA_ROOT=self.private_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class PayslipPdfStorageTests(PrivateMediaTestMixin, TestCase):
+    """Rendered payslips are private and only reachable through the login-protected view"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(email='payroll@example.com', password='password')
+        make_employee(1)
+        cls.payroll_run = PayrollRun.objects.create(payroll_month=date(2024, 3, 1))
+        process_payroll_run(cls.payroll_run)
+
+    def download(self):
+        payslip = self.payroll_run.payslips.get()
+        response = self.client.get(reverse('payroll:payslip_download', args=[payslip.pk]), secure=True)
+        payslip.refresh_from_db()
+        return response, payslip
+
+    def test_pdf_is_stored_outside_media_under_a_random_name(self):
+        self.client.force_login(self.user)
+        response, payslip = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'private, no-store')
+        self.assertTrue(payslip.pdf_file.path.startswith(self.private_root))
+        self.assertFalse(payslip.pdf_file.path.startswith(str(settings.MEDIA_ROOT)))
+        self.assertNotIn(payslip.employee.employee_id, payslip.pdf_file.name)
+        with self.assertRaises(ValueError):
+            payslip.pdf_file.url
+
+    def test_stored_pdf_is_reused(self):
+        self.client.force_login(self.user)
+        _, first = self.download()
+        _, second = self.download()
+        self.assertEqual(first.pdf_file.name, second.pdf_file.name)
+
+        response = self.client.get(reverse('payroll:payslip_detail', args=[second.pk]), secure=True)
+        self.assertTrue(response.context['pdf_is_current'])
+
+    def test_download_requires_login(self):
+        response, payslip = self.download()
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(payslip.pdf_file)
+
+
+def legacy_deductions(gross):
+    """The per-employee Decimal calculations statutory.py replaced, rounded to the cent"""
+    tax = Decimal('0.00')
+    remaining = gross
+    for band_limit, rate in ((Decimal('24000'), Decimal('0.10')), (Decimal('8333'), Decimal('0.25')),
+                             (Decimal('467667'), Decimal('0.30')), (Decimal('300000'), Decimal('0.325'))):
+        if remaining <= 0:
+            break
+        taxable_in_band = min(remaining, band_limit)
+        tax += taxable_in_band * rate
+        remaining -= taxable_in_band
+    if remaining > 0:
+        tax += remaining * Decimal('0.35')
+    paye = max(tax - Decimal('2400'), Decimal('0.00'))
+
+    nhif = Decimal('1700')
+    for limit, contribution in (
+        (5999, 150), (7999, 300), (11999, 400), (14999, 500), (19999, 600), (24999, 750),
+        (29999, 850), (34999, 900), (39999, 950), (44999, 1000), (49999, 1100), (59999, 1200),
+        (69999, 1300), (79999, 1400), (89999, 1500), (99999, 1600),
+    ):
+        if gross <= limit:
+            nhif = Decimal(contribution)
+            break
+
+    nssf = min(gross, Decimal('36000')) * Decimal('0.06')
+    housing_levy = gross * Decimal('0.015')
+
+    amounts = {'paye': paye, 'nhif': nhif, 'nssf': nssf, 'housing_levy': housing_levy}
+    return {name: amount.quantize(statutory.CENT, rounding=ROUND_HALF_UP) for name, amount in amounts.items()}
+
+
+class StatutoryDeductionTests(SimpleTestCase):
+    """Scalar and batch APIs agree with each other and with the legacy calculations"""
+
+    def edge_salaries(self):
+        table = statutory.get_rate_table(date(2024, 3, 1))
+        edges = {upper for upper, _ in table.paye_bands if upper is not None}
+        edges |= {upper for upper, _ in table.nhif_bands if upper is not None}
+        edges |= {Decimal('7000'), table.nssf_upper_limit}
+        salaries = set()
+        for edge in edges:
+            salaries |= {edge - Decimal('0.01'), edge, edge + Decimal('0.01'), edge + Decimal('0.50')}
+        return sorted(salaries)
+
+    def test_scalar_and_batch_agree_at_band_edges(self):
+        salaries = self.edge_salaries() + [Decimal('0.00'), Decimal('1234567.89')]
+        batch = statutory.compute_batch(salaries, date(2024, 3, 1))
+
+        for index, gross in enumerate(salaries):
+            scalar = statutory.compute(gross, date(2024, 3, 1))
+            for name in (*statutory.DEDUCTION_NAMES, 'total'):
+                self.assertEqual(batch[name][index], scalar[name], f'{name} at {gross}')
+
+    def test_float_array_batch_matches_decimal_batch(self):
+        salaries = self.edge_salaries()
+        from_decimals = statutory.compute_batch(salaries, as_cents=True)
+        from_floats = statutory.compute_batch(np.array([float(gross) for gross in salaries]), as_cents=True)
+        for name in statutory.DEDUCTION_NAMES:
+            np.testing.assert_array_equal(from_floats[name], from_decimals[name])
+
+    def test_matches_legacy_calculations(self):
+        salaries = self.edge_salaries() + [Decimal('15000'), Decimal('45678.91'), Decimal('987654.33')]
+        for gross in salaries:
+            amounts = statutory.compute(gross, date(2024, 3, 1))
+            for name, expected in legacy_deductions(gross).items():
+                self.assertEqual(amounts[name], expected, f'{name} at {gross}')
+
+    def test_zero_and_negative_salaries(self):
+        for gross in (Decimal('0'), Decimal('-0.01'), Decimal('-5000')):
+            scalar = statutory.compute(gross)
+            self.assertEqual(scalar['paye'], Decimal('0.00'))
+            self.assertEqual(scalar['nssf'], Decimal('0.00'))
+            self.assertEqual(scalar['housing_levy'], Decimal('0.00'))
+            # NHIF has a minimum contribution even without pay
+            self.assertEqual(scalar['nhif'], Decimal('150.00'))
+
+            batch = statutory.compute_batch([gross])
+            self.assertEqual({name: values[0] for name, values in batch.items()}, scalar)
+
+
+class PayrollProcessingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = make_employee(1)
+
+    def test_applicable_deductions_match_model_rule(self):
+        cases = [
+            ('MONTHLY', date(2024, 1, 1), None, True),
+            ('MONTHLY', date(2024, 3, 1), date(2024, 3, 1), True),
+            ('MONTHLY', date(2024, 3, 15), None, True),
+            ('MONTHLY', date(2024, 1, 1), date(2024, 2, 29), True),
+            ('MONTHLY', date(2024, 4, 1), None, True),
+            ('MONTHLY', date(2024, 1, 1), None, False),
+            ('ONE_TIME', date(2024, 3, 1), None, True),
+            ('ONE_TIME', date(2024, 2, 1), None, True),
+            ('ONE_TIME', date(2024, 3, 20), None, True),
+        ]
+        deductions = [
+            Deduction.objects.create(
+                employee=self.employee,
+                deduction_type='LOAN',
+                description=f'Case {index}',
+                amount=Decimal('100.00'),
+                frequency=frequency,
+                start_date=start_date,
+                end_date=end_date,
+                is_active=is_active,
+            )
+            for index, (frequency, start_date, end_date, is_active) in enumerate(cases)
+        ]
+
+        for month in (date(2024, 2, 1), date(2024, 3, 1), date(2024, 4, 1)):
+            loaded = load_applicable_deductions([self.employee.pk], month)[self.employee.pk]
+            expected = [d for d in deductions if d.is_applicable_for_month(month.year, month.month)]
+            self.assertEqual({d.pk for d in loaded}, {d.pk for d in expected}, month)
+
+    @mock.patch.object(process_payroll_run_task, 'apply_async')
+    def test_double_submit_queues_one_task(self, apply_async):
+        payroll_run = PayrollRun.objects.create(payroll_month=date(2024, 3, 1))
+
+        first = enqueue_payroll_run(payroll_run)
+        second = enqueue_payroll_run(payroll_run)
+
+        self.assertEqual(apply_async.call_count, 1)
+        self.assertEqual(first, second)
+        payroll_run.refresh_from_db()
+        self.assertEqual(payroll_run.status, 'PROCESSING')
+        self.assertEqual(payroll_run.task_id, first)
+
+    @mock.patch.object(process_payroll_run_task, 'apply_async')
+    def test_stale_processing_run_is_reclaimed(self, apply_async):
+        payroll_run = PayrollRun.objects.create(payroll_month=date(2024, 3, 1))
+        stale_task_id = enqueue_payroll_run(payroll_run)
+
+        # Fresh progress keeps the claim; no progress past the task time limit releases it
+        self.assertEqual(enqueue_payroll_run(payroll_run), stale_task_id)
+        PayrollRun.objects.filter(pk=payroll_run.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=settings.CELERY_TASK_TIME_LIMIT + 60)
+        )
+        payroll_run.refresh_from_db()
+        self.assertFalse(payroll_run.is_processing)
+
+        new_task_id = enqueue_payroll_run(payroll_run)
+        self.assertNotEqual(new_task_id, stale_task_id)
+        self.assertEqual(apply_async.call_count, 2)
+        payroll_run.refresh_from_db()
+        self.assertEqual(payroll_run.task_id, new_task_id)
+
+    def test_superseded_task_skips_processing(self):
+        payroll_run = PayrollRun.objects.create(
+            payroll_month=date(2024, 3, 1), status='PROCESSING', task_id='newer-task'
+        )
+
+        result = process_payroll_run_task.apply(args=[payroll_run.pk], task_id='older-task').get()
+
+        self.assertEqual(result['status'], 'superseded')
+        self.assertFalse(payroll_run.payslips.exists())
+        payroll_run.refresh_from_db()
+        self.assertEqual(payroll_run.status, 'PROCESSING')
+
+
+class AttendanceImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(email='attendance@example.com', password='password')
+        cls.employee = make_employee(1)
+
+    def upload(self, content):
+        self.client.force_login(self.user)
+        return self.client.post(
+            reverse('payroll:attendance_import'),
+            {'file': SimpleUploadedFile('attendance.csv', content, content_type='text/csv')},
+            secure=True,
+        )
+
+    def test_non_utf8_file_is_a_form_error(self):
+        rows = [f'{self.employee.employee_id},2024-03-0{day},P,Caf\xe9' for day in range(1, 4)]
+        content = ('employee_id,date,status,notes\n' + '\n'.join(rows)).encode('latin-1')
+
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('not UTF-8 text', response.context['form'].errors['file'][0])
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_utf8_file_is_imported(self):
+        content = f'employee_id,date,status,notes\n{self.employee.employee_id},2024-03-01,P,Caf\xe9\n'.encode()
+
+        response = self.upload(content)
+
+        self.assertRedirects(response, reverse('payroll:attendance_list'), fetch_redirect_response=False)
+        self.assertEqual(Attendance.objects.get().notes, 'Caf\xe9')
@@ -46,6 +46,8 @@ urlpatterns = [
     path('runs/create/', views.payroll_run_create, name='payroll_run_create'),
     path('runs/<int:pk>/', views.payroll_run_detail, name='payroll_run_detail'),
     path('runs/<int:pk>/process/', views.payroll_run_process, name='payroll_run_process'),
+    path('runs/<int:pk>/progress/', views.payroll_run_progress, name='payroll_run_progress'),
+    path('runs/<int:pk>/payslips.zip', views.payroll_run_payslips_zip, name='payroll_run_payslips_zip'),
     path('runs/<int:pk>/approve/', views.payroll_run_approve, name='payroll_run_approve'),
     
     # ========================================================================
@@ -60,6 +62,7 @@ urlpatterns = [
     path('attendance/', views.attendance_list, name='attendance_list'),
     path('attendance/mark/', views.attendance_mark, name='attendance_mark'),
     path('attendance/bulk-mark/', views.attendance_bulk_mark, name='attendance_bulk_mark'),
+    path('attendance/import/', views.attendance_import, name='attendance_import'),
     
     # ========================================================================
     # Leave Management URLs
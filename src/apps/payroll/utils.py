@@ -10,6 +10,8 @@ from decimal import Decimal
 import calendar
 from io import BytesIO
 
+from . import statutory
+
 
 # ============================================================================
 # Salary Calculations
@@ -52,125 +54,36 @@ def calculate_overtime_pay(hourly_rate, hours_worked, overtime_multiplier=1.5):
 # Tax Calculations (Kenya PAYE)
 # ============================================================================
 
-def calculate_paye_tax(gross_salary):
+def calculate_paye_tax(gross_salary, on_date=None):
     """
-    Calculate Kenya PAYE (Pay As You Earn) tax.
-    Tax bands as of 2024 (simplified):
-    - Up to 24,000: 10%
-    - 24,001 to 32,333: 25%
-    - 32,334 to 500,000: 30%
-    - 500,001 to 800,000: 32.5%
-    - Above 800,000: 35%
+    Calculate Kenya PAYE (Pay As You Earn) tax after personal relief.
+    Bands and relief come from the rate table in force on on_date
+    (see statutory.STATUTORY_RATE_TABLES).
     """
-    monthly_gross = gross_salary
-    tax = Decimal('0.00')
-    
-    # Tax bands
-    bands = [
-        (Decimal('24000'), Decimal('0.10')),
-        (Decimal('8333'), Decimal('0.25')),   # 32,333 - 24,000
-        (Decimal('467667'), Decimal('0.30')), # 500,000 - 32,333
-        (Decimal('300000'), Decimal('0.325')), # 800,000 - 500,000
-    ]
-    
-    remaining = monthly_gross
-    
-    for band_limit, rate in bands:
-        if remaining <= 0:
-            break
-        
-        taxable_in_band = min(remaining, band_limit)
-        tax += taxable_in_band * rate
-        remaining -= taxable_in_band
-    
-    # Anything above 800,000
-    if remaining > 0:
-        tax += remaining * Decimal('0.35')
-    
-    # Personal relief (2,400 per month in Kenya)
-    personal_relief = Decimal('2400')
-    tax = max(tax - personal_relief, Decimal('0.00'))
-    
-    return tax
+    return statutory.calculate_paye(gross_salary, on_date)
 
 
-def calculate_nhif_contribution(gross_salary):
+def calculate_nhif_contribution(gross_salary, on_date=None):
     """
     Calculate NHIF (National Hospital Insurance Fund) contribution.
-    Based on Kenya NHIF rates 2024.
-    """
-    monthly_gross = gross_salary
-    
-    # NHIF contribution bands
-    if monthly_gross <= 5999:
-        return Decimal('150')
-    elif monthly_gross <= 7999:
-        return Decimal('300')
-    elif monthly_gross <= 11999:
-        return Decimal('400')
-    elif monthly_gross <= 14999:
-        return Decimal('500')
-    elif monthly_gross <= 19999:
-        return Decimal('600')
-    elif monthly_gross <= 24999:
-        return Decimal('750')
-    elif monthly_gross <= 29999:
-        return Decimal('850')
-    elif monthly_gross <= 34999:
-        return Decimal('900')
-    elif monthly_gross <= 39999:
-        return Decimal('950')
-    elif monthly_gross <= 44999:
-        return Decimal('1000')
-    elif monthly_gross <= 49999:
-        return Decimal('1100')
-    elif monthly_gross <= 59999:
-        return Decimal('1200')
-    elif monthly_gross <= 69999:
-        return Decimal('1300')
-    elif monthly_gross <= 79999:
-        return Decimal('1400')
-    elif monthly_gross <= 89999:
-        return Decimal('1500')
-    elif monthly_gross <= 99999:
-        return Decimal('1600')
-    else:
-        return Decimal('1700')
+    """
+    return statutory.calculate_nhif(gross_salary, on_date)
 
 
-def calculate_nssf_contribution(gross_salary):
+def calculate_nssf_contribution(gross_salary, on_date=None):
     """
-    Calculate NSSF (National Social Security Fund) contribution.
-    Both employee and employer contribute.
+    Calculate NSSF (National Social Security Fund) employee contribution
+    (Tier I and Tier II up to the upper earnings limit).
     """
-    # NSSF Tier I (Lower Earnings Limit): Up to KES 7,000
-    # NSSF Tier II (Upper Earnings Limit): KES 7,001 to KES 36,000
-    
-    tier1_limit = Decimal('7000')
-    tier2_limit = Decimal('36000')
-    rate = Decimal('0.06')  # 6%
-    
-    contribution = Decimal('0.00')
-    
-    # Tier I contribution
-    tier1_amount = min(gross_salary, tier1_limit)
-    contribution += tier1_amount * rate
-    
-    # Tier II contribution (if applicable)
-    if gross_salary > tier1_limit:
-        tier2_amount = min(gross_salary - tier1_limit, tier2_limit - tier1_limit)
-        contribution += tier2_amount * rate
-    
-    return contribution
+    return statutory.calculate_nssf(gross_salary, on_date)
 
 
-def calculate_housing_levy(gross_salary):
+def calculate_housing_levy(gross_salary, on_date=None):
     """
-    Calculate Affordable Housing Levy (1.5% of gross salary).
+    Calculate Affordable Housing Levy.
     Introduced in Kenya 2023.
     """
-    rate = Decimal('0.015')  # 1.5%
-    return gross_salary * rate
+    return statutory.calculate_housing_levy(gross_salary, on_date)
 
 
 def calculate_net_salary(gross_salary, deductions):
@@ -204,33 +117,27 @@ def get_working_days(year, month):
 def get_employee_attendance_summary(employee, year, month):
     """
     Get attendance summary for an employee for a given month.
+    Reads the maintained AttendanceMonthlySummary rollup.
     """
-    from .models import Attendance
+    from .models import AttendanceMonthlySummary
     
-    attendance_records = Attendance.objects.filter(
+    rollup = AttendanceMonthlySummary.objects.filter(
         employee=employee,
-        attendance_date__year=year,
-        attendance_date__month=month
-    )
+        month=date(year, month, 1)
+    ).first() or AttendanceMonthlySummary()
     
     summary = {
         'total_days': calendar.monthrange(year, month)[1],
         'working_days': get_working_days(year, month),
-        'present': attendance_records.filter(status='PRESENT').count(),
-        'absent': attendance_records.filter(status='ABSENT').count(),
-        'late': attendance_records.filter(status='LATE').count(),
-        'half_day': attendance_records.filter(status='HALF_DAY').count(),
-        'on_leave': attendance_records.filter(status='ON_LEAVE').count(),
-        'holiday': attendance_records.filter(status='HOLIDAY').count(),
+        'present': rollup.present_days,
+        'absent': rollup.absent_days,
+        'late': rollup.late_days,
+        'half_day': rollup.half_days,
+        'on_leave': rollup.leave_days,
+        'holiday': rollup.holiday_days,
+        'total_hours': rollup.total_hours,
     }
     
-    # Calculate total hours worked
-    total_hours = attendance_records.aggregate(
-        Sum('hours_worked')
-    )['hours_worked__sum'] or Decimal('0.00')
-    
-    summary['total_hours'] = total_hours
-    
     return summary
 
 
@@ -288,10 +195,11 @@ def calculate_employee_payslip(employee, payroll_month):
     }
     
     # Calculate statutory deductions
-    deduction_breakdown['income_tax'] = calculate_paye_tax(gross_salary)
-    deduction_breakdown['nhif'] = calculate_nhif_contribution(gross_salary)
-    deduction_breakdown['nssf'] = calculate_nssf_contribution(gross_salary)
-    deduction_breakdown['housing_levy'] = calculate_housing_levy(gross_salary)
+    statutory_amounts = statutory.compute(gross_salary, on_date=payroll_month)
+    deduction_breakdown['income_tax'] = statutory_amounts['paye']
+    deduction_breakdown['nhif'] = statutory_amounts['nhif']
+    deduction_breakdown['nssf'] = statutory_amounts['nssf']
+    deduction_breakdown['housing_levy'] = statutory_amounts['housing_levy']
     
     # Apply custom deductions
     for deduction in deductions:
@@ -619,10 +527,11 @@ def check_loan_eligibility(employee, loan_amount):
 
 def notify_payslip_ready(payslip):
     """
-    Send notification when payslip is ready.
+    Send notification when payslip is ready, with the payslip PDF attached.
     """
-    from django.core.mail import send_mail
+    from django.core.mail import EmailMessage
     from django.conf import settings
+    from .pdf import get_payslip_pdf, payslip_pdf_filename
     
     employee = payslip.employee
     
@@ -631,25 +540,25 @@ def notify_payslip_ready(payslip):
         message = f"""
 Dear {employee.get_full_name()},
 
-Your payslip for {payslip.payroll_run.payroll_month.strftime('%B %Y')} is now available.
+Your payslip for {payslip.payroll_run.payroll_month.strftime('%B %Y')} is now available and attached to this email.
 
 Gross Salary: KES {payslip.gross_salary:,.2f}
 Total Deductions: KES {payslip.total_deductions:,.2f}
 Net Salary: KES {payslip.net_salary:,.2f}
 
-Please log in to the system to view your detailed payslip.
+You can also log in to the system to view your detailed payslip.
 
 Best regards,
 HR Department
         """
         
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [employee.email],
-            fail_silently=True,
-        )
+        email = EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [employee.email])
+        
+        pdf_file = get_payslip_pdf(payslip)
+        with pdf_file.open('rb') as pdf:
+            email.attach(payslip_pdf_filename(payslip), pdf.read(), 'application/pdf')
+        
+        email.send(fail_silently=True)
 
 
 def notify_leave_decision(leave_request):
@@ -715,15 +624,10 @@ def get_payroll_dashboard_stats():
     """
     Get statistics for payroll dashboard.
     """
-    from .models import Employee, PayrollRun, Leave, Loan, Commission
+    from apps.dashboard.kpis import get_snapshot
+    from .models import PayrollRun
     
-    stats = {
-        'active_employees': Employee.objects.filter(status='ACTIVE').count(),
-        'total_employees': Employee.objects.count(),
-        'pending_leaves': Leave.objects.filter(status='PENDING').count(),
-        'pending_loans': Loan.objects.filter(status='PENDING').count(),
-        'pending_commissions': Commission.objects.filter(status='PENDING').count(),
-    }
+    stats = dict(get_snapshot('payroll').values)
     
     # Current month payroll
     today = date.today()
@@ -6,12 +6,13 @@ Handles employee management, salary processing, and payroll operations.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
 from django.db.models import Q, Sum, Count, Avg
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from django.db import transaction
+from django.urls import reverse
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 import calendar
@@ -23,8 +24,12 @@ from .models import (
 from .forms import (
     EmployeeForm, SalaryStructureForm, CommissionForm, DeductionForm,
     PayrollRunForm, AttendanceForm, LeaveForm, LeaveApprovalForm,
-    LoanForm, PayrollSearchForm, BulkAttendanceForm
+    LoanForm, PayrollSearchForm, BulkAttendanceForm, AttendanceImportForm
 )
+from apps.dashboard.kpis import get_snapshot
+from .attendance import AttendanceImportError, import_attendance_csv, mark_attendance
+from .engine import enqueue_payroll_run, process_payroll_run
+from .pdf import get_payslip_pdf, iter_payroll_run_zip, payslip_pdf_filename, payslip_pdf_is_current
 
 
 # ============================================================================
@@ -34,8 +39,8 @@ from .forms import (
 @login_required
 def payroll_dashboard(request):
     """Display payroll dashboard with key metrics."""
-    # Active employees
-    active_employees = Employee.objects.filter(status='ACTIVE').count()
+    # Employee and pending-approval counts come from the KPI snapshot
+    kpi_snapshot = get_snapshot('payroll')
     
     # Current month payroll
     today = date.today()
@@ -46,11 +51,6 @@ def payroll_dashboard(request):
     except PayrollRun.DoesNotExist:
         current_payroll = None
     
-    # Pending approvals
-    pending_leaves = Leave.objects.filter(status='PENDING').count()
-    pending_loans = Loan.objects.filter(status='PENDING').count()
-    pending_commissions = Commission.objects.filter(status='PENDING').count()
-    
     # Recent payrolls
     recent_payrolls = PayrollRun.objects.all().order_by('-payroll_month')[:5]
     
@@ -62,11 +62,12 @@ def payroll_dashboard(request):
     ).order_by('payroll_month').values('payroll_month', 'total_net')
     
     context = {
-        'active_employees': active_employees,
+        'active_employees': kpi_snapshot.values['active_employees'],
         'current_payroll': current_payroll,
-        'pending_leaves': pending_leaves,
-        'pending_loans': pending_loans,
-        'pending_commissions': pending_commissions,
+        'pending_leaves': kpi_snapshot.values['pending_leaves'],
+        'pending_loans': kpi_snapshot.values['pending_loans'],
+        'pending_commissions': kpi_snapshot.values['pending_commissions'],
+        'kpi_snapshot': kpi_snapshot,
         'recent_payrolls': recent_payrolls,
         'payroll_trend': list(payroll_trend),
     }
@@ -468,118 +469,34 @@ def payroll_run_create(request):
 
 @login_required
 def payroll_run_process(request, pk):
-    """Process payroll run - generate payslips."""
+    """Process payroll run - generate payslips in a background job."""
     payroll_run = get_object_or_404(PayrollRun, pk=pk)
     
     if payroll_run.status not in ['DRAFT', 'PROCESSING']:
         messages.error(request, 'This payroll has already been processed.')
         return redirect('payroll:payroll_run_detail', pk=payroll_run.pk)
     
-    if request.method == 'POST':
-        try:
-            with transaction.atomic():
-                # Mark as processing
-                payroll_run.status = 'PROCESSING'
-                payroll_run.save()
-                
-                # Get active employees
-                employees = Employee.objects.filter(status='ACTIVE').select_related('salary_structure')
-                
-                for employee in employees:
-                    # Skip if no salary structure
-                    if not hasattr(employee, 'salary_structure'):
-                        continue
-                    
-                    salary = employee.salary_structure
-                    
-                    # Calculate working days for the month
-                    year = payroll_run.payroll_month.year
-                    month = payroll_run.payroll_month.month
-                    working_days = calendar.monthrange(year, month)[1]
-                    
-                    # Get attendance for the month
-                    attendance_records = employee.attendance_records.filter(
-                        attendance_date__year=year,
-                        attendance_date__month=month
-                    )
-                    days_worked = attendance_records.filter(status='PRESENT').count()
-                    absent_days = attendance_records.filter(status='ABSENT').count()
-                    
-                    # Get commissions for the month
-                    commissions = employee.commissions.filter(
-                        payroll_month=payroll_run.payroll_month,
-                        status='APPROVED'
-                    )
-                    commission_amount = commissions.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-                    
-                    # Get deductions
-                    deductions = employee.deductions.filter(is_active=True)
-                    
-                    income_tax = Decimal('0.00')
-                    pension = Decimal('0.00')
-                    insurance = Decimal('0.00')
-                    loan_repayment = Decimal('0.00')
-                    other_deductions_total = Decimal('0.00')
-                    
-                    gross = salary.calculate_gross_salary()
-                    
-                    for deduction in deductions:
-                        if deduction.is_applicable_for_month(year, month):
-                            amount = deduction.calculate_deduction_amount(gross)
-                            
-                            if deduction.deduction_type == 'TAX':
-                                income_tax += amount
-                            elif deduction.deduction_type == 'PENSION':
-                                pension += amount
-                            elif deduction.deduction_type == 'INSURANCE':
-                                insurance += amount
-                            elif deduction.deduction_type in ['LOAN', 'ADVANCE']:
-                                loan_repayment += amount
-                            else:
-                                other_deductions_total += amount
-                    
-                    # Create payslip
-                    Payslip.objects.create(
-                        payroll_run=payroll_run,
-                        employee=employee,
-                        basic_salary=salary.basic_salary,
-                        housing_allowance=salary.housing_allowance,
-                        transport_allowance=salary.transport_allowance,
-                        medical_allowance=salary.medical_allowance,
-                        meal_allowance=salary.meal_allowance,
-                        other_allowances=salary.other_allowances,
-                        commission_amount=commission_amount,
-                        overtime_amount=Decimal('0.00'),  # TODO: Calculate overtime
-                        bonus_amount=Decimal('0.00'),  # TODO: Handle bonuses
-                        income_tax=income_tax,
-                        pension_contribution=pension,
-                        insurance_deduction=insurance,
-                        loan_repayment=loan_repayment,
-                        other_deductions=other_deductions_total,
-                        working_days=working_days,
-                        days_worked=days_worked,
-                        absent_days=absent_days,
-                    )
-                
-                # Update payroll totals
-                payroll_run.calculate_totals()
-                
-                # Mark as completed
-                payroll_run.status = 'COMPLETED'
-                payroll_run.processed_by = request.user
-                payroll_run.processed_at = timezone.now()
-                payroll_run.save()
-                
-                messages.success(
-                    request,
-                    f'Payroll processed successfully. {payroll_run.total_employees} payslips generated.'
-                )
-                return redirect('payroll:payroll_run_detail', pk=payroll_run.pk)
+    # A queued or running job reports its progress on this page; a job that
+    # stopped making progress (dead worker) no longer blocks re-processing
+    is_running = payroll_run.is_processing
+    
+    if request.method == 'POST' and not is_running:
+        if enqueue_payroll_run(payroll_run, request.user) is not None:
+            messages.info(request, 'Payroll processing started. Progress is shown below.')
+            return redirect('payroll:payroll_run_process', pk=payroll_run.pk)
         
+        # Task queue unavailable: process the claimed run in this request instead
+        try:
+            process_payroll_run(payroll_run, user=request.user)
         except Exception as e:
             messages.error(request, f'Error processing payroll: {str(e)}')
-            payroll_run.status = 'DRAFT'
-            payroll_run.save()
+            payroll_run.refresh_from_db()
+        else:
+            messages.success(
+                request,
+                f'Payroll processed successfully. {payroll_run.total_employees} payslips generated.'
+            )
+            return redirect('payroll:payroll_run_detail', pk=payroll_run.pk)
     
     # Get preview of employees to be processed
     employees = Employee.objects.filter(status='ACTIVE')
@@ -588,11 +505,27 @@ def payroll_run_process(request, pk):
         'payroll_run': payroll_run,
         'employees': employees,
         'employee_count': employees.count(),
+        'is_running': is_running,
     }
     
     return render(request, 'payroll/payroll_run_process.html', context)
 
 
+@login_required
+def payroll_run_progress(request, pk):
+    """Return background processing progress for a payroll run (polled via AJAX)."""
+    payroll_run = get_object_or_404(PayrollRun, pk=pk)
+    
+    return JsonResponse({
+        'status': payroll_run.status,
+        'processed': payroll_run.progress_processed,
+        'total': payroll_run.progress_total,
+        'percentage': payroll_run.get_progress_percentage(),
+        'error': payroll_run.processing_error,
+        'detail_url': reverse('payroll:payroll_run_detail', args=[payroll_run.pk]),
+    })
+
+
 @login_required
 @require_http_methods(["POST"])
 def payroll_run_approve(request, pk):
@@ -629,6 +562,8 @@ def payslip_detail(request, pk):
     
     context = {
         'payslip': payslip,
+        # The download link serves the stored PDF when this is set
+        'pdf_is_current': payslip_pdf_is_current(payslip),
     }
     
     return render(request, 'payroll/payslip_detail.html', context)
@@ -636,13 +571,36 @@ def payslip_detail(request, pk):
 
 @login_required
 def payslip_download(request, pk):
-    """Download payslip as PDF."""
-    payslip = get_object_or_404(Payslip, pk=pk)
+    """
+    Download payslip as PDF (rendered once and stored). Stored PDFs are in
+    private storage, so this view is the only way to fetch one.
+    """
+    payslip = get_object_or_404(Payslip.objects.select_related('employee', 'payroll_run'), pk=pk)
+    
+    pdf_file = get_payslip_pdf(payslip)
+    response = FileResponse(
+        pdf_file.open('rb'),
+        as_attachment=True,
+        filename=payslip_pdf_filename(payslip),
+        content_type='application/pdf',
+    )
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@login_required
+def payroll_run_payslips_zip(request, pk):
+    """
+    Download every payslip in a payroll run as a streamed ZIP of PDFs.
+    
+    Stored PDFs are streamed as they are; a payslip without a current PDF is
+    rendered when its entry is reached, so no process pool runs in the request.
+    """
+    payroll_run = get_object_or_404(PayrollRun, pk=pk)
     
-    # TODO: Generate PDF
-    # For now, return simple response
-    messages.info(request, 'PDF generation not yet implemented.')
-    return redirect('payroll:payslip_detail', pk=pk)
+    response = StreamingHttpResponse(iter_payroll_run_zip(payroll_run), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="payslips_{payroll_run.payroll_number}.zip"'
+    return response
 
 
 # ============================================================================
@@ -711,19 +669,43 @@ def attendance_bulk_mark(request):
     attendance_date = form.cleaned_data['attendance_date']
     status = form.cleaned_data['status']
     
-    count = 0
-    for emp_id in employee_ids:
-        Attendance.objects.update_or_create(
-            employee_id=emp_id,
-            attendance_date=attendance_date,
-            defaults={'status': status}
-        )
-        count += 1
+    count = mark_attendance(employee_ids, attendance_date, status)
     
     messages.success(request, f'Attendance marked for {count} employee(s).')
     return redirect('payroll:attendance_list')
 
 
+@login_required
+def attendance_import(request):
+    """Import attendance from a CSV or biometric export."""
+    if request.method == 'POST':
+        form = AttendanceImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                report = import_attendance_csv(form.cleaned_data['file'].file)
+            except AttendanceImportError as e:
+                form.add_error('file', str(e))
+            else:
+                messages.success(
+                    request,
+                    f"Imported {report['imported']} attendance record(s) from {report['rows']} row(s)."
+                )
+                if report['skipped']:
+                    messages.warning(request, f"{report['skipped']} row(s) skipped.")
+                    for line, error in report['errors'][:10]:
+                        messages.warning(request, f'Line {line}: {error}')
+                return redirect('payroll:attendance_list')
+    else:
+        form = AttendanceImportForm()
+    
+    context = {
+        'form': form,
+        'title': 'Import Attendance',
+    }
+    
+    return render(request, 'payroll/attendance_import.html', context)
+
+
 # ============================================================================
 # Leave Management Views
 # ============================================================================
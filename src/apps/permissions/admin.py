@@ -4,10 +4,11 @@ Permissions Admin Configuration
 from django.contrib import admin
 from django.utils.html import format_html
 from .models import RolePermission, PermissionHistory
+from utils.admin import PerformanceModelAdmin
 
 
 @admin.register(RolePermission)
-class RolePermissionAdmin(admin.ModelAdmin):
+class RolePermissionAdmin(PerformanceModelAdmin):
     """Admin interface for Role Permissions"""
     
     list_display = [
@@ -139,7 +140,7 @@ class RolePermissionAdmin(admin.ModelAdmin):
 
 
 @admin.register(PermissionHistory)
-class PermissionHistoryAdmin(admin.ModelAdmin):
+class PermissionHistoryAdmin(PerformanceModelAdmin):
     """Admin interface for Permission History"""
     
     list_display = [
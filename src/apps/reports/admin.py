@@ -13,9 +13,11 @@ from .models import (
     Report,
     ReportTemplate,
     ReportExecution,
+    ReportDelivery,
     ReportWidget,
     SavedReport
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class ReportExecutionInline(admin.TabularInline):
@@ -31,6 +33,17 @@ class ReportExecutionInline(admin.TabularInline):
         return False
 
 
+class ReportDeliveryInline(admin.TabularInline):
+    model = ReportDelivery
+    extra = 0
+    readonly_fields = ['email', 'attached', 'sent_at', 'download_count', 'first_downloaded_at', 'last_downloaded_at']
+    fields = readonly_fields
+    can_delete = False
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 class ReportWidgetInline(admin.TabularInline):
     model = ReportWidget
     extra = 0
@@ -39,7 +52,7 @@ class ReportWidgetInline(admin.TabularInline):
 
 
 @admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
+class ReportAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'report_type_badge',
@@ -224,7 +237,7 @@ class ReportAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReportTemplate)
-class ReportTemplateAdmin(admin.ModelAdmin):
+class ReportTemplateAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'report_type',
@@ -296,7 +309,7 @@ class ReportTemplateAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReportExecution)
-class ReportExecutionAdmin(admin.ModelAdmin):
+class ReportExecutionAdmin(PerformanceModelAdmin):
     list_display = [
         'report_link',
         'status_badge',
@@ -308,6 +321,7 @@ class ReportExecutionAdmin(admin.ModelAdmin):
         'row_count',
         'output_format',
     ]
+    list_select_related = ['report', 'triggered_by']
     list_filter = [
         'status',
         'output_format',
@@ -381,6 +395,7 @@ class ReportExecutionAdmin(admin.ModelAdmin):
     )
     date_hierarchy = 'created_at'
     list_per_page = 50
+    inlines = [ReportDeliveryInline]
     actions = ['retry_failed_executions', 'delete_old_executions']
     
     def has_add_permission(self, request):
@@ -396,8 +411,8 @@ class ReportExecutionAdmin(admin.ModelAdmin):
     
     def triggered_by_link(self, obj):
         if obj.triggered_by:
-            url = reverse('admin:auth_user_change', args=[obj.triggered_by.pk])
-            return format_html('<a href="{}">{}</a>', url, obj.triggered_by.get_full_name() or obj.triggered_by.username)
+            url = reverse('admin:authentication_user_change', args=[obj.triggered_by.pk])
+            return format_html('<a href="{}">{}</a>', url, obj.triggered_by.get_full_name() or obj.triggered_by.email)
         return format_html('<span style="color: gray;">System</span>')
     triggered_by_link.short_description = 'Triggered By'
     
@@ -420,7 +435,7 @@ class ReportExecutionAdmin(admin.ModelAdmin):
     
     def execution_time_display(self, obj):
         if obj.execution_time:
-            return format_html('<span>{:.2f}s</span>', obj.execution_time)
+            return format_html('<span>{}s</span>', f'{obj.execution_time:.2f}')
         return '-'
     execution_time_display.short_description = 'Execution Time'
     execution_time_display.admin_order_field = 'execution_time'
@@ -442,7 +457,7 @@ class ReportExecutionAdmin(admin.ModelAdmin):
 
 
 @admin.register(ReportWidget)
-class ReportWidgetAdmin(admin.ModelAdmin):
+class ReportWidgetAdmin(PerformanceModelAdmin):
     list_display = [
         'name',
         'widget_type',
@@ -516,7 +531,7 @@ class ReportWidgetAdmin(admin.ModelAdmin):
 
 
 @admin.register(SavedReport)
-class SavedReportAdmin(admin.ModelAdmin):
+class SavedReportAdmin(PerformanceModelAdmin):
     list_display = [
         'user_link',
         'report_link',
@@ -525,6 +540,7 @@ class SavedReportAdmin(admin.ModelAdmin):
         'last_accessed',
         'created_at',
     ]
+    list_select_related = ['report', 'user']
     list_filter = [
         'created_at',
         'last_accessed',
@@ -542,8 +558,8 @@ class SavedReportAdmin(admin.ModelAdmin):
     date_hierarchy = 'last_accessed'
     
     def user_link(self, obj):
-        url = reverse('admin:auth_user_change', args=[obj.user.pk])
-        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.username)
+        url = reverse('admin:authentication_user_change', args=[obj.user.pk])
+        return format_html('<a href="{}">{}</a>', url, obj.user.get_full_name() or obj.user.email)
     user_link.short_description = 'User'
     
     def report_link(self, obj):
@@ -0,0 +1,146 @@
+"""
+Report result cache
+
+An execution is identified by what shapes its file: report type,
+query_config, output options, date range and format (cache_key), and by
+the state of the tables its data comes from (data_watermark: row count,
+highest pk and latest auto_now timestamp of each source model). When a
+completed execution with the same key and watermark still has its file,
+a new execution reuses that file and is recorded as completed at once
+instead of regenerating the data and the document. Report types are
+shared across report definitions, so a reused file keeps the title of
+the report that generated it.
+
+Writes that bypass auto_now (QuerySet.update(), raw SQL) and leave the
+row count unchanged are not seen by the watermark; report types without
+declared source models are never cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from django.apps import apps
+from django.db.models import Count, Max
+
+logger = logging.getLogger(__name__)
+
+# Report type -> models its data generator reads (see utils.generate_*_report_data)
+REPORT_SOURCES = {
+    'financial': ['payments.Payment', 'expenses.Expense'],
+    'vehicle': ['vehicles.Vehicle'],
+    'client': ['clients.Client', 'payments.Payment'],
+    'auction': ['auctions.Auction', 'auctions.Bid'],
+    'payment': ['payments.Payment', 'clients.ClientVehicle', 'clients.Client'],
+    'sales': ['vehicles.Vehicle', 'payments.Payment'],
+}
+
+
+def is_cacheable(report_type):
+    return report_type in REPORT_SOURCES
+
+
+def cache_key(report, output_format, date_from, date_to):
+    """Hash of everything in the report definition that shapes the output file"""
+    definition = {
+        'report_type': report.report_type,
+        'query_config': report.query_config,
+        'include_charts': report.include_charts,
+        'include_summary': report.include_summary,
+        'include_details': report.include_details,
+        'date_from': date_from,
+        'date_to': date_to,
+        'output_format': output_format,
+    }
+    encoded = json.dumps(definition, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _updated_field(model):
+    for field in model._meta.concrete_fields:
+        if getattr(field, 'auto_now', False):
+            return field.name
+    return None
+
+
+def data_watermark(report_type):
+    """
+    Fingerprint of the source tables of a report type: one aggregate query
+    per model. None for report types that are not cached.
+    """
+    if not is_cacheable(report_type):
+        return None
+
+    parts = []
+    for label in REPORT_SOURCES[report_type]:
+        model = apps.get_model(label)
+        aggregates = {'rows': Count('pk'), 'last_pk': Max('pk')}
+        updated_field = _updated_field(model)
+        if updated_field:
+            aggregates['updated'] = Max(updated_field)
+        values = model._default_manager.aggregate(**aggregates)
+        parts.append(f"{label}:{values['rows']}:{values['last_pk']}:{values.get('updated') or ''}")
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def prepare(execution):
+    """Set the execution's cache key and the current data watermark (unsaved)"""
+    report = execution.report
+    execution.data_watermark = data_watermark(report.report_type) or ''
+    execution.cache_key = (
+        cache_key(report, execution.output_format, execution.date_from, execution.date_to)
+        if execution.data_watermark else ''
+    )
+
+
+def find_cached(execution):
+    """Latest completed execution with the same key and watermark whose file still exists"""
+    if not execution.cache_key:
+        return None
+
+    candidates = (
+        type(execution).objects
+        .filter(
+            cache_key=execution.cache_key,
+            data_watermark=execution.data_watermark,
+            status='completed',
+        )
+        .exclude(pk=execution.pk)
+        .exclude(file_path='')
+        .order_by('-completed_at')
+    )
+    for candidate in candidates[:5]:
+        if os.path.exists(candidate.file_path):
+            return candidate
+    return None
+
+
+def serve_from_cache(execution):
+    """
+    Complete the execution with a cached result if there is one.
+
+    Returns:
+        bool: True if the execution was served from the cache
+    """
+    prepare(execution)
+    source = find_cached(execution)
+    if source is None:
+        execution.save(update_fields=['cache_key', 'data_watermark'])
+        return False
+
+    execution.cache_hit = True
+    execution.source_execution = source
+    execution.result_data = source.result_data
+    execution.set_started()
+    execution.save(update_fields=[
+        'cache_key', 'data_watermark', 'cache_hit', 'source_execution', 'result_data',
+        'started_at', 'queue_wait',
+    ])
+    execution.mark_as_completed(
+        file_path=source.file_path,
+        file_size=source.file_size,
+        row_count=source.row_count,
+    )
+    logger.info(f"Served report {execution.report.name} from execution {source.pk}")
+    return True
@@ -0,0 +1,228 @@
+"""
+Report distribution
+
+Report emails link to the file instead of carrying it. Each recipient of
+an execution gets a ReportDelivery row and a signed download link
+(django.core.signing, salted, expiring after REPORT_LINK_MAX_AGE seconds)
+that works without logging in and counts the recipient's downloads. Files
+up to REPORT_ATTACHMENT_MAX_BYTES are attached as well; the file is read
+once per batch, and the whole batch goes out over one mail connection.
+
+Downloads, through a link or through download_report, are served by
+file_response(), which answers single-range requests with 206 Partial
+Content so large files can be resumed.
+"""
+
+import logging
+import mimetypes
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.mail import EmailMessage, get_connection
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+from .models import ReportDelivery
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'apps.reports.distribution.download'
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'json': 'application/json',
+    'html': 'text/html',
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def link_max_age():
+    return getattr(settings, 'REPORT_LINK_MAX_AGE', 7 * 24 * 3600)
+
+
+# ============================================================================
+# Signed links
+# ============================================================================
+
+def make_token(delivery):
+    return signing.dumps(str(delivery.pk), salt=TOKEN_SALT)
+
+
+def read_token(token):
+    """
+    The delivery a download token was issued for.
+
+    Raises:
+        signing.SignatureExpired: the link is older than REPORT_LINK_MAX_AGE
+        signing.BadSignature: the token was not issued by this site
+        ReportDelivery.DoesNotExist: the delivery was deleted
+    """
+    delivery_id = signing.loads(token, salt=TOKEN_SALT, max_age=link_max_age())
+    return ReportDelivery.objects.select_related('execution__report').get(pk=delivery_id)
+
+
+def download_url(delivery):
+    path = reverse('reports:shared_download', args=[make_token(delivery)])
+    return f"{getattr(settings, 'REPORT_LINK_BASE_URL', '').rstrip('/')}{path}"
+
+
+# ============================================================================
+# Sending
+# ============================================================================
+
+def download_filename(execution):
+    extension = 'xlsx' if execution.output_format == 'excel' else execution.output_format
+    return f"{execution.report.name}_{execution.created_at.strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+
+def build_message(delivery, attachment=None):
+    execution = delivery.execution
+    report = execution.report
+    expires = timezone.now() + timedelta(seconds=link_max_age())
+
+    body = f"""
+Hello,
+
+Your scheduled report "{report.name}" has been generated.
+
+Report Period: {execution.date_from} to {execution.date_to}
+Generated: {execution.completed_at.strftime('%Y-%m-%d %H:%M:%S')}
+Execution Time: {execution.execution_time or 0:.2f} seconds
+
+Download the report: {download_url(delivery)}
+The link is valid until {expires.strftime('%Y-%m-%d %H:%M')}.{' The report is also attached.' if attachment else ''}
+
+Best regards,
+Vehicle Management System
+    """
+
+    message = EmailMessage(
+        subject=f"Report: {report.name}",
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[delivery.email],
+    )
+    if attachment:
+        message.attach(*attachment)
+    return message
+
+
+def distribute(execution):
+    """
+    Email every recipient of the execution's report who has not been sent
+    it yet, over one mail connection.
+
+    Returns:
+        int: number of emails sent
+    """
+    recipients = execution.report.get_email_recipients_list()
+    existing = {d.email: d for d in execution.deliveries.all()}
+    ReportDelivery.objects.bulk_create(
+        [ReportDelivery(execution=execution, email=email) for email in recipients if email not in existing]
+    )
+    pending = list(execution.deliveries.filter(sent_at__isnull=True, email__in=recipients))
+    if not pending:
+        return 0
+
+    # Read a small file once for the whole batch
+    attachment = None
+    max_bytes = getattr(settings, 'REPORT_ATTACHMENT_MAX_BYTES', 0)
+    if execution.file_size and execution.file_size <= max_bytes and os.path.exists(execution.file_path):
+        with open(execution.file_path, 'rb') as f:
+            attachment = (
+                download_filename(execution), f.read(),
+                CONTENT_TYPES.get(execution.output_format, 'application/octet-stream'),
+            )
+
+    sent = []
+    connection = get_connection()
+    connection.open()
+    try:
+        for delivery in pending:
+            delivery.execution = execution
+            message = build_message(delivery, attachment)
+            message.connection = connection
+            if message.send():
+                delivery.sent_at = timezone.now()
+                delivery.attached = attachment is not None
+                sent.append(delivery)
+    finally:
+        # Record what went out before a connection error is re-raised for a retry
+        ReportDelivery.objects.bulk_update(sent, ['sent_at', 'attached'])
+        connection.close()
+
+    logger.info(f"Sent report {execution.report.name} to {len(sent)} recipient(s)")
+    return len(sent)
+
+
+# ============================================================================
+# Serving
+# ============================================================================
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range Range header, None to send the
+    whole file, or False if the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # bytes=-N: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, execution):
+    """Serve the execution's file, honouring a single byte range"""
+    path = execution.file_path
+    size = os.path.getsize(path)
+    content_type = CONTENT_TYPES.get(execution.output_format) or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    filename = download_filename(execution)
+
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type, as_attachment=True, filename=filename)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+        # Quoted and RFC 5987-encoded like FileResponse does for full downloads
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -15,6 +15,9 @@ from decimal import Decimal
 
 logger = logging.getLogger(__name__)
 
+# Rows below the header row that fit on one worksheet
+EXCEL_MAX_DATA_ROWS = 1048575
+
 
 # ============================================================================
 # MAIN GENERATOR FUNCTION
@@ -59,6 +62,12 @@ def generate_pdf_report(report, data, date_from, date_to):
     """
     Generate PDF report
     
+    Detail sections are capped at REPORT_PDF_MAX_ROWS rows (query_config
+    'max_rows' overrides it) and laid out as LongTables of
+    REPORT_PDF_CHUNK_ROWS rows with a repeated header row, with column
+    widths measured once per section, so ReportLab never lays out one
+    table over the whole section.
+    
     Returns:
         tuple: (file_path, file_size)
     """
@@ -68,7 +77,8 @@ def generate_pdf_report(report, data, date_from, date_to):
         from reportlab.lib import colors
         from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
         from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, PageBreak
         from reportlab.platypus import Image as RLImage
         from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
     except ImportError:
@@ -106,6 +116,8 @@ def generate_pdf_report(report, data, date_from, date_to):
     story.append(Paragraph(report_info, info_style))
     story.append(Spacer(1, 0.3 * inch))
     
+    sections, max_rows, notes = plan_detail_sections(report, data, 'REPORT_PDF_MAX_ROWS', 5000)
+    
     # Summary Section
     if report.include_summary and 'summary' in data:
         story.append(Paragraph("<b>Summary</b>", styles['Heading2']))
@@ -131,33 +143,45 @@ def generate_pdf_report(report, data, date_from, date_to):
             story.append(summary_table)
             story.append(Spacer(1, 0.3 * inch))
     
+    for note in notes:
+        story.append(Paragraph(f"<i>{note}</i>", info_style))
+        story.append(Spacer(1, 0.1 * inch))
+    
     # Details Section
-    if report.include_details:
-        # Add tables for different data sections
-        for section_name, section_data in data.items():
-            if section_name == 'summary':
-                continue
-            
-            if isinstance(section_data, list) and section_data:
-                story.append(Paragraph(f"<b>{section_name.replace('_', ' ').title()}</b>", styles['Heading2']))
-                story.append(Spacer(1, 0.1 * inch))
-                
-                # Create table from list data
-                table_data = create_table_from_list(section_data)
-                if table_data:
-                    table = Table(table_data)
-                    table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 10),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-                    ]))
-                    story.append(table)
-                    story.append(Spacer(1, 0.3 * inch))
+    # One style for every chunk of every section
+    detail_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
+    ])
+    chunk_rows = max(getattr(settings, 'REPORT_PDF_CHUNK_ROWS', 500), 1)
+    
+    for section_name, section_data in sections:
+        story.append(Paragraph(f"<b>{section_name.replace('_', ' ').title()}</b>", styles['Heading2']))
+        story.append(Spacer(1, 0.1 * inch))
+        
+        headers = list(section_data[0].keys())
+        header_row = [h.replace('_', ' ').title() for h in headers]
+        rows = section_data[:max_rows]
+        
+        col_widths = None
+        for start in range(0, len(rows), chunk_rows):
+            table_data = [header_row]
+            table_data.extend(
+                [format_value(item.get(h)) for h in headers]
+                for item in rows[start:start + chunk_rows]
+            )
+            if col_widths is None:
+                col_widths = measure_column_widths(table_data, doc.width, stringWidth)
+            table = LongTable(table_data, colWidths=col_widths, repeatRows=1)
+            table.setStyle(detail_style)
+            story.append(table)
+        story.append(Spacer(1, 0.3 * inch))
     
     # Build PDF
     doc.build(story)
@@ -167,6 +191,25 @@ def generate_pdf_report(report, data, date_from, date_to):
     return file_path, file_size
 
 
+def measure_column_widths(table_data, available_width, string_width, font_size=10, padding=12):
+    """
+    Column widths fitting the widest cell of each column in `table_data`
+    (header and first chunk), scaled down to the page width if needed
+    """
+    
+    columns = len(table_data[0])
+    widths = [0] * columns
+    for row in table_data:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], string_width(str(cell), 'Helvetica-Bold', font_size))
+    widths = [width + padding for width in widths]
+    
+    total = sum(widths)
+    if total > available_width:
+        widths = [width * available_width / total for width in widths]
+    return widths
+
+
 # ============================================================================
 # EXCEL GENERATOR
 # ============================================================================
@@ -175,12 +218,19 @@ def generate_excel_report(report, data, date_from, date_to):
     """
     Generate Excel report
     
+    The workbook is written in openpyxl's write-only mode: rows are
+    streamed to the file as they are appended instead of being kept as
+    cell objects, and the few styled cells share one set of style
+    objects. Detail sheets are capped at REPORT_EXCEL_MAX_ROWS rows
+    (query_config 'max_rows' overrides it).
+    
     Returns:
         tuple: (file_path, file_size)
     """
     
     try:
         import openpyxl
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
         from openpyxl.utils import get_column_letter
     except ImportError:
@@ -192,72 +242,75 @@ def generate_excel_report(report, data, date_from, date_to):
     ensure_directory_exists(file_path)
     
     # Create workbook
-    wb = openpyxl.Workbook()
+    wb = openpyxl.Workbook(write_only=True)
+    
+    title_font = Font(size=16, bold=True)
+    bold_font = Font(bold=True)
+    center = Alignment(horizontal='center')
+    header_fill = PatternFill(start_color="3498db", end_color="3498db", fill_type="solid")
+    
+    def styled(ws, value, font=None, fill=None, alignment=None):
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if alignment:
+            cell.alignment = alignment
+        return cell
+    
+    sections, max_rows, notes = plan_detail_sections(report, data, 'REPORT_EXCEL_MAX_ROWS', EXCEL_MAX_DATA_ROWS)
+    max_rows = min(max_rows, EXCEL_MAX_DATA_ROWS)
     
     # Summary Sheet
+    ws_summary = wb.create_sheet(title="Summary")
+    ws_summary.column_dimensions['A'].width = 30
+    ws_summary.column_dimensions['B'].width = 20
+    
+    # Title
+    ws_summary.append([styled(ws_summary, report.name, font=title_font, alignment=center)])
+    ws_summary.merged_cells.add('A1:B1')
+    ws_summary.append([])
+    
+    # Report info
+    ws_summary.append(["Report Type:", report.get_report_type_display()])
+    ws_summary.append(["Period:", f"{date_from.strftime('%Y-%m-%d')} to {date_to.strftime('%Y-%m-%d')}"])
+    ws_summary.append(["Generated:", timezone.now().strftime('%Y-%m-%d %H:%M:%S')])
+    
+    # Summary data
     if report.include_summary and 'summary' in data:
-        ws_summary = wb.active
-        ws_summary.title = "Summary"
-        
-        # Title
-        ws_summary['A1'] = report.name
-        ws_summary['A1'].font = Font(size=16, bold=True)
-        ws_summary['A1'].alignment = Alignment(horizontal='center')
-        ws_summary.merge_cells('A1:B1')
-        
-        # Report info
-        ws_summary['A3'] = "Report Type:"
-        ws_summary['B3'] = report.get_report_type_display()
-        ws_summary['A4'] = "Period:"
-        ws_summary['B4'] = f"{date_from.strftime('%Y-%m-%d')} to {date_to.strftime('%Y-%m-%d')}"
-        ws_summary['A5'] = "Generated:"
-        ws_summary['B5'] = timezone.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Summary data
-        row = 7
-        ws_summary[f'A{row}'] = "Metric"
-        ws_summary[f'B{row}'] = "Value"
-        ws_summary[f'A{row}'].font = Font(bold=True)
-        ws_summary[f'B{row}'].font = Font(bold=True)
-        
-        row += 1
+        ws_summary.append([])
+        ws_summary.append([
+            styled(ws_summary, "Metric", font=bold_font),
+            styled(ws_summary, "Value", font=bold_font),
+        ])
         for key, value in data['summary'].items():
-            ws_summary[f'A{row}'] = key.replace('_', ' ').title()
-            ws_summary[f'B{row}'] = format_value(value)
-            row += 1
-        
-        # Style columns
-        ws_summary.column_dimensions['A'].width = 30
-        ws_summary.column_dimensions['B'].width = 20
+            ws_summary.append([key.replace('_', ' ').title(), format_value(value)])
+    
+    if notes:
+        ws_summary.append([])
+        for note in notes:
+            ws_summary.append([note])
     
     # Detail Sheets
-    if report.include_details:
-        for section_name, section_data in data.items():
-            if section_name == 'summary':
-                continue
-            
-            if isinstance(section_data, list) and section_data:
-                ws = wb.create_sheet(title=section_name[:31])  # Excel limit
-                
-                # Add headers
-                if section_data:
-                    headers = list(section_data[0].keys())
-                    for col_num, header in enumerate(headers, 1):
-                        cell = ws.cell(row=1, column=col_num)
-                        cell.value = header.replace('_', ' ').title()
-                        cell.font = Font(bold=True)
-                        cell.fill = PatternFill(start_color="3498db", end_color="3498db", fill_type="solid")
-                        cell.alignment = Alignment(horizontal='center')
-                    
-                    # Add data
-                    for row_num, item in enumerate(section_data, 2):
-                        for col_num, header in enumerate(headers, 1):
-                            value = item.get(header)
-                            ws.cell(row=row_num, column=col_num, value=format_value(value))
-                    
-                    # Auto-size columns
-                    for col_num in range(1, len(headers) + 1):
-                        ws.column_dimensions[get_column_letter(col_num)].width = 15
+    for section_name, section_data in sections:
+        ws = wb.create_sheet(title=section_name[:31])  # Excel limit
+        headers = list(section_data[0].keys())
+        
+        # Column widths and panes have to be set before the first row
+        for col_num in range(1, len(headers) + 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = 15
+        ws.freeze_panes = 'A2'
+        
+        # Add headers
+        ws.append([
+            styled(ws, header.replace('_', ' ').title(), font=bold_font, fill=header_fill, alignment=center)
+            for header in headers
+        ])
+        
+        # Add data
+        for item in section_data[:max_rows]:
+            ws.append([format_value(item.get(header)) for header in headers])
     
     # Save workbook
     wb.save(file_path)
@@ -267,6 +320,43 @@ def generate_excel_report(report, data, date_from, date_to):
     return file_path, file_size
 
 
+def plan_detail_sections(report, data, max_rows_setting, default_max_rows):
+    """
+    Detail sections to write to an Excel or PDF file, the per-section row
+    cap and notes on what was left out.
+    
+    A report writes only its summary when include_details is off, when
+    query_config has 'summary_only', or when its sections hold more than
+    REPORT_SUMMARY_ONLY_ROWS rows together (0 disables the threshold);
+    CSV files always carry every row.
+    
+    Returns:
+        tuple: ([(section_name, rows)], max_rows, [note])
+    """
+    
+    config = report.query_config or {}
+    max_rows = config.get('max_rows') or getattr(settings, max_rows_setting, default_max_rows)
+    
+    if not report.include_details:
+        return [], max_rows, []
+    
+    sections = [
+        (name, rows) for name, rows in data.items()
+        if name != 'summary' and isinstance(rows, list) and rows
+    ]
+    total = sum(len(rows) for _, rows in sections)
+    threshold = getattr(settings, 'REPORT_SUMMARY_ONLY_ROWS', 0)
+    
+    if config.get('summary_only') or (threshold and total > threshold):
+        return [], max_rows, [f"Details omitted ({total:,} rows); export the report as CSV for every row."]
+    
+    notes = [
+        f"{name.replace('_', ' ').title()}: showing the first {max_rows:,} of {len(rows):,} rows."
+        for name, rows in sections if len(rows) > max_rows
+    ]
+    return sections, max_rows, notes
+
+
 # ============================================================================
 # CSV GENERATOR
 # ============================================================================
@@ -0,0 +1,124 @@
+"""
+Management command to measure wall time and peak memory of the report file
+writers on synthetic detail rows.
+
+    python manage.py benchmark_report_writers --rows 10000 100000 1000000
+
+Each measurement runs in a forked process, so peak RSS is that of one
+writer: "base" is the peak after the rows were built, "peak" the peak
+after the file was written. Nothing is written to the database.
+"""
+import multiprocessing
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+
+from apps.reports.generators import generate_report_file
+from apps.reports.models import Report
+
+FORMATS = ['excel', 'pdf', 'csv']
+
+
+def synthetic_rows(count, seed=42):
+    """Detail rows shaped like the payment report's items"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    methods = ['cash', 'mpesa', 'bank_transfer', 'cheque']
+    return [
+        {
+            'receipt_number': f'RCP{i:08d}',
+            'client': f'Client {rng.randrange(count // 10 + 1)}',
+            'vehicle': f'KDA {rng.randrange(1000):03d}{chr(65 + i % 26)}',
+            'amount': Decimal(rng.randrange(100000, 10000000)) / 100,
+            'payment_date': start + timedelta(days=i % 365),
+            'payment_method': methods[i % len(methods)],
+            'installment': i % 36 + 1,
+            'reference': f'TX{rng.getrandbits(40):010X}',
+        }
+        for i in range(count)
+    ]
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def measure(output_format, rows, query_config, results):
+    data = {
+        'summary': {'total_payments': rows, 'total_amount': Decimal('123456789.50')},
+        'items': synthetic_rows(rows),
+    }
+    report = Report(
+        name=f'Writer benchmark {output_format} {rows}',
+        report_type='payment',
+        output_format=output_format,
+        query_config=query_config,
+    )
+    media_root = tempfile.mkdtemp()
+    try:
+        with override_settings(MEDIA_ROOT=media_root):
+            base = peak_rss_mb()
+            started = time.perf_counter()
+            _, file_size = generate_report_file(report, data, output_format, date(2024, 1, 1), date(2024, 12, 31))
+            elapsed = time.perf_counter() - started
+        results.put((elapsed, base, peak_rss_mb(), file_size / 1024 / 1024))
+    finally:
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+class Command(BaseCommand):
+    help = 'Time the Excel/PDF/CSV report writers and measure their peak RSS on synthetic rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[10000, 100000, 1000000],
+            help='Detail row counts to write (default: 10000 100000 1000000)'
+        )
+        parser.add_argument(
+            '--formats', nargs='+', choices=FORMATS, default=['excel', 'pdf'],
+            help='Output formats to measure (default: excel pdf)'
+        )
+        parser.add_argument('--max-rows', type=int, help="Row cap (the report's query_config 'max_rows')")
+        parser.add_argument('--summary-only', action='store_true', help='Write summary-only files')
+
+    def handle(self, *args, **options):
+        if not hasattr(resource, 'getrusage'):
+            raise CommandError('Peak RSS needs resource.getrusage (not available on this platform)')
+
+        query_config = {}
+        if options['max_rows']:
+            query_config['max_rows'] = options['max_rows']
+        if options['summary_only']:
+            query_config['summary_only'] = True
+
+        # Forked children must not share the parent's database sockets
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+
+        self.stdout.write(
+            f"{'format':<8} {'rows':>10} {'seconds':>9} {'base MB':>9} {'peak MB':>9} {'writer MB':>10} {'file MB':>9}"
+        )
+        for output_format in options['formats']:
+            for rows in options['rows']:
+                results = context.Queue()
+                process = context.Process(target=measure, args=(output_format, rows, query_config, results))
+                process.start()
+                process.join()
+                if process.exitcode != 0:
+                    raise CommandError(f'{output_format} writer failed at {rows} rows (exit code {process.exitcode})')
+                elapsed, base, peak, file_mb = results.get()
+                self.stdout.write(
+                    f'{output_format:<8} {rows:>10} {elapsed:>9.2f} {base:>9.1f} {peak:>9.1f} '
+                    f'{peak - base:>10.1f} {file_mb:>9.2f}'
+                )
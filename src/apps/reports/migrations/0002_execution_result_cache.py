@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-18 22:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportexecution',
+            name='cache_hit',
+            field=models.BooleanField(default=False, help_text='Was the file reused from an identical earlier execution?'),
+        ),
+        migrations.AddField(
+            model_name='reportexecution',
+            name='cache_key',
+            field=models.CharField(blank=True, help_text='Hash of the report definition, date range and format', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='reportexecution',
+            name='data_watermark',
+            field=models.CharField(blank=True, help_text='Fingerprint of the source tables when the data was read', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='reportexecution',
+            name='source_execution',
+            field=models.ForeignKey(blank=True, help_text='Execution whose file was reused', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reused_by', to='reports.reportexecution'),
+        ),
+        migrations.AddIndex(
+            model_name='reportexecution',
+            index=models.Index(fields=['cache_key', 'data_watermark', '-completed_at'], name='reports_rep_cache_k_731db4_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 22:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_execution_result_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportexecution',
+            name='queue_wait',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Seconds between queueing and the start of execution', max_digits=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportexecution',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reportexecution',
+            name='source_execution',
+            field=models.ForeignKey(blank=True, help_text='Execution whose file was (or, while waiting, will be) reused', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reused_by', to='reports.reportexecution'),
+        ),
+    ]
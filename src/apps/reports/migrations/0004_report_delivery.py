@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-18 22:43
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_execution_queue_wait'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportDelivery',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('email', models.EmailField(max_length=254)),
+                ('attached', models.BooleanField(default=False, help_text='Was the file attached to the email as well as linked?')),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('download_count', models.PositiveIntegerField(default=0)),
+                ('first_downloaded_at', models.DateTimeField(blank=True, null=True)),
+                ('last_downloaded_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('execution', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='reports.reportexecution')),
+            ],
+            options={
+                'verbose_name': 'Report Delivery',
+                'verbose_name_plural': 'Report Deliveries',
+                'ordering': ['email'],
+                'unique_together': {('execution', 'email')},
+            },
+        ),
+    ]
@@ -4,6 +4,8 @@ Handles business intelligence and reporting
 """
 
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
@@ -55,6 +57,13 @@ class ReportExecutionManager(models.Manager):
     def in_progress(self):
         """Get in-progress executions"""
         return self.filter(status='in_progress')
+    
+    def cache_stats(self, **filters):
+        """Completed executions and how many of them reused a cached file"""
+        return self.filter(status='completed', **filters).aggregate(
+            completed=models.Count('id'),
+            cache_hits=models.Count('id', filter=models.Q(cache_hit=True)),
+        )
 
 
 # ============================================================================
@@ -449,8 +458,16 @@ class ReportExecution(models.Model):
     )
     
     # Timing
+    queued_at = models.DateTimeField(null=True, blank=True)
     started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+    queue_wait = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Seconds between queueing and the start of execution"
+    )
     execution_time = models.DecimalField(
         max_digits=8,
         decimal_places=2,
@@ -480,6 +497,30 @@ class ReportExecution(models.Model):
     error_message = models.TextField(blank=True)
     stack_trace = models.TextField(blank=True)
     
+    # Result Cache (see cache.py)
+    cache_key = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Hash of the report definition, date range and format"
+    )
+    data_watermark = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Fingerprint of the source tables when the data was read"
+    )
+    cache_hit = models.BooleanField(
+        default=False,
+        help_text="Was the file reused from an identical earlier execution?"
+    )
+    source_execution = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reused_by',
+        help_text="Execution whose file was (or, while waiting, will be) reused"
+    )
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     parameters = models.JSONField(
@@ -496,6 +537,7 @@ class ReportExecution(models.Model):
             models.Index(fields=['report', '-created_at']),
             models.Index(fields=['status', '-created_at']),
             models.Index(fields=['triggered_by']),
+            models.Index(fields=['cache_key', 'data_watermark', '-completed_at']),
         ]
         verbose_name = 'Report Execution'
         verbose_name_plural = 'Report Executions'
@@ -503,11 +545,17 @@ class ReportExecution(models.Model):
     def __str__(self):
         return f"{self.report.name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
     
+    def set_started(self):
+        """Set started_at, and the queue wait if the execution was queued (unsaved)"""
+        self.started_at = timezone.now()
+        if self.queued_at:
+            self.queue_wait = Decimal(str(round((self.started_at - self.queued_at).total_seconds(), 2)))
+    
     def mark_as_started(self):
         """Mark execution as started"""
         self.status = 'in_progress'
-        self.started_at = timezone.now()
-        self.save(update_fields=['status', 'started_at'])
+        self.set_started()
+        self.save(update_fields=['status', 'started_at', 'queue_wait'])
     
     def mark_as_completed(self, file_path=None, file_size=None, row_count=None):
         """Mark execution as completed"""
@@ -562,6 +610,55 @@ class ReportExecution(models.Model):
         self.report.save(update_fields=['last_execution_status'])
 
 
+# ============================================================================
+# REPORT DELIVERY MODEL
+# ============================================================================
+
+class ReportDelivery(models.Model):
+    """
+    One recipient of an execution's report email, with the signed download
+    link sent to them and whether they used it (see distribution.py)
+    """
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    execution = models.ForeignKey(
+        ReportExecution,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    email = models.EmailField()
+    attached = models.BooleanField(
+        default=False,
+        help_text="Was the file attached to the email as well as linked?"
+    )
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    # Downloads through the signed link
+    download_count = models.PositiveIntegerField(default=0)
+    first_downloaded_at = models.DateTimeField(null=True, blank=True)
+    last_downloaded_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['execution', 'email']
+        ordering = ['email']
+        verbose_name = 'Report Delivery'
+        verbose_name_plural = 'Report Deliveries'
+    
+    def __str__(self):
+        return f"{self.execution} - {self.email}"
+    
+    def record_download(self):
+        """Count a download through this delivery's link"""
+        now = timezone.now()
+        ReportDelivery.objects.filter(pk=self.pk).update(
+            download_count=F('download_count') + 1,
+            first_downloaded_at=Coalesce('first_downloaded_at', Value(now)),
+            last_downloaded_at=now,
+        )
+
+
 # ============================================================================
 # REPORT WIDGET MODEL
 # ============================================================================
@@ -0,0 +1,240 @@
+"""
+Report execution scheduling
+
+Executions can run on dedicated Celery queues by priority class: runs a
+user asked for (run_report) on REPORT_QUEUE_INTERACTIVE and scheduled runs
+on REPORT_QUEUE_SCHEDULED, so a month-end batch of scheduled reports waits
+behind interactive work instead of the notification and email tasks on
+the default queue. Set the queue names only once workers consume them,
+ideally with the interactive queue on its own worker:
+
+    celery -A config worker -Q celery
+    celery -A config worker -Q reports_interactive
+    celery -A config worker -Q reports_scheduled
+
+A queue left unset sends its executions to the default queue.
+
+At most REPORT_TYPE_CONCURRENCY[type] (default REPORT_DEFAULT_CONCURRENCY)
+executions of one report type are in progress at a time; an execution
+that finds its type full is re-queued REPORT_DEFER_SECONDS later.
+
+schedule_due_reports() claims due reports, moves their next_run in one
+bulk update and creates their executions in one insert. Due reports that
+would produce the same file (same cache key) are coalesced: only the
+first is queued, the others wait on it (source_execution) and are queued
+when it finishes, by which time they are served from the result cache.
+Executions whose leader finished without releasing them, and executions
+that could not be queued because the broker was down, are queued again by
+the same scheduler run.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import cache_key, is_cacheable
+from .models import Report, ReportExecution
+
+logger = logging.getLogger(__name__)
+
+# Age before an unqueued pending execution is picked up by requeue_unqueued()
+REQUEUE_GRACE = timedelta(minutes=1)
+
+
+def queue_for(execution):
+    """The execution's dedicated queue, or None for the default queue"""
+    if execution.is_scheduled:
+        return getattr(settings, 'REPORT_QUEUE_SCHEDULED', '') or None
+    return getattr(settings, 'REPORT_QUEUE_INTERACTIVE', '') or None
+
+
+def concurrency_limit(report_type):
+    limits = getattr(settings, 'REPORT_TYPE_CONCURRENCY', {})
+    return limits.get(report_type, getattr(settings, 'REPORT_DEFAULT_CONCURRENCY', 4))
+
+
+def defer_seconds():
+    return getattr(settings, 'REPORT_DEFER_SECONDS', 30)
+
+
+def _stale_cutoff():
+    """Executions started before this have outlived the task time limit"""
+    return timezone.now() - timedelta(seconds=getattr(settings, 'CELERY_TASK_TIME_LIMIT', 30 * 60))
+
+
+# ============================================================================
+# Queueing
+# ============================================================================
+
+def enqueue(execution, countdown=None):
+    """
+    Queue an execution on its priority class's queue, if one is configured.
+    If the broker is unavailable the execution is left pending with no
+    queued_at, for the caller to run inline or the next sweep to re-queue.
+
+    Returns:
+        bool: False when the broker is unavailable
+    """
+    from .tasks import execute_report_task
+
+    if execution.queued_at is None:
+        execution.queued_at = timezone.now()
+        ReportExecution.objects.filter(pk=execution.pk).update(queued_at=execution.queued_at)
+
+    queue = queue_for(execution)
+    options = {'queue': queue} if queue else {}
+    try:
+        execute_report_task.apply_async(
+            args=[str(execution.id)],
+            countdown=countdown,
+            retry=False,
+            **options,
+        )
+    except Exception as e:
+        logger.warning(f"Could not queue report execution {execution.id}: {e}")
+        # Unqueued again: the next scheduler sweep (requeue_unqueued) retries it
+        execution.queued_at = None
+        ReportExecution.objects.filter(pk=execution.pk).update(queued_at=None)
+        return False
+    return True
+
+
+def claim_slot(execution):
+    """
+    Start the execution if fewer than its report type's limit are in
+    progress. Executions running longer than the task time limit are
+    assumed dead and not counted.
+
+    Returns:
+        bool: False if the execution has to wait
+    """
+    report_type = execution.report.report_type
+    stale = _stale_cutoff()
+
+    with transaction.atomic():
+        # Lock the type's report rows so concurrent claims for it are serialised
+        list(Report.objects.select_for_update().filter(report_type=report_type).values_list('pk', flat=True))
+        running = ReportExecution.objects.filter(
+            report__report_type=report_type,
+            status='in_progress',
+            started_at__gte=stale,
+        ).count()
+        if running >= concurrency_limit(report_type):
+            return False
+        execution.mark_as_started()
+    return True
+
+
+def release_followers(execution_id):
+    """Queue the executions coalesced onto one that has finished"""
+    _release(ReportExecution.objects.filter(source_execution_id=execution_id))
+
+
+def _release(followers):
+    followers = list(followers.filter(status='pending', cache_hit=False).select_related('report'))
+    # Detach first so a later orphan sweep does not queue them a second time;
+    # serve_from_cache links them again if they reuse the leader's file
+    ReportExecution.objects.filter(pk__in=[f.pk for f in followers]).update(source_execution=None)
+    for follower in followers:
+        follower.source_execution = None
+        enqueue(follower)
+
+
+# ============================================================================
+# Scheduled reports
+# ============================================================================
+
+def schedule_due_reports(now=None):
+    """
+    Create and queue executions for every scheduled report that is due.
+
+    Returns:
+        int: number of executions created
+    """
+    now = now or timezone.now()
+    release_orphans()
+    requeue_unqueued(now)
+
+    with transaction.atomic():
+        # skip_locked lets overlapping scheduler runs split the due reports
+        due = list(
+            Report.objects.select_for_update(skip_locked=True)
+            .filter(is_active=True, is_scheduled=True, next_run__lte=now)
+            .order_by('next_run')
+        )
+        if not due:
+            return 0
+
+        executions = []
+        for report in due:
+            date_from, date_to = report.get_date_range()
+            executions.append(ReportExecution(
+                report=report,
+                is_scheduled=True,
+                output_format=report.output_format,
+                date_from=date_from,
+                date_to=date_to,
+                queued_at=now,
+            ))
+            report.last_run = now
+            if report.frequency == 'once':
+                report.is_scheduled = False
+                report.next_run = None
+            else:
+                report.next_run = report.calculate_next_run()
+
+        Report.objects.bulk_update(due, ['is_scheduled', 'next_run', 'last_run'])
+        ReportExecution.objects.bulk_create(executions)
+
+        leaders, followers = {}, []
+        for execution in executions:
+            key = execution.pk
+            if is_cacheable(execution.report.report_type):
+                key = cache_key(execution.report, execution.output_format, execution.date_from, execution.date_to)
+            leader = leaders.setdefault(key, execution)
+            if leader is not execution:
+                execution.source_execution = leader
+                followers.append(execution)
+        ReportExecution.objects.bulk_update(followers, ['source_execution'])
+
+        leaders = list(leaders.values())
+        transaction.on_commit(lambda: [enqueue(execution) for execution in leaders])
+
+    logger.info(
+        f"Scheduled {len(executions)} report executions "
+        f"({len(followers)} coalesced onto identical runs)"
+    )
+    return len(executions)
+
+
+def release_orphans():
+    """Queue coalesced executions whose leader finished without releasing them"""
+    stale = _stale_cutoff()
+    _release(
+        ReportExecution.objects.filter(source_execution__isnull=False)
+        .exclude(source_execution__status='pending')
+        .exclude(source_execution__status='in_progress', source_execution__started_at__gte=stale)
+    )
+
+
+def requeue_unqueued(now=None):
+    """
+    Queue again the pending executions whose enqueue failed (broker down),
+    such as scheduled leaders whose report already moved on to its next_run.
+    Executions younger than REQUEUE_GRACE may still be queued or run inline
+    by whoever created them.
+
+    Returns:
+        int: number of executions queued
+    """
+    cutoff = (now or timezone.now()) - REQUEUE_GRACE
+    executions = list(
+        ReportExecution.objects.filter(
+            status='pending', queued_at__isnull=True,
+            source_execution__isnull=True, created_at__lt=cutoff,
+        ).select_related('report')
+    )
+    return sum(1 for execution in executions if enqueue(execution))
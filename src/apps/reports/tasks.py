@@ -4,14 +4,14 @@ Reports App - Background Tasks (Celery)
 
 from celery import shared_task
 from django.utils import timezone
-from django.core.mail import EmailMessage
-from django.conf import settings
 from datetime import timedelta
 import logging
 import os
 import traceback
 
-from .models import Report, ReportExecution, ReportSchedule
+from . import scheduler
+from .cache import serve_from_cache
+from .models import Report, ReportExecution
 from .utils import (
     generate_financial_report_data,
     generate_vehicle_report_data,
@@ -38,13 +38,31 @@ def execute_report_task(self, execution_id):
     """
     
     try:
-        execution = ReportExecution.objects.get(id=execution_id)
+        execution = ReportExecution.objects.select_related('report').get(id=execution_id)
         report = execution.report
         
-        logger.info(f"Starting execution of report: {report.name}")
+        # Deliveries of an execution that already finished (broker redelivery)
+        if execution.status in ('completed', 'cancelled'):
+            return {'status': 'skipped', 'execution_id': str(execution_id)}
+        
+        # Reuse the file of an identical execution over unchanged data
+        if serve_from_cache(execution):
+            scheduler.release_followers(execution.id)
+            if report.send_email and report.get_email_recipients_list():
+                send_report_email.delay(str(execution.id))
+            return {
+                'status': 'completed',
+                'execution_id': str(execution_id),
+                'file_path': execution.file_path,
+                'cache_hit': True,
+            }
+        
+        # Wait for a slot if the report type is at its concurrency limit
+        if not scheduler.claim_slot(execution):
+            scheduler.enqueue(execution, countdown=scheduler.defer_seconds())
+            return {'status': 'deferred', 'execution_id': str(execution_id)}
         
-        # Mark as started
-        execution.mark_as_started()
+        logger.info(f"Starting execution of report: {report.name}")
         
         # Get date range
         date_from, date_to = execution.date_from, execution.date_to
@@ -80,6 +98,9 @@ def execute_report_task(self, execution_id):
         
         logger.info(f"Completed execution of report: {report.name}")
         
+        # Identical scheduled executions waiting on this one are now cache hits
+        scheduler.release_followers(execution.id)
+        
         # Send email if configured
         if report.send_email and report.get_email_recipients_list():
             send_report_email.delay(str(execution.id))
@@ -111,6 +132,9 @@ def execute_report_task(self, execution_id):
         if self.request.retries < self.max_retries:
             raise self.retry(exc=e, countdown=60 * (self.request.retries + 1))
         
+        # Out of retries: let the coalesced executions run on their own
+        scheduler.release_followers(execution_id)
+        
         return {'status': 'failed', 'error': str(e)}
 
 
@@ -176,44 +200,14 @@ def send_report_email(self, execution_id):
             logger.warning(f"No recipients for report: {report.name}")
             return {'status': 'skipped', 'reason': 'No recipients'}
         
-        # Prepare email
-        subject = f"Report: {report.name}"
-        
-        body = f"""
-Hello,
-
-Your scheduled report "{report.name}" has been generated.
-
-Report Period: {execution.date_from} to {execution.date_to}
-Generated: {execution.completed_at.strftime('%Y-%m-%d %H:%M:%S')}
-Execution Time: {execution.execution_time:.2f} seconds
-
-Please find the report attached.
-
-Best regards,
-Vehicle Management System
-        """
-        
-        email = EmailMessage(
-            subject=subject,
-            body=body,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to=recipients
-        )
-        
-        # Attach report file
-        if os.path.exists(execution.file_path):
-            filename = f"{report.name}_{execution.created_at.strftime('%Y%m%d')}.{execution.output_format}"
-            email.attach_file(execution.file_path, mimetype=get_mimetype(execution.output_format))
-        
-        email.send()
-        
-        logger.info(f"Sent report email to {len(recipients)} recipient(s)")
+        # Signed download links, over one mail connection (see distribution.py)
+        from .distribution import distribute
+        sent = distribute(execution)
         
         return {
             'status': 'sent',
             'execution_id': str(execution_id),
-            'recipients': len(recipients)
+            'recipients': sent
         }
     
     except ReportExecution.DoesNotExist:
@@ -238,44 +232,10 @@ Vehicle Management System
 def process_scheduled_reports():
     """
     Process scheduled reports that are due
-    Scheduled to run every 5 minutes
+    Scheduled to run every 5 minutes (see scheduler.schedule_due_reports)
     """
     
-    now = timezone.now()
-    
-    # Get reports due for execution
-    due_reports = Report.objects.filter(
-        is_active=True,
-        is_scheduled=True,
-        next_run__lte=now
-    )
-    
-    count = 0
-    
-    for report in due_reports:
-        try:
-            # Create execution record
-            execution = ReportExecution.objects.create(
-                report=report,
-                is_scheduled=True,
-                output_format=report.output_format,
-                date_from=report.get_date_range()[0],
-                date_to=report.get_date_range()[1]
-            )
-            
-            # Queue execution
-            execute_report_task.delay(str(execution.id))
-            
-            # Update next run time
-            report.next_run = report.calculate_next_run()
-            report.save(update_fields=['next_run'])
-            
-            count += 1
-            
-            logger.info(f"Queued scheduled report: {report.name}")
-        
-        except Exception as e:
-            logger.error(f"Error processing scheduled report {report.name}: {e}")
+    count = scheduler.schedule_due_reports()
     
     logger.info(f"Processed {count} scheduled reports")
     
@@ -301,10 +261,18 @@ def cleanup_old_report_files():
         status='completed'
     )
     
+    # Files reused by recent executions through the result cache are kept
+    recent_files = set(
+        ReportExecution.objects.filter(completed_at__gte=cutoff, cache_hit=True)
+        .values_list('file_path', flat=True)
+    )
+    
     count = 0
     deleted_size = 0
     
     for execution in old_executions:
+        if execution.file_path in recent_files:
+            continue
         if execution.file_path and os.path.exists(execution.file_path):
             try:
                 file_size = os.path.getsize(execution.file_path)
@@ -444,7 +412,7 @@ def retry_failed_executions():
             )
             
             # Queue execution
-            execute_report_task.delay(str(new_execution.id))
+            scheduler.enqueue(new_execution)
             
             count += 1
         
@@ -1,3 +1,429 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.clients.tests import make_client, make_purchase, make_vehicle
+from apps.payments.models import Payment
+
+from . import scheduler
+from .generators import generate_excel_report, generate_pdf_report, plan_detail_sections
+from .models import Report, ReportDelivery, ReportExecution
+from .tasks import execute_report_task, process_scheduled_reports, send_report_email
+
+User = get_user_model()
+
+
+class ReportResultCacheTests(TestCase):
+    """Identical executions over unchanged data reuse the first file"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(email='reports@example.com', password='password')
+        cls.report = Report.objects.create(
+            name='Monthly payments',
+            report_type='payment',
+            output_format='csv',
+            date_range_type='custom',
+            custom_date_from=date(2024, 1, 1),
+            custom_date_to=date(2024, 12, 31),
+            send_email=False,
+            created_by=cls.user,
+        )
+        cls.purchase = make_purchase(make_client(1), make_vehicle(1))
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def execute(self):
+        date_from, date_to = self.report.get_date_range()
+        execution = ReportExecution.objects.create(
+            report=self.report,
+            triggered_by=self.user,
+            output_format='csv',
+            date_from=date_from,
+            date_to=date_to,
+        )
+        execute_report_task.apply(args=[str(execution.id)])
+        execution.refresh_from_db()
+        self.assertEqual(execution.status, 'completed', execution.error_message)
+        return execution
+
+    def test_unchanged_data_reuses_file(self):
+        first = self.execute()
+        second = self.execute()
+
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(second.source_execution, first)
+        self.assertEqual(second.file_path, first.file_path)
+        self.assertEqual(ReportExecution.objects.cache_stats(), {'completed': 2, 'cache_hits': 1})
+
+    def test_new_source_rows_regenerate(self):
+        first = self.execute()
+        Payment.objects.create(
+            client_vehicle=self.purchase,
+            amount=Decimal('50000'),
+            payment_date=date(2024, 3, 1),
+            payment_method='cash',
+        )
+        second = self.execute()
+
+        self.assertFalse(second.cache_hit)
+        self.assertNotEqual(second.data_watermark, first.data_watermark)
+        self.assertEqual(second.cache_key, first.cache_key)
+
+    def test_run_report_serves_hit_without_queueing(self):
+        self.execute()
+        self.client.force_login(self.user)
+
+        with mock.patch.object(execute_report_task, 'apply_async') as apply_async:
+            response = self.client.post(reverse('reports:run_report', args=[self.report.pk]), secure=True)
+
+        apply_async.assert_not_called()
+        execution = ReportExecution.objects.latest('created_at')
+        self.assertRedirects(
+            response, reverse('reports:execution_detail', args=[execution.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertTrue(execution.cache_hit)
+        self.assertEqual(execution.status, 'completed')
+
+
+@override_settings(
+    REPORT_QUEUE_INTERACTIVE='interactive',
+    REPORT_QUEUE_SCHEDULED='scheduled',
+    REPORT_TYPE_CONCURRENCY={'payment': 1},
+)
+class ReportSchedulerTests(TestCase):
+    """Due reports are fanned out in bulk, coalesced, queued by priority and capped per type"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(email='scheduler@example.com', password='password')
+        make_purchase(make_client(1), make_vehicle(1))
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        patcher = mock.patch.object(execute_report_task, 'apply_async')
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_report(self, name, **kwargs):
+        fields = {
+            'report_type': 'payment',
+            'output_format': 'csv',
+            'date_range_type': 'custom',
+            'custom_date_from': date(2024, 1, 1),
+            'custom_date_to': date(2024, 12, 31),
+            'send_email': False,
+            'is_scheduled': True,
+            'frequency': 'daily',
+            'schedule_time': time(6, 0),
+            'next_run': timezone.now() - timedelta(minutes=1),
+            'created_by': self.user,
+        }
+        fields.update(kwargs)
+        return Report.objects.create(name=name, **fields)
+
+    def queued_ids(self):
+        return [call.kwargs['args'][0] for call in self.apply_async.call_args_list]
+
+    def test_due_reports_are_coalesced_and_queued_as_scheduled(self):
+        first = self.make_report('Payments A')
+        second = self.make_report('Payments B')
+        other = self.make_report('Payments PDF', output_format='pdf')
+        self.make_report('Not due', next_run=timezone.now() + timedelta(hours=1))
+        once = self.make_report('One-off', report_type='vehicle', frequency='once')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = process_scheduled_reports.apply().get()
+
+        self.assertEqual(result['processed'], 4)
+        leader = ReportExecution.objects.get(report=first)
+        follower = ReportExecution.objects.get(report=second)
+        self.assertEqual(follower.source_execution, leader)
+        self.assertEqual(
+            sorted(self.queued_ids()),
+            sorted(str(e.pk) for e in ReportExecution.objects.exclude(pk=follower.pk)),
+        )
+        self.assertEqual({call.kwargs['queue'] for call in self.apply_async.call_args_list}, {'scheduled'})
+
+        first.refresh_from_db()
+        once.refresh_from_db()
+        self.assertGreater(first.next_run, timezone.now())
+        self.assertFalse(once.is_scheduled)
+        self.assertIsNone(once.next_run)
+        self.assertTrue(ReportExecution.objects.filter(report=other).exists())
+
+    @override_settings(REPORT_QUEUE_INTERACTIVE='', REPORT_QUEUE_SCHEDULED='')
+    def test_unconfigured_queues_use_the_default_queue(self):
+        self.make_report('Payments A')
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduler.schedule_due_reports()
+
+        self.assertEqual(len(self.apply_async.call_args_list), 1)
+        self.assertNotIn('queue', self.apply_async.call_args.kwargs)
+
+    @override_settings(REPORT_QUEUE_INTERACTIVE='')
+    def test_interactive_runs_stay_off_the_scheduled_queue(self):
+        report = self.make_report('Payments', is_scheduled=False)
+        execution = ReportExecution.objects.create(report=report, output_format='csv')
+
+        self.assertTrue(scheduler.enqueue(execution))
+        self.assertNotIn('queue', self.apply_async.call_args.kwargs)
+
+    def test_leader_left_unqueued_by_broker_outage_is_requeued(self):
+        report = self.make_report('Payments A')
+        self.apply_async.side_effect = ConnectionError('broker down')
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduler.schedule_due_reports()
+
+        execution = ReportExecution.objects.get(report=report)
+        self.assertIsNone(execution.queued_at)
+        report.refresh_from_db()
+        self.assertGreater(report.next_run, timezone.now())
+
+        # Too recent: whoever created it may still queue it
+        self.apply_async.reset_mock(side_effect=True)
+        self.assertEqual(scheduler.requeue_unqueued(), 0)
+
+        self.assertEqual(scheduler.requeue_unqueued(timezone.now() + timedelta(minutes=2)), 1)
+        self.assertEqual(self.queued_ids(), [str(execution.pk)])
+        self.assertEqual(self.apply_async.call_args.kwargs['queue'], 'scheduled')
+        execution.refresh_from_db()
+        self.assertIsNotNone(execution.queued_at)
+
+    def test_follower_is_released_and_served_from_leader(self):
+        self.make_report('Payments A')
+        second = self.make_report('Payments B')
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduler.schedule_due_reports()
+        leader_id = self.queued_ids()[0]
+
+        self.apply_async.reset_mock()
+        execute_report_task.apply(args=[leader_id])
+
+        follower = ReportExecution.objects.get(report=second)
+        self.assertEqual(self.queued_ids(), [str(follower.pk)])
+        execute_report_task.apply(args=[str(follower.pk)])
+        follower.refresh_from_db()
+        self.assertTrue(follower.cache_hit)
+        self.assertEqual(str(follower.source_execution_id), leader_id)
+
+    def test_concurrency_cap_defers_execution(self):
+        report = self.make_report('Payments', is_scheduled=False)
+        running = ReportExecution.objects.create(report=report, output_format='csv')
+        running.mark_as_started()
+        waiting = ReportExecution.objects.create(
+            report=report, output_format='pdf', triggered_by=self.user,
+            date_from=date(2024, 1, 1), date_to=date(2024, 12, 31),
+            queued_at=timezone.now() - timedelta(seconds=5),
+        )
+
+        result = execute_report_task.apply(args=[str(waiting.pk)]).get()
+
+        self.assertEqual(result['status'], 'deferred')
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, 'pending')
+        self.apply_async.assert_called_once_with(
+            args=[str(waiting.pk)], queue='interactive', countdown=30, retry=False,
+        )
+
+        running.mark_as_completed()
+        execute_report_task.apply(args=[str(waiting.pk)])
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status, 'completed', waiting.error_message)
+        self.assertGreaterEqual(waiting.queue_wait, Decimal('5'))
+
+
+@override_settings(REPORT_EXCEL_MAX_ROWS=25, REPORT_PDF_MAX_ROWS=25, REPORT_PDF_CHUNK_ROWS=10)
+class ReportWriterTests(TestCase):
+    """Excel and PDF writers cap detail rows and can write the summary only"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.data = {
+            'summary': {'total_payments': 40},
+            'items': [
+                {'receipt_number': f'RCP{i:04d}', 'amount': Decimal('1500.50'), 'payment_date': date(2024, 1, 1)}
+                for i in range(40)
+            ],
+        }
+
+    def write(self, generator, **query_config):
+        report = Report(name='Writer test', report_type='payment', query_config=query_config)
+        file_path, file_size = generator(report, self.data, date(2024, 1, 1), date(2024, 12, 31))
+        self.assertGreater(file_size, 0)
+        return file_path
+
+    def test_excel_rows_are_capped_with_a_note(self):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(self.write(generate_excel_report), read_only=True)
+
+        self.assertEqual(workbook.sheetnames, ['Summary', 'items'])
+        rows = list(workbook['items'].values)
+        self.assertEqual(len(rows), 26)
+        self.assertEqual(rows[0], ('Receipt Number', 'Amount', 'Payment Date'))
+        self.assertEqual(rows[1][0], 'RCP0000')
+        summary = [row[0] for row in workbook['Summary'].values if row]
+        self.assertIn('Items: showing the first 25 of 40 rows.', summary)
+
+    def test_summary_only_and_max_rows_override(self):
+        report = Report(name='Writer test', report_type='payment', query_config={'summary_only': True})
+        sections, _, notes = plan_detail_sections(report, self.data, 'REPORT_PDF_MAX_ROWS', 5000)
+        self.assertEqual(sections, [])
+        self.assertIn('40 rows', notes[0])
+
+        report.query_config = {'max_rows': 50}
+        sections, max_rows, notes = plan_detail_sections(report, self.data, 'REPORT_PDF_MAX_ROWS', 5000)
+        self.assertEqual((len(sections), max_rows, notes), (1, 50, []))
+
+        with override_settings(REPORT_SUMMARY_ONLY_ROWS=30):
+            report.query_config = {}
+            self.assertEqual(plan_detail_sections(report, self.data, 'REPORT_PDF_MAX_ROWS', 5000)[0], [])
+
+    def test_pdf_is_written_in_chunks(self):
+        from reportlab.platypus import LongTable
+
+        with mock.patch('reportlab.platypus.LongTable', wraps=LongTable) as table:
+            file_path = self.write(generate_pdf_report)
+
+        self.assertEqual(table.call_count, 3)
+        self.assertEqual(len(table.call_args_list[-1].args[0]), 6)
+        with open(file_path, 'rb') as f:
+            self.assertTrue(f.read(5).startswith(b'%PDF'))
+
+
+class ReportDistributionTests(TestCase):
+    """Report emails carry signed, expiring links served with byte ranges"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(email='distribution@example.com', password='password')
+        cls.report = Report.objects.create(
+            name='Payments',
+            report_type='payment',
+            output_format='csv',
+            date_range_type='custom',
+            custom_date_from=date(2024, 1, 1),
+            custom_date_to=date(2024, 12, 31),
+            send_email=False,
+            email_recipients='finance@example.com, ops@example.com',
+            created_by=cls.user,
+        )
+        make_purchase(make_client(1), make_vehicle(1))
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, REPORT_LINK_BASE_URL='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.execution = ReportExecution.objects.create(
+            report=self.report, output_format='csv', date_from=date(2024, 1, 1), date_to=date(2024, 12, 31),
+        )
+        execute_report_task.apply(args=[str(self.execution.pk)])
+        self.execution.refresh_from_db()
+
+    def link(self, email):
+        message = next(m for m in mail.outbox if m.to == [email])
+        return next(line.split(': ', 1)[1] for line in message.body.splitlines() if line.startswith('Download'))
+
+    def test_each_recipient_gets_a_link_once(self):
+        with override_settings(REPORT_ATTACHMENT_MAX_BYTES=0):
+            result = send_report_email.apply(args=[str(self.execution.pk)]).get()
+
+        self.assertEqual(result['recipients'], 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['finance@example.com', 'ops@example.com'])
+        self.assertEqual([m.attachments for m in mail.outbox], [[], []])
+        self.assertNotEqual(self.link('finance@example.com'), self.link('ops@example.com'))
+        self.assertFalse(ReportDelivery.objects.filter(sent_at__isnull=True).exists())
+
+        # A retry of the task does not email anyone twice
+        send_report_email.apply(args=[str(self.execution.pk)])
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_small_files_are_attached(self):
+        send_report_email.apply(args=[str(self.execution.pk)])
+
+        self.assertEqual(len(mail.outbox[0].attachments), 1)
+        self.assertTrue(ReportDelivery.objects.get(email='ops@example.com').attached)
+
+    def test_link_download_is_recorded_and_supports_ranges(self):
+        send_report_email.apply(args=[str(self.execution.pk)])
+        url = self.link('finance@example.com')
+        with open(self.execution.file_path, 'rb') as f:
+            content = f.read()
+
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        response = self.client.get(url, secure=True, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(content)}')
+        self.assertEqual(b''.join(response.streaming_content), content[10:20])
+
+        response = self.client.get(url, secure=True, HTTP_RANGE=f'bytes={len(content)}-')
+        self.assertEqual(response.status_code, 416)
+
+        delivery = ReportDelivery.objects.get(email='finance@example.com')
+        self.assertEqual(delivery.download_count, 1)
+        self.assertIsNotNone(delivery.first_downloaded_at)
+        self.assertEqual(ReportDelivery.objects.get(email='ops@example.com').download_count, 0)
+
+    def test_expired_and_tampered_links_are_refused(self):
+        send_report_email.apply(args=[str(self.execution.pk)])
+        url = self.link('finance@example.com')
+
+        self.assertEqual(self.client.get(url[:-2] + 'xx/', secure=True).status_code, 404)
+        with override_settings(REPORT_LINK_MAX_AGE=-1):
+            self.assertEqual(self.client.get(url, secure=True).status_code, 410)
+        self.assertEqual(ReportDelivery.objects.get(email='finance@example.com').download_count, 0)
+
+    def test_download_report_supports_ranges(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('reports:download_report', args=[self.execution.pk]), secure=True, HTTP_RANGE='bytes=-5',
+        )
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(len(b''.join(response.streaming_content)), 5)
+
+    def test_report_name_cannot_break_content_disposition(self):
+        Report.objects.filter(pk=self.report.pk).update(name='Sales "Q1"\r\nX-Injected: 1 – Nairobi')
+        self.client.force_login(self.user)
+        url = reverse('reports:download_report', args=[self.execution.pk])
+
+        for headers in ({}, {'HTTP_RANGE': 'bytes=0-9'}):
+            response = self.client.get(url, secure=True, **headers)
+            disposition = response['Content-Disposition']
+            self.assertTrue(disposition.startswith('attachment; filename'))
+            self.assertNotIn('\n', disposition)
+            self.assertIn("filename*=utf-8''Sales%20%22Q1%22", disposition)
+            self.assertFalse(response.has_header('X-Injected'))
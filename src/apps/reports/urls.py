@@ -23,6 +23,7 @@ urlpatterns = [
     path('execution/<uuid:pk>/', views.execution_detail, name='execution_detail'),
     path('execution/<uuid:pk>/download/', views.download_report, name='download_report'),
     path('executions/', views.execution_list, name='execution_list'),
+    path('download/<str:token>/', views.shared_download, name='shared_download'),
     
     # Report Scheduling
     path('<uuid:pk>/schedule/', views.schedule_report, name='schedule_report'),
@@ -316,37 +316,29 @@ def generate_payment_report_data(date_from, date_to):
     """Generate payment report data"""
     from apps.payments.models import Payment
     
+    # Payments are only recorded once received, so every row is completed
     payments = Payment.objects.filter(
         payment_date__gte=date_from,
         payment_date__lte=date_to
     )
+    totals = payments.aggregate(count=Count('id'), sum=Sum('amount'), avg=Avg('amount'))
     
     data = {
         'summary': {
-            'total_payments': payments.count(),
-            'completed_payments': payments.filter(status='completed').count(),
-            'pending_payments': payments.filter(status='pending').count(),
-            'failed_payments': payments.filter(status='failed').count(),
-            'total_amount': float(payments.filter(
-                status='completed'
-            ).aggregate(sum=Sum('amount'))['sum'] or 0),
-            'average_payment': float(payments.filter(
-                status='completed'
-            ).aggregate(avg=Avg('amount'))['avg'] or 0),
+            'total_payments': totals['count'],
+            'total_amount': float(totals['sum'] or 0),
+            'average_payment': float(totals['avg'] or 0),
         },
         'payments': list(payments.values(
-            'id', 'amount', 'payment_date', 'payment_method',
-            'status', 'client__name'
+            'id', 'receipt_number', 'amount', 'payment_date', 'payment_method',
+            'client_vehicle__client__first_name', 'client_vehicle__client__last_name'
         )),
         'by_method': list(
-            payments.filter(status='completed').values('payment_method').annotate(
+            payments.values('payment_method').annotate(
                 total=Sum('amount'),
                 count=Count('id')
             )
         ),
-        'by_status': list(
-            payments.values('status').annotate(count=Count('id'))
-        ),
     }
     
     return data
@@ -21,6 +21,7 @@ from .models import (
     Report,
     ReportTemplate,
     ReportExecution,
+    ReportDelivery,
     ReportWidget,
     SavedReport
 )
@@ -174,9 +175,20 @@ def run_report(request, pk):
         date_to=report.get_date_range()[1]
     )
     
-    # Queue execution task
-    from .tasks import execute_report_task
-    execute_report_task.delay(str(execution.id))
+    # Reuse the file of an identical execution over unchanged data
+    from .cache import serve_from_cache
+    if serve_from_cache(execution):
+        messages.success(request, 'Report ready (data unchanged since the last identical run).')
+        return redirect('reports:execution_detail', pk=execution.pk)
+    
+    # Queue execution task on the interactive queue, or run it here if the
+    # broker is unavailable
+    from . import scheduler
+    if not scheduler.enqueue(execution):
+        from .tasks import execute_report_task
+        execute_report_task.apply(args=[str(execution.id)])
+        messages.success(request, 'Report generated.')
+        return redirect('reports:execution_detail', pk=execution.pk)
     
     messages.success(request, 'Report queued for execution.')
     return redirect('reports:execution_detail', pk=execution.pk)
@@ -195,6 +207,7 @@ def execution_detail(request, pk):
     
     context = {
         'execution': execution,
+        'deliveries': execution.deliveries.all(),
     }
     
     return render(request, 'reports/execution_detail.html', context)
@@ -220,23 +233,33 @@ def download_report(request, pk):
         messages.error(request, 'Report file not found.')
         return redirect('reports:execution_detail', pk=pk)
     
-    # Determine content type
-    content_types = {
-        'pdf': 'application/pdf',
-        'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        'csv': 'text/csv',
-        'json': 'application/json',
-        'html': 'text/html',
-    }
-    content_type = content_types.get(execution.output_format, 'application/octet-stream')
+    from .distribution import file_response
+    return file_response(request, execution)
+
+
+def shared_download(request, token):
+    """Download a report through the signed link emailed to a recipient"""
     
-    # Get filename
-    filename = f"{execution.report.name}_{execution.created_at.strftime('%Y%m%d_%H%M%S')}.{execution.output_format}"
+    from django.core import signing
+    from .distribution import file_response, read_token
     
-    response = FileResponse(open(execution.file_path, 'rb'), content_type=content_type)
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    try:
+        delivery = read_token(token)
+    except signing.SignatureExpired:
+        return HttpResponse('This download link has expired.', status=410, content_type='text/plain')
+    except (signing.BadSignature, ReportDelivery.DoesNotExist):
+        return HttpResponse('This download link is not valid.', status=404, content_type='text/plain')
     
-    return response
+    execution = delivery.execution
+    if execution.status != 'completed' or not execution.file_path or not os.path.exists(execution.file_path):
+        return HttpResponse('This report is no longer available.', status=410, content_type='text/plain')
+    
+    # Resumed downloads send a Range request per part; count the first only
+    byte_range = request.META.get('HTTP_RANGE', '')
+    if not byte_range or byte_range.startswith('bytes=0-'):
+        delivery.record_download()
+    
+    return file_response(request, execution)
 
 
 @login_required
@@ -587,9 +610,15 @@ def report_analytics(request):
     
     executions = ReportExecution.objects.filter(created_at__gte=cutoff)
     
+    cache_stats = ReportExecution.objects.cache_stats(created_at__gte=cutoff)
+    
     analytics = {
         'total_executions': executions.count(),
-        'successful': executions.filter(status='completed').count(),
+        'successful': cache_stats['completed'],
+        'cache_hits': cache_stats['cache_hits'],
+        'cache_hit_rate': (
+            cache_stats['cache_hits'] * 100 / cache_stats['completed'] if cache_stats['completed'] else 0
+        ),
         'failed': executions.filter(status='failed').count(),
         'average_execution_time': executions.filter(status='completed').aggregate(
             avg=Avg('execution_time')
@@ -14,6 +14,7 @@ from .models import (
     RepossessionExpense, RepossessionStatusHistory, RepossessionNotice,
     RepossessionContact, RepossessionRecoveryAttempt
 )
+from utils.admin import PerformanceModelAdmin
 
 
 class RepossessionDocumentInline(admin.TabularInline):
@@ -56,7 +57,7 @@ class RepossessionStatusHistoryInline(admin.TabularInline):
 
 
 @admin.register(Repossession)
-class RepossessionAdmin(admin.ModelAdmin):
+class RepossessionAdmin(PerformanceModelAdmin):
     """Admin interface for repossessions."""
     
     list_display = (
@@ -289,7 +290,7 @@ class RepossessionAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionDocument)
-class RepossessionDocumentAdmin(admin.ModelAdmin):
+class RepossessionDocumentAdmin(PerformanceModelAdmin):
     """Admin interface for repossession documents."""
     
     list_display = (
@@ -328,7 +329,7 @@ class RepossessionDocumentAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionNote)
-class RepossessionNoteAdmin(admin.ModelAdmin):
+class RepossessionNoteAdmin(PerformanceModelAdmin):
     """Admin interface for repossession notes."""
     
     list_display = (
@@ -367,7 +368,7 @@ class RepossessionNoteAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionExpense)
-class RepossessionExpenseAdmin(admin.ModelAdmin):
+class RepossessionExpenseAdmin(PerformanceModelAdmin):
     """Admin interface for repossession expenses."""
     
     list_display = (
@@ -411,7 +412,7 @@ class RepossessionExpenseAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionNotice)
-class RepossessionNoticeAdmin(admin.ModelAdmin):
+class RepossessionNoticeAdmin(PerformanceModelAdmin):
     """Admin interface for repossession notices."""
     
     list_display = (
@@ -461,7 +462,7 @@ class RepossessionNoticeAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionContact)
-class RepossessionContactAdmin(admin.ModelAdmin):
+class RepossessionContactAdmin(PerformanceModelAdmin):
     """Admin interface for repossession contacts."""
     
     list_display = (
@@ -496,7 +497,7 @@ class RepossessionContactAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionRecoveryAttempt)
-class RepossessionRecoveryAttemptAdmin(admin.ModelAdmin):
+class RepossessionRecoveryAttemptAdmin(PerformanceModelAdmin):
     """Admin interface for recovery attempts."""
     
     list_display = (
@@ -550,7 +551,7 @@ class RepossessionRecoveryAttemptAdmin(admin.ModelAdmin):
 
 
 @admin.register(RepossessionStatusHistory)
-class RepossessionStatusHistoryAdmin(admin.ModelAdmin):
+class RepossessionStatusHistoryAdmin(PerformanceModelAdmin):
     """Admin interface for status history."""
     
     list_display = (
@@ -0,0 +1,35 @@
+"""
+Repossession dashboard KPIs (see apps.dashboard.kpis)
+"""
+from django.db.models import Count, Q, Sum
+
+from apps.dashboard import kpis
+
+from .models import Repossession, RepossessionNotice
+
+CLOSED_STATUSES = ['COMPLETED', 'CANCELLED']
+RECOVERY_STATUSES = ['PENDING', 'NOTICE_SENT', 'IN_PROGRESS', 'VEHICLE_RECOVERED']
+
+
+@kpis.register('repossessions', models=[Repossession])
+def repossession_kpis(today):
+    open_cases = ~Q(status__in=CLOSED_STATUSES)
+    return Repossession.objects.all(), {
+        **{
+            f'status_{status}': Count('id', filter=Q(status=status))
+            for status, _ in Repossession.STATUS_CHOICES
+        },
+        'total_active': Count('id', filter=open_cases),
+        'active_outstanding': Sum('outstanding_amount', filter=open_cases),
+        'active_recovery_costs': Sum('total_cost', filter=open_cases),
+        'recovery_outstanding': Sum('outstanding_amount', filter=Q(status__in=RECOVERY_STATUSES)),
+        'total_costs': Sum('total_cost'),
+    }
+
+
+@kpis.register('repossessions', models=[RepossessionNotice])
+def notice_kpis(today):
+    return RepossessionNotice.objects.all(), {
+        'pending_notices': Count('id', filter=Q(delivered=False)),
+        'overdue_notices': Count('id', filter=Q(response_deadline__lt=today, response_received=False)),
+    }
@@ -648,29 +648,17 @@ def get_repossession_dashboard_stats():
     """
     Get statistics for repossession dashboard.
     """
-    from .models import Repossession, RepossessionNotice
+    from apps.dashboard.kpis import get_snapshot
     
+    kpis = get_snapshot('repossessions').values
     stats = {
-        'total_active': Repossession.objects.exclude(
-            status__in=['COMPLETED', 'CANCELLED']
-        ).count(),
-        'pending_approval': Repossession.objects.filter(status='PENDING').count(),
-        'in_recovery': Repossession.objects.filter(status='IN_PROGRESS').count(),
-        'vehicles_recovered': Repossession.objects.filter(status='VEHICLE_RECOVERED').count(),
-        'overdue_notices': RepossessionNotice.objects.filter(
-            response_deadline__lt=date.today(),
-            response_received=False
-        ).count(),
+        'total_active': kpis['total_active'],
+        'pending_approval': kpis['status_PENDING'],
+        'in_recovery': kpis['status_IN_PROGRESS'],
+        'vehicles_recovered': kpis['status_VEHICLE_RECOVERED'],
+        'overdue_notices': kpis['overdue_notices'],
+        'total_outstanding': Decimal(kpis['active_outstanding']),
+        'total_recovery_costs': Decimal(kpis['active_recovery_costs']),
     }
     
-    # Financial stats
-    active_repos = Repossession.objects.exclude(status__in=['COMPLETED', 'CANCELLED'])
-    stats['total_outstanding'] = active_repos.aggregate(
-        Sum('outstanding_amount')
-    )['outstanding_amount__sum'] or Decimal('0.00')
-    
-    stats['total_recovery_costs'] = active_repos.aggregate(
-        Sum('total_cost')
-    )['total_cost__sum'] or Decimal('0.00')
-    
     return stats
\ No newline at end of file
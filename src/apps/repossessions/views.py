@@ -26,6 +26,7 @@ from .forms import (
     RepossessionContactForm, RepossessionRecoveryAttemptForm,
     RepossessionSearchForm, RepossessionCompletionForm
 )
+from apps.dashboard.kpis import get_snapshot
 
 
 # ============================================================================
@@ -35,36 +36,20 @@ from .forms import (
 @login_required
 def repossession_dashboard(request):
     """Display repossession dashboard with key metrics."""
-    # Status counts
-    status_counts = {}
-    for status, label in Repossession.STATUS_CHOICES:
-        count = Repossession.objects.filter(status=status).count()
-        status_counts[status] = {'label': label, 'count': count}
+    # Status counts and totals come from the KPI snapshot
+    kpi_snapshot = get_snapshot('repossessions')
+    kpi_values = kpi_snapshot.values
+    
+    status_counts = {
+        status: {'label': label, 'count': kpi_values[f'status_{status}']}
+        for status, label in Repossession.STATUS_CHOICES
+    }
     
     # Recent repossessions
     recent_repos = Repossession.objects.all().select_related(
         'vehicle', 'client', 'assigned_to'
     ).order_by('-created_at')[:10]
     
-    # Pending actions
-    pending_notices = RepossessionNotice.objects.filter(
-        delivered=False
-    ).count()
-    
-    overdue_responses = RepossessionNotice.objects.filter(
-        response_deadline__lt=date.today(),
-        response_received=False
-    ).count()
-    
-    # Financial summary
-    total_outstanding = Repossession.objects.filter(
-        status__in=['PENDING', 'NOTICE_SENT', 'IN_PROGRESS', 'VEHICLE_RECOVERED']
-    ).aggregate(Sum('outstanding_amount'))['outstanding_amount__sum'] or Decimal('0.00')
-    
-    total_costs = Repossession.objects.aggregate(
-        Sum('total_cost')
-    )['total_cost__sum'] or Decimal('0.00')
-    
     # Monthly trend (last 6 months)
     six_months_ago = date.today() - timedelta(days=180)
     monthly_trend = Repossession.objects.filter(
@@ -78,10 +63,11 @@ def repossession_dashboard(request):
     context = {
         'status_counts': status_counts,
         'recent_repos': recent_repos,
-        'pending_notices': pending_notices,
-        'overdue_responses': overdue_responses,
-        'total_outstanding': total_outstanding,
-        'total_costs': total_costs,
+        'pending_notices': kpi_values['pending_notices'],
+        'overdue_responses': kpi_values['overdue_notices'],
+        'total_outstanding': kpi_values['recovery_outstanding'],
+        'total_costs': kpi_values['total_costs'],
+        'kpi_snapshot': kpi_snapshot,
         'monthly_trend': list(monthly_trend),
     }
     
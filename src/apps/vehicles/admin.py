@@ -4,8 +4,9 @@ Vehicles Admin Configuration
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.db.models import Sum, Count
+from django.db.models import Sum, Count, Prefetch
 from .models import Vehicle, VehiclePhoto, VehicleHistory
+from utils.admin import PerformanceModelAdmin
 
 
 class VehiclePhotoInline(admin.TabularInline):
@@ -29,7 +30,7 @@ class VehicleHistoryInline(admin.TabularInline):
 
 
 @admin.register(Vehicle)
-class VehicleAdmin(admin.ModelAdmin):
+class VehicleAdmin(PerformanceModelAdmin):
     """Admin interface for Vehicles"""
     
     inlines = [VehiclePhotoInline, VehicleHistoryInline]
@@ -106,6 +107,15 @@ class VehicleAdmin(admin.ModelAdmin):
     ordering = ['-date_added']
     list_per_page = 25
     
+    # Main photo first: primary photos, then the model's photo ordering
+    list_prefetch_related = [
+        Prefetch(
+            'photos',
+            queryset=VehiclePhoto.objects.order_by('-is_primary', 'order', '-uploaded_at'),
+            to_attr='ordered_photos'
+        ),
+    ]
+    
     actions = [
         'mark_as_available', 'mark_as_sold', 'mark_as_reserved',
         'activate_vehicles', 'deactivate_vehicles', 
@@ -114,7 +124,8 @@ class VehicleAdmin(admin.ModelAdmin):
     
     def vehicle_thumbnail(self, obj):
         """Display vehicle thumbnail"""
-        main_photo = obj.main_photo
+        photos = getattr(obj, 'ordered_photos', None)
+        main_photo = photos[0] if photos else None
         if main_photo and main_photo.image:
             return format_html(
                 '<img src="{}" width="80" height="60" style="object-fit: cover; border-radius: 4px;" />',
@@ -176,9 +187,9 @@ class VehicleAdmin(admin.ModelAdmin):
         """Display profit"""
         profit_color = 'green' if obj.profit >= 0 else 'red'
         return format_html(
-            '<span style="color: {}; font-weight: bold;">KSh {:,}</span>',
+            '<span style="color: {}; font-weight: bold;">KSh {}</span>',
             profit_color,
-            obj.profit
+            f'{obj.profit:,}'
         )
     profit_display.short_description = 'Profit'
     
@@ -187,9 +198,9 @@ class VehicleAdmin(admin.ModelAdmin):
         percentage = obj.profit_percentage
         color = 'green' if percentage >= 0 else 'red'
         return format_html(
-            '<span style="color: {}; font-weight: bold;">{:.2f}%</span>',
+            '<span style="color: {}; font-weight: bold;">{}%</span>',
             color,
-            percentage
+            f'{percentage:.2f}'
         )
     profit_percentage_display.short_description = 'Profit %'
     
@@ -274,7 +285,7 @@ class VehicleAdmin(admin.ModelAdmin):
 
 
 @admin.register(VehiclePhoto)
-class VehiclePhotoAdmin(admin.ModelAdmin):
+class VehiclePhotoAdmin(PerformanceModelAdmin):
     """Admin interface for Vehicle Photos"""
     
     list_display = ['photo_thumbnail', 'vehicle', 'caption', 'is_primary', 'order', 'uploaded_at']
@@ -295,7 +306,7 @@ class VehiclePhotoAdmin(admin.ModelAdmin):
 
 
 @admin.register(VehicleHistory)
-class VehicleHistoryAdmin(admin.ModelAdmin):
+class VehicleHistoryAdmin(PerformanceModelAdmin):
     """Admin interface for Vehicle History"""
     
     list_display = ['vehicle', 'timestamp', 'changed_by', 'status_change', 'notes_short']
@@ -69,6 +69,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.audit.middleware.PerformanceMiddleware',  # Request profiling - first, so it times everything below
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise - should be right after SecurityMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -174,6 +175,10 @@ WHITENOISE_SKIP_COMPRESS_EXTENSIONS = ('jpg', 'jpeg', 'png', 'gif', 'webp', 'zip
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Confidential generated files (payslip PDFs) are kept outside MEDIA_ROOT,
+# which is served without authentication, and only streamed by views
+PRIVATE_MEDIA_ROOT = config('PRIVATE_MEDIA_ROOT', default=str(BASE_DIR / 'private_media'))
+
 # IMPORTANT: WhiteNoise can serve media files using WHITENOISE_ROOT
 # This serves files at the root URL, but we'll handle media separately
 # For production, consider using cloud storage (S3, Azure Blob, etc.)
@@ -296,6 +301,97 @@ CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
+# Periodic tasks synced into django_celery_beat on beat startup
+from celery.schedules import crontab
+
+CELERY_BEAT_SCHEDULE = {
+    'documents-maintenance': {
+        'task': 'apps.documents.tasks.documents_maintenance_task',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'expenses-generate-recurring': {
+        'task': 'apps.expenses.tasks.generate_recurring_expenses_task',
+        'schedule': crontab(hour=0, minute=30),
+    },
+    'expenses-anomaly-scan': {
+        'task': 'apps.expenses.tasks.expense_anomaly_scan_task',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    'dashboard-refresh-kpis': {
+        'task': 'apps.dashboard.tasks.refresh_kpi_snapshots_task',
+        'schedule': crontab(minute='*'),
+    },
+    'authentication-purge-sessions': {
+        'task': 'apps.authentication.tasks.purge_expired_sessions_task',
+        'schedule': crontab(minute=15),
+    },
+    'reports-process-scheduled': {
+        'task': 'apps.reports.tasks.process_scheduled_reports',
+        'schedule': crontab(minute='*/5'),
+    },
+    'clients-reconcile-summaries': {
+        'task': 'apps.clients.tasks.reconcile_client_summaries_task',
+        'schedule': crontab(minute=45),
+    },
+    'insurance-requeue-reminder-runs': {
+        'task': 'apps.insurance.tasks.requeue_reminder_runs_task',
+        'schedule': crontab(minute='*/5'),
+    },
+    'audit-purge-performance-metrics': {
+        'task': 'apps.audit.tasks.purge_performance_metrics_task',
+        'schedule': crontab(hour=3, minute=15),
+    },
+}
+
+# Dashboard KPI snapshots are recomputed when older than this (seconds),
+# or on the next minute after a change to one of their models
+KPI_SNAPSHOT_MAX_AGE = config('KPI_SNAPSHOT_MAX_AGE', default=300, cast=int)
+
+# Admin changelists paginate on the planner's row estimate instead of
+# COUNT(*) once a result is estimated above this many rows (PostgreSQL)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)
+
+# Request performance instrumentation (apps.audit.performance): share of
+# requests profiled, seconds between flushes of the in-memory aggregates,
+# executions of one query shape in a request reported as an N+1, and how
+# long flushed metrics are kept (purged daily by a beat task)
+PERF_INSTRUMENTATION_ENABLED = config('PERF_INSTRUMENTATION_ENABLED', default=True, cast=bool)
+PERF_SAMPLE_RATE = config('PERF_SAMPLE_RATE', default=1.0, cast=float)
+PERF_FLUSH_INTERVAL = config('PERF_FLUSH_INTERVAL', default=60, cast=int)
+PERF_DUPLICATE_THRESHOLD = config('PERF_DUPLICATE_THRESHOLD', default=3, cast=int)
+PERF_METRICS_RETENTION_DAYS = config('PERF_METRICS_RETENTION_DAYS', default=14, cast=int)
+
+# Report executions (apps.reports.scheduler): when these queue names are
+# set, reports run from the UI and scheduled reports go to separate queues,
+# each consumed by its own worker (docker-compose.yml runs one per queue);
+# unset, they stay on the default queue. enqueue() passes the queue on every
+# call, so there is no task route. At most this many executions of one report type run at a
+# time; an execution over the limit is re-queued after REPORT_DEFER_SECONDS
+REPORT_QUEUE_INTERACTIVE = config('REPORT_QUEUE_INTERACTIVE', default='')
+REPORT_QUEUE_SCHEDULED = config('REPORT_QUEUE_SCHEDULED', default='')
+REPORT_DEFAULT_CONCURRENCY = config('REPORT_DEFAULT_CONCURRENCY', default=4, cast=int)
+REPORT_TYPE_CONCURRENCY = {
+    'financial': 2,
+    'sales': 2,
+}
+REPORT_DEFER_SECONDS = config('REPORT_DEFER_SECONDS', default=30, cast=int)
+
+# Excel and PDF report files (apps.reports.generators): detail rows written
+# per section (a report's query_config 'max_rows' overrides these), rows per
+# PDF table chunk, and the total detail rows above which Excel and PDF files
+# carry only the summary (0 disables it; CSV always has every row)
+REPORT_EXCEL_MAX_ROWS = config('REPORT_EXCEL_MAX_ROWS', default=1048575, cast=int)
+REPORT_PDF_MAX_ROWS = config('REPORT_PDF_MAX_ROWS', default=5000, cast=int)
+REPORT_PDF_CHUNK_ROWS = config('REPORT_PDF_CHUNK_ROWS', default=500, cast=int)
+REPORT_SUMMARY_ONLY_ROWS = config('REPORT_SUMMARY_ONLY_ROWS', default=0, cast=int)
+
+# Report emails (apps.reports.distribution) carry a signed download link
+# valid for REPORT_LINK_MAX_AGE seconds, built on REPORT_LINK_BASE_URL; files
+# up to REPORT_ATTACHMENT_MAX_BYTES are attached as well
+REPORT_LINK_BASE_URL = config('REPORT_LINK_BASE_URL', default='https://vms.ayubsoft-inc.systems')
+REPORT_LINK_MAX_AGE = config('REPORT_LINK_MAX_AGE', default=7 * 24 * 3600, cast=int)
+REPORT_ATTACHMENT_MAX_BYTES = config('REPORT_ATTACHMENT_MAX_BYTES', default=2 * 1024 * 1024, cast=int)
+
 # ==============================================================================
 # COMPANY INFORMATION
 # ==============================================================================
@@ -324,6 +420,19 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB in bytes
 ALLOWED_DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.jpg', '.jpeg', '.png']
 ALLOWED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif']
 
+# Per-user document storage quota in MB (0 = unlimited)
+DOCUMENT_STORAGE_QUOTA_MB = config('DOCUMENT_STORAGE_QUOTA_MB', default=0, cast=int)
+
+# Document full-text search (PostgreSQL text search configuration)
+DOCUMENT_SEARCH_CONFIG = config('DOCUMENT_SEARCH_CONFIG', default='simple')
+
+# Document preview sizes rendered by the background processing pipeline
+DOCUMENT_PREVIEW_SIZES = {
+    'small': (128, 128),
+    'medium': (320, 320),
+    'large': (1024, 1024),
+}
+
 # ==============================================================================
 # SECURITY SETTINGS (Production)
 # ==============================================================================
@@ -355,6 +464,41 @@ SESSION_SAVE_EVERY_REQUEST = False
 SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 
+# With a shared session cache (SESSION_REDIS_URL, below), sessions are read
+# from the 'sessions' cache and written through to django_session; unchanged
+# sessions are not re-saved. Without one each gunicorn worker would hold its
+# own copy, so a logout or password change would not reach the others: use
+# the database engine instead.
+SESSION_REDIS_URL = config('SESSION_REDIS_URL', default='')
+SESSION_ENGINE = 'apps.authentication.sessions' if SESSION_REDIS_URL else 'django.contrib.sessions.backends.db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Expired sessions are purged hourly in batches of this many rows
+SESSION_PURGE_BATCH_SIZE = config('SESSION_PURGE_BATCH_SIZE', default=5000, cast=int)
+
+# ==============================================================================
+# CACHE CONFIGURATION
+# ==============================================================================
+
+# The sessions cache is process memory unless SESSION_REDIS_URL names a
+# server; the cache-first session engine is only enabled with a server.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+if SESSION_REDIS_URL:
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': SESSION_REDIS_URL,
+        'KEY_PREFIX': 'sessions',
+    }
+
 # ==============================================================================
 # LOGGING CONFIGURATION
 # ==============================================================================
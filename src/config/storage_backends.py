@@ -12,8 +12,13 @@ To switch to cloud storage:
 3. Set cloud provider credentials in environment variables
 """
 
+import hashlib
+import os
+
 from django.core.files.storage import FileSystemStorage
 from django.conf import settings
+from django.db import transaction
+from django.utils.functional import cached_property
 
 
 class SecureMediaStorage(FileSystemStorage):
@@ -40,6 +45,126 @@ class SecureMediaStorage(FileSystemStorage):
         return super().get_available_name(name, max_length)
 
 
+class PrivateMediaStorage(FileSystemStorage):
+    """
+    Storage for confidential generated files (payslip PDFs).
+
+    Files live under PRIVATE_MEDIA_ROOT, outside MEDIA_ROOT, so neither the
+    /media/ URL pattern nor the web server's media location can serve them.
+    They have no URL; views stream them after checking permissions.
+    """
+    
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PRIVATE_MEDIA_ROOT)
+    
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'PRIVATE_MEDIA_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
+    
+    def url(self, name):
+        raise ValueError('Private files have no public URL; serve them through a view.')
+
+
+def compute_content_digest(content, chunk_size=1024 * 1024):
+    """
+    Stream a file through BLAKE2b and return (hexdigest, size_in_bytes).
+
+    Uses large buffers so big uploads are hashed with few Python-level
+    iterations. The file position is rewound afterwards.
+    """
+    hasher = hashlib.blake2b(digest_size=32)
+    size = 0
+
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    if hasattr(content, 'chunks'):
+        chunks = content.chunks(chunk_size=chunk_size)
+    else:
+        chunks = iter(lambda: content.read(chunk_size), b'')
+
+    for chunk in chunks:
+        hasher.update(chunk)
+        size += len(chunk)
+
+    if hasattr(content, 'seek'):
+        content.seek(0)
+
+    return hasher.hexdigest(), size
+
+
+class ContentAddressableMediaStorage(SecureMediaStorage):
+    """
+    Content-addressable storage for uploaded documents.
+
+    Every upload is stored once under its content digest
+    (cas/ab/cd/<digest>.<ext>) no matter how many documents reference it.
+    References are counted in documents.DocumentBlob, and the file is only
+    removed from disk when the last reference is released.
+    """
+
+    prefix = 'cas'
+    chunk_size = 1024 * 1024
+
+    def blob_name(self, digest, extension=''):
+        """Build the storage path for a digest"""
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+    def is_blob_name(self, name):
+        """Check whether a name lives in the content-addressed area"""
+        return bool(name) and name.startswith(f"{self.prefix}/")
+
+    def _save(self, name, content):
+        from apps.documents.models import DocumentBlob
+
+        digest, size = compute_content_digest(content, self.chunk_size)
+        blob_name = self.blob_name(digest, os.path.splitext(name)[1])
+
+        try:
+            # Re-referencing a stored blob restarts the orphan scan's grace period
+            os.utime(self.path(blob_name))
+        except FileNotFoundError:
+            blob_name = super()._save(blob_name, content)
+
+        DocumentBlob.objects.acquire(blob_name, digest, size)
+        return blob_name
+
+    def delete(self, name):
+        """
+        Release one reference to a blob.
+
+        Untracked (legacy) files are deleted directly. Tracked blobs are
+        removed once their reference count reaches zero and the current
+        transaction commits.
+        """
+        from apps.documents.models import DocumentBlob
+
+        released = DocumentBlob.objects.release(name)
+        if released is None:
+            super().delete(name)
+        elif released:
+            transaction.on_commit(lambda: self._delete_unreferenced(name))
+
+    def _delete_unreferenced(self, name):
+        from apps.documents.models import DocumentBlob
+
+        # A new upload of the same content may have re-acquired the blob
+        if not DocumentBlob.objects.filter(name=name).exists():
+            super().delete(name)
+
+
+def get_document_storage():
+    """Storage used by documents.Document.file"""
+    return ContentAddressableMediaStorage()
+
+
+def get_private_storage():
+    """Storage used by payroll.Payslip.pdf_file"""
+    return PrivateMediaStorage()
+
+
 # Example AWS S3 Configuration (for future use)
 # Uncomment and configure when ready to use S3
 """
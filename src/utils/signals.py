@@ -0,0 +1,127 @@
+"""
+Transaction-scoped signal batching
+
+A receiver registered with @batch_receiver is called once per transaction
+and sender, after the transaction commits, with the list of events it
+collected instead of once per saved row:
+
+    @batch_receiver([post_save, post_delete], sender=Payment,
+                    snapshot=lambda payment: payment.client_vehicle_id)
+    def refresh_summaries(sender, events):
+        refresh({event.data for event in events})
+
+Outside a transaction (autocommit) each event is delivered immediately as
+a batch of one. Batches of a rolled-back transaction are dropped, but
+events saved inside a savepoint that rolled back while its transaction
+committed are still delivered, so batch receivers should recompute from
+the database rather than apply the events as deltas. Receivers whose
+derived rows must change in the same transaction as the source row stay
+plain @receiver functions.
+
+suppress_receivers() skips batch receivers during bulk operations whose
+caller rebuilds the derived data itself.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Any, NamedTuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_state = threading.local()
+
+
+class SignalEvent(NamedTuple):
+    signal: Any
+    instance: Any
+    created: bool
+    # snapshot(instance) taken when the signal fired, if the receiver asked for one
+    data: Any
+
+
+def _pending():
+    """(alias, handler, sender) -> (events, on_commit list the delivery is queued on)"""
+    if not hasattr(_state, 'pending'):
+        _state.pending = {}
+    return _state.pending
+
+
+def _suppressed():
+    if not hasattr(_state, 'suppressed'):
+        _state.suppressed = []
+    return _state.suppressed
+
+
+def batch_receiver(signals, sender, snapshot=None, dispatch_uid=None):
+    """
+    Register handler(sender, events) to receive the `signals` sent by
+    `sender` as one list per transaction, after commit.
+
+    snapshot(instance), when given, is evaluated as each signal fires and
+    stored as event.data, for state that a later save in the same
+    transaction would overwrite (e.g. what a row looked like before).
+    """
+    if not isinstance(signals, (list, tuple)):
+        signals = [signals]
+
+    def decorator(handler):
+        def collect(sender, instance, signal, raw=False, using=None, **kwargs):
+            if raw or _is_suppressed(handler):
+                return
+            event = SignalEvent(
+                signal, instance, kwargs.get('created', False),
+                snapshot(instance) if snapshot else None,
+            )
+            _collect(handler, sender, using or DEFAULT_DB_ALIAS, event)
+
+        uid = dispatch_uid or f'batch_{handler.__module__}.{handler.__qualname__}'
+        for signal in signals:
+            signal.connect(collect, sender=sender, weak=False, dispatch_uid=uid)
+        return handler
+    return decorator
+
+
+def _collect(handler, sender, using, event):
+    connection = connections[using]
+    pending = _pending()
+    key = (using, handler, sender)
+
+    # Django replaces run_on_commit when a transaction or savepoint ends, so
+    # a batch whose list is no longer current is delivered or discarded
+    batch = pending.get(key)
+    if batch and connection.in_atomic_block and batch[1] is connection.run_on_commit:
+        batch[0].append(event)
+        return
+
+    events = [event]
+
+    def deliver():
+        if pending.get(key, (None,))[0] is events:
+            del pending[key]
+        handler(sender, events)
+    deliver.__qualname__ = handler.__qualname__
+
+    if connection.in_atomic_block:
+        transaction.on_commit(deliver, using=using, robust=True)
+        pending[key] = (events, connection.run_on_commit)
+    else:
+        deliver()
+
+
+def _is_suppressed(handler):
+    return any(not handlers or handler in handlers for handlers in _suppressed())
+
+
+@contextmanager
+def suppress_receivers(*handlers):
+    """
+    Drop events for batch receivers (all, or only `handlers`) raised in
+    this thread inside the block. For bulk loads and repairs that rebuild
+    the derived data themselves afterwards.
+    """
+    stack = _suppressed()
+    stack.append(set(handlers))
+    try:
+        yield
+    finally:
+        stack.pop()
+